@@ -0,0 +1,45 @@
+"""add_system_sample
+
+Added system_sample table holding the last /proc sample (CPU, disk and
+network counters plus boot time) so each run computes machine rates
+against the previous run instead of sleeping through a sampling window.
+
+Revision ID: 3c7b2e9f4a18
+Revises: 9d3f7a1c5e22
+Create Date: 2026-10-17 14:21:05.118930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c7b2e9f4a18'
+down_revision: Union[str, Sequence[str], None] = '9d3f7a1c5e22'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create system_sample table."""
+    op.create_table(
+        "system_sample",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("timestamp", sa.Float(), nullable=False),
+        sa.Column("boot_time", sa.Integer(), nullable=False),
+        sa.Column("cpu_total", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("cpu_idle", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("cpu_iowait", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("disk_read_bytes", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("disk_write_bytes", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("net_recv_bytes", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("net_sent_bytes", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    """Drop system_sample table."""
+    op.drop_table("system_sample")
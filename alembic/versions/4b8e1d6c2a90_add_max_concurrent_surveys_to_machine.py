@@ -0,0 +1,41 @@
+"""add_max_concurrent_surveys_to_machine
+
+Added max_concurrent_surveys field to Machine table to cap the number of
+in-flight node survey requests. Defaults to 1 for backward compatibility
+(nodes are surveyed one at a time).
+
+Revision ID: 4b8e1d6c2a90
+Revises: e2f4a512d24c
+Create Date: 2026-10-17 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b8e1d6c2a90'
+down_revision: Union[str, Sequence[str], None] = 'e2f4a512d24c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add max_concurrent_surveys column to machine table."""
+    with op.batch_alter_table("machine", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "max_concurrent_surveys",
+                sa.Integer(),
+                nullable=True,
+                server_default="1",
+            )
+        )
+
+
+def downgrade() -> None:
+    """Remove max_concurrent_surveys column from machine table."""
+    with op.batch_alter_table("machine", schema=None) as batch_op:
+        batch_op.drop_column("max_concurrent_surveys")
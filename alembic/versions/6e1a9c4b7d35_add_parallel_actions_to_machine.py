@@ -0,0 +1,41 @@
+"""add_parallel_actions_to_machine
+
+Added parallel_actions field to Machine table to run planned node actions
+concurrently (bounded by max_concurrent_operations). Defaults to 0 for
+backward compatibility (actions run one at a time).
+
+Revision ID: 6e1a9c4b7d35
+Revises: 3c7b2e9f4a18
+Create Date: 2026-10-17 15:40:12.902117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e1a9c4b7d35'
+down_revision: Union[str, Sequence[str], None] = '3c7b2e9f4a18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add parallel_actions column to machine table."""
+    with op.batch_alter_table("machine", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "parallel_actions",
+                sa.Integer(),
+                nullable=True,
+                server_default="0",
+            )
+        )
+
+
+def downgrade() -> None:
+    """Remove parallel_actions column from machine table."""
+    with op.batch_alter_table("machine", schema=None) as batch_op:
+        batch_op.drop_column("parallel_actions")
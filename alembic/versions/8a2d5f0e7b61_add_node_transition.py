@@ -0,0 +1,51 @@
+"""add_node_transition
+
+Added node_transition table tracking each RESTARTING/UPGRADING transition:
+readiness probe state while it is open, and the outcome and time-to-ready
+once the node is promoted (or its delay timer expires).
+
+Revision ID: 8a2d5f0e7b61
+Revises: 6e1a9c4b7d35
+Create Date: 2026-10-17 16:52:40.337914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a2d5f0e7b61'
+down_revision: Union[str, Sequence[str], None] = '6e1a9c4b7d35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create node_transition table."""
+    op.create_table(
+        "node_transition",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("node_id", sa.Integer(), nullable=False),
+        sa.Column("transition", sa.UnicodeText(), nullable=False),
+        sa.Column("started_at", sa.Integer(), nullable=False),
+        sa.Column("finished_at", sa.Integer(), nullable=True),
+        sa.Column("outcome", sa.UnicodeText(), nullable=True),
+        sa.Column("probes", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("next_probe_at", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("seconds", sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_node_transition_open",
+        "node_transition",
+        ["transition", "finished_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Drop node_transition table."""
+    op.drop_index("ix_node_transition_open", table_name="node_transition")
+    op.drop_table("node_transition")
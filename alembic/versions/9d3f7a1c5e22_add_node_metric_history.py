@@ -0,0 +1,71 @@
+"""add_node_metric_history
+
+Added node_metric table holding append-only node metrics history
+(raw survey samples, 5 minute and hourly rollups) and the
+history_retention field to the Machine table (days, default 30).
+
+Revision ID: 9d3f7a1c5e22
+Revises: 4b8e1d6c2a90
+Create Date: 2026-10-17 11:02:18.640417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3f7a1c5e22'
+down_revision: Union[str, Sequence[str], None] = '4b8e1d6c2a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create node_metric table and add history_retention to machine."""
+    op.create_table(
+        "node_metric",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("node_id", sa.Integer(), nullable=False),
+        sa.Column("timestamp", sa.Integer(), nullable=False),
+        sa.Column("resolution", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("records", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("puts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("rewards", sa.UnicodeText(), nullable=True, server_default="0"),
+        sa.Column("connected_peers", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("shunned", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("mem", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("cpu", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_node_metric_node_resolution_ts",
+        "node_metric",
+        ["node_id", "resolution", "timestamp"],
+    )
+    op.create_index(
+        "ix_node_metric_resolution_ts",
+        "node_metric",
+        ["resolution", "timestamp"],
+    )
+    op.create_index("ix_node_metric_ts", "node_metric", ["timestamp"])
+    with op.batch_alter_table("machine", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "history_retention",
+                sa.Integer(),
+                nullable=True,
+                server_default="30",
+            )
+        )
+
+
+def downgrade() -> None:
+    """Drop node_metric table and history_retention column."""
+    with op.batch_alter_table("machine", schema=None) as batch_op:
+        batch_op.drop_column("history_retention")
+    op.drop_index("ix_node_metric_ts", table_name="node_metric")
+    op.drop_index("ix_node_metric_resolution_ts", table_name="node_metric")
+    op.drop_index("ix_node_metric_node_resolution_ts", table_name="node_metric")
+    op.drop_table("node_metric")
@@ -0,0 +1,41 @@
+"""add_firewall_range_block_to_machine
+
+Added firewall_range_block field to Machine table (node ports are opened
+in port-range firewall rules covering this many node ids; 0 keeps one
+rule per node).
+
+Revision ID: a8d2c5e9f141
+Revises: f3b9d6e2a8c4
+Create Date: 2026-10-17 23:18:42.513904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8d2c5e9f141'
+down_revision: Union[str, Sequence[str], None] = 'f3b9d6e2a8c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add firewall_range_block column to machine table."""
+    with op.batch_alter_table("machine", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "firewall_range_block",
+                sa.Integer(),
+                nullable=True,
+                server_default="0",
+            )
+        )
+
+
+def downgrade() -> None:
+    """Remove firewall_range_block column from machine table."""
+    with op.batch_alter_table("machine", schema=None) as batch_op:
+        batch_op.drop_column("firewall_range_block")
@@ -0,0 +1,58 @@
+"""add_upgrade_rollout
+
+Added upgrade_canary field to Machine table (canary cohort size for rolling
+upgrades, 0 disables waves) and the upgrade_rollout table persisting the
+rollout state, open wave and progress across runs.
+
+Revision ID: b7c3e81f2d49
+Revises: 8a2d5f0e7b61
+Create Date: 2026-10-17 17:34:18.604251
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7c3e81f2d49'
+down_revision: Union[str, Sequence[str], None] = '8a2d5f0e7b61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add upgrade_canary column and create upgrade_rollout table."""
+    with op.batch_alter_table("machine", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "upgrade_canary",
+                sa.Integer(),
+                nullable=True,
+                server_default="0",
+            )
+        )
+    op.create_table(
+        "upgrade_rollout",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.UnicodeText(), nullable=False),
+        sa.Column("state", sa.UnicodeText(), nullable=False, server_default="rolling"),
+        sa.Column("started_at", sa.Integer(), nullable=False),
+        sa.Column("finished_at", sa.Integer(), nullable=True),
+        sa.Column("wave", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("wave_size", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("wave_started_at", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("wave_nodes", sa.UnicodeText(), nullable=False, server_default="{}"),
+        sa.Column("upgraded", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("rolled_back", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("reason", sa.UnicodeText(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    """Drop upgrade_rollout table and upgrade_canary column."""
+    op.drop_table("upgrade_rollout")
+    with op.batch_alter_table("machine", schema=None) as batch_op:
+        batch_op.drop_column("upgrade_canary")
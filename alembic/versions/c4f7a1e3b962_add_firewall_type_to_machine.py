@@ -0,0 +1,33 @@
+"""add_firewall_type_to_machine
+
+Added firewall_type field to Machine table (firewall backend for node
+ports: ufw, nftables or null; NULL keeps the process manager's default).
+
+Revision ID: c4f7a1e3b962
+Revises: a8d2c5e9f141
+Create Date: 2026-10-17 23:52:17.284615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f7a1e3b962'
+down_revision: Union[str, Sequence[str], None] = 'a8d2c5e9f141'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add firewall_type column to machine table."""
+    with op.batch_alter_table("machine", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("firewall_type", sa.UnicodeText(), nullable=True))
+
+
+def downgrade() -> None:
+    """Remove firewall_type column from machine table."""
+    with op.batch_alter_table("machine", schema=None) as batch_op:
+        batch_op.drop_column("firewall_type")
@@ -0,0 +1,33 @@
+"""add_downtime_to_node_transition
+
+Added downtime field to node_transition table: seconds between stopping a
+node and starting it again on the new binary during an upgrade cutover.
+
+Revision ID: d41f6a2b8c57
+Revises: b7c3e81f2d49
+Create Date: 2026-10-17 18:26:51.472063
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41f6a2b8c57'
+down_revision: Union[str, Sequence[str], None] = 'b7c3e81f2d49'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add downtime column to node_transition table."""
+    with op.batch_alter_table("node_transition", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("downtime", sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    """Remove downtime column from node_transition table."""
+    with op.batch_alter_table("node_transition", schema=None) as batch_op:
+        batch_op.drop_column("downtime")
@@ -0,0 +1,41 @@
+"""add_systemd_template_to_machine
+
+Added systemd_template field to Machine table (create systemd nodes as
+instances of the antnode@.service template unit, 0 keeps one unit file per
+node).
+
+Revision ID: e5a8c3d17f92
+Revises: d41f6a2b8c57
+Create Date: 2026-10-17 21:12:47.318560
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a8c3d17f92'
+down_revision: Union[str, Sequence[str], None] = 'd41f6a2b8c57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add systemd_template column to machine table."""
+    with op.batch_alter_table("machine", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "systemd_template",
+                sa.Integer(),
+                nullable=True,
+                server_default="0",
+            )
+        )
+
+
+def downgrade() -> None:
+    """Remove systemd_template column from machine table."""
+    with op.batch_alter_table("machine", schema=None) as batch_op:
+        batch_op.drop_column("systemd_template")
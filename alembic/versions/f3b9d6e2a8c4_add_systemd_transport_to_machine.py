@@ -0,0 +1,41 @@
+"""add_systemd_transport_to_machine
+
+Added systemd_transport field to Machine table (how the systemd process
+manager talks to systemd: subprocess runs systemctl, dbus uses one
+persistent D-Bus connection).
+
+Revision ID: f3b9d6e2a8c4
+Revises: e5a8c3d17f92
+Create Date: 2026-10-17 22:41:05.806127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b9d6e2a8c4'
+down_revision: Union[str, Sequence[str], None] = 'e5a8c3d17f92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add systemd_transport column to machine table."""
+    with op.batch_alter_table("machine", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "systemd_transport",
+                sa.UnicodeText(),
+                nullable=True,
+                server_default="subprocess",
+            )
+        )
+
+
+def downgrade() -> None:
+    """Remove systemd_transport column from machine table."""
+    with op.batch_alter_table("machine", schema=None) as batch_op:
+        batch_op.drop_column("systemd_transport")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark the single-pass node metrics parser against the previous
+regex-per-series implementation.
+
+Uses the checked-in metrics.out fixture (a real antnode /metrics page) and
+verifies both implementations return the same dict before timing them.
+
+Usage:
+    python scripts/bench_metrics_parser.py [--iterations 2000] [--file metrics.out]
+"""
+
+import argparse
+import os
+import re
+import sys
+import timeit
+from pathlib import Path
+
+# Add src to path so we can import wnm modules
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+# Skip config/database initialisation on import
+os.environ.setdefault("WNM_TEST_MODE", "1")
+
+from wnm.common import RUNNING  # noqa: E402
+from wnm.utils import parse_node_metrics  # noqa: E402
+
+
+def legacy_parse(text):
+    """The regex-per-series parser previously inlined in read_node_metrics."""
+    metrics = {"status": RUNNING}
+    metrics["uptime"] = int((re.findall(r"ant_node_uptime ([\d]+)", text) or [0])[0])
+    metrics["records"] = int(
+        (re.findall(r"ant_networking_records_stored ([\d]+)", text) or [0])[0]
+    )
+    metrics["shunned"] = int(
+        (re.findall(r"ant_networking_shunned_by_close_group ([\d]+)", text) or [0])[0]
+    )
+    metrics["connected_peers"] = int(
+        (re.findall(r"ant_networking_connected_peers ([\d]+)", text) or [0])[0]
+    )
+    metrics["puts"] = int(
+        (re.findall(r"ant_node_put_record_ok_total(?:\{[^}]*\})? ([\d]+)", text) or [0])[0]
+    )
+    metrics["gets"] = 0
+    metrics["rewards"] = str(
+        (re.findall(r"ant_node_current_reward_wallet_balance ([\d.]+)", text) or ["0"])[0]
+    )
+    mem_mb = float(
+        (re.findall(r"ant_networking_process_memory_used_mb ([\d.]+)", text) or [0])[0]
+    )
+    metrics["mem"] = int(mem_mb * 100)
+    cpu_pct = float(
+        (re.findall(r"ant_networking_process_cpu_usage_percentage ([\d.]+)", text) or [0])[0]
+    )
+    metrics["cpu"] = int(cpu_pct * 100)
+    for key, name in (
+        ("open_connections", "ant_networking_open_connections"),
+        ("total_peers", "ant_networking_peers_in_routing_table"),
+        ("bad_peers", "ant_networking_bad_peers_count_total"),
+        ("rel_records", "ant_networking_relevant_records"),
+        ("max_records", "ant_networking_max_records"),
+        ("payment_count", "ant_networking_received_payment_count"),
+        ("live_time", "ant_networking_live_time"),
+        ("network_size", "ant_networking_estimated_network_size"),
+    ):
+        metrics[key] = int((re.findall(name + r" ([\d]+)", text) or [0])[0])
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument(
+        "--file", default=str(Path(__file__).parent.parent / "metrics.out")
+    )
+    args = parser.parse_args()
+
+    text = Path(args.file).read_text()
+    legacy = legacy_parse(text)
+    current = parse_node_metrics(text)
+    if legacy != current:
+        print("Parsers disagree:")
+        for key in sorted(set(legacy) | set(current)):
+            if legacy.get(key) != current.get(key):
+                print(f"  {key}: legacy={legacy.get(key)!r} new={current.get(key)!r}")
+        sys.exit(1)
+
+    print(f"Fixture: {args.file} ({len(text.splitlines())} lines)")
+    results = {}
+    for label, func in (("regex per series", legacy_parse), ("single pass", parse_node_metrics)):
+        seconds = min(timeit.repeat(lambda: func(text), number=args.iterations, repeat=5))
+        results[label] = seconds
+        print(f"{label:>18}: {seconds / args.iterations * 1e6:8.1f} us/page")
+    speedup = results["regex per series"] / results["single pass"]
+    print(f"{'speedup':>18}: {speedup:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
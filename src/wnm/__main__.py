@@ -18,14 +18,21 @@ from wnm.config import (
     machine_config,
     options,
 )
+from wnm.daemon import DaemonLoop
 from wnm.decision_engine import DecisionEngine
 from wnm.executor import ActionExecutor
 from wnm.migration import detect_port_ranges_from_nodes, survey_machine
 from wnm.models import Machine, Node
+from wnm.node_candidates import NodeCandidates
+from wnm.rollout import RollingUpgrade
+from wnm.system_metrics import SystemSampler
 from wnm.utils import (
+    close_scrape_client,
     get_antnode_version,
     get_machine_metrics,
     get_system_start_time,
+    psutil_rates,
+    save_version_cache,
     update_counters,
 )
 
@@ -66,10 +73,12 @@ signal.signal(signal.SIGINT, signal_handler)
 
 # Register cleanup function to run on normal exit
 atexit.register(cleanup_lock_file)
+atexit.register(close_scrape_client)
+atexit.register(save_version_cache)
 
 
 # Make a decision about what to do (new implementation using DecisionEngine)
-def choose_action(machine_config, metrics, dry_run):
+def choose_action(machine_config, metrics, dry_run, executor=None, sampler=None):
     """Plan and execute actions using DecisionEngine and ActionExecutor.
 
     This function now acts as a thin wrapper around the new decision engine
@@ -79,6 +88,9 @@ def choose_action(machine_config, metrics, dry_run):
         machine_config: Machine configuration dictionary
         metrics: Current system metrics
         dry_run: If True, log actions without executing
+        executor: Optional ActionExecutor to reuse (--daemon mode keeps one warm)
+        sampler: SystemSampler whose pending window (if any) is closed once
+            the counters have been surveyed, so the wait overlaps the survey
 
     Returns:
         Dictionary with execution status
@@ -111,6 +123,11 @@ def choose_action(machine_config, metrics, dry_run):
                     )
                     session.commit()
 
+    # Close a pending machine rates window now the survey work is done,
+    # falling back to psutil if /proc could not be read for it
+    if sampler is not None and sampler.pending:
+        metrics.update(sampler.finish() or psutil_rates())
+
     # Determine if this is an --init operation and whether we should survey
     is_init = getattr(options, 'init', False)
     should_survey_init = is_init and (
@@ -119,8 +136,32 @@ def choose_action(machine_config, metrics, dry_run):
     )
 
     # Use the new DecisionEngine to plan actions
-    engine = DecisionEngine(machine_config, metrics, is_init=is_init, should_survey_init=should_survey_init)
+    candidates = NodeCandidates(
+        S,
+        metrics["antnode_version"],
+        machine_config.get("node_removal_strategy") or "youngest",
+    )
+    rollout = None
+    if machine_config.get("upgrade_canary"):
+        rollout = RollingUpgrade(
+            S,
+            metrics["antnode_version"],
+            machine_config["upgrade_canary"],
+            sudo=ActionExecutor._binary_store_sudo(machine_config),
+        )
+        if not dry_run:
+            rollout.evaluate()
+    engine = DecisionEngine(
+        machine_config,
+        metrics,
+        is_init=is_init,
+        should_survey_init=should_survey_init,
+        candidates=candidates,
+        rollout=rollout,
+    )
     actions = engine.plan_actions()
+    if rollout is not None and not dry_run:
+        rollout.record(actions)
 
     # Log the computed features for debugging
     if options.show_decisions or options.v or logging.getLogger().isEnabledFor(logging.DEBUG):
@@ -138,12 +179,69 @@ def choose_action(machine_config, metrics, dry_run):
         machine_config["this_survey_delay"] = options.this_survey_delay
 
     # Use ActionExecutor to execute the planned actions
-    executor = ActionExecutor(S)
+    if executor is None:
+        executor = ActionExecutor(S)
     result = executor.execute(actions, machine_config, metrics, dry_run)
 
     return result
 
 
+def load_local_config():
+    """Reload the machine config from the database as a working dictionary."""
+    with S() as session:
+        result = session.execute(select(Machine)).first()
+    return json.loads(json.dumps(result[0])) if result else None
+
+
+def run_daemon(local_config, metrics, sampler=None):
+    """Repeat the plan/execute cycle every --daemon_interval seconds.
+
+    The lock file is held for the life of the daemon. The first cycle uses
+    the config and metrics main() already loaded; later cycles reload the
+    machine config and metrics. The ActionExecutor (and its process
+    managers), system sampler, database engine and scrape client are reused
+    throughout, so machine rates are computed against the previous cycle.
+    """
+    executor = ActionExecutor(S)
+    sampler = sampler or SystemSampler(S)
+    state = {"config": local_config, "metrics": metrics}
+
+    def cycle():
+        if state["config"] is None:
+            state["config"] = load_local_config()
+            if state["config"] is None:
+                logging.error("Unable to load machine config, stopping daemon")
+                loop.stop()
+                return
+            state["metrics"] = get_machine_metrics(
+                S,
+                state["config"]["node_storage"],
+                state["config"]["hd_remove"],
+                state["config"]["crisis_bytes"],
+                sampler=sampler,
+                defer_rates=True,
+            )
+        try:
+            this_action = choose_action(
+                state["config"],
+                state["metrics"],
+                options.dry_run,
+                executor=executor,
+                sampler=sampler,
+            )
+            logging.info("Action: " + json.dumps(this_action, indent=2))
+        finally:
+            # Versions probed this cycle are written once, not per miss
+            save_version_cache()
+            # Reload on the next cycle
+            state["config"] = None
+
+    loop = DaemonLoop(cycle, options.daemon_interval)
+    # A second SIGTERM/SIGINT while finishing a cycle exits immediately
+    loop.install_signal_handlers(on_second_signal=signal_handler)
+    return loop.run()
+
+
 def main():
     # Handle --version flag (before any lock file or database checks)
     if options.version:
@@ -263,11 +361,16 @@ def main():
     else:
         local_config = json.loads(json.dumps(machine_config))
 
+    # Planning runs close a pending sampling window after the survey in
+    # choose_action; reports, forced actions and --init need rates now
+    sampler = SystemSampler(S)
     metrics = get_machine_metrics(
         S,
         local_config["node_storage"],
         local_config["hd_remove"],
         local_config["crisis_bytes"],
+        sampler=sampler,
+        defer_rates=not (options.init or options.report or options.force_action),
     )
     # Only log metrics at INFO level if --show_machine_metrics or -v is set
     if options.show_machine_metrics or options.v or logging.getLogger().isEnabledFor(logging.DEBUG):
@@ -362,6 +465,8 @@ def main():
             generate_node_status_report,
             generate_node_status_details_report,
             generate_influx_resources_report,
+            generate_node_rates_report,
+            generate_upgrade_status_report,
             generate_machine_config_report,
             generate_machine_metrics_report,
         )
@@ -390,6 +495,12 @@ def main():
             )
         elif options.report == "influx-resources":
             report_output = generate_influx_resources_report(S, options.service_name)
+        elif options.report == "node-rates":
+            report_output = generate_node_rates_report(
+                S, options.service_name, options.report_format
+            )
+        elif options.report == "upgrade-status":
+            report_output = generate_upgrade_status_report(S, options.report_format)
         elif options.report == "machine-config":
             report_output = generate_machine_config_report(
                 S, options.dbpath, options.report_format
@@ -404,6 +515,15 @@ def main():
         print(report_output)
         sys.exit(0)
 
+    # Persistent mode: keep running the plan/execute cycle until SIGTERM
+    if options.daemon:
+        if options.force_action:
+            logging.error("--daemon cannot be combined with --force_action")
+            sys.exit(1)
+        run_daemon(local_config, metrics, sampler)
+        # Exit normally (atexit will clean up lock file)
+        sys.exit(0)
+
     # Check for forced actions
     if options.force_action:
         # Teardown requires confirmation for safety
@@ -422,7 +542,9 @@ def main():
             count=options.count if hasattr(options, "count") else 1,
         )
     else:
-        this_action = choose_action(local_config, metrics, options.dry_run)
+        this_action = choose_action(
+            local_config, metrics, options.dry_run, sampler=sampler
+        )
 
     logging.info("Action: " + json.dumps(this_action, indent=2))
 
@@ -18,6 +18,7 @@ class ActionType(Enum):
     START_NODE = "start"
     STOP_NODE = "stop"
     RESTART_NODE = "restart"
+    ROLLBACK_NODE = "rollback"
     SURVEY_NODES = "survey"
     RESURVEY_NODES = "resurvey"
 
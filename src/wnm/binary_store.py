@@ -0,0 +1,292 @@
+"""
+Content-addressed antnode binary store for weave-node-manager (wnm).
+
+Rather than every node getting its own copy of antnode, each distinct binary
+is kept once under BINARY_STORE_DIR, named by its SHA-256 digest, and node
+binaries are hardlinks to it (reflinks, or as a last resort copies, when the
+node directory is on another filesystem). Node binaries are always replaced
+by renaming a new link over them, never written in place, so a running node
+or another node sharing the same file is never affected. gc() deletes store
+entries that no node links to any more.
+
+Upgrades stage the new binary next to the node binary (STAGED_SUFFIX) while
+the node is still running and verify it against the store, so the cutover
+is only a stop, a rename and a start.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+from wnm.config import BINARY_STORE_DIR
+from wnm.version_cache import binary_key
+
+# Linux ioctl sharing the extents of one file with another (cp --reflink)
+FICLONE = 0x40049409
+
+# Temporary files left behind by an interrupted install are removed by gc()
+STALE_TMP_SECONDS = 3600
+
+# Upgrades stage the new binary next to the node binary until cutover
+STAGED_SUFFIX = ".staged"
+
+
+def staged_binary(path: str) -> str:
+    """Path a node's new binary is staged at before an upgrade cutover."""
+    return path + STAGED_SUFFIX
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _reflink(source: str, dest: str) -> bool:
+    try:
+        import fcntl
+
+        with open(source, "rb") as src, open(dest, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    except (ImportError, OSError):
+        try:
+            os.remove(dest)
+        except OSError:
+            pass
+        return False
+
+
+def _tmp_path(path: str) -> str:
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+class BinaryStore:
+    """Shared store of antnode binaries, linked into node directories."""
+
+    def __init__(self, root: str = BINARY_STORE_DIR, sudo: bool = False):
+        """
+        Args:
+            root: Store directory
+            sudo: Run file operations through sudo (system-wide installs)
+        """
+        self.root = root
+        self.sudo = sudo
+        self.links = 0
+        self.reflinks = 0
+        self.copies = 0
+        # Digest by source file identity, so a source is hashed once per run
+        self._digests: Dict[tuple, str] = {}
+        self._lock = threading.Lock()
+
+    def _run(self, *command):
+        subprocess.run(["sudo", *command], stdout=subprocess.PIPE, check=True)
+
+    def entry_path(self, digest: str) -> str:
+        return os.path.join(self.root, digest)
+
+    def add(self, source: str) -> str:
+        """Add a binary to the store.
+
+        Args:
+            source: Path to an antnode binary
+
+        Returns:
+            Path of the store entry holding the same content
+        """
+        key = binary_key(source)
+        if key is None:
+            raise FileNotFoundError(f"Source binary not found: {source}")
+        with self._lock:
+            digest = self._digests.get(key)
+            if digest is None:
+                digest = self._digests[key] = file_digest(source)
+            entry = self.entry_path(digest)
+            if not os.path.exists(entry):
+                tmp = _tmp_path(entry)
+                if self.sudo:
+                    self._run("mkdir", "-p", self.root)
+                    self._run("cp", source, tmp)
+                    self._run("chmod", "755", tmp)
+                    self._run("mv", "-f", tmp, entry)
+                else:
+                    os.makedirs(self.root, exist_ok=True)
+                    shutil.copy2(source, tmp)
+                    os.chmod(tmp, 0o755)
+                    os.replace(tmp, entry)
+                logging.info(f"Added {source} to binary store as {digest[:12]}")
+        return entry
+
+    def install(self, source: str, dest: str) -> str:
+        """Atomically place the binary source at dest.
+
+        dest becomes a hardlink to the store entry for source, or a reflink
+        or copy of it when a hardlink is not possible. A binary already at
+        dest is replaced by rename.
+
+        Args:
+            source: Path to an antnode binary
+            dest: Node binary path
+
+        Returns:
+            How the binary was placed: "link", "reflink" or "copy"
+        """
+        try:
+            entry = self.add(source)
+        except (OSError, subprocess.CalledProcessError) as err:
+            logging.warning(f"Binary store unavailable, copying {source}: {err}")
+            entry = None
+        tmp = _tmp_path(dest)
+        if self.sudo:
+            if entry:
+                try:
+                    self._run("ln", "-f", entry, tmp)
+                    method = "link"
+                except subprocess.CalledProcessError:
+                    self._run("cp", "--reflink=auto", entry, tmp)
+                    method = "copy"
+            else:
+                self._run("cp", source, tmp)
+                self._run("chmod", "755", tmp)
+                method = "copy"
+            self._run("mv", "-f", tmp, dest)
+        else:
+            try:
+                if entry:
+                    try:
+                        os.link(entry, tmp)
+                        method = "link"
+                    except OSError:
+                        method = "reflink" if _reflink(entry, tmp) else "copy"
+                        if method == "copy":
+                            shutil.copy2(entry, tmp)
+                        os.chmod(tmp, 0o755)
+                else:
+                    shutil.copy2(source, tmp)
+                    os.chmod(tmp, 0o755)
+                    method = "copy"
+                os.replace(tmp, dest)
+            except OSError:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+        with self._lock:
+            if method == "link":
+                self.links += 1
+            elif method == "reflink":
+                self.reflinks += 1
+            else:
+                self.copies += 1
+        logging.debug(f"Installed {source} at {dest} ({method})")
+        return method
+
+    def verify(self, source: str, path: str) -> bool:
+        """Check path holds the same content as source.
+
+        A hardlink to the store entry is checked by identity, anything else
+        (reflinks and copies) by digest.
+        """
+        try:
+            entry = self.add(source)
+            if os.path.samefile(entry, path):
+                return True
+            return file_digest(path) == os.path.basename(entry)
+        except (OSError, subprocess.CalledProcessError) as err:
+            logging.debug(f"Unable to verify {path}: {err}")
+            return False
+
+    def swap(self, staged: str, dest: str):
+        """Atomically move a staged binary over dest."""
+        if self.sudo:
+            self._run("mv", "-f", staged, dest)
+        else:
+            os.replace(staged, dest)
+
+    def link(self, source: str, dest: str):
+        """Hardlink dest to source, replacing dest if it exists."""
+        if self.sudo:
+            self._run("ln", "-f", source, dest)
+            return
+        tmp = _tmp_path(dest)
+        os.link(source, tmp)
+        try:
+            os.replace(tmp, dest)
+        except OSError:
+            os.remove(tmp)
+            raise
+
+    def remove(self, path: str):
+        """Delete a node binary (or a binary kept next to it), if present."""
+        if self.sudo:
+            self._run("rm", "-f", path)
+            return
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def gc(self, keep: Optional[Iterable[str]] = None) -> int:
+        """Delete store entries no node binary links to.
+
+        Args:
+            keep: Digests to keep even when unused
+
+        Returns:
+            Number of entries removed
+        """
+        keep = set(keep or ())
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return 0
+        removed = 0
+        now = time.time()
+        for name in names:
+            path = os.path.join(self.root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if name.endswith(".tmp"):
+                unused = now - st.st_mtime > STALE_TMP_SECONDS
+            else:
+                unused = st.st_nlink <= 1 and name not in keep
+            if not unused:
+                continue
+            try:
+                if self.sudo:
+                    self._run("rm", "-f", path)
+                else:
+                    os.remove(path)
+            except (OSError, subprocess.CalledProcessError) as err:
+                logging.debug(f"Unable to remove {path}: {err}")
+                continue
+            removed += 1
+            logging.info(f"Removed unused binary {name[:12]} from binary store")
+        with self._lock:
+            self._digests = {
+                key: digest
+                for key, digest in self._digests.items()
+                if os.path.exists(self.entry_path(digest))
+            }
+        return removed
+
+
+_stores: Dict[bool, BinaryStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_binary_store(sudo: bool = False) -> BinaryStore:
+    """Return the process-wide BinaryStore, creating it on first use."""
+    with _stores_lock:
+        if sudo not in _stores:
+            _stores[sudo] = BinaryStore(BINARY_STORE_DIR, sudo=sudo)
+        return _stores[sudo]
@@ -241,6 +241,7 @@ else:
 
 # Derived paths
 LOCK_FILE = os.path.join(BASE_DIR, "wnm_active")
+BINARY_STORE_DIR = os.path.join(BASE_DIR, "binaries")
 DEFAULT_DB_PATH = f"sqlite:///{os.path.join(BASE_DIR, 'colony.db')}"
 
 # Create minimal directories needed for config.py (except in test mode)
@@ -318,6 +319,19 @@ def load_config():
     c.add(
         "--dry_run", env_var="DRY_RUN", help="Do not save changes", action="store_true"
     )
+    c.add(
+        "--daemon",
+        env_var="DAEMON",
+        help="Stay running and repeat the survey/plan/execute cycle every --daemon_interval seconds",
+        action="store_true",
+    )
+    c.add(
+        "--daemon_interval",
+        env_var="DAEMON_INTERVAL",
+        help="Seconds between cycles in --daemon mode (default: 60)",
+        type=int,
+        default=60,
+    )
     c.add("--init", help="Initialize a cluster", action="store_true")
     c.add("--migrate_anm", help="Migrate a cluster from anm", action="store_true")
     c.add(
@@ -387,6 +401,70 @@ def load_config():
         env_var="MAX_CONCURRENT_OPERATIONS",
         help="Maximum total number of concurrent operations (global limit across all types, default: 1)",
     )
+    c.add(
+        "--max_concurrent_surveys",
+        env_var="MAX_CONCURRENT_SURVEYS",
+        help="Maximum number of node surveys in flight at once (default: 1)",
+    )
+    c.add(
+        "--parallel_actions",
+        env_var="PARALLEL_ACTIONS",
+        help="Run planned node actions concurrently, up to max_concurrent_operations at once (1 = on, default: 0)",
+        type=int,
+    )
+    c.add(
+        "--upgrade_canary",
+        env_var="UPGRADE_CANARY",
+        help="Roll upgrades out in health-gated waves starting with this many canary nodes (default: 0, no waves)",
+        type=int,
+    )
+    c.add(
+        "--systemd_template",
+        env_var="SYSTEMD_TEMPLATE",
+        help="Create systemd nodes as instances of one antnode@.service template unit (1 = on, default: 0)",
+        type=int,
+    )
+    c.add(
+        "--systemd_transport",
+        env_var="SYSTEMD_TRANSPORT",
+        help="How the systemd process manager talks to systemd: subprocess (systemctl, default) or dbus",
+        choices=["subprocess", "dbus"],
+    )
+    c.add(
+        "--firewall_range_block",
+        env_var="FIREWALL_RANGE_BLOCK",
+        help="Open node ports in port-range firewall rules covering this many node ids each (default: 0, one rule per node)",
+        type=int,
+    )
+    c.add(
+        "--firewall_type",
+        env_var="FIREWALL_TYPE",
+        help="Firewall backend for node ports: ufw, nftables or null (default: the process manager's choice)",
+        choices=["ufw", "nftables", "null"],
+    )
+    c.add(
+        "--max_node_per_container",
+        env_var="MAX_NODE_PER_CONTAINER",
+        help="Nodes packed into each s6overlay container, also the size of its port blocks (default: 200)",
+        type=int,
+    )
+    c.add(
+        "--min_container_count",
+        env_var="MIN_CONTAINER_COUNT",
+        help="Containers the s6overlay process manager spreads new nodes over before filling any (default: 1)",
+        type=int,
+    )
+    c.add(
+        "--docker_image",
+        env_var="DOCKER_IMAGE",
+        help="s6-overlay image for new s6overlay containers (default: iweave/antnode:latest)",
+    )
+    c.add(
+        "--history_retention",
+        env_var="HISTORY_RETENTION",
+        help="Days of node metrics history to keep, 0 disables history (default: 30)",
+        type=int,
+    )
     c.add("--node_storage", env_var="NODE_STORAGE", help="Node Storage Path")
     c.add("--rewards_address", env_var="REWARDS_ADDRESS", help="Rewards Address")
     c.add("--donate_address", env_var="DONATE_ADDRESS", help="Donate Address")
@@ -472,7 +550,7 @@ def load_config():
     c.add(
         "--force_action",
         env_var="FORCE_ACTION",
-        help="Force an action: add, remove, upgrade, start, stop, disable, teardown, survey, wnm-db-migration, nullop, update_config, disable_config",
+        help="Force an action: add, remove, upgrade, start, stop, disable, teardown, survey, resume_upgrade, wnm-db-migration, nullop, update_config, disable_config",
         choices=[
             "add",
             "remove",
@@ -482,6 +560,7 @@ def load_config():
             "disable",
             "teardown",
             "survey",
+            "resume_upgrade",
             "wnm-db-migration",
             "nullop",
             "update_config",
@@ -496,8 +575,8 @@ def load_config():
     c.add(
         "--report",
         env_var="REPORT",
-        help="Generate a report: node-status, node-status-details, influx-resources, machine-config, machine-metrics",
-        choices=["node-status", "node-status-details", "influx-resources", "machine-config", "machine-metrics"],
+        help="Generate a report: node-status, node-status-details, influx-resources, node-rates, upgrade-status, machine-config, machine-metrics",
+        choices=["node-status", "node-status-details", "influx-resources", "node-rates", "upgrade-status", "machine-config", "machine-metrics"],
     )
     c.add(
         "--report_format",
@@ -523,7 +602,7 @@ def load_config():
     c.add(
         "--process_manager",
         env_var="PROCESS_MANAGER",
-        help="Process manager to use: systemd+sudo, systemd+user, setsid+sudo, setsid+user, launchd+sudo, launchd+user, antctl+sudo, antctl+user, antctl+zen (user mode only)",
+        help="Process manager to use: systemd+sudo, systemd+user, setsid+sudo, setsid+user, launchd+sudo, launchd+user, antctl+sudo, antctl+user, antctl+zen (user mode only), s6overlay+user",
         choices=[
             "systemd+sudo",
             "systemd+user",
@@ -534,6 +613,7 @@ def load_config():
             "antctl+sudo",
             "antctl+user",
             "antctl+zen",
+            "s6overlay+user",
         ],
     )
     c.add(
@@ -670,6 +750,55 @@ def merge_config_changes(options, machine_config):
         and int(options.max_concurrent_operations) != machine_config.max_concurrent_operations
     ):
         cfg["max_concurrent_operations"] = int(options.max_concurrent_operations)
+    if (
+        options.max_concurrent_surveys
+        and int(options.max_concurrent_surveys) != machine_config.max_concurrent_surveys
+    ):
+        cfg["max_concurrent_surveys"] = int(options.max_concurrent_surveys)
+    if (
+        options.parallel_actions is not None
+        and int(options.parallel_actions) != machine_config.parallel_actions
+    ):
+        cfg["parallel_actions"] = int(options.parallel_actions)
+    if (
+        options.upgrade_canary is not None
+        and int(options.upgrade_canary) != machine_config.upgrade_canary
+    ):
+        cfg["upgrade_canary"] = int(options.upgrade_canary)
+    if (
+        options.systemd_template is not None
+        and int(options.systemd_template) != machine_config.systemd_template
+    ):
+        cfg["systemd_template"] = int(options.systemd_template)
+    if (
+        options.systemd_transport
+        and options.systemd_transport != machine_config.systemd_transport
+    ):
+        cfg["systemd_transport"] = options.systemd_transport
+    if (
+        options.firewall_range_block is not None
+        and int(options.firewall_range_block) != machine_config.firewall_range_block
+    ):
+        cfg["firewall_range_block"] = int(options.firewall_range_block)
+    if options.firewall_type and options.firewall_type != machine_config.firewall_type:
+        cfg["firewall_type"] = options.firewall_type
+    if (
+        options.max_node_per_container
+        and int(options.max_node_per_container) != machine_config.max_node_per_container
+    ):
+        cfg["max_node_per_container"] = int(options.max_node_per_container)
+    if (
+        options.min_container_count
+        and int(options.min_container_count) != machine_config.min_container_count
+    ):
+        cfg["min_container_count"] = int(options.min_container_count)
+    if options.docker_image and options.docker_image != machine_config.docker_image:
+        cfg["docker_image"] = options.docker_image
+    if (
+        options.history_retention is not None
+        and int(options.history_retention) != machine_config.history_retention
+    ):
+        cfg["history_retention"] = int(options.history_retention)
     if options.node_storage and options.node_storage != machine_config.node_storage:
         cfg["node_storage"] = options.node_storage
     if (
@@ -1067,10 +1196,18 @@ def define_machine(options):
         "max_concurrent_starts": int(_get_option(options, "max_concurrent_starts") or 1),
         "max_concurrent_removals": int(_get_option(options, "max_concurrent_removals") or 1),
         "max_concurrent_operations": int(_get_option(options, "max_concurrent_operations") or 1),
+        "max_concurrent_surveys": int(_get_option(options, "max_concurrent_surveys") or 1),
+        "parallel_actions": int(_get_option(options, "parallel_actions") or 0),
+        "upgrade_canary": int(_get_option(options, "upgrade_canary") or 0),
+        "systemd_template": int(_get_option(options, "systemd_template") or 0),
+        "systemd_transport": _get_option(options, "systemd_transport") or "subprocess",
+        "firewall_range_block": int(_get_option(options, "firewall_range_block") or 0),
+        "firewall_type": _get_option(options, "firewall_type"),
+        "history_retention": int(_get_option(options, "history_retention", 30)),
         "node_removal_strategy": "youngest",
-        "max_node_per_container": 200,
-        "min_container_count": 1,
-        "docker_image": "iweave/antnode:latest",
+        "max_node_per_container": int(_get_option(options, "max_node_per_container") or 200),
+        "min_container_count": int(_get_option(options, "min_container_count") or 1),
+        "docker_image": _get_option(options, "docker_image") or "iweave/antnode:latest",
         "no_upnp": bool(_get_option(options, "no_upnp", False)),
         "antnode_path": _get_option(options, "antnode_path") or "~/.local/bin/antnode",
         "antctl_path": _get_option(options, "antctl_path") or "~/.local/bin/antctl",
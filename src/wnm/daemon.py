@@ -0,0 +1,98 @@
+"""
+Persistent (--daemon) mode scheduling for weave-node-manager (wnm).
+
+The daemon runs the same survey/plan/execute cycle as a one-shot cron run,
+but inside one long-lived process so the database engine, session factory,
+process managers and scrape client stay warm between cycles.
+"""
+
+import logging
+import signal
+import threading
+import time
+from typing import Callable, Optional
+
+
+class DaemonLoop:
+    """Run a cycle function on a fixed interval until stopped.
+
+    Cycles are scheduled on a fixed grid from the first run, so the time a
+    cycle takes does not push later cycles back (no drift). A cycle that
+    overruns the interval skips the missed slots instead of running
+    back-to-back. stop() (or SIGTERM/SIGINT once install_signal_handlers()
+    has been called) lets the current cycle finish and then exits the loop.
+    """
+
+    def __init__(
+        self,
+        cycle: Callable[[], None],
+        interval: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            cycle: Function run once per interval
+            interval: Seconds between cycle starts
+            clock: Monotonic clock (overridable for tests)
+        """
+        self.cycle = cycle
+        self.interval = max(1, int(interval or 60))
+        self.clock = clock
+        self.cycles = 0
+        self.skipped = 0
+        self._stop = threading.Event()
+
+    def stop(self):
+        """Ask the loop to exit after the current cycle."""
+        self._stop.set()
+
+    @property
+    def stopping(self) -> bool:
+        return self._stop.is_set()
+
+    def install_signal_handlers(self, on_second_signal: Optional[Callable] = None):
+        """Stop cleanly on SIGTERM/SIGINT.
+
+        Args:
+            on_second_signal: Handler called if a signal arrives while already
+                stopping (e.g. to exit immediately)
+        """
+
+        def _handler(signum, frame):
+            signal_name = signal.Signals(signum).name
+            if self.stopping and on_second_signal:
+                on_second_signal(signum, frame)
+                return
+            logging.info(f"Received {signal_name}, stopping after the current cycle")
+            self.stop()
+
+        signal.signal(signal.SIGTERM, _handler)
+        signal.signal(signal.SIGINT, _handler)
+
+    def run(self) -> int:
+        """Run cycles until stopped.
+
+        Returns:
+            Number of cycles run
+        """
+        logging.info(f"Daemon started, running every {self.interval}s")
+        next_run = self.clock()
+        while not self.stopping:
+            try:
+                self.cycle()
+            except Exception as error:
+                logging.exception(f"Daemon cycle failed: {error}")
+            self.cycles += 1
+
+            next_run += self.interval
+            now = self.clock()
+            if next_run <= now:
+                missed = int((now - next_run) // self.interval) + 1
+                self.skipped += missed
+                logging.warning(
+                    f"Cycle overran the {self.interval}s interval, skipping {missed} slot(s)"
+                )
+                next_run += missed * self.interval
+            self._stop.wait(next_run - now)
+        logging.info(f"Daemon stopped after {self.cycles} cycles")
+        return self.cycles
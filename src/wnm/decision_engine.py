@@ -12,6 +12,7 @@ from packaging.version import Version
 
 from wnm.actions import Action, ActionType
 from wnm.common import DEAD, DISABLED, REMOVING, RESTARTING, RUNNING, STOPPED, UPGRADING
+from wnm.node_candidates import REMOVE_RUNNING, REMOVE_STOPPED, START, UPGRADE
 
 
 class DecisionEngine:
@@ -22,7 +23,7 @@ class DecisionEngine:
     to perform.
     """
 
-    def __init__(self, machine_config: Dict[str, Any], metrics: Dict[str, Any], is_init: bool = False, should_survey_init: bool = False):
+    def __init__(self, machine_config: Dict[str, Any], metrics: Dict[str, Any], is_init: bool = False, should_survey_init: bool = False, candidates=None, rollout=None):
         """Initialize the decision engine.
 
         Args:
@@ -30,11 +31,17 @@ class DecisionEngine:
             metrics: Current system metrics and node status
             is_init: Whether this is an --init operation
             should_survey_init: Whether to survey nodes during init (only if --import or --migrate_anm)
+            candidates: Optional NodeCandidates; when given, planned node actions
+                are bound to specific node ids (otherwise the executor selects)
+            rollout: Optional RollingUpgrade; when given, upgrades are limited
+                to its open wave and regressed waves are rolled back
         """
         self.config = machine_config
         self.metrics = metrics
         self.is_init = is_init
         self.should_survey_init = should_survey_init
+        self.candidates = candidates
+        self.rollout = rollout
         self.features = self._compute_features()
 
     def _compute_features(self) -> Dict[str, bool]:
@@ -277,13 +284,19 @@ class DecisionEngine:
             if actions:
                 return actions
 
-        # Priority 6: Upgrades (only if not removing)
+        # Priority 6: Roll back a regressed upgrade wave
+        if self.rollout is not None:
+            actions.extend(self._plan_rollbacks())
+            if actions:
+                return actions
+
+        # Priority 7: Upgrades (only if not removing)
         if self.features["upgrade"]:
             actions.extend(self._plan_upgrades())
             if actions:
                 return actions
 
-        # Priority 7: Add nodes (if resources allow)
+        # Priority 8: Add nodes (if resources allow)
         if self.features["add_new_node"]:
             actions.extend(self._plan_node_additions())
             if actions:
@@ -342,16 +355,17 @@ class DecisionEngine:
             )
         ):
             # CRITICAL: Remove stopped nodes first (limited by actual stopped nodes)
-            stopped_to_remove = min(
-                self.metrics.get("stopped_nodes", 0),
-                removal_capacity
+            stopped_ids = self._node_ids(
+                REMOVE_STOPPED,
+                min(self.metrics.get("stopped_nodes", 0), removal_capacity),
             )
+            stopped_to_remove = len(stopped_ids)
 
-            for i in range(stopped_to_remove):
+            for i, node_id in enumerate(stopped_ids):
                 actions.append(
                     Action(
                         type=ActionType.REMOVE_NODE,
-                        node_id=None,  # Executor will query for youngest stopped
+                        node_id=node_id,
                         priority=80,
                         reason=f"remove stopped node ({i+1}/{stopped_to_remove})",
                     )
@@ -359,16 +373,17 @@ class DecisionEngine:
 
             # CRITICAL: Remove running nodes for remaining capacity
             remaining_capacity = removal_capacity - stopped_to_remove
-            running_to_remove = min(
-                self.metrics.get("running_nodes", 0),
-                remaining_capacity
+            running_ids = self._node_ids(
+                REMOVE_RUNNING,
+                min(self.metrics.get("running_nodes", 0), remaining_capacity),
             )
+            running_to_remove = len(running_ids)
 
-            for i in range(running_to_remove):
+            for i, node_id in enumerate(running_ids):
                 actions.append(
                     Action(
                         type=ActionType.REMOVE_NODE,
-                        node_id=None,  # Executor will query for youngest running
+                        node_id=node_id,
                         priority=75,
                         reason=f"remove running node ({i+1}/{running_to_remove})",
                     )
@@ -380,16 +395,17 @@ class DecisionEngine:
                 return []
 
             # CRITICAL: Stop youngest running nodes (limited by actual running nodes)
-            nodes_to_stop = min(
-                self.metrics.get("running_nodes", 0),
-                removal_capacity
+            stop_ids = self._node_ids(
+                REMOVE_RUNNING,
+                min(self.metrics.get("running_nodes", 0), removal_capacity),
             )
+            nodes_to_stop = len(stop_ids)
 
-            for i in range(nodes_to_stop):
+            for i, node_id in enumerate(stop_ids):
                 actions.append(
                     Action(
                         type=ActionType.STOP_NODE,
-                        node_id=None,  # Executor will query for youngest running
+                        node_id=node_id,
                         priority=70,
                         reason=f"stop node ({i+1}/{nodes_to_stop})",
                     )
@@ -422,15 +438,21 @@ class DecisionEngine:
         actual_upgrades_needed = self.metrics.get("nodes_to_upgrade", 0)
         upgrades_to_plan = min(upgrade_capacity, actual_upgrades_needed)
 
+        # Rolling upgrades: only as many as the open wave still takes
+        if self.rollout is not None:
+            upgrades_to_plan = min(upgrades_to_plan, self.rollout.allowance())
+
         if upgrades_to_plan <= 0:
             return []
 
         # Plan multiple upgrades up to actual available count
-        for i in range(upgrades_to_plan):
+        upgrade_ids = self._node_ids(UPGRADE, upgrades_to_plan)
+        upgrades_to_plan = len(upgrade_ids)
+        for i, node_id in enumerate(upgrade_ids):
             actions.append(
                 Action(
                     type=ActionType.UPGRADE_NODE,
-                    node_id=None,  # Executor will query for oldest outdated nodes
+                    node_id=node_id,
                     priority=60,
                     reason=f"upgrade outdated node ({i+1}/{upgrades_to_plan})",
                 )
@@ -438,6 +460,29 @@ class DecisionEngine:
 
         return actions
 
+    def _plan_rollbacks(self) -> List[Action]:
+        """Plan rolling back the nodes of a regressed upgrade wave.
+
+        Returns:
+            List of rollback actions, limited by upgrade capacity
+        """
+        capacity = min(
+            self.config["max_concurrent_upgrades"] - self.metrics.get("upgrading_nodes", 0),
+            self.config["max_concurrent_operations"] - self._get_current_operations(),
+        )
+        if capacity <= 0:
+            return []
+        rollback_ids = self.rollout.rollback_ids()[:capacity]
+        return [
+            Action(
+                type=ActionType.ROLLBACK_NODE,
+                node_id=node_id,
+                priority=65,
+                reason=f"roll back regressed upgrade ({i+1}/{len(rollback_ids)})",
+            )
+            for i, node_id in enumerate(rollback_ids)
+        ]
+
     def _plan_node_additions(self) -> List[Action]:
         """Plan adding new nodes or starting stopped nodes with aggressive scaling.
 
@@ -460,16 +505,16 @@ class DecisionEngine:
             return []
 
         # CRITICAL: Plan starts for stopped nodes (limited by actual stopped nodes)
-        stopped_to_start = min(
-            self.metrics.get("stopped_nodes", 0),
-            start_capacity
+        start_ids = self._node_ids(
+            START, min(self.metrics.get("stopped_nodes", 0), start_capacity)
         )
+        stopped_to_start = len(start_ids)
 
-        for i in range(stopped_to_start):
+        for i, node_id in enumerate(start_ids):
             actions.append(
                 Action(
                     type=ActionType.START_NODE,
-                    node_id=None,  # Executor will query for oldest stopped nodes
+                    node_id=node_id,
                     priority=50,
                     reason=f"start stopped node ({i+1}/{stopped_to_start})",
                 )
@@ -493,6 +538,19 @@ class DecisionEngine:
 
         return actions
 
+    def _node_ids(self, pool: str, count: int) -> List[Optional[int]]:
+        """Node ids to bind to count planned actions.
+
+        Without candidates every action is left unbound (None). With
+        candidates the list may be shorter than count when fewer nodes are
+        available than the metrics suggested.
+        """
+        if count <= 0:
+            return []
+        if self.candidates is None:
+            return [None] * count
+        return self.candidates.take(pool, count)
+
     def _get_current_operations(self) -> int:
         """Get total number of current concurrent operations.
 
@@ -6,9 +6,10 @@ from the DecisionEngine and executes them using ProcessManager abstractions.
 
 import logging
 import os
-import shutil
 import subprocess
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional
 
 from packaging.version import Version
@@ -16,6 +17,7 @@ from sqlalchemy import func, insert, select, text
 from sqlalchemy.orm import scoped_session
 
 from wnm.actions import Action, ActionType
+from wnm.binary_store import get_binary_store, staged_binary
 from wnm.common import (
     DEAD,
     DISABLED,
@@ -29,16 +31,73 @@ from wnm.common import (
     UPGRADING,
 )
 from wnm.config import LOG_DIR
-from wnm.models import Machine, Node
+from wnm.models import Container, Machine, Node, NodeTransition
 from wnm.node_id_tracker import allocate_node_id
+from wnm.process_managers.base import has_native_batch
 from wnm.process_managers.factory import get_default_manager_type, get_process_manager
+from wnm.readiness import READY_PROBE_BASE
+from wnm.rollout import PAUSED, ROLLING_BACK, RollingUpgrade, previous_binary
+from wnm.run_context import RunContext
 from wnm.utils import (
+    forget_antnode_version,
     get_antnode_version,
     parse_service_names,
     update_nodes,
 )
 from wnm.wallets import select_wallet_for_node
 
+# Node actions that can run side by side when parallel_actions is enabled
+PARALLEL_ACTION_TYPES = {
+    ActionType.ADD_NODE,
+    ActionType.START_NODE,
+    ActionType.STOP_NODE,
+    ActionType.UPGRADE_NODE,
+    ActionType.REMOVE_NODE,
+    ActionType.ROLLBACK_NODE,
+}
+
+# Same-kind node actions in one plan run through a single batched
+# ProcessManager call: batch -> (status of the nodes it claims, oldest first)
+BATCH_CLAIMS = {
+    "start": (STOPPED, True),
+    "stop": (RUNNING, False),
+    "remove-running": (RUNNING, False),
+    "remove-stopped": (STOPPED, False),
+    "upgrade": (RUNNING, True),
+}
+
+# ProcessManager batch method each batch goes through
+BATCH_METHODS = {
+    "start": "start_nodes",
+    "stop": "stop_nodes",
+    "remove-running": "stop_nodes",
+    "remove-stopped": "remove_nodes",
+    "upgrade": "upgrade_nodes",
+}
+
+# Result status of a batched action that found no node to act on
+BATCH_EMPTY_STATUS = {
+    "start": "no-stopped-nodes",
+    "stop": "no-nodes-to-stop",
+    "remove-running": "no-running-nodes-to-remove",
+    "remove-stopped": "no-stopped-nodes-to-remove",
+    "upgrade": "no-nodes-to-upgrade",
+}
+
+# Managers whose node ids come from highest_node_id_used (never reused), so
+# several adds get consecutive ids and ports
+TRACKED_ID_MANAGER_TYPES = {"antctl+user", "antctl+sudo", "antctl+zen"}
+
+# Actions after which binary store entries may no longer be used
+BINARY_ACTION_TYPES = {
+    ActionType.UPGRADE_NODE,
+    ActionType.ROLLBACK_NODE,
+    ActionType.REMOVE_NODE,
+}
+
+# Nodes whose ports a reconciling firewall keeps closed
+CLOSED_PORT_STATUSES = (STOPPED, DISABLED, REMOVING, DEAD)
+
 
 class ActionExecutor:
     """Executes planned actions on nodes.
@@ -48,18 +107,34 @@ class ActionExecutor:
     managing database state.
     """
 
-    def __init__(self, session_factory: scoped_session):
+    def __init__(
+        self, session_factory: scoped_session, context: Optional[RunContext] = None
+    ):
         """Initialize the action executor.
 
         Args:
             session_factory: SQLAlchemy session factory for database operations
+            context: Run context shared with other components (default: a new one)
         """
         self.S = session_factory
         self.machine_config = None  # Will be set in execute()
+        # Machine snapshot and process managers, kept for the executor's lifetime
+        self.context = context or RunContext(session_factory)
+        # Node ids picked by actions in the current execute() call, so
+        # concurrent actions never select the same node
+        self._claimed = set()
+        self._claim_lock = threading.Lock()
+        # Serializes node id allocation and insert for concurrent adds
+        self._add_lock = threading.Lock()
+        # Serializes rollout wave bookkeeping for upgrades on start
+        self._rollout_lock = threading.Lock()
 
     def _get_process_manager(self, node: Node):
         """Get the appropriate process manager for a node.
 
+        Managers are created once per manager type and reused, so a long-lived
+        executor (--daemon mode) keeps them warm between cycles.
+
         Args:
             node: Node database record
 
@@ -75,7 +150,69 @@ class ActionExecutor:
         if not manager_type:
             manager_type = get_default_manager_type()
 
-        return get_process_manager(manager_type, session_factory=self.S)
+        return self._manager_of_type(manager_type)
+
+    def _manager_of_type(self, manager_type: str):
+        """Get the (shared) process manager of a manager type."""
+        return self.context.manager(
+            manager_type,
+            lambda: get_process_manager(
+                manager_type, session_factory=self.S, **self._manager_options(manager_type)
+            ),
+        )
+
+    def _manager_options(self, manager_type: str) -> Dict[str, Any]:
+        """Machine settings passed to a new process manager."""
+        options = {}
+        if not self.machine_config:
+            return options
+        if manager_type.startswith("systemd"):
+            transport = self.machine_config.get("systemd_transport")
+            if transport:
+                options["transport"] = transport
+        if manager_type.startswith("s6overlay"):
+            image = self.machine_config.get("docker_image")
+            if image:
+                options["image"] = image
+        firewall_type = self.machine_config.get("firewall_type")
+        if firewall_type:
+            options["firewall_type"] = firewall_type
+        return options
+
+    def _uses_containers(self, machine_config: Dict[str, Any]) -> bool:
+        """Whether nodes are packed into shared containers (s6overlay)."""
+        manager_type = machine_config.get("process_manager") or ""
+        return manager_type.startswith("s6overlay")
+
+    def _batches_adds(self, machine_config: Dict[str, Any]) -> bool:
+        """Whether several new nodes are created with one batched manager call."""
+        # New nodes get the manager type _execute_batch_adds creates them with
+        manager_type = machine_config.get("process_manager") or ""
+        return manager_type in TRACKED_ID_MANAGER_TYPES and has_native_batch(
+            self._manager_of_type(manager_type), "create_nodes"
+        )
+
+    def _claim_node(self, query, node_id: Optional[int] = None):
+        """Select the first node matching query not already claimed this cycle.
+
+        Args:
+            query: select(Node) statement, ordered by preference
+            node_id: Node bound to the action by the planner; if given, only
+                that node is selected (and only if it still matches query)
+
+        Returns:
+            Result row (node in row[0]) or None
+        """
+        if node_id is not None:
+            query = query.where(Node.id == node_id)
+        with self._claim_lock:
+            with self.S() as session:
+                row = session.execute(
+                    query.where(Node.id.notin_(self._claimed))
+                ).first()
+            if row:
+                self._claimed.add(row[0].id)
+        return row
 
     def _set_node_status(self, node_id: int, status: str) -> bool:
         """Update node status in database.
@@ -142,11 +279,127 @@ class ActionExecutor:
         # Fall back to persistent setting
         return machine_config.get("survey_delay", 0)
 
+    def _get_survey_concurrency(self, machine_config: Dict[str, Any]) -> int:
+        """Get the maximum number of node surveys allowed in flight at once.
+
+        Args:
+            machine_config: Machine configuration dict (can be None)
+
+        Returns:
+            Number of concurrent surveys (default: 1)
+        """
+        if not machine_config:
+            return 1
+        return max(1, int(machine_config.get("max_concurrent_surveys") or 1))
+
+    def _get_action_workers(self, machine_config: Dict[str, Any]) -> int:
+        """Get how many planned actions may run at once.
+
+        Args:
+            machine_config: Machine configuration dict (can be None)
+
+        Returns:
+            max_concurrent_operations when parallel_actions is enabled, else 1
+        """
+        if not machine_config or not machine_config.get("parallel_actions"):
+            return 1
+        return max(1, int(machine_config.get("max_concurrent_operations") or 1))
+
+    def _get_upgrade_canary(self, machine_config: Dict[str, Any]) -> int:
+        """Get the rolling upgrade canary size (0 when upgrades are not rolled out in waves).
+
+        Args:
+            machine_config: Machine configuration dict (can be None)
+
+        Returns:
+            Canary cohort size (default: 0)
+        """
+        if not machine_config:
+            return 0
+        return int(machine_config.get("upgrade_canary") or 0)
+
+    def _get_history_retention(self, machine_config: Dict[str, Any]) -> int:
+        """Get the node metrics history retention in days (0 disables history).
+
+        Args:
+            machine_config: Machine configuration dict (can be None)
+
+        Returns:
+            Retention in days (default: 0)
+        """
+        if not machine_config:
+            return 0
+        return int(machine_config.get("history_retention") or 0)
+
+    def _stage_binary(self, node: Node, manager) -> Optional[str]:
+        """Place and verify the new binary next to a node, without stopping it.
+
+        A binary staged by an earlier cycle is reused if it still matches.
+
+        Args:
+            node: Node to upgrade
+            manager: Process manager of the node
+
+        Returns:
+            Path of the staged binary, or None if staging failed
+        """
+        try:
+            source_binary = os.path.expanduser(self.machine_config["antnode_path"])
+            store = get_binary_store(getattr(manager, "use_system_services", False))
+            staged = staged_binary(node.binary)
+            if os.path.exists(staged) and store.verify(source_binary, staged):
+                return staged
+            if not manager.install_binary(source_binary, staged, sudo=store.sudo):
+                return None
+            if not store.verify(source_binary, staged) or not get_antnode_version(
+                store.add(source_binary)
+            ):
+                logging.error(f"Staged binary for node {node.id} failed verification")
+                return None
+        except Exception as error:
+            template = "In SB - An exception of type {0} occurred. Arguments:\n{1!r}"
+            message = template.format(type(error).__name__, error.args)
+            logging.error(message)
+            return None
+        logging.info(f"Staged new binary for node {node.id} at {staged}")
+        return staged
+
+    def _stage_upgrades(self, actions: List[Action]):
+        """Stage the binaries of all planned upgrades before any cutover."""
+        node_ids = [
+            action.node_id
+            for action in actions
+            if action.type == ActionType.UPGRADE_NODE and action.node_id is not None
+        ]
+        if not node_ids:
+            return
+        from wnm.process_managers.antctl_manager import AntctlManager
+        from wnm.process_managers.antctl_zen_manager import AntctlZenManager
+
+        with self.S() as session:
+            nodes = session.execute(select(Node).where(Node.id.in_(node_ids))).scalars().all()
+        targets = []
+        for node in nodes:
+            manager = self._get_process_manager(node)
+            # antctl managers upgrade through antctl
+            if not isinstance(manager, (AntctlManager, AntctlZenManager)):
+                targets.append((node, manager))
+        if not targets:
+            return
+        workers = min(len(targets), max(1, self._get_action_workers(self.machine_config)))
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="wnm-stage"
+        ) as pool:
+            list(pool.map(lambda target: self._stage_binary(*target), targets))
+
     def _upgrade_node_binary(self, node: Node, new_version: str) -> bool:
-        """Upgrade a node's binary by stopping it, copying the new binary, and starting it again.
+        """Upgrade a node's binary with as little downtime as possible.
 
         For AntctlManager and AntctlZenManager, this delegates to antctl's built-in upgrade command.
-        For other managers, this manually stops, copies binary, and starts the node.
+        For other managers the new binary is first staged and verified next to
+        the node while it keeps running; the node is then stopped, the staged
+        binary renamed over the old one and the node started again. The
+        downtime of the cutover is logged and recorded on the node_transition.
 
         Args:
             node: Node to upgrade
@@ -163,51 +416,101 @@ class ActionExecutor:
         if isinstance(manager, (AntctlManager, AntctlZenManager)):
             # Use antctl's built-in upgrade command
             logging.info(f"Using antctl upgrade for node {node.id}")
-            if not manager.upgrade_node(node, new_version):
-                logging.error(f"Failed to upgrade node {node.id} via antctl")
-                return False
-
-            # Update status to UPGRADING
-            with self.S() as session:
-                session.query(Node).filter(Node.id == node.id).update(
-                    {
-                        "status": UPGRADING,
-                        "timestamp": int(time.time()),
-                        "version": new_version,
-                    }
-                )
-                session.commit()
+            return self._upgrade_antctl_nodes(manager, [node], new_version)
 
-            return True
+        # For other managers (systemd, launchd, setsid), upgrade in two phases
+        # Phase 1: Stage and verify the new binary while the node keeps running
+        staged = self._stage_binary(node, manager)
+        if not staged:
+            return False
 
-        # For other managers (systemd, launchd, setsid), manually upgrade
-        # Step 1: Stop the node (required to replace binary file)
+        # Phase 2: Cutover (stop, atomic rename, start)
+        store = get_binary_store(getattr(manager, "use_system_services", False))
+        cutover_started = time.monotonic()
         logging.info(f"Stopping node {node.id} for upgrade")
         if not manager.stop_node(node):
             logging.error(f"Failed to stop node {node.id} during upgrade")
             return False
 
-        # Step 2: Copy new binary to node directory
-        source_binary = os.path.expanduser(self.machine_config.antnode_path)
+        # Rolling upgrades keep the previous binary so a regressed wave can roll back
+        keep_previous = self._get_upgrade_canary(self.machine_config) > 0 and os.path.exists(
+            node.binary
+        )
+        previous = previous_binary(node.binary)
         try:
-            shutil.copy2(source_binary, node.binary)
-            os.chmod(node.binary, 0o755)
-            logging.info(f"Copied new binary from {source_binary} to {node.binary}")
-        except (OSError, shutil.Error) as err:
-            logging.error(f"Failed to copy binary for upgrade: {err}")
+            if keep_previous:
+                store.link(node.binary, previous)
+        except (OSError, subprocess.CalledProcessError) as err:
+            logging.warning(f"Unable to keep previous binary of node {node.id}: {err}")
+        try:
+            store.swap(staged, node.binary)
+        except (OSError, subprocess.CalledProcessError) as err:
+            logging.error(f"Failed to swap in new binary for node {node.id}: {err}")
+            if keep_previous:
+                try:
+                    store.remove(previous)
+                except (OSError, subprocess.CalledProcessError) as err:
+                    logging.debug(f"Unable to remove {previous}: {err}")
             # Try to restart the node with old binary
             manager.start_node(node)
             return False
+        forget_antnode_version(node.binary)
 
-        # Step 3: Start the node with new binary
         logging.info(f"Starting node {node.id} with new binary")
         if not manager.start_node(node):
             logging.error(f"Failed to start node {node.id} after upgrade")
             return False
+        downtime = round(time.monotonic() - cutover_started, 3)
+        logging.info(f"Upgraded node {node.id} to {new_version} with {downtime}s downtime")
 
-        # Update status to UPGRADING
+        # Update status to UPGRADING and open its transition with the downtime
+        now = int(time.time())
         with self.S() as session:
             session.query(Node).filter(Node.id == node.id).update(
+                {
+                    "status": UPGRADING,
+                    "timestamp": now,
+                    "version": new_version,
+                }
+            )
+            session.execute(
+                insert(NodeTransition),
+                [
+                    {
+                        "node_id": node.id,
+                        "transition": UPGRADING,
+                        "started_at": now,
+                        "probes": 0,
+                        "next_probe_at": now + READY_PROBE_BASE,
+                        "downtime": downtime,
+                    }
+                ],
+            )
+            session.commit()
+
+        return True
+
+    def _upgrade_antctl_nodes(self, manager, nodes: List[Node], new_version: str) -> bool:
+        """Upgrade nodes with one antctl upgrade call and mark them UPGRADING.
+
+        Args:
+            manager: AntctlManager or AntctlZenManager of the nodes
+            nodes: Nodes to upgrade
+            new_version: Version string for the new binary
+
+        Returns:
+            True if upgrade succeeded
+        """
+        if not manager.upgrade_nodes(nodes, new_version):
+            names = ", ".join(str(node.id) for node in nodes)
+            logging.error(f"Failed to upgrade node {names} via antctl")
+            return False
+        for node in nodes:
+            forget_antnode_version(node.binary)
+
+        # Update status to UPGRADING
+        with self.S() as session:
+            session.query(Node).filter(Node.id.in_([node.id for node in nodes])).update(
                 {
                     "status": UPGRADING,
                     "timestamp": int(time.time()),
@@ -218,6 +521,31 @@ class ActionExecutor:
 
         return True
 
+    def _upgrade_node_batch(
+        self, manager, nodes: List[Node], new_version: str
+    ) -> List[bool]:
+        """Upgrade nodes of one manager, batched when the manager supports it.
+
+        Args:
+            manager: Process manager of the nodes
+            nodes: Nodes to upgrade
+            new_version: Version string for the new binary
+
+        Returns:
+            Whether each node was upgraded, in order
+        """
+        if has_native_batch(manager, "upgrade_nodes"):
+            upgraded = self._upgrade_antctl_nodes(manager, nodes, new_version)
+            return [upgraded] * len(nodes)
+        upgraded = []
+        for node in nodes:
+            try:
+                upgraded.append(self._upgrade_node_binary(node, new_version))
+            except Exception as e:
+                logging.error(f"Failed to upgrade node {node.id}: {e}")
+                upgraded.append(False)
+        return upgraded
+
     def execute(
         self,
         actions: List[Action],
@@ -234,34 +562,404 @@ class ActionExecutor:
             dry_run: If True, log actions without executing them
 
         Returns:
-            Dictionary with execution status and results
+            Status of the first (highest priority) action, with the result of
+            every action under "results"
         """
         # Store machine_config for use in _get_process_manager
         self.machine_config = machine_config
+        self._claimed = set()
+        self._begin_cycle()
 
         if not actions:
-            return {"status": "no-actions", "results": []}
+            self._reconcile_firewalls(dry_run)
+            return self._report_forks({"status": "no-actions", "results": []})
+
+        # Phase 1 of upgrades: stage every new binary before any node goes down
+        if not dry_run:
+            self._stage_upgrades(actions)
+
+        # Same-kind stops, starts and removals go to the managers in batches
+        results = [None] * len(actions)
+        if not dry_run:
+            for index, result in self._execute_batches(actions, metrics).items():
+                results[index] = result
+        pending = [index for index, result in enumerate(results) if result is None]
+
+        # Adds into shared containers run side by side, one per container;
+        # antctl adds go to antctl together
+        adds = [index for index in pending if actions[index].type == ActionType.ADD_NODE]
+        if not dry_run and len(adds) > 1:
+            added = None
+            if self._uses_containers(machine_config):
+                logging.info(f"Executing: {len(adds)} add-node actions across containers")
+                added = self._execute_container_adds(len(adds), machine_config, metrics)
+            elif self._batches_adds(machine_config):
+                logging.info(f"Executing: {len(adds)} add-node actions as one batch")
+                added = self._execute_batch_adds(len(adds), machine_config, metrics)
+            if added is not None:
+                for index, (_, result) in zip(adds, added):
+                    result.setdefault("action", ActionType.ADD_NODE.value)
+                    results[index] = result
+                pending = [index for index in pending if results[index] is None]
+
+        workers = min(self._get_action_workers(machine_config), len(pending))
+        if (
+            workers > 1
+            and not dry_run
+            and all(action.type in PARALLEL_ACTION_TYPES for action in actions)
+        ):
+            logging.info(f"Executing {len(pending)} actions with {workers} workers")
+            with ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="wnm-action"
+            ) as pool:
+                futures = {
+                    index: pool.submit(
+                        self._run_action_in_worker,
+                        actions[index],
+                        machine_config,
+                        metrics,
+                        dry_run,
+                    )
+                    for index in pending
+                }
+                for index, future in futures.items():
+                    results[index] = future.result()
+        else:
+            for index in pending:
+                results[index] = self._run_action(
+                    actions[index], machine_config, metrics, dry_run
+                )
 
-        results = []
+        # Upgrades, rollbacks and removals may leave store binaries unused
+        if not dry_run and any(action.type in BINARY_ACTION_TYPES for action in actions):
+            self._collect_binary_garbage()
 
-        for action in actions:
-            logging.info(
-                f"Executing: {action.type.value} (priority={action.priority}, reason={action.reason})"
-            )
+        # Return status from the first (highest priority) action
+        summary = dict(results[0])
+        summary["results"] = results
+        self._reconcile_firewalls(dry_run)
+        return self._report_forks(summary)
+
+    def _begin_cycle(self):
+        """Refresh the machine snapshot and the managers' per-cycle state."""
+        self.context.begin_cycle()
+
+    def _reconcile_firewalls(self, dry_run: bool = False):
+        """
+        Bring reconciling firewalls (nftables) in line with the node table.
+
+        Runs once at the end of a cycle: the ports of every node that should
+        be reachable are handed to each reconciling backend, which applies
+        the difference in one transaction.
+        """
+        if dry_run:
+            return
+        firewall_type = (self.machine_config or {}).get("firewall_type")
+        if firewall_type and not self.context.all_managers():
+            # No node was touched this cycle; repair drift all the same
+            self._get_process_manager(None)
+
+        firewalls = {}
+        for manager in self.context.all_managers():
+            firewall = getattr(manager, "firewall", None)
+            if getattr(firewall, "reconciles", False) is True:
+                # One nft set per machine, so one reconcile per backend
+                firewalls.setdefault(type(firewall), firewall)
+        if not firewalls:
+            return
+
+        try:
+            with self.S() as session:
+                ports = (
+                    session.execute(
+                        select(Node.port).where(
+                            Node.status.notin_(CLOSED_PORT_STATUSES)
+                        )
+                    )
+                    .scalars()
+                    .all()
+                )
+                highest_port = session.execute(select(func.max(Node.port))).scalar()
+            port_range = self._node_port_range(highest_port)
+            for firewall in firewalls.values():
+                firewall.reconcile(ports, port_range=port_range)
+        except Exception as error:
+            template = "In RF - An exception of type {0} occurred. Arguments:\n{1!r}"
+            message = template.format(type(error).__name__, error.args)
+            logging.warning(message)
+
+    def _node_port_range(self, highest_port: Optional[int]) -> Optional[tuple]:
+        """
+        The node port range a reconciling firewall keeps closed.
+
+        Covers port_start * 1000 + 1 up to the next thousand, or up to the
+        highest node port when node ids have grown past that.
+
+        Args:
+            highest_port: Highest port of any node in the table
+
+        Returns:
+            (start, end), or None without a port_start
+        """
+        port_start = (self.machine_config or {}).get("port_start")
+        if not port_start:
+            return None
+        base = int(port_start) * PORT_MULTIPLIER
+        end = max(base + PORT_MULTIPLIER - 1, highest_port or 0)
+        return (base + 1, min(end, 65535))
+
+    def _report_forks(self, summary: Dict[str, Any]) -> Dict[str, Any]:
+        """Add the cycle's antctl invocation count to a result, if antctl was used."""
+        counts = [
+            manager.forks
+            for manager in self.context.all_managers()
+            if isinstance(getattr(manager, "forks", None), int)
+        ]
+        if counts:
+            summary["antctl_forks"] = sum(counts)
+            logging.info(f"antctl invocations this cycle: {summary['antctl_forks']}")
+        return summary
+
+    @staticmethod
+    def _binary_store_sudo(machine_config: Optional[Dict[str, Any]]) -> bool:
+        """True if node binaries belong to system services (managed through sudo)."""
+        manager_type = (machine_config or {}).get("process_manager") or ""
+        return "+sudo" in manager_type
+
+    def _collect_binary_garbage(self):
+        """Delete binary store entries no node uses any more."""
+        try:
+            get_binary_store(sudo=self._binary_store_sudo(self.machine_config)).gc()
+        except Exception as error:
+            template = "In CBG - An exception of type {0} occurred. Arguments:\n{1!r}"
+            message = template.format(type(error).__name__, error.args)
+            logging.warning(message)
+
+    def _run_action(
+        self,
+        action: Action,
+        machine_config: Dict[str, Any],
+        metrics: Dict[str, Any],
+        dry_run: bool,
+    ) -> Dict[str, Any]:
+        """Execute one action, turning exceptions into a failed result."""
+        logging.info(
+            f"Executing: {action.type.value} (priority={action.priority}, reason={action.reason})"
+        )
+        try:
+            result = self._execute_action(action, machine_config, metrics, dry_run)
+        except Exception as e:
+            logging.error(f"Failed to execute {action.type.value}: {e}")
+            return {"action": action.type.value, "success": False, "error": str(e)}
+        result.setdefault("action", action.type.value)
+        return result
+
+    def _run_action_in_worker(
+        self,
+        action: Action,
+        machine_config: Dict[str, Any],
+        metrics: Dict[str, Any],
+        dry_run: bool,
+    ) -> Dict[str, Any]:
+        """Run an action on a pool thread and release its thread-local session."""
+        try:
+            return self._run_action(action, machine_config, metrics, dry_run)
+        finally:
+            # scoped_session keeps one session per thread
+            remove = getattr(self.S, "remove", None)
+            if callable(remove):
+                remove()
+
+    def _batch_kind(self, action: Action) -> Optional[str]:
+        """Name the batch an action can join, or None if it runs on its own."""
+        if action.type == ActionType.START_NODE:
+            return "start"
+        if action.type == ActionType.STOP_NODE:
+            return "stop"
+        if action.type == ActionType.UPGRADE_NODE:
+            return "upgrade"
+        if action.type == ActionType.REMOVE_NODE:
+            reason = action.reason.lower()
+            if "dead" in reason:
+                return None
+            return "remove-stopped" if "stopped" in reason else "remove-running"
+        return None
+
+    def _execute_batches(
+        self, actions: List[Action], metrics: Dict[str, Any]
+    ) -> Dict[int, Dict[str, Any]]:
+        """Execute same-kind node actions with one batched manager call per kind.
+
+        Kinds with a single action are left for the regular per-action path.
+
+        Args:
+            actions: Planned actions
+            metrics: Current system metrics
 
+        Returns:
+            Results of the batched actions, keyed by their index in actions
+        """
+        batches = {}
+        for index, action in enumerate(actions):
+            kind = self._batch_kind(action)
+            if kind:
+                batches.setdefault(kind, []).append(index)
+
+        results = {}
+        for kind, indexes in batches.items():
+            if len(indexes) < 2:
+                continue
+            batch = [actions[index] for index in indexes]
             try:
-                result = self._execute_action(action, machine_config, metrics, dry_run)
-                results.append(result)
+                batch_results = self._execute_batch(kind, batch, metrics)
             except Exception as e:
-                logging.error(f"Failed to execute {action.type.value}: {e}")
-                results.append(
-                    {"action": action.type.value, "success": False, "error": str(e)}
+                logging.error(f"Failed to execute {kind} batch: {e}")
+                batch_results = [{"success": False, "error": str(e)} for _ in batch]
+            for index, action, result in zip(indexes, batch, batch_results):
+                if result is None:
+                    # Left for the per-action path
+                    continue
+                result.setdefault("action", action.type.value)
+                results[index] = result
+        return results
+
+    def _execute_batch(
+        self, kind: str, actions: List[Action], metrics: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Claim a node for each action and act on them with batched manager calls.
+
+        Claimed nodes are grouped by their own process manager. A group whose
+        manager has no native batch method, or that holds a single node, is
+        released to the per-action path: the base-class loop gains nothing
+        over it (and parallel_actions can spread it over worker threads).
+
+        Args:
+            kind: Batch name from _batch_kind
+            actions: Actions of that kind
+            metrics: Current system metrics
+
+        Returns:
+            One result per action, in order (None for released actions)
+        """
+        status, oldest_first = BATCH_CLAIMS[kind]
+        query = (
+            select(Node)
+            .where(Node.status == status)
+            .order_by(Node.age.asc() if oldest_first else Node.age.desc())
+        )
+        if kind == "upgrade":
+            query = query.where(Node.version != metrics["antnode_version"])
+
+        results = [None] * len(actions)
+        # Claimed nodes grouped by process manager, with their action position
+        groups = {}
+        for position, action in enumerate(actions):
+            row = self._claim_node(query, action.node_id)
+            if not row:
+                results[position] = {"status": BATCH_EMPTY_STATUS[kind]}
+                continue
+            node = row[0]
+            if kind == "start":
+                # If we don't have a version number from metadata, grab from binary
+                if not node.version:
+                    node.version = get_antnode_version(node.binary)
+                # An outdated stopped node is upgraded instead (which also starts
+                # it), unless a rolling upgrade is not taking more nodes
+                outdated = Version(metrics["antnode_version"]) > Version(node.version)
+                if outdated and self._may_upgrade_stopped(node, metrics["antnode_version"]):
+                    if self._upgrade_node_binary(node, metrics["antnode_version"]):
+                        results[position] = {"status": "upgrading-stopped-node"}
+                    else:
+                        results[position] = {"status": "failed-upgrade"}
+                    continue
+            manager = self._get_process_manager(node)
+            groups.setdefault(manager, []).append((position, node))
+
+        batched = False
+        for manager, members in groups.items():
+            if len(members) < 2 or not has_native_batch(manager, BATCH_METHODS[kind]):
+                with self._claim_lock:
+                    self._claimed.difference_update(node.id for _, node in members)
+                continue
+            batched = True
+            nodes = [node for _, node in members]
+            logging.info(
+                f"Executing: {len(nodes)} {actions[0].type.value} actions as one batch"
+            )
+            if kind == "upgrade":
+                upgraded = self._upgrade_node_batch(manager, nodes, metrics["antnode_version"])
+                for (position, _), done in zip(members, upgraded):
+                    results[position] = {"status": "upgrading-node" if done else "upgrade-failed"}
+            elif kind == "start":
+                started = self._started_nodes(manager, nodes)
+                for position, node in members:
+                    if node.id in started:
+                        self._set_node_status(node.id, RESTARTING)
+                        results[position] = {"status": "started-node"}
+                    else:
+                        results[position] = {"status": "failed-start-node"}
+            elif kind == "remove-stopped":
+                manager.remove_nodes(nodes)
+                # Delete from database immediately (no delay for stopped nodes)
+                with self.S() as session:
+                    for node in nodes:
+                        session.delete(node)
+                    session.commit()
+                for position, _ in members:
+                    results[position] = {"status": "removed-stopped-node"}
+            else:
+                manager.stop_nodes(nodes)
+                if kind == "stop":
+                    # Stopped nodes stay in place; running removals are
+                    # deleted later, after the removal delay
+                    new_status, result_status = STOPPED, "stopped-node"
+                else:
+                    new_status, result_status = REMOVING, "removed-running-node"
+                for position, node in members:
+                    self._set_node_status(node.id, new_status)
+                    results[position] = {"status": result_status}
+
+        if kind == "stop" and batched:
+            # Update the last stopped time
+            with self.S() as session:
+                session.query(Machine).filter(Machine.id == 1).update(
+                    {"last_stopped_at": int(time.time())}
                 )
+                session.commit()
 
-        # Return status from the first (highest priority) action
-        if results:
-            return results[0]
-        return {"status": "no-results"}
+        return results
+
+    def _started_nodes(self, manager, nodes: List[Node]) -> set:
+        """Start nodes with one batched call and return the ids that started.
+
+        start_nodes() reports the batch as a whole, while systemctl, antctl
+        and docker still start the other nodes when one fails. After a
+        failed batch each node's state is checked, so only nodes that are
+        not running are reported as failed.
+
+        Args:
+            manager: Process manager of the nodes
+            nodes: Node records to start
+
+        Returns:
+            Ids of the nodes that are running
+        """
+        if manager.start_nodes(nodes):
+            return {node.id for node in nodes}
+        if len(nodes) < 2:
+            return set()
+        try:
+            statuses = manager.get_statuses(nodes)
+        except Exception as error:
+            template = "In SN - An exception of type {0} occurred. Arguments:\n{1!r}"
+            message = template.format(type(error).__name__, error.args)
+            logging.warning(message)
+            return set()
+        return {
+            node.id
+            for node in nodes
+            if getattr(statuses.get(node.id), "status", None) == RUNNING
+        }
 
     def _execute_action(
         self,
@@ -288,13 +986,16 @@ class ActionExecutor:
             return self._execute_remove_node(action, dry_run)
 
         elif action.type == ActionType.STOP_NODE:
-            return self._execute_stop_node(machine_config, dry_run)
+            return self._execute_stop_node(action, machine_config, dry_run)
 
         elif action.type == ActionType.UPGRADE_NODE:
-            return self._execute_upgrade_node(metrics, dry_run)
+            return self._execute_upgrade_node(action, metrics, dry_run)
 
         elif action.type == ActionType.START_NODE:
-            return self._execute_start_node(metrics, dry_run)
+            return self._execute_start_node(action, metrics, dry_run)
+
+        elif action.type == ActionType.ROLLBACK_NODE:
+            return self._execute_rollback_node(action, dry_run)
 
         elif action.type == ActionType.ADD_NODE:
             return self._execute_add_node(machine_config, metrics, dry_run)
@@ -329,7 +1030,12 @@ class ActionExecutor:
                 logging.warning("DRYRUN: System rebooted, survey nodes")
         else:
             survey_delay_ms = self._get_survey_delay_ms(machine_config)
-            update_nodes(self.S, survey_delay_ms=survey_delay_ms)
+            update_nodes(
+                self.S,
+                survey_delay_ms=survey_delay_ms,
+                max_concurrent_surveys=self._get_survey_concurrency(machine_config),
+                history_retention=self._get_history_retention(machine_config),
+            )
             # Update the last stopped time
             with self.S() as session:
                 session.query(Machine).filter(Machine.id == 1).update(
@@ -343,7 +1049,8 @@ class ActionExecutor:
         """Execute node removal.
 
         If reason contains 'dead', remove all dead nodes.
-        Otherwise, remove youngest stopped or running node based on reason.
+        Otherwise, remove the stopped or running node bound to the action
+        (or the youngest, if unbound) based on reason.
         """
         if "dead" in action.reason.lower():
             # Remove all dead nodes
@@ -357,24 +1064,28 @@ class ActionExecutor:
                         .order_by(Node.timestamp.asc())
                     ).all()
 
+                groups = {}
                 for row in broken:
                     node = row[0]
                     logging.info(f"Removing dead node {node.id}")
-                    manager = self._get_process_manager(node)
-                    manager.remove_node(node)
+                    groups.setdefault(self._get_process_manager(node), []).append(node)
+
+                for manager, nodes in groups.items():
+                    manager.remove_nodes(nodes)
                     # Delete from database immediately (no delay for dead nodes)
                     with self.S() as session:
-                        session.delete(node)
+                        for node in nodes:
+                            session.delete(node)
                         session.commit()
 
             return {"status": "removed-dead-nodes"}
 
         elif "stopped" in action.reason.lower():
             # Remove youngest stopped node
-            with self.S() as session:
-                youngest = session.execute(
-                    select(Node).where(Node.status == STOPPED).order_by(Node.age.desc())
-                ).first()
+            youngest = self._claim_node(
+                select(Node).where(Node.status == STOPPED).order_by(Node.age.desc()),
+                action.node_id,
+            )
 
             if youngest:
                 if dry_run:
@@ -393,10 +1104,10 @@ class ActionExecutor:
 
         else:
             # Remove youngest running node (with delay)
-            with self.S() as session:
-                youngest = session.execute(
-                    select(Node).where(Node.status == RUNNING).order_by(Node.age.desc())
-                ).first()
+            youngest = self._claim_node(
+                select(Node).where(Node.status == RUNNING).order_by(Node.age.desc()),
+                action.node_id,
+            )
 
             if youngest:
                 if dry_run:
@@ -412,13 +1123,13 @@ class ActionExecutor:
                 return {"status": "no-running-nodes-to-remove"}
 
     def _execute_stop_node(
-        self, machine_config: Dict[str, Any], dry_run: bool
+        self, action: Action, machine_config: Dict[str, Any], dry_run: bool
     ) -> Dict[str, Any]:
         """Execute node stop (to reduce resource usage)."""
-        with self.S() as session:
-            youngest = session.execute(
-                select(Node).where(Node.status == RUNNING).order_by(Node.age.desc())
-            ).first()
+        youngest = self._claim_node(
+            select(Node).where(Node.status == RUNNING).order_by(Node.age.desc()),
+            action.node_id,
+        )
 
         if youngest:
             if dry_run:
@@ -439,16 +1150,16 @@ class ActionExecutor:
             return {"status": "no-nodes-to-stop"}
 
     def _execute_upgrade_node(
-        self, metrics: Dict[str, Any], dry_run: bool
+        self, action: Action, metrics: Dict[str, Any], dry_run: bool
     ) -> Dict[str, Any]:
         """Execute node upgrade (oldest running node with outdated version)."""
-        with self.S() as session:
-            oldest = session.execute(
-                select(Node)
-                .where(Node.status == RUNNING)
-                .where(Node.version != metrics["antnode_version"])
-                .order_by(Node.age.asc())
-            ).first()
+        oldest = self._claim_node(
+            select(Node)
+            .where(Node.status == RUNNING)
+            .where(Node.version != metrics["antnode_version"])
+            .order_by(Node.age.asc()),
+            action.node_id,
+        )
 
         if oldest:
             if dry_run:
@@ -467,14 +1178,94 @@ class ActionExecutor:
         else:
             return {"status": "no-nodes-to-upgrade"}
 
+    def _execute_rollback_node(self, action: Action, dry_run: bool) -> Dict[str, Any]:
+        """Execute restoring the binary a node ran before a regressed upgrade wave."""
+        claimed = self._claim_node(
+            select(Node).where(Node.status.in_([RUNNING, STOPPED])),
+            action.node_id,
+        )
+        if not claimed:
+            return {"status": "no-nodes-to-rollback"}
+        node = claimed[0]
+        previous = previous_binary(node.binary)
+        if not os.path.exists(previous):
+            logging.warning(f"No previous binary to roll node {node.id} back to")
+            return {"status": "rollback-failed"}
+        if dry_run:
+            logging.warning("DRYRUN: Roll back upgraded node")
+            return {"status": "rolling-back-node"}
+
+        manager = self._get_process_manager(node)
+        logging.info(f"Rolling node {node.id} back to its previous binary")
+        if node.status == RUNNING and not manager.stop_node(node):
+            logging.error(f"Failed to stop node {node.id} for rollback")
+            return {"status": "rollback-failed"}
+        store = get_binary_store(getattr(manager, "use_system_services", False))
+        try:
+            store.swap(previous, node.binary)
+            forget_antnode_version(node.binary)
+        except (OSError, subprocess.CalledProcessError) as err:
+            logging.error(f"Failed to restore binary for rollback: {err}")
+            manager.start_node(node)
+            return {"status": "rollback-failed"}
+        if not manager.start_node(node):
+            logging.error(f"Failed to start node {node.id} after rollback")
+            return {"status": "rollback-failed"}
+
+        with self.S() as session:
+            session.query(Node).filter(Node.id == node.id).update(
+                {
+                    "status": RESTARTING,
+                    "timestamp": int(time.time()),
+                    "version": get_antnode_version(node.binary),
+                }
+            )
+            session.commit()
+        return {"status": "rolled-back-node"}
+
+    def _may_upgrade_stopped(
+        self, node: Node, version: str, dry_run: bool = False
+    ) -> bool:
+        """Whether an outdated stopped node is upgraded as it is started.
+
+        With rolling upgrades (upgrade_canary) the node joins the open wave,
+        so it goes through the same health gate as planned upgrades. While
+        the rollout is paused, rolling back or its wave is full, the node is
+        started on its current binary instead.
+
+        Args:
+            node: Stopped node record
+            version: antnode version being rolled out
+            dry_run: Check the rollout without adding the node to its wave
+
+        Returns:
+            True if the node should be upgraded
+        """
+        canary = (self.machine_config or {}).get("upgrade_canary")
+        if not canary:
+            return True
+        with self._rollout_lock:
+            rollout = RollingUpgrade(
+                self.S, version, canary, sudo=self._binary_store_sudo(self.machine_config)
+            )
+            if rollout.state in (PAUSED, ROLLING_BACK) or rollout.allowance() < 1:
+                logging.info(
+                    f"Upgrade rollout of {version} not taking node {node.id}, "
+                    + "starting it on its current binary"
+                )
+                return False
+            if not dry_run:
+                rollout.record([Action(type=ActionType.UPGRADE_NODE, node_id=node.id)])
+        return True
+
     def _execute_start_node(
-        self, metrics: Dict[str, Any], dry_run: bool
+        self, action: Action, metrics: Dict[str, Any], dry_run: bool
     ) -> Dict[str, Any]:
         """Execute starting a stopped node (may upgrade first if needed)."""
-        with self.S() as session:
-            oldest = session.execute(
-                select(Node).where(Node.status == STOPPED).order_by(Node.age.asc())
-            ).first()
+        oldest = self._claim_node(
+            select(Node).where(Node.status == STOPPED).order_by(Node.age.asc()),
+            action.node_id,
+        )
 
         if oldest:
             node = oldest[0]
@@ -482,28 +1273,223 @@ class ActionExecutor:
             if not node.version:
                 node.version = get_antnode_version(node.binary)
 
-            # If the stopped version is old, upgrade it (which also starts it)
-            if Version(metrics["antnode_version"]) > Version(node.version):
-                if dry_run:
-                    logging.warning("DRYRUN: Upgrade and start stopped node")
-                else:
-                    # Perform the upgrade (copies binary, restarts, sets UPGRADING status)
-                    if not self._upgrade_node_binary(node, metrics["antnode_version"]):
-                        return {"status": "failed-upgrade"}
-                return {"status": "upgrading-stopped-node"}
-            else:
-                if dry_run:
-                    logging.warning("DRYRUN: Start stopped node")
-                    return {"status": "starting-node"}
-                else:
-                    manager = self._get_process_manager(node)
-                    if manager.start_node(node):
-                        self._set_node_status(node.id, RESTARTING)
-                        return {"status": "started-node"}
-                    else:
-                        return {"status": "failed-start-node"}
-        else:
-            return {"status": "no-stopped-nodes"}
+            # If the stopped version is old, upgrade it (which also starts it),
+            # unless a rolling upgrade is not taking more nodes
+            outdated = Version(metrics["antnode_version"]) > Version(node.version)
+            if outdated and self._may_upgrade_stopped(
+                node, metrics["antnode_version"], dry_run
+            ):
+                if dry_run:
+                    logging.warning("DRYRUN: Upgrade and start stopped node")
+                else:
+                    # Perform the upgrade (copies binary, restarts, sets UPGRADING status)
+                    if not self._upgrade_node_binary(node, metrics["antnode_version"]):
+                        return {"status": "failed-upgrade"}
+                return {"status": "upgrading-stopped-node"}
+            else:
+                if dry_run:
+                    logging.warning("DRYRUN: Start stopped node")
+                    return {"status": "starting-node"}
+                else:
+                    manager = self._get_process_manager(node)
+                    if manager.start_node(node):
+                        self._set_node_status(node.id, RESTARTING)
+                        return {"status": "started-node"}
+                    else:
+                        return {"status": "failed-start-node"}
+        else:
+            return {"status": "no-stopped-nodes"}
+
+    def _allocate_container_node(
+        self, machine_config: Dict[str, Any], metrics: Dict[str, Any]
+    ) -> Optional[Node]:
+        """Place and insert a new node in the least loaded shared container.
+
+        Every container owns a block of consecutive node and metrics ports.
+        The node takes the lowest free port of its container's block and its
+        id follows from that port, so ids are not gap-filled machine-wide. A
+        container is added while there are fewer than min_container_count,
+        or when every container is full.
+
+        Args:
+            machine_config: Machine configuration
+            metrics: Current system metrics
+
+        Returns:
+            The inserted node, or None if a needed container could not be created
+        """
+        manager_type = machine_config["process_manager"]
+        with self._add_lock:
+            with self.S() as session:
+                containers = (
+                    session.execute(
+                        select(Container)
+                        .where(Container.port_range_start.is_not(None))
+                        .order_by(Container.id)
+                    )
+                    .scalars()
+                    .all()
+                )
+                counts = dict(
+                    session.execute(
+                        select(Node.container_id, func.count(Node.id)).group_by(
+                            Node.container_id
+                        )
+                    ).all()
+                )
+
+            open_containers = [
+                container
+                for container in containers
+                if counts.get(container.id, 0)
+                <= container.port_range_end - container.port_range_start
+            ]
+            if (
+                len(containers) < machine_config["min_container_count"]
+                or not open_containers
+            ):
+                container = self._add_container(machine_config, containers)
+                if container is None:
+                    return None
+            else:
+                container = min(
+                    open_containers,
+                    key=lambda container: (counts.get(container.id, 0), container.id),
+                )
+
+            with self.S() as session:
+                used = set(
+                    session.execute(
+                        select(Node.port).where(Node.container_id == container.id)
+                    ).scalars()
+                )
+            port = next(
+                port
+                for port in range(container.port_range_start, container.port_range_end + 1)
+                if port not in used
+            )
+            node_id = port - machine_config["port_start"] * PORT_MULTIPLIER
+
+            node = self._new_node(node_id, machine_config, metrics, manager_type)
+            node.port = port
+            node.metrics_port = container.metrics_port_range_start + (
+                port - container.port_range_start
+            )
+            node.container_id = container.id
+            with self.S() as session:
+                session.add(node)
+                session.commit()
+                session.refresh(node)
+
+        logging.info(f"Allocated node {node_id} in container {container.name}")
+        return node
+
+    def _add_container(
+        self, machine_config: Dict[str, Any], containers: List[Container]
+    ) -> Optional[Container]:
+        """Create a container for the first free port block and record it.
+
+        Args:
+            machine_config: Machine configuration
+            containers: Existing block-allocated containers
+
+        Returns:
+            The new Container record, or None if the container could not be created
+        """
+        size = machine_config["max_node_per_container"]
+        port_base = machine_config["port_start"] * PORT_MULTIPLIER + 1
+        metrics_base = machine_config["metrics_port_start"] * PORT_MULTIPLIER + 1
+
+        # Blocks of removed containers are reused
+        block = 0
+        while any(
+            container.port_range_start < port_base + (block + 1) * size
+            and port_base + block * size <= container.port_range_end
+            for container in containers
+        ):
+            block += 1
+        port_start = port_base + block * size
+        metrics_start = metrics_base + block * size
+        name = f"antcontainer{block + 1:02}"
+
+        manager = self._get_process_manager(None)
+        container_id = manager.create_container(
+            name,
+            machine_config["node_storage"],
+            (port_start, port_start + size - 1),
+            (metrics_start, metrics_start + size - 1),
+        )
+        if not container_id:
+            logging.error(f"Failed to create container {name}")
+            return None
+
+        container = Container(
+            container_id=container_id,
+            name=name,
+            image=manager.image,
+            status="running",
+            created_at=int(time.time()),
+            port_range_start=port_start,
+            port_range_end=port_start + size - 1,
+            metrics_port_range_start=metrics_start,
+            metrics_port_range_end=metrics_start + size - 1,
+        )
+        with self.S() as session:
+            session.add(container)
+            session.commit()
+            session.refresh(container)
+        return container
+
+    def _execute_container_adds(
+        self, count: int, machine_config: Dict[str, Any], metrics: Dict[str, Any]
+    ) -> List[tuple]:
+        """Add several nodes to shared containers, one worker per container.
+
+        The nodes are placed first (spreading them over the least loaded
+        containers), then each container's new nodes are created in turn
+        while the containers proceed in parallel.
+
+        Args:
+            count: Number of nodes to add
+            machine_config: Machine configuration
+            metrics: Current system metrics
+
+        Returns:
+            (node or None, result) for each add, in order
+        """
+        added = []
+        groups = {}
+        for position in range(count):
+            node = self._allocate_container_node(machine_config, metrics)
+            if node is None:
+                added.append((None, {"status": "failed-create-container"}))
+                continue
+            added.append((node, None))
+            groups.setdefault(node.container_id, []).append(position)
+
+        def create(positions):
+            try:
+                for position in positions:
+                    node = added[position][0]
+                    try:
+                        result = self._create_node_process(node, machine_config)
+                    except Exception as e:
+                        logging.error(f"Failed to create node {node.id}: {e}")
+                        result = {"status": "failed-create-node", "error": str(e)}
+                    added[position] = (node, result)
+            finally:
+                # scoped_session keeps one session per thread
+                remove = getattr(self.S, "remove", None)
+                if callable(remove):
+                    remove()
+
+        if groups:
+            with ThreadPoolExecutor(
+                max_workers=len(groups), thread_name_prefix="wnm-container"
+            ) as pool:
+                for future in [pool.submit(create, positions) for positions in groups.values()]:
+                    future.result()
+        return added
 
     def _execute_add_node(
         self, machine_config: Dict[str, Any], metrics: Dict[str, Any], dry_run: bool
@@ -513,59 +1499,86 @@ class ActionExecutor:
             logging.warning("DRYRUN: Add a node")
             return {"status": "add-node"}
 
-        # Use the machine config's process manager (includes mode like "systemd+sudo")
-        manager_type = machine_config.get("process_manager") or get_default_manager_type()
-
-        # Determine node ID allocation strategy based on process manager
-        if manager_type in ["antctl+user", "antctl+sudo", "antctl+zen"]:
-            # antctl managers: Use node ID tracking (IDs/ports don't reuse)
-            # Load machine_config from database to get current highest_node_id_used
-            with self.S() as session:
-                db_machine_config = session.execute(select(Machine)).first()[0]
-
-            node_id, node_id_update = allocate_node_id(db_machine_config)
+        if self._uses_containers(machine_config):
+            node = self._allocate_container_node(machine_config, metrics)
+            if node is None:
+                return {"status": "failed-create-container"}
+            return self._create_node_process(node, machine_config)
+
+        # Allocate the node id and insert the row under a lock so concurrent
+        # adds never pick the same id; creating the node runs in parallel
+        with self._add_lock:
+            # Use the machine config's process manager (includes mode like "systemd+sudo")
+            manager_type = machine_config.get("process_manager") or get_default_manager_type()
+
+            # Determine node ID allocation strategy based on process manager
+            if manager_type in TRACKED_ID_MANAGER_TYPES:
+                # antctl managers: Use node ID tracking (IDs/ports don't reuse)
+                # Load machine_config from database to get current highest_node_id_used
+                with self.S() as session:
+                    db_machine_config = session.execute(select(Machine)).first()[0]
 
-            # Update machine config BEFORE creating the node to prevent race conditions
-            with self.S() as session:
-                session.query(Machine).filter(Machine.id == 1).update(node_id_update)
-                session.commit()
+                node_id, node_id_update = allocate_node_id(db_machine_config)
 
-            logging.info(f"Allocated node ID {node_id} using antctl ID tracking (highest_node_id_used now {node_id_update['highest_node_id_used']})")
-        else:
-            # Other managers: Use legacy node_id allocation (fills gaps)
-            # First check if node 1 exists
-            with self.S() as session:
-                node_1_exists = session.execute(
-                    select(Node.id).where(Node.id == 1)
-                ).first()
+                # Update machine config BEFORE creating the node to prevent race conditions
+                with self.S() as session:
+                    session.query(Machine).filter(Machine.id == 1).update(node_id_update)
+                    session.commit()
 
-            if not node_1_exists:
-                # Node 1 is available, use it
-                node_id = 1
+                logging.info(f"Allocated node ID {node_id} using antctl ID tracking (highest_node_id_used now {node_id_update['highest_node_id_used']})")
             else:
-                # Look for holes in the sequence
-                sql = text(
-                    "select n1.id + 1 as id from node n1 "
-                    + "left join node n2 on n2.id = n1.id + 1 "
-                    + "where n2.id is null "
-                    + "and n1.id <> (select max(id) from node) "
-                    + "order by n1.id;"
-                )
+                # Other managers: Use legacy node_id allocation (fills gaps)
+                # First check if node 1 exists
                 with self.S() as session:
-                    result = session.execute(sql).first()
+                    node_1_exists = session.execute(
+                        select(Node.id).where(Node.id == 1)
+                    ).first()
 
-                if result:
-                    node_id = result[0]
+                if not node_1_exists:
+                    # Node 1 is available, use it
+                    node_id = 1
                 else:
-                    # No holes, use max + 1
+                    # Look for holes in the sequence
+                    sql = text(
+                        "select n1.id + 1 as id from node n1 "
+                        + "left join node n2 on n2.id = n1.id + 1 "
+                        + "where n2.id is null "
+                        + "and n1.id <> (select max(id) from node) "
+                        + "order by n1.id;"
+                    )
                     with self.S() as session:
-                        result = session.execute(
-                            select(Node.id).order_by(Node.id.desc())
-                        ).first()
-                    node_id = result[0] + 1 if result else 1
+                        result = session.execute(sql).first()
+
+                    if result:
+                        node_id = result[0]
+                    else:
+                        # No holes, use max + 1
+                        with self.S() as session:
+                            result = session.execute(
+                                select(Node.id).order_by(Node.id.desc())
+                            ).first()
+                        node_id = result[0] + 1 if result else 1
+
+                logging.debug(f"Allocated node ID {node_id} using gap-filling strategy")
+
+            node = self._new_node(node_id, machine_config, metrics, manager_type)
 
-            logging.debug(f"Allocated node ID {node_id} using gap-filling strategy")
+            # Insert into database
+            with self.S() as session:
+                session.add(node)
+                session.commit()
+                session.refresh(node)  # Get the persisted node
 
+        return self._create_node_process(node, machine_config)
+
+    def _new_node(
+        self,
+        node_id: int,
+        machine_config: Dict[str, Any],
+        metrics: Dict[str, Any],
+        manager_type: str,
+    ) -> Node:
+        """Build the record of a new node (not yet inserted)."""
         # Select wallet for this node from weighted distribution
         selected_wallet = select_wallet_for_node(
             machine_config["rewards_address"],
@@ -573,7 +1586,7 @@ class ActionExecutor:
         )
 
         # Create node object
-        node = Node(
+        return Node(
             id=node_id,
             node_name=f"{node_id:04}",
             service=f"antnode{node_id:04}.service",
@@ -600,12 +1613,76 @@ class ActionExecutor:
             manager_type=manager_type,
         )
 
-        # Insert into database
-        with self.S() as session:
-            session.add(node)
-            session.commit()
-            session.refresh(node)  # Get the persisted node
+    def _execute_batch_adds(
+        self, count: int, machine_config: Dict[str, Any], metrics: Dict[str, Any]
+    ) -> List[tuple]:
+        """Add several nodes with one batched manager call.
+
+        The node ids are allocated (and the rows inserted) together, so the
+        nodes get consecutive ports that a single `antctl add --count N`
+        can take.
+
+        Args:
+            count: Number of nodes to add
+            machine_config: Machine configuration
+            metrics: Current system metrics
+
+        Returns:
+            (node, result) for each add, in order
+        """
+        manager_type = machine_config.get("process_manager") or get_default_manager_type()
+        with self._add_lock:
+            with self.S() as session:
+                db_machine_config = session.execute(select(Machine)).first()[0]
+            first_id, _ = allocate_node_id(db_machine_config)
+            node_ids = list(range(first_id, first_id + count))
+
+            # Update machine config BEFORE creating the nodes to prevent race conditions
+            with self.S() as session:
+                session.query(Machine).filter(Machine.id == 1).update(
+                    {"highest_node_id_used": node_ids[-1]}
+                )
+                session.commit()
+            logging.info(
+                f"Allocated node IDs {node_ids[0]}-{node_ids[-1]} using antctl ID tracking"
+            )
+
+            nodes = [
+                self._new_node(node_id, machine_config, metrics, manager_type)
+                for node_id in node_ids
+            ]
+            # One antctl add takes one rewards address: give nodes sharing a
+            # wallet consecutive ids (the wallet split itself is unchanged)
+            for node, wallet in zip(nodes, sorted(node.wallet for node in nodes)):
+                node.wallet = wallet
+            with self.S() as session:
+                session.add_all(nodes)
+                session.commit()
+                for node in nodes:
+                    session.refresh(node)
+
+        source_binary = os.path.expanduser(machine_config["antnode_path"])
+        manager = self._get_process_manager(nodes[0])
+        try:
+            node_processes = manager.create_nodes(nodes, source_binary)
+        except Exception as e:
+            logging.error(f"Failed to create nodes: {e}")
+            return [(node, {"status": "failed-create-node", "error": str(e)}) for node in nodes]
+
+        added = []
+        for node, node_process in zip(nodes, node_processes):
+            if not node_process:
+                logging.error(f"Failed to create node {node.id}")
+                added.append((node, {"status": "failed-create-node"}))
+                continue
+            self._record_node_process(node, node_process, manager)
+            added.append((node, {"status": "added-node"}))
+        return added
 
+    def _create_node_process(
+        self, node: Node, machine_config: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Create an inserted node through its process manager."""
         # Create the node using process manager
         source_binary = os.path.expanduser(machine_config["antnode_path"])
         manager = self._get_process_manager(node)
@@ -615,6 +1692,11 @@ class ActionExecutor:
             logging.error(f"Failed to create node {node.id}")
             return {"status": "failed-create-node"}
 
+        self._record_node_process(node, node_process, manager)
+        return {"status": "added-node"}
+
+    def _record_node_process(self, node: Node, node_process, manager):
+        """Persist what the process manager reported for a new node and mark it RESTARTING."""
         # Persist metadata returned by process manager to database
         with self.S() as session:
             db_node = session.query(Node).filter_by(id=node.id).first()
@@ -622,8 +1704,6 @@ class ActionExecutor:
                 # Store container_id if provided (for Docker/s6overlay managers)
                 if node_process.container_id:
                     # Create or update Container record
-                    from wnm.models import Container
-
                     container = session.query(Container).filter_by(
                         container_id=node_process.container_id
                     ).first()
@@ -653,15 +1733,18 @@ class ActionExecutor:
         # Update status to RESTARTING (node is starting up)
         self._set_node_status(node.id, RESTARTING)
 
-        return {"status": "added-node"}
-
     def _execute_survey(self, dry_run: bool) -> Dict[str, Any]:
         """Execute node survey (idle monitoring)."""
         if dry_run:
             logging.warning("DRYRUN: Update nodes")
         else:
             survey_delay_ms = self._get_survey_delay_ms(self.machine_config)
-            update_nodes(self.S, survey_delay_ms=survey_delay_ms)
+            update_nodes(
+                self.S,
+                survey_delay_ms=survey_delay_ms,
+                max_concurrent_surveys=self._get_survey_concurrency(self.machine_config),
+                history_retention=self._get_history_retention(self.machine_config),
+            )
         return {"status": "idle"}
 
     def _parse_node_name(self, service_name: str) -> Optional[int]:
@@ -674,7 +1757,7 @@ class ActionExecutor:
             Node ID as integer, or None if parsing fails
         """
         import re
-        match = re.match(r"antnode(\d+)", service_name)
+        match = re.match(r"antnode@?(\d+)", service_name)
         if match:
             return int(match.group(1))
         return None
@@ -726,24 +1809,30 @@ class ActionExecutor:
         Returns:
             Dictionary with execution result
         """
+        self.machine_config = machine_config
+        self._begin_cycle()
         if action_type == "add":
-            return self._force_add_node(machine_config, metrics, dry_run, count)
+            result = self._force_add_node(machine_config, metrics, dry_run, count)
         elif action_type == "remove":
-            return self._force_remove_node(service_name, dry_run, count)
+            result = self._force_remove_node(service_name, dry_run, count)
         elif action_type == "upgrade":
-            return self._force_upgrade_node(service_name, metrics, dry_run, count)
+            result = self._force_upgrade_node(service_name, metrics, dry_run, count)
         elif action_type == "start":
-            return self._force_start_node(service_name, metrics, dry_run, count)
+            result = self._force_start_node(service_name, metrics, dry_run, count)
         elif action_type == "stop":
-            return self._force_stop_node(service_name, dry_run, count)
+            result = self._force_stop_node(service_name, dry_run, count)
         elif action_type == "disable":
-            return self._force_disable_node(service_name, dry_run)
+            result = self._force_disable_node(service_name, dry_run)
         elif action_type == "teardown":
-            return self._force_teardown_cluster(machine_config, dry_run)
+            result = self._force_teardown_cluster(machine_config, dry_run)
         elif action_type == "survey":
-            return self._force_survey_nodes(service_name, dry_run)
+            result = self._force_survey_nodes(service_name, dry_run)
+        elif action_type == "resume_upgrade":
+            result = self._force_resume_upgrade(machine_config, metrics, dry_run)
         else:
-            return {"status": "error", "message": f"Unknown action type: {action_type}"}
+            result = {"status": "error", "message": f"Unknown action type: {action_type}"}
+        self._reconcile_firewalls(dry_run)
+        return self._report_forks(result)
 
     def _force_add_node(
         self, machine_config: Dict[str, Any], metrics: Dict[str, Any], dry_run: bool, count: int = 1
@@ -773,6 +1862,28 @@ class ActionExecutor:
         # Get action delay setting
         delay_ms = self._get_action_delay_ms(machine_config)
 
+        # Nodes for shared containers are added one per container in parallel,
+        # antctl nodes with one batched antctl add
+        added = None
+        if count > 1 and not dry_run and delay_ms == 0:
+            if self._uses_containers(machine_config):
+                added = self._execute_container_adds(count, machine_config, metrics)
+            elif self._batches_adds(machine_config):
+                added = self._execute_batch_adds(count, machine_config, metrics)
+        if added is not None:
+            for i, (node, result) in enumerate(added):
+                if result["status"] == "added-node":
+                    added_nodes.append(node.service.replace(".service", ""))
+                else:
+                    failed_nodes.append({"index": i + 1, "error": result["status"]})
+            return {
+                "status": "added-nodes",
+                "added_count": len(added_nodes),
+                "added_nodes": added_nodes if added_nodes else None,
+                "failed_count": len(failed_nodes),
+                "failed_nodes": failed_nodes if failed_nodes else None,
+            }
+
         for i in range(count):
             # Insert delay between operations (skip before first)
             if i > 0 and delay_ms > 0:
@@ -807,6 +1918,85 @@ class ActionExecutor:
             "failed_nodes": failed_nodes if failed_nodes else None,
         }
 
+    def _force_batch(
+        self,
+        operation: str,
+        named_nodes: List[tuple],
+        metrics: Optional[Dict[str, Any]] = None,
+    ) -> tuple:
+        """Stop, start or remove several nodes with batched manager calls.
+
+        Args:
+            operation: "stop", "start", "remove" or "upgrade"
+            named_nodes: (reported service name, node) pairs
+            metrics: Current system metrics (start and upgrade only, for the
+                current antnode version)
+
+        Returns:
+            Tuple of (names acted on, names upgraded instead of started,
+            failed node entries)
+        """
+        done = []
+        upgraded = []
+        failed = []
+        groups = {}
+        for name, node in named_nodes:
+            try:
+                if operation == "start":
+                    # Check if node needs upgrade
+                    if not node.version:
+                        node.version = get_antnode_version(node.binary)
+
+                    # If the stopped version is old, upgrade it (which also starts it)
+                    if Version(metrics["antnode_version"]) > Version(node.version):
+                        if self._upgrade_node_binary(node, metrics["antnode_version"]):
+                            upgraded.append(name)
+                        else:
+                            failed.append({"service": name, "error": "upgrade failed"})
+                        continue
+                groups.setdefault(self._get_process_manager(node), []).append((name, node))
+            except Exception as e:
+                logging.error(f"Failed to {operation} node {name}: {e}")
+                failed.append({"service": name, "error": str(e)})
+
+        for manager, members in groups.items():
+            names = [name for name, _ in members]
+            nodes = [node for _, node in members]
+            try:
+                if operation == "upgrade":
+                    upgraded_nodes = self._upgrade_node_batch(
+                        manager, nodes, metrics["antnode_version"]
+                    )
+                    for name, done_upgrade in zip(names, upgraded_nodes):
+                        if done_upgrade:
+                            done.append(name)
+                        else:
+                            failed.append({"service": name, "error": "upgrade failed"})
+                    continue
+                if operation == "remove":
+                    manager.remove_nodes(nodes)
+                    # Remove from database immediately
+                    with self.S() as session:
+                        for node in nodes:
+                            session.delete(node)
+                        session.commit()
+                elif operation == "stop":
+                    manager.stop_nodes(nodes)
+                    for node in nodes:
+                        self._set_node_status(node.id, STOPPED)
+                elif manager.start_nodes(nodes):
+                    for node in nodes:
+                        self._set_node_status(node.id, RESTARTING)
+                else:
+                    failed.extend({"service": name, "error": "start failed"} for name in names)
+                    continue
+                done.extend(names)
+            except Exception as e:
+                logging.error(f"Failed to {operation} nodes {', '.join(names)}: {e}")
+                failed.extend({"service": name, "error": str(e)} for name in names)
+
+        return done, upgraded, failed
+
     def _force_remove_node(
         self, service_name: Optional[str], dry_run: bool, count: int = 1
     ) -> Dict[str, Any]:
@@ -831,34 +2021,48 @@ class ActionExecutor:
             # Get action delay setting
             delay_ms = self._get_action_delay_ms(self.machine_config)
 
-            for idx, name in enumerate(service_names):
-                # Insert delay between operations (skip before first)
-                if idx > 0 and delay_ms > 0:
-                    delay_seconds = delay_ms / 1000.0
-                    logging.info(f"Action delay: waiting {delay_ms}ms ({delay_seconds:.2f}s) between node removals")
-                    time.sleep(delay_seconds)
-
-                node = self._get_node_by_name(name)
-                if not node:
-                    failed_nodes.append({"service": name, "error": "not found"})
-                    continue
-
-                logging.info(f"Forced action: Removing node {name}")
-                if dry_run:
-                    logging.warning(f"DRYRUN: Remove node {name}")
-                    removed_nodes.append(name)
-                else:
-                    try:
-                        manager = self._get_process_manager(node)
-                        manager.remove_node(node)
-                        # Remove from database immediately
-                        with self.S() as session:
-                            session.delete(node)
-                            session.commit()
+            if not dry_run and delay_ms == 0 and len(service_names) > 1:
+                # No delay wanted between nodes: one batched manager call
+                named_nodes = []
+                for name in service_names:
+                    node = self._get_node_by_name(name)
+                    if not node:
+                        failed_nodes.append({"service": name, "error": "not found"})
+                        continue
+                    logging.info(f"Forced action: Removing node {name}")
+                    named_nodes.append((name, node))
+                done, _, failed = self._force_batch("remove", named_nodes)
+                removed_nodes.extend(done)
+                failed_nodes.extend(failed)
+            else:
+                for idx, name in enumerate(service_names):
+                    # Insert delay between operations (skip before first)
+                    if idx > 0 and delay_ms > 0:
+                        delay_seconds = delay_ms / 1000.0
+                        logging.info(f"Action delay: waiting {delay_ms}ms ({delay_seconds:.2f}s) between node removals")
+                        time.sleep(delay_seconds)
+
+                    node = self._get_node_by_name(name)
+                    if not node:
+                        failed_nodes.append({"service": name, "error": "not found"})
+                        continue
+
+                    logging.info(f"Forced action: Removing node {name}")
+                    if dry_run:
+                        logging.warning(f"DRYRUN: Remove node {name}")
                         removed_nodes.append(name)
-                    except Exception as e:
-                        logging.error(f"Failed to remove node {name}: {e}")
-                        failed_nodes.append({"service": name, "error": str(e)})
+                    else:
+                        try:
+                            manager = self._get_process_manager(node)
+                            manager.remove_node(node)
+                            # Remove from database immediately
+                            with self.S() as session:
+                                session.delete(node)
+                                session.commit()
+                            removed_nodes.append(name)
+                        except Exception as e:
+                            logging.error(f"Failed to remove node {name}: {e}")
+                            failed_nodes.append({"service": name, "error": str(e)})
 
             return {
                 "status": "removed-nodes" if not dry_run else "remove-dryrun",
@@ -892,29 +2096,38 @@ class ActionExecutor:
             # Get action delay setting
             delay_ms = self._get_action_delay_ms(self.machine_config)
 
-            for idx, row in enumerate(youngest_nodes):
-                # Insert delay between operations (skip before first)
-                if idx > 0 and delay_ms > 0:
-                    delay_seconds = delay_ms / 1000.0
-                    logging.info(f"Action delay: waiting {delay_ms}ms ({delay_seconds:.2f}s) between node removals")
-                    time.sleep(delay_seconds)
+            if not dry_run and delay_ms == 0 and len(youngest_nodes) > 1:
+                # No delay wanted between nodes: one batched manager call
+                named_nodes = [
+                    (row[0].service.replace(".service", ""), row[0]) for row in youngest_nodes
+                ]
+                done, _, failed = self._force_batch("remove", named_nodes)
+                removed_nodes.extend(done)
+                failed_nodes.extend(failed)
+            else:
+                for idx, row in enumerate(youngest_nodes):
+                    # Insert delay between operations (skip before first)
+                    if idx > 0 and delay_ms > 0:
+                        delay_seconds = delay_ms / 1000.0
+                        logging.info(f"Action delay: waiting {delay_ms}ms ({delay_seconds:.2f}s) between node removals")
+                        time.sleep(delay_seconds)
 
-                node = row[0]
-                if dry_run:
-                    logging.warning(f"DRYRUN: Remove youngest node {node.node_name}")
-                    removed_nodes.append(node.service.replace(".service", ""))
-                else:
-                    try:
-                        manager = self._get_process_manager(node)
-                        manager.remove_node(node)
-                        # Remove from database immediately
-                        with self.S() as session:
-                            session.delete(node)
-                            session.commit()
+                    node = row[0]
+                    if dry_run:
+                        logging.warning(f"DRYRUN: Remove youngest node {node.node_name}")
                         removed_nodes.append(node.service.replace(".service", ""))
-                    except Exception as e:
-                        logging.error(f"Failed to remove node {node.node_name}: {e}")
-                        failed_nodes.append({"service": node.service.replace(".service", ""), "error": str(e)})
+                    else:
+                        try:
+                            manager = self._get_process_manager(node)
+                            manager.remove_node(node)
+                            # Remove from database immediately
+                            with self.S() as session:
+                                session.delete(node)
+                                session.commit()
+                            removed_nodes.append(node.service.replace(".service", ""))
+                        except Exception as e:
+                            logging.error(f"Failed to remove node {node.node_name}: {e}")
+                            failed_nodes.append({"service": node.service.replace(".service", ""), "error": str(e)})
 
             if count == 1 and len(removed_nodes) == 1:
                 # Keep backward compatibility for single node
@@ -955,31 +2168,45 @@ class ActionExecutor:
             # Get action delay setting
             delay_ms = self._get_action_delay_ms(self.machine_config)
 
-            for idx, name in enumerate(service_names):
-                # Insert delay between operations (skip before first)
-                if idx > 0 and delay_ms > 0:
-                    delay_seconds = delay_ms / 1000.0
-                    logging.info(f"Action delay: waiting {delay_ms}ms ({delay_seconds:.2f}s) between node upgrades")
-                    time.sleep(delay_seconds)
-
-                node = self._get_node_by_name(name)
-                if not node:
-                    failed_nodes.append({"service": name, "error": "not found"})
-                    continue
-
-                logging.info(f"Forced action: Upgrading node {name}")
-                if dry_run:
-                    logging.warning(f"DRYRUN: Upgrade node {name}")
-                    upgraded_nodes.append(name)
-                else:
-                    try:
-                        if not self._upgrade_node_binary(node, metrics["antnode_version"]):
-                            failed_nodes.append({"service": name, "error": "upgrade failed"})
-                        else:
-                            upgraded_nodes.append(name)
-                    except Exception as e:
-                        logging.error(f"Failed to upgrade node {name}: {e}")
-                        failed_nodes.append({"service": name, "error": str(e)})
+            if not dry_run and delay_ms == 0 and len(service_names) > 1:
+                # No delay wanted between nodes: one batched upgrade per manager
+                named_nodes = []
+                for name in service_names:
+                    node = self._get_node_by_name(name)
+                    if not node:
+                        failed_nodes.append({"service": name, "error": "not found"})
+                        continue
+                    logging.info(f"Forced action: Upgrading node {name}")
+                    named_nodes.append((name, node))
+                done, _, failed = self._force_batch("upgrade", named_nodes, metrics)
+                upgraded_nodes.extend(done)
+                failed_nodes.extend(failed)
+            else:
+                for idx, name in enumerate(service_names):
+                    # Insert delay between operations (skip before first)
+                    if idx > 0 and delay_ms > 0:
+                        delay_seconds = delay_ms / 1000.0
+                        logging.info(f"Action delay: waiting {delay_ms}ms ({delay_seconds:.2f}s) between node upgrades")
+                        time.sleep(delay_seconds)
+
+                    node = self._get_node_by_name(name)
+                    if not node:
+                        failed_nodes.append({"service": name, "error": "not found"})
+                        continue
+
+                    logging.info(f"Forced action: Upgrading node {name}")
+                    if dry_run:
+                        logging.warning(f"DRYRUN: Upgrade node {name}")
+                        upgraded_nodes.append(name)
+                    else:
+                        try:
+                            if not self._upgrade_node_binary(node, metrics["antnode_version"]):
+                                failed_nodes.append({"service": name, "error": "upgrade failed"})
+                            else:
+                                upgraded_nodes.append(name)
+                        except Exception as e:
+                            logging.error(f"Failed to upgrade node {name}: {e}")
+                            failed_nodes.append({"service": name, "error": str(e)})
 
             return {
                 "status": "upgraded-nodes" if not dry_run else "upgrade-dryrun",
@@ -1016,26 +2243,35 @@ class ActionExecutor:
             # Get action delay setting
             delay_ms = self._get_action_delay_ms(self.machine_config)
 
-            for idx, row in enumerate(oldest_nodes):
-                # Insert delay between operations (skip before first)
-                if idx > 0 and delay_ms > 0:
-                    delay_seconds = delay_ms / 1000.0
-                    logging.info(f"Action delay: waiting {delay_ms}ms ({delay_seconds:.2f}s) between node upgrades")
-                    time.sleep(delay_seconds)
+            if not dry_run and delay_ms == 0 and len(oldest_nodes) > 1:
+                # No delay wanted between nodes: one batched upgrade per manager
+                named_nodes = [
+                    (row[0].service.replace(".service", ""), row[0]) for row in oldest_nodes
+                ]
+                done, _, failed = self._force_batch("upgrade", named_nodes, metrics)
+                upgraded_nodes.extend(done)
+                failed_nodes.extend(failed)
+            else:
+                for idx, row in enumerate(oldest_nodes):
+                    # Insert delay between operations (skip before first)
+                    if idx > 0 and delay_ms > 0:
+                        delay_seconds = delay_ms / 1000.0
+                        logging.info(f"Action delay: waiting {delay_ms}ms ({delay_seconds:.2f}s) between node upgrades")
+                        time.sleep(delay_seconds)
 
-                node = row[0]
-                if dry_run:
-                    logging.warning(f"DRYRUN: Upgrade oldest node {node.node_name}")
-                    upgraded_nodes.append(node.service.replace(".service", ""))
-                else:
-                    try:
-                        if not self._upgrade_node_binary(node, metrics["antnode_version"]):
-                            failed_nodes.append({"service": node.service.replace(".service", ""), "error": "upgrade failed"})
-                        else:
-                            upgraded_nodes.append(node.service.replace(".service", ""))
-                    except Exception as e:
-                        logging.error(f"Failed to upgrade node {node.node_name}: {e}")
-                        failed_nodes.append({"service": node.service.replace(".service", ""), "error": str(e)})
+                    node = row[0]
+                    if dry_run:
+                        logging.warning(f"DRYRUN: Upgrade oldest node {node.node_name}")
+                        upgraded_nodes.append(node.service.replace(".service", ""))
+                    else:
+                        try:
+                            if not self._upgrade_node_binary(node, metrics["antnode_version"]):
+                                failed_nodes.append({"service": node.service.replace(".service", ""), "error": "upgrade failed"})
+                            else:
+                                upgraded_nodes.append(node.service.replace(".service", ""))
+                        except Exception as e:
+                            logging.error(f"Failed to upgrade node {node.node_name}: {e}")
+                            failed_nodes.append({"service": node.service.replace(".service", ""), "error": str(e)})
 
             if count == 1 and len(upgraded_nodes) == 1:
                 # Keep backward compatibility for single node
@@ -1075,31 +2311,45 @@ class ActionExecutor:
             # Get action delay setting
             delay_ms = self._get_action_delay_ms(self.machine_config)
 
-            for idx, name in enumerate(service_names):
-                # Insert delay between operations (skip before first)
-                if idx > 0 and delay_ms > 0:
-                    delay_seconds = delay_ms / 1000.0
-                    logging.info(f"Action delay: waiting {delay_ms}ms ({delay_seconds:.2f}s) between node stops")
-                    time.sleep(delay_seconds)
-
-                node = self._get_node_by_name(name)
-                if not node:
-                    failed_nodes.append({"service": name, "error": "not found"})
-                    continue
-
-                logging.info(f"Forced action: Stopping node {name}")
-                if dry_run:
-                    logging.warning(f"DRYRUN: Stop node {name}")
-                    stopped_nodes.append(name)
-                else:
-                    try:
-                        manager = self._get_process_manager(node)
-                        manager.stop_node(node)
-                        self._set_node_status(node.id, STOPPED)
+            if not dry_run and delay_ms == 0 and len(service_names) > 1:
+                # No delay wanted between nodes: one batched manager call
+                named_nodes = []
+                for name in service_names:
+                    node = self._get_node_by_name(name)
+                    if not node:
+                        failed_nodes.append({"service": name, "error": "not found"})
+                        continue
+                    logging.info(f"Forced action: Stopping node {name}")
+                    named_nodes.append((name, node))
+                done, _, failed = self._force_batch("stop", named_nodes)
+                stopped_nodes.extend(done)
+                failed_nodes.extend(failed)
+            else:
+                for idx, name in enumerate(service_names):
+                    # Insert delay between operations (skip before first)
+                    if idx > 0 and delay_ms > 0:
+                        delay_seconds = delay_ms / 1000.0
+                        logging.info(f"Action delay: waiting {delay_ms}ms ({delay_seconds:.2f}s) between node stops")
+                        time.sleep(delay_seconds)
+
+                    node = self._get_node_by_name(name)
+                    if not node:
+                        failed_nodes.append({"service": name, "error": "not found"})
+                        continue
+
+                    logging.info(f"Forced action: Stopping node {name}")
+                    if dry_run:
+                        logging.warning(f"DRYRUN: Stop node {name}")
                         stopped_nodes.append(name)
-                    except Exception as e:
-                        logging.error(f"Failed to stop node {name}: {e}")
-                        failed_nodes.append({"service": name, "error": str(e)})
+                    else:
+                        try:
+                            manager = self._get_process_manager(node)
+                            manager.stop_node(node)
+                            self._set_node_status(node.id, STOPPED)
+                            stopped_nodes.append(name)
+                        except Exception as e:
+                            logging.error(f"Failed to stop node {name}: {e}")
+                            failed_nodes.append({"service": name, "error": str(e)})
 
             return {
                 "status": "stopped-nodes" if not dry_run else "stop-dryrun",
@@ -1136,26 +2386,35 @@ class ActionExecutor:
             # Get action delay setting
             delay_ms = self._get_action_delay_ms(self.machine_config)
 
-            for idx, row in enumerate(youngest_nodes):
-                # Insert delay between operations (skip before first)
-                if idx > 0 and delay_ms > 0:
-                    delay_seconds = delay_ms / 1000.0
-                    logging.info(f"Action delay: waiting {delay_ms}ms ({delay_seconds:.2f}s) between node stops")
-                    time.sleep(delay_seconds)
+            if not dry_run and delay_ms == 0 and len(youngest_nodes) > 1:
+                # No delay wanted between nodes: one batched manager call
+                named_nodes = [
+                    (row[0].service.replace(".service", ""), row[0]) for row in youngest_nodes
+                ]
+                done, _, failed = self._force_batch("stop", named_nodes)
+                stopped_nodes.extend(done)
+                failed_nodes.extend(failed)
+            else:
+                for idx, row in enumerate(youngest_nodes):
+                    # Insert delay between operations (skip before first)
+                    if idx > 0 and delay_ms > 0:
+                        delay_seconds = delay_ms / 1000.0
+                        logging.info(f"Action delay: waiting {delay_ms}ms ({delay_seconds:.2f}s) between node stops")
+                        time.sleep(delay_seconds)
 
-                node = row[0]
-                if dry_run:
-                    logging.warning(f"DRYRUN: Stop youngest node {node.node_name}")
-                    stopped_nodes.append(node.service.replace(".service", ""))
-                else:
-                    try:
-                        manager = self._get_process_manager(node)
-                        manager.stop_node(node)
-                        self._set_node_status(node.id, STOPPED)
+                    node = row[0]
+                    if dry_run:
+                        logging.warning(f"DRYRUN: Stop youngest node {node.node_name}")
                         stopped_nodes.append(node.service.replace(".service", ""))
-                    except Exception as e:
-                        logging.error(f"Failed to stop node {node.node_name}: {e}")
-                        failed_nodes.append({"service": node.service.replace(".service", ""), "error": str(e)})
+                    else:
+                        try:
+                            manager = self._get_process_manager(node)
+                            manager.stop_node(node)
+                            self._set_node_status(node.id, STOPPED)
+                            stopped_nodes.append(node.service.replace(".service", ""))
+                        except Exception as e:
+                            logging.error(f"Failed to stop node {node.node_name}: {e}")
+                            failed_nodes.append({"service": node.service.replace(".service", ""), "error": str(e)})
 
             if count == 1 and len(stopped_nodes) == 1:
                 # Keep backward compatibility for single node
@@ -1197,48 +2456,66 @@ class ActionExecutor:
             # Get action delay setting
             delay_ms = self._get_action_delay_ms(self.machine_config)
 
-            for idx, name in enumerate(service_names):
-                # Insert delay between operations (skip before first)
-                if idx > 0 and delay_ms > 0:
-                    delay_seconds = delay_ms / 1000.0
-                    logging.info(f"Action delay: waiting {delay_ms}ms ({delay_seconds:.2f}s) between node starts")
-                    time.sleep(delay_seconds)
-
-                node = self._get_node_by_name(name)
-                if not node:
-                    failed_nodes.append({"service": name, "error": "not found"})
-                    continue
-
-                if node.status == RUNNING:
-                    failed_nodes.append({"service": name, "error": "already running"})
-                    continue
+            if not dry_run and delay_ms == 0 and len(service_names) > 1:
+                # No delay wanted between nodes: one batched manager call
+                named_nodes = []
+                for name in service_names:
+                    node = self._get_node_by_name(name)
+                    if not node:
+                        failed_nodes.append({"service": name, "error": "not found"})
+                        continue
+                    if node.status == RUNNING:
+                        failed_nodes.append({"service": name, "error": "already running"})
+                        continue
+                    logging.info(f"Forced action: Starting node {name}")
+                    named_nodes.append((name, node))
+                done, upgraded, failed = self._force_batch("start", named_nodes, metrics)
+                started_nodes.extend(done)
+                upgraded_nodes.extend(upgraded)
+                failed_nodes.extend(failed)
+            else:
+                for idx, name in enumerate(service_names):
+                    # Insert delay between operations (skip before first)
+                    if idx > 0 and delay_ms > 0:
+                        delay_seconds = delay_ms / 1000.0
+                        logging.info(f"Action delay: waiting {delay_ms}ms ({delay_seconds:.2f}s) between node starts")
+                        time.sleep(delay_seconds)
+
+                    node = self._get_node_by_name(name)
+                    if not node:
+                        failed_nodes.append({"service": name, "error": "not found"})
+                        continue
 
-                logging.info(f"Forced action: Starting node {name}")
-                if dry_run:
-                    logging.warning(f"DRYRUN: Start node {name}")
-                    started_nodes.append(name)
-                else:
-                    try:
-                        # Check if node needs upgrade
-                        if not node.version:
-                            node.version = get_antnode_version(node.binary)
+                    if node.status == RUNNING:
+                        failed_nodes.append({"service": name, "error": "already running"})
+                        continue
 
-                        # If the stopped version is old, upgrade it (which also starts it)
-                        if Version(metrics["antnode_version"]) > Version(node.version):
-                            if not self._upgrade_node_binary(node, metrics["antnode_version"]):
-                                failed_nodes.append({"service": name, "error": "upgrade failed"})
-                            else:
-                                upgraded_nodes.append(name)
-                        else:
-                            manager = self._get_process_manager(node)
-                            if manager.start_node(node):
-                                self._set_node_status(node.id, RESTARTING)
-                                started_nodes.append(name)
+                    logging.info(f"Forced action: Starting node {name}")
+                    if dry_run:
+                        logging.warning(f"DRYRUN: Start node {name}")
+                        started_nodes.append(name)
+                    else:
+                        try:
+                            # Check if node needs upgrade
+                            if not node.version:
+                                node.version = get_antnode_version(node.binary)
+
+                            # If the stopped version is old, upgrade it (which also starts it)
+                            if Version(metrics["antnode_version"]) > Version(node.version):
+                                if not self._upgrade_node_binary(node, metrics["antnode_version"]):
+                                    failed_nodes.append({"service": name, "error": "upgrade failed"})
+                                else:
+                                    upgraded_nodes.append(name)
                             else:
-                                failed_nodes.append({"service": name, "error": "start failed"})
-                    except Exception as e:
-                        logging.error(f"Failed to start node {name}: {e}")
-                        failed_nodes.append({"service": name, "error": str(e)})
+                                manager = self._get_process_manager(node)
+                                if manager.start_node(node):
+                                    self._set_node_status(node.id, RESTARTING)
+                                    started_nodes.append(name)
+                                else:
+                                    failed_nodes.append({"service": name, "error": "start failed"})
+                        except Exception as e:
+                            logging.error(f"Failed to start node {name}: {e}")
+                            failed_nodes.append({"service": name, "error": str(e)})
 
             return {
                 "status": "started-nodes" if not dry_run else "start-dryrun",
@@ -1278,39 +2555,49 @@ class ActionExecutor:
             # Get action delay setting
             delay_ms = self._get_action_delay_ms(self.machine_config)
 
-            for idx, row in enumerate(oldest_nodes):
-                # Insert delay between operations (skip before first)
-                if idx > 0 and delay_ms > 0:
-                    delay_seconds = delay_ms / 1000.0
-                    logging.info(f"Action delay: waiting {delay_ms}ms ({delay_seconds:.2f}s) between node starts")
-                    time.sleep(delay_seconds)
-
-                node = row[0]
-                if dry_run:
-                    logging.warning(f"DRYRUN: Start oldest stopped node {node.node_name}")
-                    started_nodes.append(node.service.replace(".service", ""))
-                else:
-                    try:
-                        # Check if node needs upgrade
-                        if not node.version:
-                            node.version = get_antnode_version(node.binary)
+            if not dry_run and delay_ms == 0 and len(oldest_nodes) > 1:
+                # No delay wanted between nodes: one batched manager call
+                named_nodes = [
+                    (row[0].service.replace(".service", ""), row[0]) for row in oldest_nodes
+                ]
+                done, upgraded, failed = self._force_batch("start", named_nodes, metrics)
+                started_nodes.extend(done)
+                upgraded_nodes.extend(upgraded)
+                failed_nodes.extend(failed)
+            else:
+                for idx, row in enumerate(oldest_nodes):
+                    # Insert delay between operations (skip before first)
+                    if idx > 0 and delay_ms > 0:
+                        delay_seconds = delay_ms / 1000.0
+                        logging.info(f"Action delay: waiting {delay_ms}ms ({delay_seconds:.2f}s) between node starts")
+                        time.sleep(delay_seconds)
 
-                        # If the stopped version is old, upgrade it (which also starts it)
-                        if Version(metrics["antnode_version"]) > Version(node.version):
-                            if not self._upgrade_node_binary(node, metrics["antnode_version"]):
-                                failed_nodes.append({"service": node.service.replace(".service", ""), "error": "upgrade failed"})
-                            else:
-                                upgraded_nodes.append(node.service.replace(".service", ""))
-                        else:
-                            manager = self._get_process_manager(node)
-                            if manager.start_node(node):
-                                self._set_node_status(node.id, RESTARTING)
-                                started_nodes.append(node.service.replace(".service", ""))
+                    node = row[0]
+                    if dry_run:
+                        logging.warning(f"DRYRUN: Start oldest stopped node {node.node_name}")
+                        started_nodes.append(node.service.replace(".service", ""))
+                    else:
+                        try:
+                            # Check if node needs upgrade
+                            if not node.version:
+                                node.version = get_antnode_version(node.binary)
+
+                            # If the stopped version is old, upgrade it (which also starts it)
+                            if Version(metrics["antnode_version"]) > Version(node.version):
+                                if not self._upgrade_node_binary(node, metrics["antnode_version"]):
+                                    failed_nodes.append({"service": node.service.replace(".service", ""), "error": "upgrade failed"})
+                                else:
+                                    upgraded_nodes.append(node.service.replace(".service", ""))
                             else:
-                                failed_nodes.append({"service": node.service.replace(".service", ""), "error": "start failed"})
-                    except Exception as e:
-                        logging.error(f"Failed to start node {node.node_name}: {e}")
-                        failed_nodes.append({"service": node.service.replace(".service", ""), "error": str(e)})
+                                manager = self._get_process_manager(node)
+                                if manager.start_node(node):
+                                    self._set_node_status(node.id, RESTARTING)
+                                    started_nodes.append(node.service.replace(".service", ""))
+                                else:
+                                    failed_nodes.append({"service": node.service.replace(".service", ""), "error": "start failed"})
+                        except Exception as e:
+                            logging.error(f"Failed to start node {node.node_name}: {e}")
+                            failed_nodes.append({"service": node.service.replace(".service", ""), "error": str(e)})
 
             if count == 1 and len(started_nodes) == 1:
                 # Keep backward compatibility for single node
@@ -1416,9 +2703,10 @@ class ActionExecutor:
                             )
                             session.commit()
 
-                    # Remove all nodes from database
+                    # Remove all nodes (and the containers that hosted them) from database
                     with self.S() as session:
                         session.query(Node).delete()
+                        session.query(Container).delete()
                         session.commit()
                     return {"status": "cluster-teardown", "method": "manager-specific"}
 
@@ -1458,14 +2746,13 @@ class ActionExecutor:
         Returns:
             Dictionary with survey results
         """
-        import time
-        from wnm.utils import read_node_metrics, read_node_metadata, update_node_from_metrics
+        from wnm.utils import NodeWriteBatch, node_card_from_metrics, survey_nodes
 
         surveyed_nodes = []
         failed_nodes = []
-        survey_delay_ms = self._get_survey_delay_ms(self.machine_config)
+        to_survey = []
 
-        for idx, service_name in enumerate(service_names):
+        for service_name in service_names:
             node = self._get_node_by_name(service_name)
             if not node:
                 failed_nodes.append({"service": service_name, "error": "not found"})
@@ -1480,34 +2767,24 @@ class ActionExecutor:
                 surveyed_nodes.append(service_name)
             else:
                 logging.info(f"Surveying node {service_name}")
+                to_survey.append((service_name, node))
 
-                # Check metadata first
-                node_metadata = read_node_metadata(node.host, node.metrics_port)
-
-                # If metadata fails, fake metrics with 0's
-                if node_metadata["status"] == STOPPED:
-                    node_metrics = {
-                        "status": STOPPED,
-                        "uptime": 0,
-                        "records": 0,
-                        "shunned": 0,
-                        "connected_peers": 0
-                    }
-                else:
-                    # Metadata succeeded, now get metrics
-                    node_metrics = read_node_metrics(node.host, node.metrics_port)
-
-                # Skip update if node is stopped and already marked as stopped
-                if node_metadata["status"] == STOPPED and node.status == STOPPED:
-                    surveyed_nodes.append(service_name)
-                    continue
-
-                update_node_from_metrics(self.S, node.id, node_metrics, node_metadata)
-                surveyed_nodes.append(service_name)
-
-            # Insert delay between nodes (but not after the last node)
-            if survey_delay_ms > 0 and idx < len(service_names) - 1:
-                time.sleep(survey_delay_ms / 1000.0)
+        results = survey_nodes(
+            [(node.host, node.metrics_port) for _, node in to_survey],
+            max_workers=self._get_survey_concurrency(self.machine_config),
+            survey_delay_ms=self._get_survey_delay_ms(self.machine_config),
+        )
+        history_retention = self._get_history_retention(self.machine_config)
+        batch = NodeWriteBatch(self.S)
+        for (service_name, node), (node_metrics, node_metadata) in zip(to_survey, results):
+            # Skip update if node is stopped and already marked as stopped
+            if not (node_metadata["status"] == STOPPED and node.status == STOPPED):
+                card = node_card_from_metrics(node_metrics, node_metadata)
+                batch.update(node.id, card)
+                if history_retention and card["status"] == RUNNING:
+                    batch.add_history(node.id, card)
+            surveyed_nodes.append(service_name)
+        batch.flush()
 
         return {
             "status": "survey-complete" if not dry_run else "survey-dryrun",
@@ -1517,6 +2794,36 @@ class ActionExecutor:
             "failed_nodes": failed_nodes if failed_nodes else None,
         }
 
+    def _force_resume_upgrade(
+        self, machine_config: Dict[str, Any], metrics: Dict[str, Any], dry_run: bool = False
+    ) -> Dict[str, Any]:
+        """Resume a rolling upgrade paused after a regressed wave.
+
+        Args:
+            machine_config: Machine configuration
+            metrics: Current system metrics
+            dry_run: If True, log without executing
+
+        Returns:
+            Dictionary with execution result
+        """
+        rollout = RollingUpgrade(
+            self.S,
+            metrics["antnode_version"],
+            self._get_upgrade_canary(machine_config),
+            sudo=self._binary_store_sudo(machine_config),
+        )
+        if rollout.state != PAUSED:
+            return {
+                "status": "error",
+                "message": f"No paused upgrade rollout of {metrics['antnode_version']}",
+            }
+        if dry_run:
+            logging.warning("DRYRUN: Resume upgrade rollout")
+            return {"status": "resume-upgrade-dryrun"}
+        rollout.resume()
+        return {"status": "upgrade-resumed", "version": metrics["antnode_version"]}
+
     def _force_survey_nodes(self, service_name: Optional[str] = None, dry_run: bool = False) -> Dict[str, Any]:
         """Force a survey of all nodes or specific nodes to update their status and metrics.
 
@@ -1550,7 +2857,12 @@ class ActionExecutor:
 
             # Update all nodes
             survey_delay_ms = self._get_survey_delay_ms(self.machine_config)
-            update_nodes(self.S, survey_delay_ms=survey_delay_ms)
+            update_nodes(
+                self.S,
+                survey_delay_ms=survey_delay_ms,
+                max_concurrent_surveys=self._get_survey_concurrency(self.machine_config),
+                history_retention=self._get_history_retention(self.machine_config),
+            )
 
             # Get updated count
             with self.S() as session:
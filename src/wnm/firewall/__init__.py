@@ -2,12 +2,19 @@
 Firewall management abstraction for WNM.
 
 Provides a pluggable interface for firewall operations across different
-firewall implementations (ufw, firewalld, iptables, or no-op).
+firewall implementations (ufw, nftables, firewalld, iptables, or no-op).
 """
 
 from wnm.firewall.base import FirewallManager
 from wnm.firewall.factory import get_firewall_manager
+from wnm.firewall.nftables_manager import NftablesManager
 from wnm.firewall.null_firewall import NullFirewall
 from wnm.firewall.ufw_manager import UFWManager
 
-__all__ = ["FirewallManager", "get_firewall_manager", "NullFirewall", "UFWManager"]
+__all__ = [
+    "FirewallManager",
+    "get_firewall_manager",
+    "NftablesManager",
+    "NullFirewall",
+    "UFWManager",
+]
@@ -6,6 +6,7 @@ across different firewall implementations.
 """
 
 from abc import ABC, abstractmethod
+from typing import Iterable, List, Optional, Tuple
 
 
 class FirewallManager(ABC):
@@ -16,9 +17,14 @@ class FirewallManager(ABC):
     - UFWManager: Ubuntu's Uncomplicated Firewall (ufw)
     - FirewalldManager: Firewalld (RHEL/Fedora/CentOS)
     - IptablesManager: Direct iptables manipulation
+    - NftablesManager: nftables set, reconciled once per cycle
     - NullFirewall: No-op implementation (firewall disabled)
     """
 
+    # Whether open ports are brought in line with the node table by
+    # reconcile() each cycle rather than by each enable/disable call
+    reconciles = False
+
     @abstractmethod
     def enable_port(
         self, port: int, protocol: str = "udp", comment: str = None
@@ -50,6 +56,64 @@ class FirewallManager(ABC):
         """
         pass
 
+    def enable_port_range(
+        self, start: int, end: int, protocol: str = "udp", comment: str = None
+    ) -> bool:
+        """
+        Open a contiguous port range for incoming traffic.
+
+        The default opens each port on its own; backends that support
+        range rules override this with a single rule.
+
+        Args:
+            start: First port of the range
+            end: Last port of the range (inclusive)
+            protocol: Protocol type (udp/tcp)
+            comment: Optional comment/description for the rule
+
+        Returns:
+            True if every port in the range was opened, False otherwise
+        """
+        return all(
+            [self.enable_port(port, protocol, comment) for port in range(start, end + 1)]
+        )
+
+    def open_port_ranges(self, protocol: str = "udp") -> Optional[List[Tuple[int, int]]]:
+        """
+        List the port ranges currently open for a protocol.
+
+        Args:
+            protocol: Protocol type (udp/tcp)
+
+        Returns:
+            (start, end) pairs of the open range rules, or None if this
+            backend cannot read its rules back
+        """
+        return None
+
+    def reconcile(
+        self,
+        ports: Iterable[int],
+        protocol: str = "udp",
+        port_range: Optional[Tuple[int, int]] = None,
+    ) -> bool:
+        """
+        Make the open node ports match the given set.
+
+        Backends that apply enable_port()/disable_port() immediately have
+        nothing to do; reconciling backends override this.
+
+        Args:
+            ports: Ports that should be open
+            protocol: Protocol type (udp/tcp)
+            port_range: (start, end) of the node port range, closed
+                except for the given ports
+
+        Returns:
+            True if the open ports match
+        """
+        return True
+
     @abstractmethod
     def is_enabled(self) -> bool:
         """
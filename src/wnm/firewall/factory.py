@@ -9,6 +9,7 @@ import logging
 import os
 
 from wnm.firewall.base import FirewallManager
+from wnm.firewall.nftables_manager import NftablesManager
 from wnm.firewall.null_firewall import NullFirewall
 from wnm.firewall.ufw_manager import UFWManager
 
@@ -59,7 +60,7 @@ def get_firewall_manager(firewall_type: str = None) -> FirewallManager:
     Create a firewall manager instance.
 
     Args:
-        firewall_type: Type of firewall ("ufw", "firewalld", "iptables", "null")
+        firewall_type: Type of firewall ("ufw", "nftables", "firewalld", "iptables", "null")
                       If None, auto-detects best available option
 
     Returns:
@@ -75,6 +76,8 @@ def get_firewall_manager(firewall_type: str = None) -> FirewallManager:
 
     managers = {
         "ufw": UFWManager,
+        "nftables": NftablesManager,
+        "nft": NftablesManager,  # Alias for nftables
         "null": NullFirewall,
         "disabled": NullFirewall,  # Alias for null
         # TODO: Add when implemented
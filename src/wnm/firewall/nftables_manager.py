@@ -0,0 +1,364 @@
+"""
+nftables firewall manager implementation.
+
+Keeps node ports in a named set of a table owned by wnm:
+
+    table inet wnm {
+        set antnode_udp { type inet_service; counter; }
+        set antnode_tcp { type inet_service; counter; }
+        chain input {
+            type filter hook input priority 0; policy accept;
+            udp dport @antnode_udp accept
+            tcp dport @antnode_tcp accept
+            udp dport 55001-55999 udp dport != @antnode_udp drop
+        }
+    }
+
+An accept only ends the wnm chain, so it cannot open a port another
+table drops; the last rule is what closes node ports: traffic to the
+node port range is dropped unless its port is in the set. Hosts whose
+own ruleset drops input by default still have to allow the range there.
+
+Instead of one rule change per node, the executor hands the ports of the
+nodes that should be reachable to reconcile() once per cycle. The set is
+read back, and the ports to add and to remove are applied in a single
+`nft -f` transaction, so rules lost or left behind by a crash are
+repaired on the next cycle. Every set element carries its own packet and
+byte counter (see port_counters()).
+
+Requires sudo privileges for nft operations.
+"""
+
+import json
+import logging
+import shutil
+import subprocess
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from wnm.firewall.base import FirewallManager
+
+# Table holding the wnm node port sets and their accept rules
+NFT_TABLE = "wnm"
+NFT_FAMILY = "inet"
+# Protocols with a node port set (and accept rule) in the table
+PROTOCOLS = ("udp", "tcp")
+
+
+def set_name(protocol: str) -> str:
+    """Name of the node port set for a protocol (e.g. antnode_udp)."""
+    return f"antnode_{protocol}"
+
+
+def parse_set_elements(document: dict) -> Dict[int, Dict[str, int]]:
+    """
+    Decode the elements of `nft -j list set` output.
+
+    Args:
+        document: Decoded JSON output of nft -j list set
+
+    Returns:
+        Counter values by port ({"packets": n, "bytes": n}, zero when the
+        set has no counters)
+    """
+    elements = {}
+    for item in document.get("nftables", []):
+        nft_set = item.get("set")
+        if not nft_set:
+            continue
+        for element in nft_set.get("elem", []):
+            # Plain sets list bare values, counted ones wrap them in "elem"
+            if isinstance(element, dict):
+                entry = element.get("elem", element)
+                value = entry.get("val")
+                counter = entry.get("counter") or {}
+            else:
+                value, counter = element, {}
+            if isinstance(value, int):
+                elements[value] = {
+                    "packets": int(counter.get("packets", 0)),
+                    "bytes": int(counter.get("bytes", 0)),
+                }
+    return elements
+
+
+class NftablesManager(FirewallManager):
+    """
+    Firewall manager keeping node ports in an nftables set.
+
+    enable_port() and disable_port() only queue changes; they are applied
+    by reconcile() (the executor, once per cycle) or flush().
+    """
+
+    reconciles = True
+
+    # Result of the nft PATH lookup, once made
+    _available = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Queued changes by protocol: port -> True (open) / False (close)
+        self._pending = {}
+        # Node port range by protocol, enforced by the chain's drop rules
+        self._port_ranges = {}
+        # Port ranges the chain was last built with (None = not built yet)
+        self._chain_ranges = None
+
+    def _nft(self, args: List[str], script: str = None) -> subprocess.CompletedProcess:
+        """Run nft through sudo, feeding a transaction script on stdin."""
+        return subprocess.run(
+            ["sudo", "nft", *args],
+            input=script,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+
+    def _queue(self, port: int, protocol: str, open_port: bool) -> bool:
+        if protocol not in PROTOCOLS:
+            logging.error(f"Unsupported nftables protocol: {protocol}")
+            return False
+        if not self.is_available():
+            logging.warning("nftables is not available on this system")
+            return False
+        with self._lock:
+            self._pending.setdefault(protocol, {})[port] = open_port
+        return True
+
+    def enable_port(
+        self, port: int, protocol: str = "udp", comment: str = None
+    ) -> bool:
+        """
+        Queue a port to be added to the node port set.
+
+        Args:
+            port: Port number to open
+            protocol: Protocol type (udp/tcp)
+            comment: Ignored, set elements carry no comments
+
+        Returns:
+            True if the change was queued
+        """
+        return self._queue(port, protocol, True)
+
+    def disable_port(self, port: int, protocol: str = "udp") -> bool:
+        """
+        Queue a port to be removed from the node port set.
+
+        Args:
+            port: Port number to close
+            protocol: Protocol type (udp/tcp)
+
+        Returns:
+            True if the change was queued
+        """
+        return self._queue(port, protocol, False)
+
+    def port_counters(self, protocol: str = "udp") -> Optional[Dict[int, Dict[str, int]]]:
+        """
+        Read the node port set with its per-element counters.
+
+        Args:
+            protocol: Protocol type (udp/tcp)
+
+        Returns:
+            {"packets": n, "bytes": n} by port ({} if the set does not exist
+            yet), or None if nft could not be queried
+        """
+        if not self.is_available():
+            return None
+
+        try:
+            result = self._nft(
+                ["-j", "list", "set", NFT_FAMILY, NFT_TABLE, set_name(protocol)]
+            )
+        except subprocess.CalledProcessError as err:
+            if "No such file or directory" in (err.stderr or ""):
+                return {}
+            logging.error(f"Failed to read nftables set: {err}")
+            return None
+        except Exception as err:
+            logging.error(f"Failed to read nftables set: {err}")
+            return None
+
+        try:
+            return parse_set_elements(json.loads(result.stdout))
+        except (json.JSONDecodeError, AttributeError) as err:
+            logging.error(f"Failed to parse nftables set: {err}")
+            return None
+
+    def open_ports(self, protocol: str = "udp") -> Optional[Set[int]]:
+        """
+        The ports currently in the node port set.
+
+        Args:
+            protocol: Protocol type (udp/tcp)
+
+        Returns:
+            Set of ports, or None if nft could not be queried
+        """
+        counters = self.port_counters(protocol)
+        return None if counters is None else set(counters)
+
+    def transaction(
+        self, add: Iterable[int], delete: Iterable[int], protocol: str = "udp"
+    ) -> str:
+        """
+        The nft script that creates the table if needed and changes the set.
+
+        The input chain is rebuilt with an accept rule per set and, for
+        every known node port range, a rule dropping range ports that are
+        not in the set.
+
+        Args:
+            add: Ports to add to the set
+            delete: Ports to remove from the set
+            protocol: Protocol type (udp/tcp)
+
+        Returns:
+            Script for nft -f, applied as one atomic transaction
+        """
+        name = set_name(protocol)
+        lines = [f"table {NFT_FAMILY} {NFT_TABLE} {{"]
+        for set_protocol in PROTOCOLS:
+            lines += [
+                f"    set {set_name(set_protocol)} {{",
+                "        type inet_service",
+                "        counter",
+                "    }",
+            ]
+        lines += [
+            "    chain input {",
+            "        type filter hook input priority 0; policy accept;",
+            "    }",
+            "}",
+            # Rebuilt on every transaction so the accept rules never pile up
+            f"flush chain {NFT_FAMILY} {NFT_TABLE} input",
+        ]
+        for set_protocol in PROTOCOLS:
+            lines.append(
+                f"add rule {NFT_FAMILY} {NFT_TABLE} input "
+                f"{set_protocol} dport @{set_name(set_protocol)} accept"
+            )
+        for range_protocol, (start, end) in sorted(self._port_ranges.items()):
+            lines.append(
+                f"add rule {NFT_FAMILY} {NFT_TABLE} input "
+                f"{range_protocol} dport {start}-{end} "
+                f"{range_protocol} dport != @{set_name(range_protocol)} drop"
+            )
+        add, delete = sorted(add), sorted(delete)
+        if add:
+            ports = ", ".join(str(port) for port in add)
+            lines.append(f"add element {NFT_FAMILY} {NFT_TABLE} {name} {{ {ports} }}")
+        if delete:
+            ports = ", ".join(str(port) for port in delete)
+            lines.append(f"delete element {NFT_FAMILY} {NFT_TABLE} {name} {{ {ports} }}")
+        return "\n".join(lines) + "\n"
+
+    def reconcile(
+        self,
+        ports: Iterable[int],
+        protocol: str = "udp",
+        port_range: Optional[Tuple[int, int]] = None,
+    ) -> bool:
+        """
+        Make the node port set hold exactly the given ports.
+
+        The set is read once and the difference applied with one `nft -f`
+        transaction; nothing runs when the set already matches and the
+        chain is up to date. Queued enable_port()/disable_port() changes
+        are superseded.
+
+        Args:
+            ports: Ports that should be open
+            protocol: Protocol type (udp/tcp)
+            port_range: (start, end) of the node port range; ports in it
+                that are not in the set are dropped
+
+        Returns:
+            True if the set matches the desired ports
+        """
+        if protocol not in PROTOCOLS:
+            logging.error(f"Unsupported nftables protocol: {protocol}")
+            return False
+        if not self.is_available():
+            logging.warning("nftables is not available on this system")
+            return False
+
+        desired = set(ports)
+        with self._lock:
+            self._pending.pop(protocol, None)
+            if port_range is not None:
+                self._port_ranges[protocol] = tuple(port_range)
+            current = self.open_ports(protocol)
+            if current is None:
+                return False
+            add, delete = desired - current, current - desired
+            if not add and not delete and self._chain_ranges == self._port_ranges:
+                logging.debug(f"nftables {set_name(protocol)} is up to date")
+                return True
+            return self._apply(add, delete, protocol)
+
+    def flush(self, protocol: str = "udp") -> bool:
+        """
+        Apply the queued enable_port()/disable_port() changes.
+
+        Args:
+            protocol: Protocol type (udp/tcp)
+
+        Returns:
+            True if the queued changes were applied (or there were none)
+        """
+        with self._lock:
+            pending = self._pending.pop(protocol, {})
+            if not pending:
+                return True
+            current = self.open_ports(protocol)
+            if current is None:
+                return False
+            add = {port for port, is_open in pending.items() if is_open} - current
+            delete = {port for port, is_open in pending.items() if not is_open} & current
+            if not add and not delete:
+                return True
+            return self._apply(add, delete, protocol)
+
+    def _apply(self, add: Set[int], delete: Set[int], protocol: str) -> bool:
+        """Run one nft transaction (caller holds the lock)."""
+        logging.info(
+            f"Updating nftables {set_name(protocol)}: "
+            f"+{len(add)} -{len(delete)} ports"
+        )
+        try:
+            self._nft(["-f", "-"], self.transaction(add, delete, protocol))
+        except (subprocess.CalledProcessError, Exception) as err:
+            logging.error(f"Failed to update nftables set: {err}")
+            return False
+        self._chain_ranges = dict(self._port_ranges)
+        return True
+
+    def is_enabled(self) -> bool:
+        """
+        Check if the wnm table is loaded.
+
+        Returns:
+            True if nft lists the wnm table
+        """
+        if not self.is_available():
+            return False
+
+        try:
+            self._nft(["list", "table", NFT_FAMILY, NFT_TABLE])
+            return True
+        except (subprocess.CalledProcessError, Exception):
+            return False
+
+    def is_available(self) -> bool:
+        """
+        Check if nft is installed on the system.
+
+        Returns:
+            True if nft command is available
+        """
+        if self._available is None:
+            self._available = shutil.which("nft") is not None
+        return self._available
@@ -52,6 +52,26 @@ class NullFirewall(FirewallManager):
         logging.debug(f"NullFirewall: Skipping disable for port {port}/{protocol}")
         return True
 
+    def enable_port_range(
+        self, start: int, end: int, protocol: str = "udp", comment: str = None
+    ) -> bool:
+        """
+        No-op port range enable operation.
+
+        Args:
+            start: First port (ignored)
+            end: Last port (ignored)
+            protocol: Protocol type (ignored)
+            comment: Comment (ignored)
+
+        Returns:
+            Always True
+        """
+        logging.debug(
+            f"NullFirewall: Skipping enable for ports {start}:{end}/{protocol}"
+        )
+        return True
+
     def is_enabled(self) -> bool:
         """
         Check if firewall is enabled.
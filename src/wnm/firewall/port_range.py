@@ -0,0 +1,138 @@
+"""
+Port-range firewall mode.
+
+Node ports are allocated as port_start * 1000 + node_id, so every node
+port lies in one contiguous range. PortRangeFirewall wraps a firewall
+backend and opens that range in fixed blocks of node ids, one range rule
+per block (e.g. 55001:55100/udp), the first time a port in the block is
+needed. Starting or stopping a node inside an open block changes no rules,
+so the rule list stays short however many nodes the machine runs.
+"""
+
+import logging
+import threading
+from typing import Optional, Tuple
+
+from wnm.firewall.base import FirewallManager
+
+# Highest valid port number, the last block is cut off here
+MAX_PORT = 65535
+
+
+class PortRangeFirewall(FirewallManager):
+    """
+    Opens node ports block by block through another firewall manager.
+
+    Ports below the node port range are passed to the wrapped firewall one
+    rule at a time, as before.
+    """
+
+    def __init__(self, firewall: FirewallManager, port_start: int, block_size: int):
+        """
+        Args:
+            firewall: Backend the range rules are created with
+            port_start: Machine port_start (node ports are port_start * 1000 + id)
+            block_size: Node ids covered by each range rule
+        """
+        self.firewall = firewall
+        self.port_start = port_start
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        # Blocks known to be open by protocol, read from the backend on first use
+        self._open = {}
+
+    @property
+    def key(self) -> Tuple[int, int]:
+        """The (port_start, block_size) the block layout derives from."""
+        return (self.port_start, self.block_size)
+
+    def block_range(self, port: int) -> Optional[Tuple[int, int]]:
+        """
+        The block of the node port range a port belongs to.
+
+        Args:
+            port: Port number
+
+        Returns:
+            (start, end) of the block, or None if the port is below the node
+            port range
+        """
+        base = self.port_start * 1000
+        if port <= base or port > MAX_PORT:
+            return None
+        index = (port - base - 1) // self.block_size
+        start = base + 1 + index * self.block_size
+        return (start, min(start + self.block_size - 1, MAX_PORT))
+
+    def _open_blocks(self, protocol: str) -> set:
+        """Blocks already open for a protocol (caller holds the lock)."""
+        if protocol not in self._open:
+            ranges = self.firewall.open_port_ranges(protocol) or []
+            self._open[protocol] = set(ranges)
+        return self._open[protocol]
+
+    def _is_covered(self, block: Tuple[int, int], protocol: str) -> bool:
+        start, end = block
+        return any(
+            low <= start and end <= high for low, high in self._open_blocks(protocol)
+        )
+
+    def enable_port(
+        self, port: int, protocol: str = "udp", comment: str = None
+    ) -> bool:
+        """
+        Make sure the block holding a port is open.
+
+        Args:
+            port: Port number to open
+            protocol: Protocol type (udp/tcp)
+            comment: Optional comment for a new range rule
+
+        Returns:
+            True if the port's block is open
+        """
+        block = self.block_range(port)
+        if block is None:
+            return self.firewall.enable_port(port, protocol, comment)
+
+        with self._lock:
+            if self._is_covered(block, protocol):
+                logging.debug(f"Port {port}/{protocol} already open in {block}")
+                return True
+            start, end = block
+            if not self.firewall.enable_port_range(
+                start, end, protocol, f"antnode ports {start}-{end}"
+            ):
+                return False
+            self._open_blocks(protocol).add(block)
+            return True
+
+    def disable_port(self, port: int, protocol: str = "udp") -> bool:
+        """
+        Leave the block holding a port open.
+
+        Args:
+            port: Port number to close
+            protocol: Protocol type (udp/tcp)
+
+        Returns:
+            True (ports below the node port range are closed on the backend)
+        """
+        if self.block_range(port) is None:
+            return self.firewall.disable_port(port, protocol)
+        logging.debug(f"Port {port}/{protocol} stays open in its port range rule")
+        return True
+
+    def enable_port_range(
+        self, start: int, end: int, protocol: str = "udp", comment: str = None
+    ) -> bool:
+        return self.firewall.enable_port_range(start, end, protocol, comment)
+
+    def open_port_ranges(self, protocol: str = "udp"):
+        return self.firewall.open_port_ranges(protocol)
+
+    def is_enabled(self) -> bool:
+        return self.firewall.is_enabled()
+
+    def is_available(self) -> bool:
+        return self.firewall.is_available()
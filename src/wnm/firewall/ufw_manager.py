@@ -6,11 +6,16 @@ Requires sudo privileges for port operations.
 """
 
 import logging
+import re
 import shutil
 import subprocess
+from typing import List, Optional, Tuple
 
 from wnm.firewall.base import FirewallManager
 
+# A port range rule in `ufw status` output, e.g. "55001:55100/udp   ALLOW   Anywhere"
+UFW_RANGE_RULE = re.compile(r"^(\d+):(\d+)/(\w+)\s.*\bALLOW\b", re.MULTILINE)
+
 
 class UFWManager(FirewallManager):
     """
@@ -19,6 +24,9 @@ class UFWManager(FirewallManager):
     Uses 'sudo ufw' commands to manage port rules.
     """
 
+    # Result of the ufw PATH lookup, once made
+    _available = None
+
     def enable_port(
         self, port: int, protocol: str = "udp", comment: str = None
     ) -> bool:
@@ -86,6 +94,77 @@ class UFWManager(FirewallManager):
             logging.error(f"Failed to close firewall port: {err}")
             return False
 
+    def enable_port_range(
+        self, start: int, end: int, protocol: str = "udp", comment: str = None
+    ) -> bool:
+        """
+        Open a port range with a single ufw rule.
+
+        Args:
+            start: First port of the range
+            end: Last port of the range (inclusive)
+            protocol: Protocol type (udp/tcp)
+            comment: Optional comment for the rule
+
+        Returns:
+            True if the range was opened successfully
+        """
+        if not self.is_available():
+            logging.warning("UFW is not available on this system")
+            return False
+
+        logging.info(f"Opening firewall ports {start}:{end}/{protocol}")
+
+        try:
+            cmd = ["sudo", "ufw", "allow", f"{start}:{end}/{protocol}"]
+            if comment:
+                cmd.extend(["comment", comment])
+
+            subprocess.run(
+                cmd,
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            return True
+
+        except (subprocess.CalledProcessError, Exception) as err:
+            logging.error(f"Failed to open firewall ports: {err}")
+            return False
+
+    def open_port_ranges(self, protocol: str = "udp") -> Optional[List[Tuple[int, int]]]:
+        """
+        Read the allowed port range rules from `ufw status`.
+
+        Args:
+            protocol: Protocol type (udp/tcp)
+
+        Returns:
+            (start, end) pairs of the range rules, or None if ufw could not
+            be queried
+        """
+        if not self.is_available():
+            return None
+
+        try:
+            result = subprocess.run(
+                ["sudo", "ufw", "status"],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+        except (subprocess.CalledProcessError, Exception) as err:
+            logging.error(f"Failed to read firewall rules: {err}")
+            return None
+
+        return sorted(
+            {
+                (int(start), int(end))
+                for start, end, rule_protocol in UFW_RANGE_RULE.findall(result.stdout)
+                if rule_protocol == protocol
+            }
+        )
+
     def is_enabled(self) -> bool:
         """
         Check if UFW is active.
@@ -112,7 +191,11 @@ class UFWManager(FirewallManager):
         """
         Check if ufw is installed on the system.
 
+        The PATH lookup runs once per manager; every port change checks it.
+
         Returns:
             True if ufw command is available
         """
-        return shutil.which("ufw") is not None
+        if self._available is None:
+            self._available = shutil.which("ufw") is not None
+        return self._available
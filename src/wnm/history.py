@@ -0,0 +1,211 @@
+"""
+Node metrics history for weave-node-manager (wnm).
+
+Each survey appends one raw sample per running node to the node_metric
+table. Raw samples are rolled up into 5 minute buckets after a few hours,
+5 minute buckets into hourly buckets after a week, and anything older than
+the machine history_retention (days) is deleted so the table stays bounded.
+"""
+
+import logging
+import time
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import delete, insert, select
+
+from wnm.models import NodeMetric
+
+# Sample resolutions (seconds covered by one row, 0 = raw survey sample)
+RAW = 0
+FIVE_MINUTES = 300
+ONE_HOUR = 3600
+
+# How long each resolution is kept before being rolled up
+RAW_HISTORY_SECONDS = 6 * ONE_HOUR
+FIVE_MINUTE_HISTORY_SECONDS = 7 * 24 * ONE_HOUR
+
+
+def history_sample(node_id: int, card: Dict, timestamp: Optional[int] = None) -> Dict:
+    """Build a raw node_metric row from a survey card.
+
+    Args:
+        node_id: Node id
+        card: Node card as built by node_card_from_metrics
+        timestamp: Sample time (default: card timestamp or now)
+
+    Returns:
+        Dict of node_metric column values
+    """
+    # Kept as a string, like Node.rewards, so no precision is lost
+    rewards = str(card.get("rewards") or "0")
+    try:
+        Decimal(rewards)
+    except InvalidOperation:
+        rewards = "0"
+    return {
+        "node_id": node_id,
+        "timestamp": timestamp or card.get("timestamp") or int(time.time()),
+        "resolution": RAW,
+        "records": card.get("records") or 0,
+        "puts": card.get("puts") or 0,
+        "rewards": rewards,
+        "connected_peers": card.get("connected_peers") or 0,
+        "shunned": card.get("shunned") or 0,
+        "mem": card.get("mem") or 0,
+        "cpu": card.get("cpu") or 0,
+    }
+
+
+def _decimal(value) -> Decimal:
+    try:
+        return Decimal(value or "0")
+    except InvalidOperation:
+        return Decimal(0)
+
+
+def _rollup(session, source: int, resolution: int, cutoff: int) -> int:
+    """Fold samples of one resolution older than cutoff into coarser buckets.
+
+    Counters and gauges keep the last value in each bucket, mem and cpu are
+    averaged. Only whole buckets are folded, so a bucket is never split
+    across two rollup rows.
+
+    Returns:
+        Number of source rows folded
+    """
+    cutoff -= cutoff % resolution
+    rows = session.execute(
+        select(NodeMetric)
+        .where(NodeMetric.resolution == source, NodeMetric.timestamp < cutoff)
+        .order_by(NodeMetric.node_id, NodeMetric.timestamp)
+    ).scalars().all()
+    if not rows:
+        return 0
+
+    buckets = {}
+    for row in rows:
+        key = (row.node_id, row.timestamp - row.timestamp % resolution)
+        buckets.setdefault(key, []).append(row)
+
+    samples = []
+    for (node_id, bucket), group in buckets.items():
+        last = group[-1]
+        samples.append(
+            {
+                "node_id": node_id,
+                "timestamp": bucket,
+                "resolution": resolution,
+                "records": last.records,
+                "puts": last.puts,
+                "rewards": last.rewards,
+                "connected_peers": last.connected_peers,
+                "shunned": last.shunned,
+                "mem": sum(row.mem for row in group) // len(group),
+                "cpu": sum(row.cpu for row in group) // len(group),
+            }
+        )
+    session.execute(insert(NodeMetric), samples)
+    session.execute(
+        delete(NodeMetric).where(
+            NodeMetric.resolution == source, NodeMetric.timestamp < cutoff
+        )
+    )
+    return len(rows)
+
+
+def maintain_history(S, retention_days: int, now: Optional[int] = None) -> bool:
+    """Downsample and prune the node metrics history in one transaction.
+
+    Args:
+        S: SQLAlchemy session factory
+        retention_days: Days of history to keep (0 or less does nothing)
+        now: Current time (default: time.time())
+
+    Returns:
+        True on success, False if the maintenance failed
+    """
+    if not retention_days or retention_days <= 0:
+        return True
+    now = int(now or time.time())
+    try:
+        with S() as session:
+            _rollup(session, RAW, FIVE_MINUTES, now - RAW_HISTORY_SECONDS)
+            _rollup(session, FIVE_MINUTES, ONE_HOUR, now - FIVE_MINUTE_HISTORY_SECONDS)
+            session.execute(
+                delete(NodeMetric).where(
+                    NodeMetric.timestamp < now - retention_days * 24 * ONE_HOUR
+                )
+            )
+            session.commit()
+    except Exception as error:
+        template = "In MH - An exception of type {0} occurred. Arguments:\n{1!r}"
+        message = template.format(type(error).__name__, error.args)
+        logging.warning(message)
+        return False
+    return True
+
+
+def node_rates(
+    S,
+    window: int = ONE_HOUR,
+    node_ids: Optional[Iterable[int]] = None,
+    now: Optional[int] = None,
+) -> Dict[int, Dict]:
+    """Compute per-node rates from the metrics history.
+
+    puts is a counter, so increments are summed sample to sample and a drop
+    (node restart) counts from zero. records and rewards are gauges and are
+    reported as the change between the first and last sample in the window
+    (reward_delta as a string, like the rewards it is computed from).
+
+    Args:
+        S: SQLAlchemy session factory
+        window: Look-back window in seconds (default: one hour)
+        node_ids: Optional node ids to limit the query to
+        now: Current time (default: time.time())
+
+    Returns:
+        Dict of node_id to {"samples", "span", "puts", "puts_per_hour",
+        "records_delta", "records_per_hour", "reward_delta"}
+    """
+    now = int(now or time.time())
+    query = (
+        select(
+            NodeMetric.node_id,
+            NodeMetric.timestamp,
+            NodeMetric.puts,
+            NodeMetric.records,
+            NodeMetric.rewards,
+        )
+        .where(NodeMetric.timestamp >= now - window)
+        .order_by(NodeMetric.node_id, NodeMetric.timestamp)
+    )
+    if node_ids is not None:
+        query = query.where(NodeMetric.node_id.in_(list(node_ids)))
+    with S() as session:
+        rows = session.execute(query).all()
+
+    series = {}
+    for row in rows:
+        series.setdefault(row.node_id, []).append(row)
+
+    rates = {}
+    for node_id, samples in series.items():
+        first, last = samples[0], samples[-1]
+        span = last.timestamp - first.timestamp
+        puts = 0
+        for prev, cur in zip(samples, samples[1:]):
+            puts += cur.puts - prev.puts if cur.puts >= prev.puts else cur.puts
+        records_delta = last.records - first.records
+        hours = span / ONE_HOUR if span > 0 else 0
+        rates[node_id] = {
+            "samples": len(samples),
+            "span": span,
+            "puts": puts,
+            "puts_per_hour": round(puts / hours, 2) if hours else 0,
+            "records_delta": records_delta,
+            "records_per_hour": round(records_delta / hours, 2) if hours else 0,
+            "reward_delta": str(_decimal(last.rewards) - _decimal(first.rewards)),
+        }
+    return rates
@@ -5,6 +5,7 @@ import json_fix
 from sqlalchemy import (
     Float,
     ForeignKey,
+    Index,
     Integer,
     Unicode,
     UnicodeText,
@@ -99,6 +100,22 @@ class Machine(Base):
     max_concurrent_starts: Mapped[int] = mapped_column(Integer, default=1)
     max_concurrent_removals: Mapped[int] = mapped_column(Integer, default=1)
     max_concurrent_operations: Mapped[int] = mapped_column(Integer, default=1)
+    max_concurrent_surveys: Mapped[int] = mapped_column(Integer, default=1)
+    # Run planned node actions concurrently (0 = one at a time)
+    parallel_actions: Mapped[int] = mapped_column(Integer, default=0)
+    # Rolling upgrade canary cohort size (0 = upgrade without waves)
+    upgrade_canary: Mapped[int] = mapped_column(Integer, default=0)
+    # Create systemd nodes as instances of the antnode@.service template (0 = one unit per node)
+    systemd_template: Mapped[int] = mapped_column(Integer, default=0)
+    # How SystemdManager talks to systemd: subprocess (systemctl) or dbus
+    systemd_transport: Mapped[str] = mapped_column(UnicodeText, default="subprocess")
+    # Open node ports in port-range firewall rules of this many node ids (0 = one rule per node)
+    firewall_range_block: Mapped[int] = mapped_column(Integer, default=0)
+    # Firewall backend for node ports: ufw, nftables or null (None = process manager default)
+    firewall_type: Mapped[Optional[str]] = mapped_column(UnicodeText, default=None)
+
+    # Node metrics history retention in days (0 disables history)
+    history_retention: Mapped[int] = mapped_column(Integer, default=30)
 
     # NEW: Node selection strategy (Phase 6)
     node_removal_strategy: Mapped[str] = mapped_column(UnicodeText, default="youngest")
@@ -179,6 +196,14 @@ class Machine(Base):
         max_concurrent_starts=1,
         max_concurrent_removals=1,
         max_concurrent_operations=1,
+        max_concurrent_surveys=1,
+        parallel_actions=0,
+        upgrade_canary=0,
+        systemd_template=0,
+        systemd_transport="subprocess",
+        firewall_range_block=0,
+        firewall_type=None,
+        history_retention=30,
         node_removal_strategy="youngest",
         process_manager=None,
         max_node_per_container=200,
@@ -232,6 +257,14 @@ class Machine(Base):
         self.max_concurrent_starts = max_concurrent_starts
         self.max_concurrent_removals = max_concurrent_removals
         self.max_concurrent_operations = max_concurrent_operations
+        self.max_concurrent_surveys = max_concurrent_surveys
+        self.parallel_actions = parallel_actions
+        self.upgrade_canary = upgrade_canary
+        self.systemd_template = systemd_template
+        self.systemd_transport = systemd_transport
+        self.firewall_range_block = firewall_range_block
+        self.firewall_type = firewall_type
+        self.history_retention = history_retention
         self.node_removal_strategy = node_removal_strategy
         self.process_manager = process_manager
         self.max_node_per_container = max_node_per_container
@@ -275,6 +308,14 @@ class Machine(Base):
             + f"max_concurrent_starts={self.max_concurrent_starts},"
             + f"max_concurrent_removals={self.max_concurrent_removals},"
             + f"max_concurrent_operations={self.max_concurrent_operations},"
+            + f"max_concurrent_surveys={self.max_concurrent_surveys},"
+            + f"parallel_actions={self.parallel_actions},"
+            + f"upgrade_canary={self.upgrade_canary},"
+            + f"systemd_template={self.systemd_template},"
+            + f"systemd_transport={self.systemd_transport},"
+            + f"firewall_range_block={self.firewall_range_block},"
+            + f"firewall_type={self.firewall_type},"
+            + f"history_retention={self.history_retention},"
             + f"node_removal_strategy={self.node_removal_strategy},"
             + f"process_manager={self.process_manager},"
             + f"max_node_per_container={self.max_node_per_container},"
@@ -326,6 +367,14 @@ class Machine(Base):
             "max_concurrent_starts": self.max_concurrent_starts,
             "max_concurrent_removals": self.max_concurrent_removals,
             "max_concurrent_operations": self.max_concurrent_operations,
+            "max_concurrent_surveys": self.max_concurrent_surveys,
+            "parallel_actions": self.parallel_actions,
+            "upgrade_canary": self.upgrade_canary,
+            "systemd_template": self.systemd_template,
+            "systemd_transport": f"{self.systemd_transport}",
+            "firewall_range_block": self.firewall_range_block,
+            "firewall_type": f"{self.firewall_type}" if self.firewall_type else None,
+            "history_retention": self.history_retention,
             "node_removal_strategy": f"{self.node_removal_strategy}",
             "process_manager": (
                 f"{self.process_manager}" if self.process_manager else None
@@ -656,3 +705,277 @@ class Node(Base):
             "layout": f"{self.layout}",
             "environment": f"{self.environment}",
         }
+
+
+# Append-only node metrics history, downsampled over time (see wnm.history)
+class NodeMetric(Base):
+    __tablename__ = "node_metric"
+    __table_args__ = (
+        Index("ix_node_metric_node_resolution_ts", "node_id", "resolution", "timestamp"),
+        # Rollups select by resolution and age, retention deletes by age alone
+        Index("ix_node_metric_resolution_ts", "resolution", "timestamp"),
+        Index("ix_node_metric_ts", "timestamp"),
+    )
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # No foreign key: history outlives removed nodes until retention expires
+    node_id: Mapped[int] = mapped_column(Integer)
+    timestamp: Mapped[int] = mapped_column(Integer)
+    # Seconds covered by the sample: 0 = raw survey, 300 = 5 minute, 3600 = hourly
+    resolution: Mapped[int] = mapped_column(Integer, default=0)
+    records: Mapped[int] = mapped_column(Integer, default=0)
+    puts: Mapped[int] = mapped_column(Integer, default=0)
+    # String like Node.rewards, to keep full precision
+    rewards: Mapped[Optional[str]] = mapped_column(UnicodeText, default="0")
+    connected_peers: Mapped[int] = mapped_column(Integer, default=0)
+    shunned: Mapped[int] = mapped_column(Integer, default=0)
+    mem: Mapped[int] = mapped_column(Integer, default=0)  # MB * 100
+    cpu: Mapped[int] = mapped_column(Integer, default=0)  # percent * 100
+
+    def __init__(
+        self,
+        node_id,
+        timestamp,
+        resolution=0,
+        records=0,
+        puts=0,
+        rewards="0",
+        connected_peers=0,
+        shunned=0,
+        mem=0,
+        cpu=0,
+    ):
+        self.node_id = node_id
+        self.timestamp = timestamp
+        self.resolution = resolution
+        self.records = records
+        self.puts = puts
+        self.rewards = rewards
+        self.connected_peers = connected_peers
+        self.shunned = shunned
+        self.mem = mem
+        self.cpu = cpu
+
+    def __repr__(self):
+        return (
+            f"NodeMetric(id={self.id},node_id={self.node_id},timestamp={self.timestamp},"
+            + f"resolution={self.resolution},records={self.records},puts={self.puts},"
+            + f'rewards="{self.rewards}",connected_peers={self.connected_peers},'
+            + f"shunned={self.shunned},mem={self.mem},cpu={self.cpu})"
+        )
+
+    def __json__(self):
+        return {
+            "id": self.id,
+            "node_id": self.node_id,
+            "timestamp": self.timestamp,
+            "resolution": self.resolution,
+            "records": self.records,
+            "puts": self.puts,
+            "rewards": self.rewards,
+            "connected_peers": self.connected_peers,
+            "shunned": self.shunned,
+            "mem": self.mem,
+            "cpu": self.cpu,
+        }
+
+
+class SystemSample(Base):
+    __tablename__ = "system_sample"
+    # Single row: the last /proc sample, so the next run can compute rates
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    timestamp: Mapped[float] = mapped_column(Float)
+    boot_time: Mapped[int] = mapped_column(Integer)
+    # Aggregate CPU time in clock ticks
+    cpu_total: Mapped[int] = mapped_column(Integer, default=0)
+    cpu_idle: Mapped[int] = mapped_column(Integer, default=0)
+    cpu_iowait: Mapped[int] = mapped_column(Integer, default=0)
+    disk_read_bytes: Mapped[int] = mapped_column(Integer, default=0)
+    disk_write_bytes: Mapped[int] = mapped_column(Integer, default=0)
+    net_recv_bytes: Mapped[int] = mapped_column(Integer, default=0)
+    net_sent_bytes: Mapped[int] = mapped_column(Integer, default=0)
+
+    def __init__(
+        self,
+        timestamp,
+        boot_time,
+        cpu_total=0,
+        cpu_idle=0,
+        cpu_iowait=0,
+        disk_read_bytes=0,
+        disk_write_bytes=0,
+        net_recv_bytes=0,
+        net_sent_bytes=0,
+        id=1,
+    ):
+        self.id = id
+        self.timestamp = timestamp
+        self.boot_time = boot_time
+        self.cpu_total = cpu_total
+        self.cpu_idle = cpu_idle
+        self.cpu_iowait = cpu_iowait
+        self.disk_read_bytes = disk_read_bytes
+        self.disk_write_bytes = disk_write_bytes
+        self.net_recv_bytes = net_recv_bytes
+        self.net_sent_bytes = net_sent_bytes
+
+    def __repr__(self):
+        return (
+            f"SystemSample(id={self.id},timestamp={self.timestamp},"
+            + f"boot_time={self.boot_time},cpu_total={self.cpu_total},"
+            + f"cpu_idle={self.cpu_idle},cpu_iowait={self.cpu_iowait},"
+            + f"disk_read_bytes={self.disk_read_bytes},"
+            + f"disk_write_bytes={self.disk_write_bytes},"
+            + f"net_recv_bytes={self.net_recv_bytes},"
+            + f"net_sent_bytes={self.net_sent_bytes})"
+        )
+
+    def __json__(self):
+        return {
+            "timestamp": self.timestamp,
+            "boot_time": self.boot_time,
+            "cpu_total": self.cpu_total,
+            "cpu_idle": self.cpu_idle,
+            "cpu_iowait": self.cpu_iowait,
+            "disk_read_bytes": self.disk_read_bytes,
+            "disk_write_bytes": self.disk_write_bytes,
+            "net_recv_bytes": self.net_recv_bytes,
+            "net_sent_bytes": self.net_sent_bytes,
+        }
+
+
+class NodeTransition(Base):
+    __tablename__ = "node_transition"
+    __table_args__ = (Index("ix_node_transition_open", "transition", "finished_at"),)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # No foreign key: finished transitions outlive removed nodes
+    node_id: Mapped[int] = mapped_column(Integer)
+    # RESTARTING or UPGRADING
+    transition: Mapped[str] = mapped_column(UnicodeText)
+    # Node timestamp when the transition began
+    started_at: Mapped[int] = mapped_column(Integer)
+    finished_at: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    # ready, failed (timer expired first) or abandoned (node left the state)
+    outcome: Mapped[Optional[str]] = mapped_column(UnicodeText, nullable=True)
+    probes: Mapped[int] = mapped_column(Integer, default=0)
+    next_probe_at: Mapped[int] = mapped_column(Integer, default=0)
+    # Time to ready in seconds
+    seconds: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    # Seconds the node was down for the binary swap (upgrades only)
+    downtime: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+
+    def __init__(
+        self,
+        node_id,
+        transition,
+        started_at,
+        finished_at=None,
+        outcome=None,
+        probes=0,
+        next_probe_at=0,
+        seconds=None,
+        downtime=None,
+    ):
+        self.node_id = node_id
+        self.transition = transition
+        self.started_at = started_at
+        self.finished_at = finished_at
+        self.outcome = outcome
+        self.probes = probes
+        self.next_probe_at = next_probe_at
+        self.seconds = seconds
+        self.downtime = downtime
+
+    def __repr__(self):
+        return (
+            f"NodeTransition(id={self.id},node_id={self.node_id},"
+            + f"transition={self.transition},started_at={self.started_at},"
+            + f"finished_at={self.finished_at},outcome={self.outcome},"
+            + f"probes={self.probes},next_probe_at={self.next_probe_at},"
+            + f"seconds={self.seconds},downtime={self.downtime})"
+        )
+
+    def __json__(self):
+        return {
+            "id": self.id,
+            "node_id": self.node_id,
+            "transition": self.transition,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "outcome": self.outcome,
+            "probes": self.probes,
+            "next_probe_at": self.next_probe_at,
+            "seconds": self.seconds,
+            "downtime": self.downtime,
+        }
+
+
+class UpgradeRollout(Base):
+    __tablename__ = "upgrade_rollout"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # antnode version being rolled out
+    version: Mapped[str] = mapped_column(UnicodeText)
+    # rolling, rolling_back, paused, done or superseded
+    state: Mapped[str] = mapped_column(UnicodeText, default="rolling")
+    started_at: Mapped[int] = mapped_column(Integer)
+    finished_at: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    # Wave 0 is the canary cohort
+    wave: Mapped[int] = mapped_column(Integer, default=0)
+    wave_size: Mapped[int] = mapped_column(Integer, default=1)
+    wave_started_at: Mapped[int] = mapped_column(Integer, default=0)
+    # JSON map of node id to pre-upgrade health baseline for the open wave
+    wave_nodes: Mapped[str] = mapped_column(UnicodeText, default="{}")
+    upgraded: Mapped[int] = mapped_column(Integer, default=0)
+    rolled_back: Mapped[int] = mapped_column(Integer, default=0)
+    reason: Mapped[Optional[str]] = mapped_column(UnicodeText, nullable=True)
+
+    def __init__(
+        self,
+        version,
+        started_at,
+        state="rolling",
+        finished_at=None,
+        wave=0,
+        wave_size=1,
+        wave_started_at=0,
+        wave_nodes="{}",
+        upgraded=0,
+        rolled_back=0,
+        reason=None,
+    ):
+        self.version = version
+        self.started_at = started_at
+        self.state = state
+        self.finished_at = finished_at
+        self.wave = wave
+        self.wave_size = wave_size
+        self.wave_started_at = wave_started_at
+        self.wave_nodes = wave_nodes
+        self.upgraded = upgraded
+        self.rolled_back = rolled_back
+        self.reason = reason
+
+    def __repr__(self):
+        return (
+            f"UpgradeRollout(id={self.id},version={self.version},state={self.state},"
+            + f"started_at={self.started_at},finished_at={self.finished_at},"
+            + f"wave={self.wave},wave_size={self.wave_size},"
+            + f"wave_started_at={self.wave_started_at},wave_nodes={self.wave_nodes},"
+            + f"upgraded={self.upgraded},rolled_back={self.rolled_back},"
+            + f"reason={self.reason})"
+        )
+
+    def __json__(self):
+        return {
+            "id": self.id,
+            "version": self.version,
+            "state": self.state,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "wave": self.wave,
+            "wave_size": self.wave_size,
+            "wave_started_at": self.wave_started_at,
+            "wave_nodes": self.wave_nodes,
+            "upgraded": self.upgraded,
+            "rolled_back": self.rolled_back,
+            "reason": self.reason,
+        }
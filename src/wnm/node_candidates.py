@@ -0,0 +1,106 @@
+"""Candidate nodes for planned actions.
+
+The DecisionEngine binds a concrete node id to every start, stop, upgrade
+and removal it plans. NodeCandidates loads the nodes that can be acted on
+with a single query (on first use, so idle cycles never run it), orders
+them once per action kind, and hands each node out at most once per cycle.
+"""
+
+import logging
+from collections import namedtuple
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+
+from wnm.common import RUNNING, STOPPED
+from wnm.models import Node
+
+_Candidate = namedtuple("_Candidate", "id status version age records")
+
+# Sort keys for node_removal_strategy (ties broken by node id)
+REMOVAL_ORDER = {
+    "youngest": lambda node: (-node.age, node.id),
+    "oldest": lambda node: (node.age, node.id),
+    "least_records": lambda node: (node.records, -node.age, node.id),
+}
+
+# Candidate pools
+REMOVE_STOPPED = "remove_stopped"
+REMOVE_RUNNING = "remove_running"
+START = "start"
+UPGRADE = "upgrade"
+
+
+class NodeCandidates:
+    """Ordered node ids per action kind, loaded once per planning cycle."""
+
+    def __init__(self, S, antnode_version: str, removal_strategy: str = "youngest"):
+        """
+        Args:
+            S: SQLAlchemy session factory
+            antnode_version: Current antnode version (nodes on another
+                version are upgrade candidates)
+            removal_strategy: Machine node_removal_strategy
+        """
+        self.S = S
+        self.antnode_version = antnode_version
+        if removal_strategy not in REMOVAL_ORDER:
+            logging.warning(
+                f"Unknown node_removal_strategy '{removal_strategy}', using youngest"
+            )
+            removal_strategy = "youngest"
+        self.removal_strategy = removal_strategy
+        self._pools: Optional[Dict[str, List[int]]] = None
+        self._taken = set()
+
+    def _load(self) -> Dict[str, List[int]]:
+        with self.S() as session:
+            rows = session.execute(
+                select(Node.id, Node.status, Node.version, Node.age, Node.records).where(
+                    Node.status.in_([RUNNING, STOPPED])
+                )
+            ).all()
+        # NULL columns sort as zero
+        rows = [
+            _Candidate(row.id, row.status, row.version, row.age or 0, row.records or 0)
+            for row in rows
+        ]
+        removal_order = REMOVAL_ORDER[self.removal_strategy]
+        running = [row for row in rows if row.status == RUNNING]
+        stopped = [row for row in rows if row.status == STOPPED]
+        return {
+            REMOVE_STOPPED: [row.id for row in sorted(stopped, key=removal_order)],
+            REMOVE_RUNNING: [row.id for row in sorted(running, key=removal_order)],
+            # Oldest stopped node first
+            START: [row.id for row in sorted(stopped, key=lambda row: (row.age, row.id))],
+            # Oldest outdated running node first
+            UPGRADE: [
+                row.id
+                for row in sorted(running, key=lambda row: (row.age, row.id))
+                if row.version is not None and row.version != self.antnode_version
+            ],
+        }
+
+    def take(self, pool: str, count: int) -> List[int]:
+        """Hand out up to count node ids from a pool.
+
+        A node handed out from one pool is never handed out again this
+        cycle, from any pool.
+
+        Args:
+            pool: One of REMOVE_STOPPED, REMOVE_RUNNING, START or UPGRADE
+            count: Maximum number of ids wanted
+
+        Returns:
+            List of node ids in pool order (may be shorter than count)
+        """
+        if self._pools is None:
+            self._pools = self._load()
+        ids = []
+        for node_id in self._pools[pool]:
+            if len(ids) >= count:
+                break
+            if node_id not in self._taken:
+                self._taken.add(node_id)
+                ids.append(node_id)
+        return ids
@@ -1,13 +1,14 @@
 """
 Process managers for node lifecycle management.
 
-Supports multiple backends: systemd, docker, setsid, antctl, launchd
+Supports multiple backends: systemd, docker, setsid, antctl, launchd, s6overlay
 """
 
 from wnm.process_managers.base import NodeProcess, ProcessManager
 from wnm.process_managers.docker_manager import DockerManager
 from wnm.process_managers.factory import get_default_manager_type, get_process_manager
 from wnm.process_managers.launchd_manager import LaunchdManager
+from wnm.process_managers.s6overlay_manager import S6OverlayManager
 from wnm.process_managers.setsid_manager import SetsidManager
 from wnm.process_managers.systemd_manager import SystemdManager
 
@@ -20,4 +21,5 @@ __all__ = [
     "DockerManager",
     "SetsidManager",
     "LaunchdManager",
+    "S6OverlayManager",
 ]
@@ -6,16 +6,16 @@ This manager delegates node management to antctl while maintaining wnm's
 decision engine and resource monitoring capabilities.
 """
 
-import json
 import logging
 import os
 import re
 import subprocess
-from typing import Optional
+from typing import List, Optional
 
 from wnm.common import DEAD, RESTARTING, RUNNING, STOPPED
 from wnm.config import machine_config, options
 from wnm.models import Node
+from wnm.process_managers.antctl_status import MUTATING_COMMANDS, AntctlStatus
 from wnm.process_managers.base import NodeProcess, ProcessManager
 from wnm.utils import read_node_metadata
 
@@ -29,6 +29,41 @@ ANTCTL_STATUS_MAP = {
 }
 
 
+def port_range(first: int, last: int) -> str:
+    """Format an antctl port argument: a single port or an inclusive range"""
+    return str(first) if first == last else f"{first}-{last}"
+
+
+def add_batches(nodes: List[Node]) -> List[List[Node]]:
+    """
+    Split new nodes into runs one `antctl add --count N` can create.
+
+    A run shares its rewards address and network, and its node, metrics
+    and RPC ports each increase by one from node to node.
+
+    Args:
+        nodes: New node records, ordered by port
+
+    Returns:
+        Runs of nodes, in order
+    """
+    batches = []
+    for node in nodes:
+        if batches:
+            previous = batches[-1][-1]
+            if (
+                node.wallet == previous.wallet
+                and node.network == previous.network
+                and node.port == previous.port + 1
+                and node.metrics_port == previous.metrics_port + 1
+                and node.rpc_port == previous.rpc_port + 1
+            ):
+                batches[-1].append(node)
+                continue
+        batches.append([node])
+    return batches
+
+
 class AntctlManager(ProcessManager):
     """Manage nodes via antctl CLI wrapper"""
 
@@ -92,6 +127,12 @@ class AntctlManager(ProcessManager):
             self.antctl_cmd.append("--debug")
             logging.debug("AntctlManager: Debug mode enabled for antctl commands")
 
+        # antctl invocations since the cycle began
+        self.forks = 0
+        # `antctl status --json` snapshot shared by status lookups, the
+        # start guard and surveys
+        self.status = AntctlStatus(self._run_antctl)
+
     def _run_antctl(
         self, args: list, capture_output: bool = True
     ) -> subprocess.CompletedProcess:
@@ -109,6 +150,7 @@ class AntctlManager(ProcessManager):
             subprocess.CalledProcessError: If command fails
             FileNotFoundError: If antctl is not installed
         """
+        self.forks += 1
         cmd = self.antctl_cmd + args
         # Log command with proper shell quoting for debugging
         import shlex
@@ -148,52 +190,54 @@ class AntctlManager(ProcessManager):
             logging.error(f"stdout: {err.stdout}")
             logging.error(f"stderr: {err.stderr}")
             raise
-
-    def create_node(self, node: Node, binary_path: str) -> Optional[NodeProcess]:
+        finally:
+            # Node state may have changed, even if the command failed
+            if args and args[0] in MUTATING_COMMANDS:
+                self.status.invalidate()
+
+    def begin_cycle(self):
+        """Drop the status snapshot and reset the fork count for a new cycle"""
+        self.status.invalidate()
+        self.forks = 0
+
+    def _service_name_args(self, nodes: List[Node]) -> list:
+        """Build one --service-name flag per node for a batched antctl call"""
+        args = []
+        for node in nodes:
+            args.extend(["--service-name", node.service])
+        return args
+
+    def _add_args(self, nodes: List[Node], binary_path: str, machine_config) -> list:
         """
-        Create and start a new node via antctl.
-
-        Args:
-            node: Node database record with configuration
-            binary_path: Path to the antnode binary (optional, antctl can download)
+        Build one antctl add command for nodes with consecutive ports.
 
-        Returns:
-            NodeProcess with external_node_id set to service_name if successful
-            None if creation failed
+        antctl takes a port range with --count, one port per added service.
+        A single node gets its own data directory; a batch shares the
+        parent directory, under which antctl creates one directory per
+        service (read back from the add output).
         """
-        logging.info(f"Creating antctl node {node.id}")
-
-        # Get machine config to check no_upnp setting
-        machine_config = None
-        if self.S:
-            from wnm.config import S
-            from wnm.models import Machine
-            from sqlalchemy import select
-
-            try:
-                with S() as session:
-                    result = session.execute(select(Machine)).first()
-                    if result:
-                        machine_config = result[0]
-            except Exception as e:
-                logging.warning(f"Failed to get machine config: {e}")
+        first, last = nodes[0], nodes[-1]
+        if len(nodes) == 1:
+            data_dir, log_dir = first.root_dir, first.log_dir
+        else:
+            data_dir = os.path.dirname(first.root_dir)
+            log_dir = os.path.dirname(first.log_dir) if first.log_dir else None
 
         # Build antctl add command with path overrides
         args = [
             "add",
             "--count",
-            "1",
+            str(len(nodes)),
             "--data-dir-path",
-            node.root_dir,
+            data_dir,
             "--node-port",
-            str(node.port),
+            port_range(first.port, last.port),
             "--metrics-port",
-            str(node.metrics_port),
+            port_range(first.metrics_port, last.metrics_port),
             "--rpc-port",
-            str(node.rpc_port),
+            port_range(first.rpc_port, last.rpc_port),
             "--rewards-address",
-            node.wallet,
-
+            first.wallet,
         ]
 
         # Add --no-upnp if configured (defaults to True for backwards compatibility)
@@ -201,8 +245,8 @@ class AntctlManager(ProcessManager):
             args.append("--no-upnp")
 
         # Add optional log directory if specified
-        if node.log_dir:
-            args.extend(["--log-dir-path", node.log_dir])
+        if log_dir:
+            args.extend(["--log-dir-path", log_dir])
 
         # Add binary path from machine config (antnode_path)
         # This tells antctl where to find the binary instead of downloading a new one
@@ -214,11 +258,31 @@ class AntctlManager(ProcessManager):
             args.extend(["--path", binary_path])
 
         # Add network
-        args.append(node.network or "evm-arbitrum-one")
+        args.append(first.network or "evm-arbitrum-one")
 
         # Add --version if antctl_version is configured
         if machine_config and hasattr(machine_config, 'antctl_version') and machine_config.antctl_version:
             args.extend(["--version", machine_config.antctl_version])
+        return args
+
+    def create_node(self, node: Node, binary_path: str) -> Optional[NodeProcess]:
+        """
+        Create and start a new node via antctl.
+
+        Args:
+            node: Node database record with configuration
+            binary_path: Path to the antnode binary (optional, antctl can download)
+
+        Returns:
+            NodeProcess with external_node_id set to service_name if successful
+            None if creation failed
+        """
+        logging.info(f"Creating antctl node {node.id}")
+
+        # Get machine config to check no_upnp setting
+        machine_config = self._get_machine_config()
+
+        args = self._add_args([node], binary_path, machine_config)
 
         try:
             result = self._run_antctl(args)
@@ -234,8 +298,8 @@ class AntctlManager(ProcessManager):
             # Update node.service so start_node can use it
             node.service = service_name
 
-            # Start the node
-            if not self.start_node(node):
+            # Start the node (a service antctl just added cannot be running)
+            if not self._start_services([node]):
                 logging.error(f"Failed to start node after creation")
                 return None
 
@@ -250,6 +314,90 @@ class AntctlManager(ProcessManager):
             logging.error(f"Failed to create antctl node: {err}")
             return None
 
+    def create_nodes(
+        self, nodes: List[Node], binary_path: str
+    ) -> List[Optional[NodeProcess]]:
+        """
+        Create and start several nodes with one antctl add and one antctl start.
+
+        Nodes that cannot share an `antctl add --count N` (different rewards
+        address, or ports that are not consecutive) are added in separate
+        runs, still followed by a single start of every added service.
+
+        Args:
+            nodes: Node database records with configuration
+            binary_path: Path to the antnode binary (optional, antctl can download)
+
+        Returns:
+            One NodeProcess (or None if that node failed) per node, in order
+        """
+        logging.info(f"Creating {len(nodes)} antctl nodes")
+        machine_config = self._get_machine_config()
+
+        added = []
+        for batch in add_batches(nodes):
+            try:
+                result = self._run_antctl(self._add_args(batch, binary_path, machine_config))
+            except (subprocess.CalledProcessError, FileNotFoundError) as err:
+                logging.error(f"Failed to create antctl nodes: {err}")
+                continue
+            added.extend(self._apply_add_output(batch, result.stdout))
+
+        if added and self.S:
+            # Persist the paths antctl chose for each service
+            try:
+                with self.S() as session:
+                    for node in added:
+                        session.merge(node)
+                    session.commit()
+            except Exception as e:
+                logging.error(f"Failed to update nodes in database: {e}")
+                return [None] * len(nodes)
+
+        # Start every new service at once (none of them can be running yet)
+        if not self._start_services(added):
+            logging.error("Failed to start nodes after creation")
+            return [None] * len(nodes)
+
+        created = {node.id for node in added}
+        return [
+            NodeProcess(node_id=node.id, external_node_id=node.service, status=RESTARTING)
+            if node.id in created
+            else None
+            for node in nodes
+        ]
+
+    def _apply_add_output(self, nodes: List[Node], output: str) -> List[Node]:
+        """
+        Match the services of one antctl add to its nodes and record their paths.
+
+        antctl creates the services in port order, so the n-th service listed
+        belongs to the n-th node.
+
+        Args:
+            nodes: Nodes passed to the antctl add
+            output: stdout of the antctl add
+
+        Returns:
+            The nodes a service was found for
+        """
+        service_names = self._extract_service_names_from_output(output)
+        if len(service_names) != len(nodes):
+            logging.error(
+                f"antctl add reported {len(service_names)} services for {len(nodes)} nodes"
+            )
+        added = []
+        for node, service_name in zip(nodes, service_names):
+            node.service = service_name
+            config = self._parse_node_config_from_add_output(output, service_name)
+            if config:
+                node.root_dir = config.get("root_dir", node.root_dir)
+                node.log_dir = config.get("log_dir", node.log_dir)
+                node.binary = config.get("binary", node.binary)
+            logging.info(f"Created antctl service: {service_name}")
+            added.append(node)
+        return added
+
     def start_node(self, node: Node) -> bool:
         """
         Start a stopped antctl node.
@@ -261,25 +409,52 @@ class AntctlManager(ProcessManager):
             True if node started successfully
         """
         logging.info(f"Starting antctl node {node.id} ({node.service})")
+        return self.start_nodes([node])
 
-        # Check if node is already responding on metadata port
-        metadata = read_node_metadata(node.host, node.metrics_port)
-        if isinstance(metadata, dict) and metadata.get("status") == RUNNING:
-            logging.warning(
-                f"Node {node.id} already responding on metadata port {node.metrics_port}, "
-                "skipping start to avoid duplicate process"
-            )
+    def start_nodes(self, nodes: List[Node]) -> bool:
+        """
+        Start several stopped antctl nodes with a single antctl call.
+
+        Args:
+            nodes: Node database records
+
+        Returns:
+            True if all nodes started successfully
+        """
+        services = self.status.services()
+        to_start = []
+        for node in nodes:
+            if services is not None:
+                running = services.get(node.service, {}).get("status") == "Running"
+            else:
+                # No antctl status, check if node is responding on metadata port
+                metadata = read_node_metadata(node.host, node.metrics_port)
+                running = isinstance(metadata, dict) and metadata.get("status") == RUNNING
+            if running:
+                logging.warning(
+                    f"Node {node.id} ({node.service}) is already running, "
+                    "skipping start to avoid duplicate process"
+                )
+                continue
+            to_start.append(node)
+        return self._start_services(to_start)
+
+    def _start_services(self, nodes: List[Node]) -> bool:
+        """Start antctl services with one antctl call, without the running check"""
+        if not nodes:
             return True
 
         try:
-            self._run_antctl(["start", "--service-name", node.service])
-            # Open firewall port
-            self.enable_firewall_port(node.port)
-            return True
+            self._run_antctl(["start"] + self._service_name_args(nodes))
         except (subprocess.CalledProcessError, FileNotFoundError) as err:
             logging.error(f"Failed to start antctl node: {err}")
             return False
 
+        # Open firewall ports
+        for node in nodes:
+            self.enable_firewall_port(node.port)
+        return True
+
     def stop_node(self, node: Node) -> bool:
         """
         Stop a running antctl node.
@@ -291,16 +466,32 @@ class AntctlManager(ProcessManager):
             True if node stopped successfully
         """
         logging.info(f"Stopping antctl node {node.id} ({node.service})")
+        return self.stop_nodes([node])
 
-        try:
-            self._run_antctl(["stop", "--service-name", node.service])
-            # Close firewall port
-            self.disable_firewall_port(node.port)
+    def stop_nodes(self, nodes: List[Node]) -> bool:
+        """
+        Stop several running antctl nodes with a single antctl call.
+
+        Args:
+            nodes: Node database records
+
+        Returns:
+            True if all nodes stopped successfully
+        """
+        if not nodes:
             return True
+
+        try:
+            self._run_antctl(["stop"] + self._service_name_args(nodes))
         except (subprocess.CalledProcessError, FileNotFoundError) as err:
             logging.error(f"Failed to stop antctl node: {err}")
             return False
 
+        # Close firewall ports
+        for node in nodes:
+            self.disable_firewall_port(node.port)
+        return True
+
     def restart_node(self, node: Node) -> bool:
         """
         Restart an antctl node (stop then start).
@@ -337,24 +528,27 @@ class AntctlManager(ProcessManager):
             True if node upgrade succeeded
         """
         logging.info(f"Upgrading antctl node {node.id} ({node.service}) to version {new_version or 'latest'}")
+        return self.upgrade_nodes([node], new_version)
 
-        # Get machine config to find antnode_path
-        machine_config = None
-        if self.S:
-            from wnm.config import S
-            from wnm.models import Machine
-            from sqlalchemy import select
+    def upgrade_nodes(self, nodes: List[Node], new_version: str = None) -> bool:
+        """
+        Upgrade several antctl nodes with a single antctl upgrade call.
 
-            try:
-                with S() as session:
-                    result = session.execute(select(Machine)).first()
-                    if result:
-                        machine_config = result[0]
-            except Exception as e:
-                logging.warning(f"Failed to get machine config: {e}")
+        Args:
+            nodes: Node database records
+            new_version: Optional version to upgrade to (not used, kept for compatibility)
+
+        Returns:
+            True if the nodes were upgraded successfully
+        """
+        if not nodes:
+            return True
+
+        # Get machine config to find antnode_path
+        machine_config = self._get_machine_config()
 
         # Build antctl upgrade command
-        args = ["upgrade", "--service-name", node.service]
+        args = ["upgrade"] + self._service_name_args(nodes)
 
         # Add path to binary from machine config
         # This tells antctl where to find the binary instead of downloading
@@ -374,7 +568,9 @@ class AntctlManager(ProcessManager):
 
         try:
             result = self._run_antctl(args)
-            logging.info(f"Successfully upgraded node {node.id}: {result.stdout}")
+            logging.info(
+                f"Successfully upgraded nodes {', '.join(str(node.id) for node in nodes)}: {result.stdout}"
+            )
             return True
         except (subprocess.CalledProcessError, FileNotFoundError) as err:
             logging.error(f"Failed to upgrade antctl node: {err}")
@@ -382,13 +578,9 @@ class AntctlManager(ProcessManager):
 
     def get_status(self, node: Node) -> NodeProcess:
         """
-        Get current status of an antctl node.
-
-        NOTE: This method is required by the ProcessManager interface but is NOT
-        actually called by the executor. The executor determines status by calling
-        read_node_metadata() directly on the metrics port.
+        Get current status of an antctl node from the status snapshot.
 
-        This is a minimal stub implementation.
+        Falls back to the node's metadata port if antctl status failed.
 
         Args:
             node: Node database record
@@ -396,19 +588,24 @@ class AntctlManager(ProcessManager):
         Returns:
             NodeProcess with current status
         """
-        # Simple implementation: Just check if metrics port responds
-        metadata = read_node_metadata(node.host, node.metrics_port)
-
-        if isinstance(metadata, dict) and metadata.get("status") == RUNNING:
-            status = RUNNING
+        services = self.status.services()
+        pid = None
+        if services is not None:
+            entry = services.get(node.service) or {}
+            status = ANTCTL_STATUS_MAP.get(entry.get("status"), STOPPED)
+            pid = entry.get("pid") if status == RUNNING else None
         else:
-            # Check if root directory exists
-            if not os.path.isdir(node.root_dir):
-                status = DEAD
+            metadata = read_node_metadata(node.host, node.metrics_port)
+            if isinstance(metadata, dict) and metadata.get("status") == RUNNING:
+                status = RUNNING
             else:
                 status = STOPPED
 
-        return NodeProcess(node_id=node.id, status=status)
+        # Check if root directory exists
+        if status != RUNNING and not os.path.isdir(node.root_dir):
+            status = DEAD
+
+        return NodeProcess(node_id=node.id, pid=pid, status=status)
 
     def remove_node(self, node: Node) -> bool:
         """
@@ -421,13 +618,27 @@ class AntctlManager(ProcessManager):
             True if node was removed successfully
         """
         logging.info(f"Removing antctl node {node.id} ({node.service})")
+        return self.remove_nodes([node])
+
+    def remove_nodes(self, nodes: List[Node]) -> bool:
+        """
+        Stop and remove several antctl nodes with one stop and one remove call.
+
+        Args:
+            nodes: Node database records
+
+        Returns:
+            True if the nodes were removed successfully
+        """
+        if not nodes:
+            return True
 
-        # Stop node first
-        self.stop_node(node)
+        # Stop nodes first
+        self.stop_nodes(nodes)
 
         # Remove via antctl
         try:
-            self._run_antctl(["remove", "--service-name", node.service])
+            self._run_antctl(["remove"] + self._service_name_args(nodes))
             return True
         except (subprocess.CalledProcessError, FileNotFoundError) as err:
             logging.error(f"Failed to remove antctl node: {err}")
@@ -437,8 +648,8 @@ class AntctlManager(ProcessManager):
         """
         Survey all antctl-managed nodes.
 
-        Uses 'antctl status --json' to discover existing nodes and collect
-        their configuration and current status.
+        Reads the 'antctl status --json' snapshot to discover existing
+        nodes and collect their configuration and current status.
 
         Args:
             machine_config: Machine configuration object
@@ -448,22 +659,8 @@ class AntctlManager(ProcessManager):
         """
         logging.info("Surveying antctl nodes")
 
-        try:
-            result = self._run_antctl(["status", "--json"])
-
-            # Extract JSON block from debug output
-            # When --debug is enabled, stdout contains logging mixed with JSON
-            # JSON starts with a line containing just "{" and ends with just "}"
-            json_match = re.search(r'^\{$.*?^\}$', result.stdout, re.MULTILINE | re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-            else:
-                # No debug output, use entire stdout
-                json_str = result.stdout
-
-            nodes_data = json.loads(json_str)
-        except (subprocess.CalledProcessError, FileNotFoundError, json.JSONDecodeError) as err:
-            logging.error(f"Failed to get antctl status: {err}")
+        nodes_data = self.status.document()
+        if nodes_data is None:
             return []
 
         if not nodes_data or not isinstance(nodes_data, dict):
@@ -513,6 +710,66 @@ class AntctlManager(ProcessManager):
         logging.debug(f"Could not extract service name from output: {output}")
         return None
 
+    def _extract_service_names_from_output(self, output: str) -> List[str]:
+        """
+        Parse antctl add output to find every created service name, in order.
+
+        Args:
+            output: stdout from antctl add command
+
+        Returns:
+            Service names (e.g., ["antnode1", "antnode2"])
+        """
+        names = re.findall(r"✓\s+(antnode\d+)\s*$", output, re.MULTILINE)
+        if not names:
+            # Older antctl output only names the service in a sentence
+            name = self._extract_service_name_from_output(output)
+            names = [name] if name else []
+        return names
+
+    def _parse_node_config_from_add_output(self, output: str, service_name: str) -> Optional[dict]:
+        """
+        Parse antctl add output to extract one service's configuration paths.
+
+        Example output format:
+        Services Added:
+         ✓ antnode1
+            - Antnode path: /var/antctl/services/antnode1/antnode
+            - Data path: /var/antctl/services/antnode1
+            - Log path: /var/log/antnode/antnode1
+            - RPC port: 127.0.0.1:30001
+
+        Args:
+            output: stdout from antctl add command
+            service_name: The service name to look for (e.g., "antnode1")
+
+        Returns:
+            Dictionary with keys: binary, root_dir, log_dir, or None if parsing failed
+        """
+        match = re.search(rf"✓\s+{re.escape(service_name)}\s*\n", output)
+        if not match:
+            logging.debug(f"Could not find service {service_name} in antctl add output")
+            return None
+
+        # This service's lines end at the next service (or the end of output)
+        start_pos = match.end()
+        next_service = re.search(r"✓\s+antnode\d+", output[start_pos:])
+        if next_service:
+            section = output[start_pos:start_pos + next_service.start()]
+        else:
+            section = output[start_pos:]
+
+        config = {}
+        for key, label in (("binary", "Antnode path"), ("root_dir", "Data path"), ("log_dir", "Log path")):
+            line = re.search(rf"-\s+{label}:\s+(.+)$", section, re.MULTILINE)
+            if line:
+                config[key] = line.group(1).strip()
+
+        # Verify we got the essential paths
+        if not config.get("root_dir"):
+            return None
+        return config
+
     def _parse_status_json(self, json_data: dict, machine_config) -> list:
         """
         Parse antctl status --json output to extract node details.
@@ -0,0 +1,103 @@
+"""
+Run-scoped snapshot of `antctl status --json`.
+
+Every antctl invocation forks antctl and loads its node registry. The
+antctl managers read node state (status lookups, the start guard and
+imports) from one shared snapshot instead, fetched at most once per cycle
+and dropped whenever a mutating antctl command runs.
+"""
+
+import json
+import logging
+import re
+import subprocess
+import threading
+from typing import Callable, Dict, Optional
+
+# antctl subcommands that change node state and so invalidate the snapshot
+MUTATING_COMMANDS = {"add", "start", "stop", "remove", "upgrade", "reset"}
+
+
+def parse_status_output(output: str) -> dict:
+    """
+    Decode `antctl status --json` output.
+
+    Args:
+        output: stdout of antctl status --json
+
+    Returns:
+        The decoded status document
+
+    Raises:
+        json.JSONDecodeError: If no JSON document can be found
+    """
+    try:
+        return json.loads(output)
+    except json.JSONDecodeError:
+        # When --debug is enabled, stdout contains logging mixed with JSON
+        # JSON starts with a line containing just "{" and ends with just "}"
+        json_match = re.search(r"^\{$.*?^\}$", output, re.MULTILINE | re.DOTALL)
+        if not json_match:
+            raise
+        return json.loads(json_match.group(0))
+
+
+class AntctlStatus:
+    """Cached `antctl status --json` shared by every call of one manager"""
+
+    def __init__(self, run: Callable[[list], subprocess.CompletedProcess]):
+        """
+        Args:
+            run: The manager's antctl runner (counts and logs the invocation)
+        """
+        self._run = run
+        self._lock = threading.Lock()
+        self._document = None
+        # A failed fetch is not retried until the snapshot is invalidated
+        self._failed = False
+
+    def invalidate(self):
+        """Drop the snapshot; the next lookup fetches a fresh one."""
+        with self._lock:
+            self._document = None
+            self._failed = False
+
+    def document(self) -> Optional[dict]:
+        """
+        The decoded status document, fetched on first use.
+
+        Returns:
+            Status document, or None if antctl status failed
+        """
+        with self._lock:
+            if self._document is None and not self._failed:
+                try:
+                    result = self._run(["status", "--json"])
+                    document = parse_status_output(result.stdout)
+                except (
+                    subprocess.CalledProcessError,
+                    FileNotFoundError,
+                    json.JSONDecodeError,
+                ) as err:
+                    logging.error(f"Failed to get antctl status: {err}")
+                    self._failed = True
+                    return None
+                self._document = document if isinstance(document, dict) else {}
+            return self._document
+
+    def services(self) -> Optional[Dict[str, dict]]:
+        """
+        Status entries by service name.
+
+        Returns:
+            Mapping of service name to its antctl status entry, or None if
+            antctl status failed
+        """
+        document = self.document()
+        if document is None:
+            return None
+        return {
+            entry.get("service_name"): entry
+            for entry in document.get("nodes", [])
+            if entry.get("service_name")
+        }
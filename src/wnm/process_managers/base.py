@@ -5,12 +5,19 @@ Process managers handle node lifecycle operations across different
 execution environments (systemd, docker, setsid, etc.)
 """
 
+import logging
+import subprocess
+import threading
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, List, Optional
 
+from wnm.binary_store import get_binary_store
+from wnm.firewall.base import FirewallManager
 from wnm.firewall.factory import get_firewall_manager
+from wnm.firewall.port_range import PortRangeFirewall
 from wnm.models import Node
+from wnm.run_context import RunContext
 
 
 @dataclass
@@ -34,8 +41,16 @@ class ProcessManager(ABC):
     - SetsidManager: Background processes via setsid
     - AntctlManager: Wrapper around antctl CLI
     - LaunchdManager: macOS launchd services
+    - S6OverlayManager: s6 services packed into shared Docker containers
     """
 
+    # RunContext that created this manager (set by RunContext.manager), or
+    # the manager's own one when it is used standalone
+    context = None
+    # Range wrapper around self.firewall while firewall_range_block is set
+    _range_firewall = None
+    _range_firewall_lock = threading.Lock()
+
     def __init__(self, firewall_type: str = None):
         """
         Initialize process manager with optional firewall manager.
@@ -46,6 +61,23 @@ class ProcessManager(ABC):
         """
         self.firewall = get_firewall_manager(firewall_type)
 
+    def _get_machine_config(self):
+        """
+        Machine settings for node options (no_upnp, antnode_path, ...).
+
+        Managers created by a RunContext read its per-cycle snapshot. A
+        manager used on its own gets a RunContext of its own over its
+        session factory, so the Machine record is loaded once.
+
+        Returns:
+            MachineSnapshot, or None
+        """
+        if self.context is None:
+            if not getattr(self, "S", None):
+                return None
+            self.context = RunContext(self.S)
+        return self.context.machine
+
     @abstractmethod
     def create_node(self, node: Node, binary_path: str) -> Optional[NodeProcess]:
         """
@@ -61,6 +93,46 @@ class ProcessManager(ABC):
         """
         pass
 
+    def create_nodes(
+        self, nodes: List[Node], binary_path: str
+    ) -> List[Optional[NodeProcess]]:
+        """
+        Create and start several new nodes.
+
+        The default implementation calls create_node for each node.
+        Managers that can create many nodes at once override it.
+
+        Args:
+            nodes: Node database records with configuration
+            binary_path: Path to the node binary to execute
+
+        Returns:
+            One NodeProcess (or None if that node failed) per node, in order
+        """
+        return [self.create_node(node, binary_path) for node in nodes]
+
+    def install_binary(self, source: str, dest: str, sudo: bool = False) -> bool:
+        """
+        Place the antnode binary for a node, linked from the binary store.
+
+        The binary at dest (if any) is replaced atomically, never written in
+        place, since it may be shared with other nodes.
+
+        Args:
+            source: Path to the antnode binary to install
+            dest: Node binary path
+            sudo: Install through sudo (system-wide nodes)
+
+        Returns:
+            True if the binary was installed
+        """
+        try:
+            get_binary_store(sudo).install(source, dest)
+        except (OSError, subprocess.CalledProcessError) as err:
+            logging.error(f"Failed to install binary {source} at {dest}: {err}")
+            return False
+        return True
+
     @abstractmethod
     def start_node(self, node: Node) -> bool:
         """
@@ -113,6 +185,21 @@ class ProcessManager(ABC):
         """
         pass
 
+    def get_statuses(self, nodes: List[Node]) -> Dict[int, NodeProcess]:
+        """
+        Get current runtime status of several nodes.
+
+        The default implementation calls get_status for each node.
+        Managers that can query every node at once override it.
+
+        Args:
+            nodes: Node database records
+
+        Returns:
+            NodeProcess of each node by node id
+        """
+        return {node.id: self.get_status(node) for node in nodes}
+
     @abstractmethod
     def remove_node(self, node: Node) -> bool:
         """
@@ -131,6 +218,63 @@ class ProcessManager(ABC):
         """
         pass
 
+    def start_nodes(self, nodes: List[Node]) -> bool:
+        """
+        Start several stopped nodes.
+
+        The default implementation calls start_node for each node.
+        Managers that can act on many nodes at once override it.
+
+        Args:
+            nodes: Node database records
+
+        Returns:
+            True if all nodes started successfully
+        """
+        started = True
+        for node in nodes:
+            if not self.start_node(node):
+                started = False
+        return started
+
+    def stop_nodes(self, nodes: List[Node]) -> bool:
+        """
+        Stop several running nodes.
+
+        The default implementation calls stop_node for each node.
+        Managers that can act on many nodes at once override it.
+
+        Args:
+            nodes: Node database records
+
+        Returns:
+            True if all nodes stopped successfully
+        """
+        stopped = True
+        for node in nodes:
+            if not self.stop_node(node):
+                stopped = False
+        return stopped
+
+    def remove_nodes(self, nodes: List[Node]) -> bool:
+        """
+        Stop and remove several nodes.
+
+        The default implementation calls remove_node for each node.
+        Managers that can act on many nodes at once override it.
+
+        Args:
+            nodes: Node database records
+
+        Returns:
+            True if all nodes were removed successfully
+        """
+        removed = True
+        for node in nodes:
+            if not self.remove_node(node):
+                removed = False
+        return removed
+
     @abstractmethod
     def survey_nodes(self, machine_config) -> list:
         """
@@ -151,13 +295,44 @@ class ProcessManager(ABC):
         """
         pass
 
+    def _port_firewall(self) -> FirewallManager:
+        """
+        Firewall manager node ports are opened and closed through.
+
+        With firewall_range_block set, node ports are covered by port-range
+        rules of that many node ids each (see PortRangeFirewall) and the
+        wrapper is kept until port_start or the block size changes.
+
+        Returns:
+            PortRangeFirewall in range mode, otherwise self.firewall
+        """
+        machine_config = self._get_machine_config()
+        block_size = getattr(machine_config, "firewall_range_block", 0) or 0
+        port_start = getattr(machine_config, "port_start", 0) or 0
+        # A reconciling backend already changes no rules per node
+        reconciles = getattr(self.firewall, "reconciles", False) is True
+        if block_size <= 0 or port_start <= 0 or reconciles:
+            return self.firewall
+
+        with self._range_firewall_lock:
+            if (
+                self._range_firewall is None
+                or self._range_firewall.firewall is not self.firewall
+                or self._range_firewall.key != (port_start, block_size)
+            ):
+                self._range_firewall = PortRangeFirewall(
+                    self.firewall, port_start, block_size
+                )
+            return self._range_firewall
+
     def enable_firewall_port(
         self, port: int, protocol: str = "udp", comment: str = None
     ) -> bool:
         """
         Open firewall port for node communication.
 
-        Uses the configured firewall manager to open the port.
+        Uses the configured firewall manager to open the port, or makes
+        sure its port range rule exists in range mode.
         Subclasses can override for custom firewall behavior.
 
         Args:
@@ -168,13 +343,14 @@ class ProcessManager(ABC):
         Returns:
             True if port was opened successfully
         """
-        return self.firewall.enable_port(port, protocol, comment)
+        return self._port_firewall().enable_port(port, protocol, comment)
 
     def disable_firewall_port(self, port: int, protocol: str = "udp") -> bool:
         """
         Close firewall port when node is removed.
 
-        Uses the configured firewall manager to close the port.
+        Uses the configured firewall manager to close the port; in range
+        mode the port stays open in its range rule.
         Subclasses can override for custom firewall behavior.
 
         Args:
@@ -184,7 +360,15 @@ class ProcessManager(ABC):
         Returns:
             True if port was closed successfully
         """
-        return self.firewall.disable_port(port, protocol)
+        return self._port_firewall().disable_port(port, protocol)
+
+    def begin_cycle(self) -> None:
+        """
+        Reset state a long-lived manager keeps for one cycle.
+
+        Called by the executor before each cycle's actions. Managers that
+        cache per-cycle state (e.g. the antctl status snapshot) override it.
+        """
 
     def teardown_cluster(self) -> bool:
         """
@@ -203,3 +387,20 @@ class ProcessManager(ABC):
             False to indicate fallback to individual node removal
         """
         return False
+
+
+def has_native_batch(manager, method: str) -> bool:
+    """
+    Check whether a manager overrides a batch method with a native one.
+
+    Args:
+        manager: Process manager instance
+        method: Batch method name (create_nodes, start_nodes, stop_nodes,
+            remove_nodes or upgrade_nodes)
+
+    Returns:
+        True if the manager acts on several nodes at once, False if it
+        would only loop over the per-node method
+    """
+    batch = getattr(type(manager), method, None)
+    return batch is not None and batch is not getattr(ProcessManager, method, None)
@@ -0,0 +1,365 @@
+"""
+Minimal Docker Engine API client over the daemon's Unix socket.
+
+DockerManager uses it instead of running the docker CLI for every
+operation. Requests go over persistent HTTP/1.1 connections (one per
+thread, reopened once if the daemon closed an idle one), node containers
+are listed with a single label-filtered containers/json call, and an
+image is only looked up until it has been seen once. Commands run inside
+containers through the exec endpoints.
+
+Only the handful of endpoints wnm needs are implemented; no docker SDK is
+required.
+"""
+
+import http.client
+import json
+import logging
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote, urlencode
+
+DEFAULT_SOCKET = "/var/run/docker.sock"
+# Engine API version (Docker 20.10 and later)
+API_VERSION = "v1.41"
+# Label carrying the wnm node id on every container wnm creates
+NODE_LABEL = "wnm.node"
+# Seconds added to a stop timeout for the HTTP request itself
+STOP_GRACE = 30
+# Containers stopped at the same time by stop_containers
+STOP_WORKERS = 8
+
+
+class DockerAPIError(Exception):
+    """Error response from the Docker daemon."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+        self.message = message
+
+
+def socket_path() -> Optional[str]:
+    """Docker daemon socket from DOCKER_HOST, or the default socket.
+
+    Returns:
+        Socket path, or None if DOCKER_HOST points at a non-unix endpoint
+    """
+    host = os.environ.get("DOCKER_HOST", "")
+    if not host:
+        return DEFAULT_SOCKET
+    if host.startswith("unix://"):
+        return host[len("unix://"):]
+    return None
+
+
+def demux_stream(data: bytes) -> Tuple[str, str]:
+    """Split a multiplexed exec/attach stream into stdout and stderr.
+
+    Without a TTY the daemon prefixes every chunk with an 8-byte header:
+    the stream type (1 stdout, 2 stderr), three zero bytes and the chunk
+    size as a big-endian 32-bit integer.
+
+    Returns:
+        Tuple of (stdout, stderr) text
+    """
+    streams = {1: bytearray(), 2: bytearray()}
+    offset = 0
+    while offset + 8 <= len(data):
+        kind = data[offset]
+        size = int.from_bytes(data[offset + 4:offset + 8], "big")
+        if kind not in (0, 1, 2) or data[offset + 1:offset + 4] != b"\0\0\0":
+            break
+        streams[2 if kind == 2 else 1] += data[offset + 8:offset + 8 + size]
+        offset += 8 + size
+    # Anything not framed (a TTY stream) is plain stdout
+    streams[1] += data[offset:]
+    return (
+        streams[1].decode(errors="replace"),
+        streams[2].decode(errors="replace"),
+    )
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection to a Unix domain socket."""
+
+    def __init__(self, path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+class DockerAPI:
+    """Docker Engine API requests over keep-alive Unix socket connections."""
+
+    def __init__(self, path: str = None, timeout: float = 60):
+        """
+        Args:
+            path: Daemon socket path (default from DOCKER_HOST or /var/run/docker.sock)
+            timeout: Seconds to wait for a response
+        """
+        self.path = path or socket_path() or DEFAULT_SOCKET
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        # Images known to be present locally
+        self._images = set()
+
+    def _connection(self) -> UnixHTTPConnection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = UnixHTTPConnection(self.path, self.timeout)
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def _drop_connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+            with self._lock:
+                if connection in self._connections:
+                    self._connections.remove(connection)
+
+    def close(self):
+        """Close every connection opened by this client."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        query: Dict = None,
+        body: Dict = None,
+        timeout: float = None,
+        raw: bool = False,
+    ) -> Tuple[int, object]:
+        """Send one API request.
+
+        Args:
+            method: HTTP method
+            path: Endpoint path without the version prefix (e.g. /containers/json)
+            query: Query string parameters
+            body: JSON request body
+            timeout: Response timeout for this request (default: client timeout)
+            raw: Return a successful response body as bytes, undecoded
+
+        Returns:
+            Tuple of (HTTP status, decoded JSON body, raw text or bytes)
+
+        Raises:
+            DockerAPIError: If the daemon answers with an error status
+            OSError: If the daemon cannot be reached
+        """
+        url = f"/{API_VERSION}{path}"
+        if query:
+            url += "?" + urlencode(query)
+        payload = None
+        headers = {}
+        if body is not None:
+            payload = json.dumps(body).encode()
+            headers["Content-Type"] = "application/json"
+
+        for attempt in range(2):
+            connection = self._connection()
+            connection.timeout = timeout or self.timeout
+            if connection.sock is not None:
+                connection.sock.settimeout(connection.timeout)
+            try:
+                connection.request(method, url, body=payload, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+                break
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                # The daemon closed an idle keep-alive connection; reopen once
+                self._drop_connection()
+                if attempt:
+                    raise
+            except (OSError, http.client.HTTPException):
+                self._drop_connection()
+                raise
+
+        if raw and response.status < 400:
+            return response.status, data
+        decoded = data.decode(errors="replace")
+        if response.getheader("Content-Type", "").startswith("application/json") and data:
+            try:
+                decoded = json.loads(decoded)
+            except ValueError:
+                # Streamed progress (image pulls) is one JSON object per line
+                pass
+        if response.status >= 400:
+            message = decoded.get("message", "") if isinstance(decoded, dict) else decoded
+            raise DockerAPIError(response.status, message.strip())
+        return response.status, decoded
+
+    def ping(self) -> bool:
+        """Check the daemon answers."""
+        return self.request("GET", "/_ping")[0] == 200
+
+    def ensure_image(self, image: str) -> bool:
+        """Make sure an image is present locally, pulling it if needed.
+
+        The lookup is skipped once the image has been seen.
+        """
+        if image in self._images:
+            return True
+        try:
+            self.request("GET", f"/images/{quote(image, safe='')}/json")
+        except DockerAPIError as err:
+            if err.status != 404:
+                raise
+            logging.info(f"Pulling Docker image: {image}")
+            name, _, tag = image.rpartition(":")
+            if not name or "/" in tag:
+                name, tag = image, "latest"
+            _, progress = self.request(
+                "POST", "/images/create", {"fromImage": name, "tag": tag}, timeout=600
+            )
+            # Pull errors are reported in the progress stream
+            for line in str(progress).splitlines():
+                if '"error"' in line:
+                    raise DockerAPIError(500, json.loads(line).get("error", line))
+        self._images.add(image)
+        return True
+
+    def create_container(self, name: str, config: Dict) -> str:
+        """Create a container and return its id."""
+        _, created = self.request("POST", "/containers/create", {"name": name}, config)
+        return created["Id"]
+
+    def start_container(self, name: str) -> bool:
+        """Start a container (already running counts as started)."""
+        self.request("POST", f"/containers/{quote(name)}/start")
+        return True
+
+    def start_containers(self, names: List[str]) -> bool:
+        """Start several containers over the same connection."""
+        return all(self.start_container(name) for name in names)
+
+    def stop_container(self, name: str, timeout: int = 30) -> bool:
+        """Stop a container, killing it after timeout seconds."""
+        self.request(
+            "POST",
+            f"/containers/{quote(name)}/stop",
+            {"t": timeout},
+            timeout=timeout + STOP_GRACE,
+        )
+        return True
+
+    def _stop_in_worker(self, name: str, timeout: int) -> bool:
+        """stop_container() on a pool thread, closing the thread's connection after."""
+        try:
+            return self.stop_container(name, timeout)
+        finally:
+            self._drop_connection()
+
+    def stop_containers(self, names: List[str], timeout: int = 30) -> bool:
+        """Stop several containers at the same time.
+
+        The Engine API stops one container per request, so the requests are
+        sent concurrently (one connection per request, closed when it
+        completes) and the batch shares one graceful shutdown timeout.
+
+        Returns:
+            True if every container stopped
+        """
+        if len(names) < 2:
+            return all(self.stop_container(name, timeout) for name in names)
+        with ThreadPoolExecutor(
+            max_workers=min(len(names), STOP_WORKERS), thread_name_prefix="wnm-docker"
+        ) as pool:
+            futures = [pool.submit(self._stop_in_worker, name, timeout) for name in names]
+        stopped = True
+        for name, future in zip(names, futures):
+            try:
+                future.result()
+            except DockerAPIError as err:
+                logging.error(f"Failed to stop container {name}: {err}")
+                stopped = False
+        return stopped
+
+    def restart_container(self, name: str, timeout: int = 30) -> bool:
+        """Restart a container."""
+        self.request(
+            "POST",
+            f"/containers/{quote(name)}/restart",
+            {"t": timeout},
+            timeout=timeout + STOP_GRACE,
+        )
+        return True
+
+    def remove_container(self, name: str) -> bool:
+        """Force-remove a container (a missing container counts as removed)."""
+        try:
+            self.request("DELETE", f"/containers/{quote(name)}", {"force": "true"})
+        except DockerAPIError as err:
+            if err.status != 404:
+                raise
+        return True
+
+    def remove_containers(self, names: List[str]) -> bool:
+        """Force-remove several containers over the same connection."""
+        return all(self.remove_container(name) for name in names)
+
+    def inspect_container(self, name: str) -> Optional[Dict]:
+        """Container details, or None if it does not exist."""
+        try:
+            return self.request("GET", f"/containers/{quote(name)}/json")[1]
+        except DockerAPIError as err:
+            if err.status == 404:
+                return None
+            raise
+
+    def list_containers(self, label: str = NODE_LABEL) -> List[Dict]:
+        """Every container (running or not) carrying label."""
+        filters = json.dumps({"label": [label]})
+        return self.request("GET", "/containers/json", {"all": "true", "filters": filters})[1]
+
+    def exec_run(self, name: str, cmd: List[str], timeout: float = None) -> Tuple[int, str, str]:
+        """Run a command inside a running container and wait for it to exit.
+
+        Args:
+            name: Container name or id
+            cmd: Command and arguments
+            timeout: Seconds to wait for the command (default: client timeout)
+
+        Returns:
+            Tuple of (exit code, stdout, stderr)
+        """
+        _, created = self.request(
+            "POST",
+            f"/containers/{quote(name)}/exec",
+            body={"Cmd": cmd, "AttachStdout": True, "AttachStderr": True},
+        )
+        exec_id = created["Id"]
+        _, output = self.request(
+            "POST",
+            f"/exec/{exec_id}/start",
+            body={"Detach": False, "Tty": False},
+            timeout=timeout,
+            raw=True,
+        )
+        stdout, stderr = demux_stream(output)
+        details = self.request("GET", f"/exec/{exec_id}/json")[1]
+        exit_code = details.get("ExitCode")
+        return (-1 if exit_code is None else exit_code), stdout, stderr
@@ -3,19 +3,41 @@ DockerManager: Manage nodes in Docker containers.
 
 This manager runs nodes inside Docker containers, allowing for better isolation
 and resource management. Supports both single-node and multi-node containers.
+
+When the Docker daemon socket is available, containers are managed through
+the Engine API over a persistent connection (see docker_api.py) instead of
+a docker CLI process per operation. If the daemon cannot be reached the
+manager falls back to the CLI for the rest of its lifetime.
 """
 
 import logging
 import os
 import re
+import http.client
 import subprocess
 import time
 from pathlib import Path
+from typing import Dict, List
 
 from wnm.common import DEAD, RESTARTING, RUNNING, STOPPED, UPGRADING
 from wnm.config import BOOTSTRAP_CACHE_DIR
 from wnm.models import Node
 from wnm.process_managers.base import NodeProcess, ProcessManager
+from wnm.process_managers.docker_api import (
+    NODE_LABEL,
+    DockerAPI,
+    DockerAPIError,
+    socket_path,
+)
+
+# Docker container state -> node status
+DOCKER_STATUS_MAP = {
+    "running": RUNNING,
+    "created": RESTARTING,
+    "restarting": RESTARTING,
+    "exited": STOPPED,
+    "dead": STOPPED,
+}
 
 
 class DockerManager(ProcessManager):
@@ -26,6 +48,7 @@ class DockerManager(ProcessManager):
         session_factory=None,
         image="autonomi/node:latest",
         firewall_type: str = "null",
+        transport: str = None,
     ):
         """
         Initialize DockerManager.
@@ -34,17 +57,55 @@ class DockerManager(ProcessManager):
             session_factory: SQLAlchemy session factory (optional, for status updates)
             image: Docker image to use for nodes
             firewall_type: Type of firewall (defaults to "null" for Docker)
+            transport: "api" for the Engine API, "cli" for the docker CLI
+                (default: the API when the daemon socket exists)
         """
         super().__init__(firewall_type)
         self.S = session_factory
         self.image = image
+        # Image known to be present, so it is not looked up again
+        self._image_ready = False
+        # Engine API client (None uses the docker CLI)
+        self.api = None
+        if transport != "cli":
+            path = socket_path()
+            if path and (transport == "api" or os.path.exists(path)):
+                self.api = DockerAPI(path)
+
+    def _docker_api(self, operation: str, *args):
+        """Run a DockerAPI operation.
+
+        Returns:
+            The operation result, False if the daemon refused it, or None if
+            the API is not in use or unreachable (the caller then uses the CLI)
+        """
+        api = self.api
+        if api is None:
+            return None
+        try:
+            return getattr(api, operation)(*args)
+        except DockerAPIError as err:
+            # The operation itself failed, the CLI would fail too
+            logging.error(f"Docker {operation} failed: {err}")
+            return False
+        except (OSError, ValueError, http.client.HTTPException) as err:
+            logging.warning(f"Docker Engine API failed ({err}), using the docker CLI")
+        api.close()
+        self.api = None
+        return None
 
     def _get_container_name(self, node: Node) -> str:
         """Get Docker container name for a node"""
         return f"antnode{node.node_name}"
 
     def _ensure_image(self) -> bool:
-        """Ensure Docker image is available"""
+        """Ensure Docker image is available (checked once per manager)"""
+        if self._image_ready:
+            return True
+        ready = self._docker_api("ensure_image", self.image)
+        if ready is not None:
+            self._image_ready = bool(ready)
+            return self._image_ready
         try:
             # Check if image exists locally
             result = subprocess.run(
@@ -52,15 +113,14 @@ class DockerManager(ProcessManager):
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
             )
-            if result.returncode == 0:
-                return True
-
-            # Pull image if not found
-            logging.info(f"Pulling Docker image: {self.image}")
-            subprocess.run(
-                ["docker", "pull", self.image],
-                check=True,
-            )
+            if result.returncode != 0:
+                # Pull image if not found
+                logging.info(f"Pulling Docker image: {self.image}")
+                subprocess.run(
+                    ["docker", "pull", self.image],
+                    check=True,
+                )
+            self._image_ready = True
             return True
 
         except subprocess.CalledProcessError as err:
@@ -94,6 +154,88 @@ class DockerManager(ProcessManager):
 
         container_name = self._get_container_name(node)
 
+        if self.api is not None:
+            container_id = self._create_container(node, container_name, binary_path)
+            if container_id is False:
+                return None
+        else:
+            container_id = None
+        if container_id is None:
+            container_id = self._run_container(node, container_name, binary_path)
+            if container_id is None:
+                return None
+
+        # Wait a moment for container to start
+        time.sleep(1)
+
+        # Return NodeProcess with container_id for persistence by executor
+        return NodeProcess(
+            node_id=node.id,
+            status=RESTARTING,  # Container is starting up
+            container_id=container_id,
+        )
+
+    def _node_command(self, node: Node) -> list:
+        """antnode command line inside the container"""
+        return [
+            "antnode",
+            "--root-dir",
+            "/data",
+            "--port",
+            str(node.port),
+            "--enable-metrics-server",
+            "--metrics-server-port",
+            str(node.metrics_port),
+            "--bootstrap-cache-dir",
+            "/bootstrap-cache",
+            "--rewards-address",
+            node.wallet,
+            node.network,
+        ]
+
+    def _create_container(self, node: Node, container_name: str, binary_path: str):
+        """
+        Create and start a node container through the Engine API.
+
+        Returns:
+            Container id, False if the daemon refused, or None to use the CLI
+        """
+        udp_port = f"{node.port}/udp"
+        metrics_port = f"{node.metrics_port}/tcp"
+        config = {
+            "Image": self.image,
+            "Cmd": self._node_command(node),
+            "Env": node.environment.split() if node.environment else [],
+            "Labels": {NODE_LABEL: str(node.id)},
+            "ExposedPorts": {udp_port: {}, metrics_port: {}},
+            "HostConfig": {
+                "Binds": [
+                    f"{node.root_dir}:/data",
+                    f"{binary_path}:/usr/local/bin/antnode:ro",
+                    f"{BOOTSTRAP_CACHE_DIR}:/bootstrap-cache:ro",
+                ],
+                "PortBindings": {
+                    udp_port: [{"HostPort": str(node.port)}],
+                    metrics_port: [{"HostPort": str(node.metrics_port)}],
+                },
+                "RestartPolicy": {"Name": "unless-stopped"},
+            },
+        }
+        container_id = self._docker_api("create_container", container_name, config)
+        if not container_id:
+            return container_id
+        if not self._docker_api("start_container", container_id):
+            return False
+        logging.info(f"Created container {container_name} with ID {container_id}")
+        return container_id
+
+    def _run_container(self, node: Node, container_name: str, binary_path: str):
+        """
+        Create and start a node container with docker run.
+
+        Returns:
+            Container id, or None if the container could not be created
+        """
         # Build docker run command
         cmd = [
             "docker",
@@ -103,6 +245,8 @@ class DockerManager(ProcessManager):
             container_name,
             "--restart",
             "unless-stopped",
+            "--label",
+            f"{NODE_LABEL}={node.id}",
             # Port mappings
             "-p",
             f"{node.port}:{node.port}/udp",
@@ -126,23 +270,7 @@ class DockerManager(ProcessManager):
         cmd.append(self.image)
 
         # Add the command to run
-        cmd.extend(
-            [
-                "antnode",
-                "--root-dir",
-                "/data",
-                "--port",
-                str(node.port),
-                "--enable-metrics-server",
-                "--metrics-server-port",
-                str(node.metrics_port),
-                "--bootstrap-cache-dir",
-                "/bootstrap-cache",
-                "--rewards-address",
-                node.wallet,
-                node.network,
-            ]
-        )
+        cmd.extend(self._node_command(node))
 
         # Run the container
         try:
@@ -155,22 +283,13 @@ class DockerManager(ProcessManager):
             )
             container_id = result.stdout.strip()
             logging.info(f"Created container {container_name} with ID {container_id}")
+            return container_id
 
         except subprocess.CalledProcessError as err:
             logging.error(f"Failed to create container: {err}")
             logging.error(f"stderr: {err.stderr}")
             return None
 
-        # Wait a moment for container to start
-        time.sleep(1)
-
-        # Return NodeProcess with container_id for persistence by executor
-        return NodeProcess(
-            node_id=node.id,
-            status=RESTARTING,  # Container is starting up
-            container_id=container_id,
-        )
-
     def start_node(self, node: Node) -> bool:
         """
         Start a stopped Docker container.
@@ -182,23 +301,41 @@ class DockerManager(ProcessManager):
             True if node started successfully
         """
         logging.info(f"Starting docker node {node.id}")
+        return self.start_nodes([node])
+
+    def start_nodes(self, nodes: List[Node]) -> bool:
+        """
+        Start several stopped Docker containers with a single docker call.
+
+        Args:
+            nodes: Node database records
 
+        Returns:
+            True if all nodes started successfully
+        """
         # Check if node is already responding on metadata port
         from wnm.utils import read_node_metadata
         from wnm.common import RUNNING
-        metadata = read_node_metadata(node.host, node.metrics_port)
-        if isinstance(metadata, dict) and metadata.get("status") == RUNNING:
-            logging.warning(
-                f"Node {node.id} already responding on metadata port {node.metrics_port}, "
-                "skipping start to avoid duplicate process"
-            )
-            return True
 
-        container_name = self._get_container_name(node)
+        container_names = []
+        for node in nodes:
+            metadata = read_node_metadata(node.host, node.metrics_port)
+            if isinstance(metadata, dict) and metadata.get("status") == RUNNING:
+                logging.warning(
+                    f"Node {node.id} already responding on metadata port {node.metrics_port}, "
+                    "skipping start to avoid duplicate process"
+                )
+                continue
+            container_names.append(self._get_container_name(node))
+        if not container_names:
+            return True
 
+        started = self._docker_api("start_containers", container_names)
+        if started is not None:
+            return started
         try:
             subprocess.run(
-                ["docker", "start", container_name],
+                ["docker", "start"] + container_names,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 check=True,
@@ -220,13 +357,33 @@ class DockerManager(ProcessManager):
             True if node stopped successfully
         """
         logging.info(f"Stopping docker node {node.id}")
+        return self.stop_nodes([node])
 
-        container_name = self._get_container_name(node)
+    def stop_nodes(self, nodes: List[Node]) -> bool:
+        """
+        Stop several Docker containers with a single docker call.
+
+        Docker stops the containers concurrently, so the whole batch
+        shares one graceful shutdown timeout.
+
+        Args:
+            nodes: Node database records
 
+        Returns:
+            True if all nodes stopped successfully
+        """
+        if not nodes:
+            return True
+
+        container_names = [self._get_container_name(node) for node in nodes]
+
+        # Stop with 30 second timeout for graceful shutdown
+        stopped = self._docker_api("stop_containers", container_names, 30)
+        if stopped is not None:
+            return stopped
         try:
-            # Stop with 30 second timeout for graceful shutdown
             subprocess.run(
-                ["docker", "stop", "-t", "30", container_name],
+                ["docker", "stop", "-t", "30"] + container_names,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 check=True,
@@ -251,6 +408,9 @@ class DockerManager(ProcessManager):
 
         container_name = self._get_container_name(node)
 
+        restarted = self._docker_api("restart_container", container_name, 30)
+        if restarted is not None:
+            return restarted
         try:
             subprocess.run(
                 ["docker", "restart", "-t", "30", container_name],
@@ -276,6 +436,19 @@ class DockerManager(ProcessManager):
         """
         container_name = self._get_container_name(node)
 
+        if self.api is not None:
+            details = self._docker_api("inspect_container", container_name)
+            if isinstance(details, dict):
+                state = details.get("State", {})
+                return self._node_process(
+                    node, state.get("Status", ""), state.get("Pid", 0), details.get("Id")
+                )
+            if details is False:
+                return NodeProcess(node_id=node.id, pid=None, status="UNKNOWN")
+            if self.api is not None:
+                # Container doesn't exist
+                return NodeProcess(node_id=node.id, pid=None, status=STOPPED)
+
         try:
             # Get container info
             result = subprocess.run(
@@ -293,29 +466,7 @@ class DockerManager(ProcessManager):
             )
 
             status_str, pid_str, container_id = result.stdout.strip().split("|")
-
-            # Map Docker status to our status
-            if status_str == "running":
-                status = RUNNING
-            elif status_str in ("created", "restarting"):
-                status = RESTARTING
-            elif status_str in ("exited", "dead"):
-                status = STOPPED
-            else:
-                status = "UNKNOWN"
-
-            pid = int(pid_str) if pid_str and pid_str != "0" else None
-
-            # Check if root directory exists
-            if not os.path.isdir(node.root_dir):
-                status = DEAD
-
-            return NodeProcess(
-                node_id=node.id,
-                pid=pid,
-                status=status,
-                container_id=container_id,
-            )
+            return self._node_process(node, status_str, int(pid_str or 0), container_id)
 
         except subprocess.CalledProcessError:
             # Container doesn't exist
@@ -324,6 +475,59 @@ class DockerManager(ProcessManager):
             logging.error(f"Failed to parse container status: {err}")
             return NodeProcess(node_id=node.id, pid=None, status="UNKNOWN")
 
+    def _node_process(
+        self, node: Node, state: str, pid: int, container_id: str
+    ) -> NodeProcess:
+        # Map Docker status to our status
+        status = DOCKER_STATUS_MAP.get(state, "UNKNOWN")
+
+        # Check if root directory exists
+        if not os.path.isdir(node.root_dir):
+            status = DEAD
+
+        return NodeProcess(
+            node_id=node.id,
+            pid=pid if pid and pid > 0 else None,
+            status=status,
+            container_id=container_id,
+        )
+
+    def get_statuses(self, nodes: List[Node]) -> Dict[int, NodeProcess]:
+        """
+        Get current status of several Docker nodes.
+
+        Through the Engine API every node container comes from one
+        label-filtered containers/json listing; otherwise each node is
+        inspected in turn.
+
+        Args:
+            nodes: Node database records
+
+        Returns:
+            NodeProcess of each node by node id
+        """
+        containers = self._docker_api("list_containers")
+        if not isinstance(containers, list):
+            return {node.id: self.get_status(node) for node in nodes}
+
+        by_node = {}
+        for container in containers:
+            node_id = (container.get("Labels") or {}).get(NODE_LABEL, "")
+            if node_id.isdigit():
+                by_node[int(node_id)] = container
+        statuses = {}
+        for node in nodes:
+            container = by_node.get(node.id)
+            if container is None:
+                # Containers created before labelling are looked up by name
+                statuses[node.id] = self.get_status(node)
+                continue
+            # The listing carries no PID
+            statuses[node.id] = self._node_process(
+                node, container.get("State", ""), 0, container.get("Id")
+            )
+        return statuses
+
     def remove_node(self, node: Node) -> bool:
         """
         Stop and remove a Docker container.
@@ -335,32 +539,51 @@ class DockerManager(ProcessManager):
             True if node was removed successfully
         """
         logging.info(f"Removing docker node {node.id}")
+        return self.remove_nodes([node])
 
-        container_name = self._get_container_name(node)
-
-        # Stop the container first
-        self.stop_node(node)
+    def remove_nodes(self, nodes: List[Node]) -> bool:
+        """
+        Stop and remove several Docker containers with one stop and one rm call.
 
-        # Remove the container
-        try:
-            subprocess.run(
-                ["docker", "rm", "-f", container_name],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                check=True,
-            )
-        except subprocess.CalledProcessError as err:
-            logging.error(f"Failed to remove container: {err}")
+        Args:
+            nodes: Node database records
 
-        # Remove node data directory
-        try:
-            import shutil
+        Returns:
+            True if the nodes were removed successfully
+        """
+        if not nodes:
+            return True
 
-            node_dir = Path(node.root_dir)
-            if node_dir.exists():
-                shutil.rmtree(node_dir)
-        except (OSError, Exception) as err:
-            logging.error(f"Failed to remove node directory: {err}")
+        container_names = [self._get_container_name(node) for node in nodes]
+
+        # Stop the containers first
+        self.stop_nodes(nodes)
+
+        # Remove the containers
+        removed = None
+        if self.api is not None:
+            removed = self._docker_api("remove_containers", container_names)
+        if removed is None:
+            try:
+                subprocess.run(
+                    ["docker", "rm", "-f"] + container_names,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    check=True,
+                )
+            except subprocess.CalledProcessError as err:
+                logging.error(f"Failed to remove container: {err}")
+
+        # Remove node data directories
+        import shutil
+
+        for node in nodes:
+            try:
+                node_dir = Path(node.root_dir)
+                if node_dir.exists():
+                    shutil.rmtree(node_dir)
+            except (OSError, Exception) as err:
+                logging.error(f"Failed to remove node directory: {err}")
 
         return True
 
@@ -12,6 +12,7 @@ from wnm.process_managers.antctl_zen_manager import AntctlZenManager
 from wnm.process_managers.base import ProcessManager
 from wnm.process_managers.docker_manager import DockerManager
 from wnm.process_managers.launchd_manager import LaunchdManager
+from wnm.process_managers.s6overlay_manager import S6OverlayManager
 from wnm.process_managers.setsid_manager import SetsidManager
 from wnm.process_managers.systemd_manager import SystemdManager
 
@@ -46,6 +47,7 @@ def get_process_manager(
         "setsid": SetsidManager,
         "launchd": LaunchdManager,
         "antctl": AntctlManager,
+        "s6overlay": S6OverlayManager,
     }
 
     # Special case: antctl+zen routes to AntctlZenManager (user mode only)
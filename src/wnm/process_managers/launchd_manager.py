@@ -82,15 +82,8 @@ class LaunchdManager(ProcessManager):
             XML string for the plist file
         """
         # Get machine config if not provided
-        if machine_config is None and self.S:
-            from wnm.config import S
-            from wnm.models import Machine
-            from sqlalchemy import select
-
-            with S() as session:
-                result = session.execute(select(Machine)).first()
-                if result:
-                    machine_config = result[0]
+        if machine_config is None:
+            machine_config = self._get_machine_config()
 
         label = self._get_service_label(node)
         log_file = os.path.join(LOG_DIR, f"antnode{node.node_name}.log")
@@ -197,17 +190,12 @@ class LaunchdManager(ProcessManager):
             logging.error(f"Failed to create directories: {err}")
             return None
 
-        # Copy binary to node directory (each node gets its own copy)
+        # Link binary into node directory (nodes share one copy per version)
         node_binary_path = os.path.join(node.root_dir, "antnode")
-        try:
-            if not os.path.exists(binary_path):
-                logging.error(f"Source binary not found: {binary_path}")
-                return None
-            shutil.copy2(binary_path, node_binary_path)
-            # Make it executable
-            os.chmod(node_binary_path, 0o755)
-        except (OSError, shutil.Error) as err:
-            logging.error(f"Failed to copy binary: {err}")
+        if not os.path.exists(binary_path):
+            logging.error(f"Source binary not found: {binary_path}")
+            return None
+        if not self.install_binary(binary_path, node_binary_path):
             return None
 
         # Generate plist file
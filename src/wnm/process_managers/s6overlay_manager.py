@@ -0,0 +1,634 @@
+"""
+S6OverlayManager: Manage many nodes per long-lived s6-overlay container.
+
+DockerManager runs one container per node. This manager packs up to
+max_node_per_container nodes into each container instead: the container
+runs s6-overlay with a "sleep infinity" main command, and every node is an
+s6 service directory under /run/service. Nodes are started and stopped by
+removing or creating the service's `down` file and signalling its
+supervisor, so stopping, upgrading or removing a node never stops the
+container.
+
+Each container publishes one block of node (udp) and metrics (tcp) ports.
+The executor allocates the blocks and the Container records (process
+managers do not write to the database); this manager only creates the
+containers it is given and runs commands inside them, through the Engine
+API exec endpoints (or `docker exec` without the API). Operations on
+several nodes run one exec per container.
+"""
+
+import logging
+import os
+import shlex
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from wnm.common import DEAD, RESTARTING, RUNNING, STOPPED
+from wnm.config import BOOTSTRAP_CACHE_DIR
+from wnm.models import Container, Node
+from wnm.process_managers.base import NodeProcess
+from wnm.process_managers.docker_api import STOP_GRACE
+from wnm.process_managers.docker_manager import DockerManager
+
+# Label carrying the container name on every container this manager creates
+CONTAINER_LABEL = "wnm.container"
+# s6-overlay scan directory for services added at runtime
+SERVICE_DIR = "/run/service"
+# Where node_storage is mounted inside the container
+DATA_DIR = "/var/antctl/services"
+# Seconds a node gets to shut down before s6 gives up waiting
+STOP_TIMEOUT = 30
+
+
+class S6OverlayManager(DockerManager):
+    """Manage nodes as s6 services inside shared Docker containers"""
+
+    def __init__(
+        self,
+        session_factory=None,
+        image="iweave/antnode:latest",
+        firewall_type: str = "null",
+        transport: str = None,
+        mode: str = "user",
+    ):
+        """
+        Initialize S6OverlayManager.
+
+        Args:
+            session_factory: SQLAlchemy session factory (read-only, to find
+                the container a node lives in)
+            image: s6-overlay Docker image for new containers
+            firewall_type: Type of firewall (defaults to "null", Docker publishes the ports)
+            transport: "api" for the Engine API, "cli" for the docker CLI
+                (default: the API when the daemon socket exists)
+            mode: Only "user" is supported
+        """
+        super().__init__(
+            session_factory=session_factory,
+            image=image,
+            firewall_type=firewall_type,
+            transport=transport,
+        )
+        self.mode = mode
+        # Container record id -> (container name, docker container id)
+        self._containers = {}
+        self._containers_lock = threading.Lock()
+
+    def _container(self, node: Node) -> Optional[Tuple[str, str]]:
+        """Name and docker id of the container hosting a node"""
+        key = node.container_id
+        with self._containers_lock:
+            if key not in self._containers and self.S:
+                with self.S() as session:
+                    rows = session.execute(
+                        select(Container.id, Container.name, Container.container_id)
+                    ).all()
+                self._containers = {row[0]: (row[1], row[2]) for row in rows}
+            return self._containers.get(key)
+
+    def _group_by_container(self, nodes: List[Node]) -> Dict[str, List[Node]]:
+        """Nodes grouped by the name of their container (unplaced nodes are logged)"""
+        groups = {}
+        for node in nodes:
+            container = self._container(node)
+            if container is None:
+                logging.error(f"Node {node.id} is not assigned to a container")
+                continue
+            groups.setdefault(container[0], []).append(node)
+        return groups
+
+    def _exec(self, container: str, script: str) -> Optional[subprocess.CompletedProcess]:
+        """Run a shell script inside a container.
+
+        Uses the Engine API exec endpoints, or the docker CLI when the API
+        is not in use.
+
+        Returns:
+            The completed docker exec, or None if docker could not be run
+        """
+        command = ["docker", "exec", container, "sh", "-c", script]
+        result = self._docker_api(
+            "exec_run", container, command[3:], STOP_TIMEOUT + STOP_GRACE
+        )
+        if result is False:
+            # The daemon refused the exec (container missing or not running)
+            return subprocess.CompletedProcess(command, 1, "", "")
+        if result is not None:
+            returncode, stdout, stderr = result
+            return subprocess.CompletedProcess(command, returncode, stdout, stderr)
+        try:
+            return subprocess.run(
+                command,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+            )
+        except OSError as err:
+            logging.error(f"Failed to run docker exec in {container}: {err}")
+            return None
+
+    def _exec_ok(self, container: str, script: str, operation: str) -> bool:
+        result = self._exec(container, script)
+        if result is None:
+            return False
+        if result.returncode != 0:
+            logging.error(
+                f"Failed to {operation} nodes in {container}: {result.stderr.strip()}"
+            )
+            return False
+        return True
+
+    @staticmethod
+    def _service_dir(node: Node) -> str:
+        return f"{SERVICE_DIR}/antnode{node.node_name}"
+
+    @staticmethod
+    def _node_dir(node: Node) -> str:
+        return f"{DATA_DIR}/{Path(node.root_dir).name}"
+
+    def _run_file(self, node: Node) -> str:
+        """s6 run script starting a node as the container's ant user"""
+        node_dir = self._node_dir(node)
+        cmd = ["s6-setuidgid", "ant"]
+        if node.environment:
+            cmd.extend(["env"] + node.environment.split())
+        cmd.extend(
+            [
+                f"{node_dir}/antnode",
+                "--bootstrap-cache-dir",
+                "/bootstrap-cache",
+                "--root-dir",
+                node_dir,
+                "--port",
+                str(node.port),
+                "--enable-metrics-server",
+                "--metrics-server-port",
+                str(node.metrics_port),
+                "--log-output-dest",
+                f"{node_dir}/logs",
+                "--max-log-files",
+                "1",
+                "--max-archived-log-files",
+                "1",
+                # Docker publishes the ports, UPnP cannot work from a container
+                "--no-upnp",
+                "--rewards-address",
+                node.wallet,
+                node.network,
+            ]
+        )
+        return "#!/bin/sh\nexec 2>&1\nexec " + shlex.join(cmd) + "\n"
+
+    def create_container(
+        self,
+        name: str,
+        node_storage: str,
+        port_range: Tuple[int, int],
+        metrics_port_range: Tuple[int, int],
+    ) -> Optional[str]:
+        """
+        Create and start a long-lived container for a block of nodes.
+
+        Args:
+            name: Container name
+            node_storage: Host directory holding the node directories
+            port_range: First and last node (udp) port published by the container
+            metrics_port_range: First and last metrics (tcp) port published
+
+        Returns:
+            Docker container id, or None if the container could not be created
+        """
+        logging.info(f"Creating s6overlay container {name}")
+        if not self._ensure_image():
+            return None
+        try:
+            Path(node_storage).mkdir(parents=True, exist_ok=True)
+        except OSError as err:
+            logging.error(f"Failed to create node storage: {err}")
+            return None
+
+        # The image's one-shot init maps the ant user onto our ids so the
+        # mounted node directories stay writable on both sides
+        env = [f"ANT_UID={os.getuid()}", f"ANT_GID={os.getgid()}"]
+        binds = [
+            f"{node_storage}:{DATA_DIR}",
+            f"{BOOTSTRAP_CACHE_DIR}:/bootstrap-cache:ro",
+        ]
+
+        if self.api is not None:
+            container_id = self._create_api_container(
+                name, env, binds, port_range, metrics_port_range
+            )
+            if container_id is not None:
+                return container_id or None
+
+        ports, metrics_ports = (f"{start}-{end}" for start, end in (port_range, metrics_port_range))
+        cmd = [
+            "docker",
+            "run",
+            "-d",
+            "--name",
+            name,
+            "--restart",
+            "unless-stopped",
+            "--label",
+            f"{CONTAINER_LABEL}={name}",
+            "-p",
+            f"{ports}:{ports}/udp",
+            "-p",
+            f"{metrics_ports}:{metrics_ports}/tcp",
+        ]
+        for bind in binds:
+            cmd.extend(["-v", bind])
+        for env_var in env:
+            cmd.extend(["-e", env_var])
+        cmd.extend([self.image, "sleep", "infinity"])
+        try:
+            result = subprocess.run(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                check=True,
+            )
+        except subprocess.CalledProcessError as err:
+            logging.error(f"Failed to create container: {err}")
+            logging.error(f"stderr: {err.stderr}")
+            return None
+        container_id = result.stdout.strip()
+        logging.info(f"Created container {name} with ID {container_id}")
+        return container_id
+
+    def _create_api_container(
+        self, name, env, binds, port_range, metrics_port_range
+    ) -> Optional[str]:
+        """
+        Create and start a container through the Engine API.
+
+        Returns:
+            Container id, "" if the daemon refused, or None to use the CLI
+        """
+        # The Engine API takes every published port on its own
+        exposed = {}
+        bindings = {}
+        for (start, end), protocol in ((port_range, "udp"), (metrics_port_range, "tcp")):
+            for port in range(start, end + 1):
+                key = f"{port}/{protocol}"
+                exposed[key] = {}
+                bindings[key] = [{"HostPort": str(port)}]
+        config = {
+            "Image": self.image,
+            "Cmd": ["sleep", "infinity"],
+            "Env": env,
+            "Labels": {CONTAINER_LABEL: name},
+            "ExposedPorts": exposed,
+            "HostConfig": {
+                "Binds": binds,
+                "PortBindings": bindings,
+                "RestartPolicy": {"Name": "unless-stopped"},
+            },
+        }
+        container_id = self._docker_api("create_container", name, config)
+        if container_id is None:
+            return None
+        if not container_id or not self._docker_api("start_container", container_id):
+            return ""
+        logging.info(f"Created container {name} with ID {container_id}")
+        return container_id
+
+    def remove_container(self, name: str) -> bool:
+        """Stop and remove a container"""
+        removed = self._docker_api("remove_container", name)
+        if removed is not None:
+            return removed
+        try:
+            subprocess.run(
+                ["docker", "rm", "-f", name],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                check=True,
+            )
+        except subprocess.CalledProcessError as err:
+            logging.error(f"Failed to remove container {name}: {err}")
+            return False
+        return True
+
+    def create_node(self, node: Node, binary_path: str) -> Optional[NodeProcess]:
+        """
+        Create a node as an s6 service in its container and start it.
+
+        Args:
+            node: Node database record, already assigned to a container
+            binary_path: Path to the antnode binary
+
+        Returns:
+            NodeProcess with the docker container id, None if creation failed
+        """
+        logging.info(f"Creating s6overlay node {node.id}")
+        container = self._container(node)
+        if container is None:
+            logging.error(f"Node {node.id} is not assigned to a container")
+            return None
+
+        node_dir = Path(node.root_dir)
+        try:
+            (node_dir / "logs").mkdir(parents=True, exist_ok=True)
+        except OSError as err:
+            logging.error(f"Failed to create node directory: {err}")
+            return None
+
+        # Linked into node_storage, which the container mounts
+        if not self.install_binary(binary_path, str(node_dir / "antnode")):
+            return None
+
+        if not self.start_nodes([node]):
+            return None
+
+        return NodeProcess(
+            node_id=node.id,
+            status=RESTARTING,  # Node is starting up
+            container_id=container[1],
+        )
+
+    def start_node(self, node: Node) -> bool:
+        """
+        Start a node's s6 service.
+
+        Args:
+            node: Node database record
+
+        Returns:
+            True if node started successfully
+        """
+        logging.info(f"Starting s6overlay node {node.id}")
+        return self.start_nodes([node])
+
+    def start_nodes(self, nodes: List[Node]) -> bool:
+        """
+        Start several nodes with one docker exec per container.
+
+        The run file is written on every start, since /run/service is
+        empty again after a container restart.
+
+        Args:
+            nodes: Node database records
+
+        Returns:
+            True if all nodes started successfully
+        """
+        groups = self._group_by_container(nodes)
+        # Nodes without a container cannot be started
+        started = sum(len(members) for members in groups.values()) == len(nodes)
+        for container, members in groups.items():
+            lines = []
+            for node in members:
+                service = self._service_dir(node)
+                lines.extend(
+                    [
+                        f"mkdir -p {service}",
+                        f"printf '%s' {shlex.quote(self._run_file(node))} > {service}/run",
+                        f"chmod 755 {service}/run",
+                        f"rm -f {service}/down",
+                    ]
+                )
+            lines.append(f"s6-svscanctl -a {SERVICE_DIR}")
+            # A new service starts once s6-svscan picks it up; existing
+            # supervisors need to be told
+            lines.extend(
+                f"if s6-svok {self._service_dir(node)}; then s6-svc -u {self._service_dir(node)}; fi"
+                for node in members
+            )
+            if not self._exec_ok(container, "set -e\n" + "\n".join(lines), "start"):
+                started = False
+        return started
+
+    def stop_node(self, node: Node) -> bool:
+        """
+        Stop a node's s6 service.
+
+        Args:
+            node: Node database record
+
+        Returns:
+            True if node stopped successfully
+        """
+        logging.info(f"Stopping s6overlay node {node.id}")
+        return self.stop_nodes([node])
+
+    def _stop_script(self, members: List[Node]) -> List[str]:
+        """Script lines bringing services down and waiting for them together"""
+        lines = []
+        services = []
+        for node in members:
+            service = self._service_dir(node)
+            lines.append(
+                f"if s6-svok {service}; then touch {service}/down; s6-svc -d {service}; fi"
+            )
+            services.append(service)
+        quoted = " ".join(services)
+        lines.append(
+            f"for s in {quoted}; do s6-svok $s && set -- \"$@\" $s; done; "
+            f'[ $# -eq 0 ] || s6-svwait -D -T {STOP_TIMEOUT * 1000} "$@"'
+        )
+        return lines
+
+    def stop_nodes(self, nodes: List[Node]) -> bool:
+        """
+        Stop several nodes with one docker exec per container.
+
+        Every service is brought down first and the batch then shares one
+        shutdown timeout.
+
+        Args:
+            nodes: Node database records
+
+        Returns:
+            True if all nodes stopped successfully
+        """
+        stopped = True
+        for container, members in self._group_by_container(nodes).items():
+            if not self._exec_ok(container, "\n".join(self._stop_script(members)), "stop"):
+                stopped = False
+        return stopped
+
+    def restart_node(self, node: Node) -> bool:
+        """
+        Restart a node's s6 service (the container keeps running).
+
+        Args:
+            node: Node database record
+
+        Returns:
+            True if node restarted successfully
+        """
+        logging.info(f"Restarting s6overlay node {node.id}")
+        return self.stop_nodes([node]) and self.start_nodes([node])
+
+    def get_status(self, node: Node) -> NodeProcess:
+        """
+        Get current status of an s6overlay node.
+
+        Args:
+            node: Node database record
+
+        Returns:
+            NodeProcess with current status
+        """
+        return self.get_statuses([node])[node.id]
+
+    def get_statuses(self, nodes: List[Node]) -> Dict[int, NodeProcess]:
+        """
+        Get current status of several nodes with one docker exec per container.
+
+        Args:
+            nodes: Node database records
+
+        Returns:
+            NodeProcess of each node by node id
+        """
+        statuses = {
+            node.id: NodeProcess(node_id=node.id, status="UNKNOWN") for node in nodes
+        }
+        for container, members in self._group_by_container(nodes).items():
+            docker_id = self._container(members[0])[1]
+            result = self._exec(
+                container,
+                f"for d in {SERVICE_DIR}/antnode*; do [ -d \"$d\" ] || continue; "
+                'echo "${d##*/} $(s6-svstat -o up,pid "$d" 2>/dev/null)"; done',
+            )
+            if result is None:
+                continue
+            services = {}
+            if result.returncode == 0:
+                for line in result.stdout.splitlines():
+                    fields = line.split()
+                    if len(fields) == 3:
+                        services[fields[0]] = fields[1:]
+            # A stopped container runs no nodes
+            for node in members:
+                up, pid = services.get(f"antnode{node.node_name}", ("false", "-1"))
+                status = RUNNING if up == "true" else STOPPED
+                if not os.path.isdir(node.root_dir):
+                    status = DEAD
+                statuses[node.id] = NodeProcess(
+                    node_id=node.id,
+                    pid=int(pid) if up == "true" and pid.isdigit() else None,
+                    status=status,
+                    container_id=docker_id,
+                )
+        return statuses
+
+    def remove_node(self, node: Node) -> bool:
+        """
+        Stop a node and remove its s6 service and data.
+
+        Args:
+            node: Node database record
+
+        Returns:
+            True if node was removed successfully
+        """
+        logging.info(f"Removing s6overlay node {node.id}")
+        return self.remove_nodes([node])
+
+    def remove_nodes(self, nodes: List[Node]) -> bool:
+        """
+        Stop several nodes and remove their services with one docker exec
+        per container; the containers keep running.
+
+        Args:
+            nodes: Node database records
+
+        Returns:
+            True if the nodes were removed successfully
+        """
+        removed = True
+        for container, members in self._group_by_container(nodes).items():
+            lines = self._stop_script(members)
+            lines.append("rm -rf " + " ".join(self._service_dir(node) for node in members))
+            lines.append(f"s6-svscanctl -an {SERVICE_DIR}")
+            if not self._exec_ok(container, "\n".join(lines), "remove"):
+                removed = False
+
+        # Remove node data directories
+        for node in nodes:
+            try:
+                node_dir = Path(node.root_dir)
+                if node_dir.exists():
+                    shutil.rmtree(node_dir)
+            except OSError as err:
+                logging.error(f"Failed to remove node directory: {err}")
+
+        return removed
+
+    def teardown_cluster(self) -> bool:
+        """
+        Stop every node, remove the node data, then remove the containers.
+
+        Returns:
+            True if every container was removed
+        """
+        containers = self._docker_api("list_containers", CONTAINER_LABEL)
+        if isinstance(containers, list):
+            names = [
+                (container.get("Labels") or {}).get(CONTAINER_LABEL)
+                for container in containers
+            ]
+        else:
+            try:
+                result = subprocess.run(
+                    [
+                        "docker",
+                        "ps",
+                        "-a",
+                        "--filter",
+                        f"label={CONTAINER_LABEL}",
+                        "--format",
+                        f'{{{{.Label "{CONTAINER_LABEL}"}}}}',
+                    ],
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    check=True,
+                )
+            except (OSError, subprocess.CalledProcessError) as err:
+                logging.error(f"Failed to list s6overlay containers: {err}")
+                return False
+            names = result.stdout.split()
+
+        torn_down = True
+        for name in filter(None, names):
+            logging.info(f"Tearing down s6overlay container {name}")
+            self._exec(
+                name,
+                f"for d in {SERVICE_DIR}/antnode*; do [ -d \"$d\" ] && touch \"$d/down\" "
+                f'&& s6-svc -d "$d"; done; '
+                f"s6-svwait -D -T {STOP_TIMEOUT * 1000} {SERVICE_DIR}/antnode* ; "
+                f"rm -rf {DATA_DIR}/antnode*",
+            )
+            if not self.remove_container(name):
+                torn_down = False
+        with self._containers_lock:
+            self._containers = {}
+        return torn_down
+
+    def survey_nodes(self, machine_config) -> list:
+        """
+        Survey s6overlay nodes.
+
+        Nodes are created fresh by WNM inside its own containers, so there
+        is nothing to migrate.
+
+        Args:
+            machine_config: Machine configuration object
+
+        Returns:
+            Empty list
+        """
+        logging.info("s6overlay survey not implemented (nodes created fresh by WNM)")
+        return []
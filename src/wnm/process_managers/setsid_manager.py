@@ -1,5 +1,5 @@
 """
-SetsidManager: Manage nodes as background processes using setsid.
+SetsidManager: Manage nodes as background processes in their own session.
 
 This manager runs nodes as simple background processes without requiring
 sudo privileges or systemd. Suitable for development and non-systemd environments.
@@ -12,6 +12,7 @@ import signal
 import subprocess
 import time
 from pathlib import Path
+from typing import List
 
 import psutil
 
@@ -20,9 +21,14 @@ from wnm.config import BOOTSTRAP_CACHE_DIR
 from wnm.models import Node
 from wnm.process_managers.base import NodeProcess, ProcessManager
 
+# Startup check: poll a new node's metadata endpoint every STARTUP_POLL
+# seconds for up to STARTUP_TIMEOUT seconds
+STARTUP_POLL = 0.1
+STARTUP_TIMEOUT = 2
+
 
 class SetsidManager(ProcessManager):
-    """Manage nodes as background processes via setsid"""
+    """Manage nodes as background processes in their own session"""
 
     def __init__(self, session_factory=None, firewall_type: str = None):
         """
@@ -34,6 +40,9 @@ class SetsidManager(ProcessManager):
         """
         super().__init__(firewall_type)
         self.S = session_factory
+        # Node processes launched by this manager, by PID, so exited
+        # nodes can be reaped (they are our children, not init's)
+        self._children = {}
 
     def _get_pid_file(self, node: Node) -> Path:
         """Get path to PID file for a node"""
@@ -51,8 +60,12 @@ class SetsidManager(ProcessManager):
         try:
             if pid_file.exists():
                 pid = int(pid_file.read_text().strip())
+                # Reap our own child if it has exited (a zombie still "exists")
+                child = self._children.get(pid)
+                if child is not None and child.poll() is not None:
+                    del self._children[pid]
                 # Verify process exists
-                if psutil.pid_exists(pid):
+                elif psutil.pid_exists(pid):
                     return pid
                 # Stale PID file, remove it
                 pid_file.unlink()
@@ -84,13 +97,9 @@ class SetsidManager(ProcessManager):
             logging.error(f"Failed to create directories: {err}")
             return None
 
-        # Copy binary to node directory
+        # Link binary into node directory
         binary_dest = node_dir / "antnode"
-        try:
-            shutil.copy2(binary_path, binary_dest)
-            binary_dest.chmod(0o755)
-        except (OSError, shutil.Error) as err:
-            logging.error(f"Failed to copy binary: {err}")
+        if not self.install_binary(binary_path, str(binary_dest)):
             return None
 
         # Start the node
@@ -118,42 +127,82 @@ class SetsidManager(ProcessManager):
             True if node started successfully
         """
         logging.info(f"Starting setsid node {node.id}")
+        return self.start_nodes([node])
+
+    def start_nodes(self, nodes: List[Node]) -> bool:
+        """
+        Start several nodes as background processes.
 
-        # Check if node is already responding on metadata port
+        Every node is launched first and their startup is then confirmed
+        together, so the batch shares one startup timeout.
+
+        Args:
+            nodes: Node database records
+
+        Returns:
+            True if all nodes started successfully
+        """
         from wnm.utils import read_node_metadata
-        metadata = read_node_metadata(node.host, node.metrics_port)
-        if isinstance(metadata, dict) and metadata.get("status") == RUNNING:
-            logging.warning(
-                f"Node {node.id} already responding on metadata port {node.metrics_port}, "
-                "skipping start to avoid duplicate process"
-            )
-            return True
 
-        # Check if already running via PID file
-        if self._read_pid_file(node):
-            logging.warning(f"Node {node.id} already running (PID file exists)")
-            return True
+        machine_config = self._get_machine_config()
+        started = True
+        launched = []
+        for node in nodes:
+            # Check if node is already responding on metadata port
+            metadata = read_node_metadata(node.host, node.metrics_port)
+            if isinstance(metadata, dict) and metadata.get("status") == RUNNING:
+                logging.warning(
+                    f"Node {node.id} already responding on metadata port {node.metrics_port}, "
+                    "skipping start to avoid duplicate process"
+                )
+                continue
+
+            # Check if already running via PID file
+            if self._read_pid_file(node):
+                logging.warning(f"Node {node.id} already running (PID file exists)")
+                continue
+
+            process = self._launch(node, machine_config)
+            if process is None:
+                started = False
+                continue
+            launched.append((node, process))
+
+        failed = self._wait_for_startup(launched)
+        for node in failed:
+            started = False
+            # The process is gone, so its PID file is stale
+            pid_file = self._get_pid_file(node)
+            if pid_file.exists():
+                pid_file.unlink()
 
-        # Get machine config to check no_upnp setting
-        machine_config = None
-        if self.S:
-            from wnm.config import S
-            from wnm.models import Machine
-            from sqlalchemy import select
+        for node, _ in launched:
+            if node not in failed:
+                # Open firewall port (best effort, may fail without sudo)
+                self.enable_firewall_port(node.port)
 
-            try:
-                with S() as session:
-                    result = session.execute(select(Machine)).first()
-                    if result:
-                        machine_config = result[0]
-            except Exception as e:
-                logging.warning(f"Failed to get machine config: {e}")
+        return started
 
+    def _launch(self, node: Node, machine_config) -> subprocess.Popen | None:
+        """
+        Launch the antnode binary of a node in a new session.
+
+        The binary is launched directly (not through the setsid wrapper),
+        so the returned process is the node itself and its PID is known
+        without searching the process table.
+
+        Args:
+            node: Node database record
+            machine_config: Machine record, or None
+
+        Returns:
+            The node process, or None if it could not be launched
+        """
         # Prepare command
         binary = Path(node.root_dir) / "antnode"
         if not binary.exists():
             logging.error(f"Binary not found: {binary}")
-            return False
+            return None
 
         log_dir = Path(node.root_dir) / "logs"
 
@@ -182,11 +231,10 @@ class SetsidManager(ProcessManager):
 
         cmd.extend(["--rewards-address", node.wallet, node.network])
 
-        # Start process in background using setsid
         try:
-            # Use setsid to detach from terminal
+            # A new session detaches the node from our terminal
             process = subprocess.Popen(
-                ["setsid"] + cmd,
+                cmd,
                 stdout=subprocess.DEVNULL,
                 stderr=subprocess.DEVNULL,
                 stdin=subprocess.DEVNULL,
@@ -196,50 +244,58 @@ class SetsidManager(ProcessManager):
                     **({"CUSTOM_ENV": node.environment} if node.environment else {}),
                 },
             )
+        except (subprocess.SubprocessError, OSError) as err:
+            logging.error(f"Failed to start node: {err}")
+            return None
 
-            # Give process a moment to start
-            time.sleep(0.5)
+        self._children[process.pid] = process
+        self._write_pid_file(node, process.pid)
+        logging.info(f"Node {node.id} started with PID {process.pid}")
+        return process
 
-            # Check if process started successfully
-            if process.poll() is not None:
-                logging.error(
-                    f"Process exited immediately with code {process.returncode}"
-                )
-                return False
+    def _wait_for_startup(self, launched: list) -> List[Node]:
+        """
+        Confirm freshly launched nodes came up.
 
-            # Get actual PID of the antnode process (not setsid wrapper)
-            # The setsid process becomes the session leader, we need to find the child
-            time.sleep(1)  # Give process time to spawn
-
-            # Find the antnode process by command line
-            for proc in psutil.process_iter(["pid", "cmdline"]):
-                try:
-                    cmdline = proc.info["cmdline"]
-                    if (
-                        cmdline
-                        and "antnode" in cmdline[0]
-                        and str(node.port) in " ".join(cmdline)
-                    ):
-                        pid = proc.info["pid"]
-                        self._write_pid_file(node, pid)
-                        logging.info(f"Node {node.id} started with PID {pid}")
-                        break
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-            else:
-                logging.warning(
-                    f"Could not find PID for node {node.id}, using setsid PID"
-                )
-                self._write_pid_file(node, process.pid)
+        A node is up once its metadata endpoint answers. Nodes that have not
+        answered within STARTUP_TIMEOUT but are still alive are left to the
+        readiness probes; only nodes whose process exited count as failed.
 
-        except (subprocess.SubprocessError, OSError) as err:
-            logging.error(f"Failed to start node: {err}")
-            return False
+        Args:
+            launched: (node, process) pairs
 
-        # Open firewall port (best effort, may fail without sudo)
-        self.enable_firewall_port(node.port)
+        Returns:
+            Nodes whose process exited during startup
+        """
+        from wnm.utils import read_node_metadata
 
-        return True
+        failed = []
+        waiting = list(launched)
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while waiting:
+            still_waiting = []
+            for node, process in waiting:
+                if process.poll() is not None:
+                    logging.error(
+                        f"Process exited immediately with code {process.returncode}"
+                    )
+                    failed.append(node)
+                    continue
+                metadata = read_node_metadata(node.host, node.metrics_port)
+                if isinstance(metadata, dict) and metadata.get("status") == RUNNING:
+                    continue
+                still_waiting.append((node, process))
+            waiting = still_waiting
+            if not waiting:
+                break
+            if time.monotonic() >= deadline:
+                for node, _ in waiting:
+                    logging.debug(
+                        f"Node {node.id} not answering yet, leaving it to the readiness probes"
+                    )
+                break
+            time.sleep(STARTUP_POLL)
+        return failed
 
     def stop_node(self, node: Node) -> bool:
         """
@@ -252,43 +308,75 @@ class SetsidManager(ProcessManager):
             True if node stopped successfully
         """
         logging.info(f"Stopping setsid node {node.id}")
+        return self.stop_nodes([node])
 
-        pid = self._read_pid_file(node)
-        if not pid:
-            logging.warning(f"No PID found for node {node.id}")
-            return True
+    def stop_nodes(self, nodes: List[Node]) -> bool:
+        """
+        Stop several node processes.
 
-        try:
-            # Try graceful shutdown first
-            process = psutil.Process(pid)
-            process.terminate()
+        Every process is sent SIGTERM first and then all of them are waited
+        on together, so the batch shares one graceful shutdown timeout.
+
+        Args:
+            nodes: Node database records
 
-            # Wait up to 10 seconds for graceful shutdown
+        Returns:
+            True if all nodes stopped successfully
+        """
+        processes = {}
+        failed = set()
+        for node in nodes:
+            pid = self._read_pid_file(node)
+            if not pid:
+                logging.warning(f"No PID found for node {node.id}")
+                continue
+            try:
+                # Try graceful shutdown first
+                process = psutil.Process(pid)
+                process.terminate()
+                processes[process] = node
+            except psutil.NoSuchProcess:
+                logging.debug(f"Process {pid} already terminated")
+            except psutil.AccessDenied as err:
+                logging.error(f"Access denied stopping process {pid}: {err}")
+                failed.add(node.id)
+            except Exception as err:
+                logging.error(f"Failed to stop node: {err}")
+                failed.add(node.id)
+
+        if processes:
             try:
-                process.wait(timeout=10)
-            except psutil.TimeoutExpired:
-                logging.warning(f"Node {node.id} did not terminate gracefully, killing")
-                process.kill()
-                process.wait(timeout=5)
+                # Wait up to 10 seconds for graceful shutdown
+                _, alive = psutil.wait_procs(list(processes), timeout=10)
+                for process in alive:
+                    logging.warning(
+                        f"Node {processes[process].id} did not terminate gracefully, killing"
+                    )
+                    process.kill()
+                if alive:
+                    _, alive = psutil.wait_procs(alive, timeout=5)
+                for process in alive:
+                    logging.error(f"Failed to kill process {process.pid}")
+                    failed.add(processes[process].id)
+                # wait_procs reaped the exited children
+                for process in processes:
+                    if process not in alive:
+                        self._children.pop(process.pid, None)
+            except Exception as err:
+                logging.error(f"Failed to stop node: {err}")
+                return False
 
+        for node in nodes:
+            if node.id in failed:
+                continue
             # Remove PID file
             pid_file = self._get_pid_file(node)
             if pid_file.exists():
                 pid_file.unlink()
+            # Close firewall port
+            self.disable_firewall_port(node.port)
 
-        except psutil.NoSuchProcess:
-            logging.debug(f"Process {pid} already terminated")
-        except psutil.AccessDenied as err:
-            logging.error(f"Access denied stopping process {pid}: {err}")
-            return False
-        except Exception as err:
-            logging.error(f"Failed to stop node: {err}")
-            return False
-
-        # Close firewall port
-        self.disable_firewall_port(node.port)
-
-        return True
+        return not failed
 
     def restart_node(self, node: Node) -> bool:
         """
@@ -302,8 +390,8 @@ class SetsidManager(ProcessManager):
         """
         logging.info(f"Restarting setsid node {node.id}")
 
+        # stop_node waits for the process to exit, so no pause is needed
         self.stop_node(node)
-        time.sleep(1)  # Brief pause between stop and start
         return self.start_node(node)
 
     def get_status(self, node: Node) -> NodeProcess:
@@ -344,20 +432,33 @@ class SetsidManager(ProcessManager):
             True if node was removed successfully
         """
         logging.info(f"Removing setsid node {node.id}")
+        return self.remove_nodes([node])
 
-        # Stop the node first
-        self.stop_node(node)
+    def remove_nodes(self, nodes: List[Node]) -> bool:
+        """
+        Stop and remove several nodes.
 
-        # Remove node directory
-        try:
-            node_dir = Path(node.root_dir)
-            if node_dir.exists():
-                shutil.rmtree(node_dir)
-        except (OSError, shutil.Error) as err:
-            logging.error(f"Failed to remove node directory: {err}")
-            return False
-
-        return True
+        Args:
+            nodes: Node database records
+
+        Returns:
+            True if all nodes were removed successfully
+        """
+        # Stop the nodes first
+        self.stop_nodes(nodes)
+
+        # Remove node directories
+        removed = True
+        for node in nodes:
+            try:
+                node_dir = Path(node.root_dir)
+                if node_dir.exists():
+                    shutil.rmtree(node_dir)
+            except (OSError, shutil.Error) as err:
+                logging.error(f"Failed to remove node directory: {err}")
+                removed = False
+
+        return removed
 
     def survey_nodes(self, machine_config) -> list:
         """
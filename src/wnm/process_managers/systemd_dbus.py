@@ -0,0 +1,619 @@
+"""
+systemd D-Bus transport for SystemdManager.
+
+A small D-Bus client (no dependencies) for the parts of systemd's
+org.freedesktop.systemd1.Manager API wnm needs. One connection is opened per
+manager and kept for its lifetime, so starting, stopping and querying nodes
+does not fork `systemctl` (and `sudo`) each time. Unit state for every
+antnode unit comes from a single ListUnitsByPatterns call, and job
+completion is taken from systemd's JobRemoved signals instead of polling.
+
+Only the unix socket transport and EXTERNAL authentication are supported,
+which is what the system and user buses use on Linux.
+"""
+
+import logging
+import os
+import select
+import socket
+import struct
+import threading
+import time
+from collections import namedtuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import unquote
+
+SYSTEM_BUS_ADDRESS = "unix:path=/run/dbus/system_bus_socket"
+
+BUS_NAME = "org.freedesktop.DBus"
+BUS_PATH = "/org/freedesktop/DBus"
+BUS_INTERFACE = "org.freedesktop.DBus"
+PROPERTIES_INTERFACE = "org.freedesktop.DBus.Properties"
+SYSTEMD_NAME = "org.freedesktop.systemd1"
+SYSTEMD_PATH = "/org/freedesktop/systemd1"
+MANAGER_INTERFACE = "org.freedesktop.systemd1.Manager"
+SERVICE_INTERFACE = "org.freedesktop.systemd1.Service"
+UNIT_INTERFACE = "org.freedesktop.systemd1.Unit"
+# GetUnit error for a unit that is not loaded
+NO_SUCH_UNIT = "org.freedesktop.systemd1.NoSuchUnit"
+
+JOB_REMOVED_MATCH = (
+    f"type='signal',sender='{SYSTEMD_NAME}',interface='{MANAGER_INTERFACE}',"
+    + "member='JobRemoved'"
+)
+
+# Errors meaning the caller may not manage units over the bus (the systemctl
+# path, through sudo, still can)
+ACCESS_ERRORS = (
+    "org.freedesktop.DBus.Error.AccessDenied",
+    "org.freedesktop.DBus.Error.InteractiveAuthorizationRequired",
+    "org.freedesktop.DBus.Error.AuthFailed",
+)
+
+# Seconds to wait for a method reply, and for a start/stop job to finish
+DBUS_TIMEOUT = 10
+JOB_TIMEOUT = 120
+# Longest a thread waits on the socket before rechecking for its reply
+POLL_INTERVAL = 0.25
+# Finished jobs remembered for waiters that have not collected them yet
+MAX_FINISHED_JOBS = 1024
+
+# Message types
+METHOD_CALL = 1
+METHOD_RETURN = 2
+ERROR = 3
+SIGNAL = 4
+
+# Header fields
+PATH = 1
+INTERFACE = 2
+MEMBER = 3
+ERROR_NAME = 4
+REPLY_SERIAL = 5
+DESTINATION = 6
+SENDER = 7
+SIGNATURE = 8
+
+Message = namedtuple("Message", "type flags serial fields body")
+
+_ALIGNMENT = {
+    "y": 1, "b": 4, "n": 2, "q": 2, "i": 4, "u": 4, "x": 8, "t": 8, "d": 8,
+    "h": 4, "s": 4, "o": 4, "g": 1, "a": 4, "(": 8, "{": 8, "v": 1,
+}
+_FIXED = {
+    "y": "B", "b": "I", "n": "h", "q": "H", "i": "i", "u": "I", "x": "q",
+    "t": "Q", "d": "d", "h": "I",
+}
+
+
+class DBusError(Exception):
+    """Error reply from a D-Bus method call."""
+
+    def __init__(self, name: str, message: str = ""):
+        super().__init__(f"{name}: {message}" if message else name)
+        self.name = name
+
+
+def _type_end(signature: str, start: int) -> int:
+    code = signature[start]
+    if code == "a":
+        return _type_end(signature, start + 1)
+    if code in "({":
+        depth = 0
+        for end in range(start, len(signature)):
+            if signature[end] in "({":
+                depth += 1
+            elif signature[end] in ")}":
+                depth -= 1
+                if depth == 0:
+                    return end + 1
+        raise ValueError(f"Unbalanced D-Bus signature {signature}")
+    if code not in _ALIGNMENT:
+        raise ValueError(f"Unsupported D-Bus type {code} in {signature}")
+    return start + 1
+
+
+def split_signature(signature: str) -> List[str]:
+    """Split a D-Bus signature into its complete types."""
+    types = []
+    start = 0
+    while start < len(signature):
+        end = _type_end(signature, start)
+        types.append(signature[start:end])
+        start = end
+    return types
+
+
+class _Writer:
+    def __init__(self, endian: str = "<"):
+        self.endian = endian
+        self.buffer = bytearray()
+
+    def align(self, size: int):
+        self.buffer.extend(b"\0" * (-len(self.buffer) % size))
+
+    def write(self, kind: str, value: Any):
+        code = kind[0]
+        self.align(_ALIGNMENT[code])
+        if code in _FIXED:
+            self.buffer.extend(struct.pack(self.endian + _FIXED[code], value))
+        elif code in "so":
+            data = value.encode()
+            self.buffer.extend(struct.pack(self.endian + "I", len(data)) + data + b"\0")
+        elif code == "g":
+            data = value.encode()
+            self.buffer.extend(bytes([len(data)]) + data + b"\0")
+        elif code == "v":
+            signature, inner = value
+            self.write("g", signature)
+            self.write(signature, inner)
+        elif code == "(":
+            for field, item in zip(split_signature(kind[1:-1]), value):
+                self.write(field, item)
+        elif code == "{":
+            key, item = split_signature(kind[1:-1])
+            self.write(key, value[0])
+            self.write(item, value[1])
+        elif code == "a":
+            length_at = len(self.buffer)
+            self.buffer.extend(b"\0\0\0\0")
+            element = kind[1:]
+            self.align(_ALIGNMENT[element[0]])
+            start = len(self.buffer)
+            for item in value.items() if element[0] == "{" else value:
+                self.write(element, item)
+            struct.pack_into(
+                self.endian + "I", self.buffer, length_at, len(self.buffer) - start
+            )
+
+
+class _Reader:
+    def __init__(self, data: bytes, endian: str, position: int = 0):
+        self.data = data
+        self.endian = endian
+        self.position = position
+
+    def align(self, size: int):
+        self.position += -self.position % size
+
+    def read(self, kind: str) -> Any:
+        code = kind[0]
+        self.align(_ALIGNMENT[code])
+        if code in _FIXED:
+            fmt = self.endian + _FIXED[code]
+            (value,) = struct.unpack_from(fmt, self.data, self.position)
+            self.position += struct.calcsize(fmt)
+            return bool(value) if code == "b" else value
+        if code in "so":
+            (length,) = struct.unpack_from(self.endian + "I", self.data, self.position)
+            start = self.position + 4
+            self.position = start + length + 1
+            return self.data[start : start + length].decode()
+        if code == "g":
+            length = self.data[self.position]
+            start = self.position + 1
+            self.position = start + length + 1
+            return self.data[start : start + length].decode()
+        if code == "v":
+            signature = self.read("g")
+            return (signature, self.read(signature))
+        if code == "(":
+            return tuple(self.read(field) for field in split_signature(kind[1:-1]))
+        if code == "{":
+            key, item = split_signature(kind[1:-1])
+            return (self.read(key), self.read(item))
+        # Array
+        (length,) = struct.unpack_from(self.endian + "I", self.data, self.position)
+        self.position += 4
+        element = kind[1:]
+        self.align(_ALIGNMENT[element[0]])
+        end = self.position + length
+        items = []
+        while self.position < end:
+            items.append(self.read(element))
+        return dict(items) if element[0] == "{" else items
+
+
+def encode_message(
+    message_type: int,
+    serial: int,
+    fields: Dict[int, Tuple[str, Any]],
+    signature: str = "",
+    body: Iterable = (),
+    flags: int = 0,
+) -> bytes:
+    """Marshal a D-Bus message (little endian).
+
+    Args:
+        message_type: METHOD_CALL, METHOD_RETURN, ERROR or SIGNAL
+        serial: Message serial (non-zero)
+        fields: Header fields, as {code: (signature, value)}
+        signature: Body signature
+        body: Body values, one per complete type of signature
+
+    Returns:
+        The message bytes
+    """
+    payload = _Writer()
+    for kind, value in zip(split_signature(signature), body):
+        payload.write(kind, value)
+    if signature:
+        fields = {**fields, SIGNATURE: ("g", signature)}
+    header = _Writer()
+    for value in (ord("l"), message_type, flags, 1):
+        header.write("y", value)
+    header.write("u", len(payload.buffer))
+    header.write("u", serial)
+    header.write("a(yv)", sorted(fields.items()))
+    header.align(8)
+    return bytes(header.buffer + payload.buffer)
+
+
+def parse_message(data: bytes) -> Tuple[Optional[Message], int]:
+    """Unmarshal the first message in data.
+
+    Returns:
+        (message, bytes consumed), or (None, 0) if data holds no complete
+        message yet
+    """
+    if len(data) < 16:
+        return None, 0
+    endian = "<" if data[:1] == b"l" else ">"
+    body_length, serial, fields_length = struct.unpack_from(endian + "III", data, 4)
+    header_end = 16 + fields_length
+    header_end += -header_end % 8
+    total = header_end + body_length
+    if len(data) < total:
+        return None, 0
+    reader = _Reader(data[:total], endian, 12)
+    fields = {code: value[1] for code, value in reader.read("a(yv)")}
+    reader.position = header_end
+    body = tuple(reader.read(kind) for kind in split_signature(fields.get(SIGNATURE, "")))
+    return Message(data[1], data[2], serial, fields, body), total
+
+
+def bus_address(user: bool = False) -> str:
+    """Address of the bus systemd listens on (system, or the user's session)."""
+    if user:
+        runtime_dir = os.environ.get("XDG_RUNTIME_DIR", f"/run/user/{os.getuid()}")
+        return os.environ.get("DBUS_SESSION_BUS_ADDRESS") or f"unix:path={runtime_dir}/bus"
+    return os.environ.get("DBUS_SYSTEM_BUS_ADDRESS") or SYSTEM_BUS_ADDRESS
+
+
+def socket_path(address: str) -> str:
+    """Unix socket path of a D-Bus address (abstract sockets start with NUL)."""
+    for entry in address.split(";"):
+        transport, _, params = entry.partition(":")
+        if transport != "unix":
+            continue
+        values = dict(param.split("=", 1) for param in params.split(",") if "=" in param)
+        if "path" in values:
+            return unquote(values["path"])
+        if "abstract" in values:
+            return "\0" + unquote(values["abstract"])
+    raise ValueError(f"Unsupported D-Bus address {address}")
+
+
+class DBusConnection:
+    """One authenticated connection to a message bus.
+
+    Calls may be made from several threads. Whichever waiting thread holds
+    the read lock reads the socket and hands replies (and signals, through
+    on_signal) to their waiters.
+    """
+
+    def __init__(self, address: str, timeout: float = DBUS_TIMEOUT):
+        """
+        Args:
+            address: D-Bus address (unix:path=...)
+            timeout: Seconds to wait for a method reply
+        """
+        self.address = address
+        self.timeout = timeout
+        self.on_signal: Optional[Callable[[Message], None]] = None
+        self._buffer = b""
+        self._serial = 0
+        self._replies: Dict[int, Message] = {}
+        self._write_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.sock.settimeout(timeout)
+            self.sock.connect(socket_path(address))
+            self._authenticate()
+            self.unique_name = self.call(BUS_NAME, BUS_PATH, BUS_INTERFACE, "Hello")[0]
+        except Exception:
+            self.sock.close()
+            raise
+
+    def _authenticate(self):
+        uid = str(os.geteuid()).encode().hex()
+        self.sock.sendall(b"\0AUTH EXTERNAL " + uid.encode() + b"\r\n")
+        while b"\r\n" not in self._buffer:
+            chunk = self.sock.recv(4096)
+            if not chunk:
+                raise ConnectionError("D-Bus connection closed during authentication")
+            self._buffer += chunk
+        line, _, self._buffer = self._buffer.partition(b"\r\n")
+        if not line.startswith(b"OK"):
+            raise DBusError("org.freedesktop.DBus.Error.AuthFailed", line.decode(errors="replace"))
+        self.sock.sendall(b"BEGIN\r\n")
+
+    def call(
+        self,
+        destination: str,
+        path: str,
+        interface: str,
+        member: str,
+        signature: str = "",
+        *args,
+        timeout: Optional[float] = None,
+    ) -> tuple:
+        """Call a method and wait for its reply.
+
+        Returns:
+            The reply body
+
+        Raises:
+            DBusError: The method returned an error
+            TimeoutError: No reply in time
+            ConnectionError: The bus closed the connection
+        """
+        serial = self.send(destination, path, interface, member, signature, *args)
+        return self.reply(serial, timeout)
+
+    def send(
+        self,
+        destination: str,
+        path: str,
+        interface: str,
+        member: str,
+        signature: str = "",
+        *args,
+    ) -> int:
+        """Send a method call without waiting, so several can be in flight.
+
+        Returns:
+            Serial to collect the reply with (see reply())
+        """
+        fields = {
+            PATH: ("o", path),
+            MEMBER: ("s", member),
+            DESTINATION: ("s", destination),
+        }
+        if interface:
+            fields[INTERFACE] = ("s", interface)
+        with self._write_lock:
+            self._serial += 1
+            serial = self._serial
+            self.sock.sendall(encode_message(METHOD_CALL, serial, fields, signature, args))
+        return serial
+
+    def reply(self, serial: int, timeout: Optional[float] = None) -> tuple:
+        """Wait for the reply to a call made with send().
+
+        Returns:
+            The reply body
+        """
+        reply = self.wait_for(lambda: self._replies.pop(serial, None), timeout)
+        if reply.type == ERROR:
+            raise DBusError(reply.fields.get(ERROR_NAME, ""), reply.body[0] if reply.body else "")
+        return reply.body
+
+    def wait_for(self, check: Callable[[], Any], timeout: Optional[float] = None):
+        """Read the bus until check() (called under the dispatch lock) returns a value."""
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        while True:
+            with self._cond:
+                result = check()
+            if result is not None:
+                return result
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Timed out waiting for D-Bus on {self.address}")
+            self._pump(deadline)
+
+    def _pump(self, deadline: float):
+        if not self._read_lock.acquire(blocking=False):
+            # Another thread is reading, wait for it to dispatch
+            with self._cond:
+                self._cond.wait(POLL_INTERVAL)
+            return
+        try:
+            messages = self._receive(min(POLL_INTERVAL, max(0.0, deadline - time.monotonic())))
+        finally:
+            self._read_lock.release()
+        with self._cond:
+            for message in messages:
+                self._dispatch(message)
+            self._cond.notify_all()
+
+    def _receive(self, timeout: float) -> List[Message]:
+        messages = self._parse_buffer()
+        if messages:
+            return messages
+        ready, _, _ = select.select([self.sock], [], [], timeout)
+        if not ready:
+            return []
+        chunk = self.sock.recv(65536)
+        if not chunk:
+            raise ConnectionError(f"D-Bus connection to {self.address} closed")
+        self._buffer += chunk
+        return self._parse_buffer()
+
+    def _parse_buffer(self) -> List[Message]:
+        messages = []
+        while True:
+            message, used = parse_message(self._buffer)
+            if message is None:
+                return messages
+            self._buffer = self._buffer[used:]
+            messages.append(message)
+
+    def _dispatch(self, message: Message):
+        if message.type in (METHOD_RETURN, ERROR):
+            self._replies[message.fields.get(REPLY_SERIAL)] = message
+        elif message.type == SIGNAL and self.on_signal:
+            self.on_signal(message)
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class SystemdBus:
+    """systemd unit management over one persistent D-Bus connection.
+
+    The connection is opened on first use and subscribes to JobRemoved, so
+    start/stop/restart wait for their jobs by signal.
+    """
+
+    def __init__(
+        self,
+        user: bool = False,
+        address: Optional[str] = None,
+        timeout: float = DBUS_TIMEOUT,
+        job_timeout: float = JOB_TIMEOUT,
+    ):
+        """
+        Args:
+            user: Talk to the user's systemd instance (session bus)
+            address: D-Bus address (defaults to the system or session bus)
+            timeout: Seconds to wait for a method reply
+            job_timeout: Seconds to wait for start/stop jobs to finish
+        """
+        self.address = address or bus_address(user)
+        self.timeout = timeout
+        self.job_timeout = job_timeout
+        self._connection: Optional[DBusConnection] = None
+        self._lock = threading.Lock()
+        # Result of finished jobs by job path (guarded by the connection)
+        self._jobs: Dict[str, str] = {}
+
+    def connection(self) -> DBusConnection:
+        with self._lock:
+            if self._connection is None:
+                connection = DBusConnection(self.address, self.timeout)
+                connection.on_signal = self._signal
+                try:
+                    connection.call(
+                        BUS_NAME, BUS_PATH, BUS_INTERFACE, "AddMatch", "s", JOB_REMOVED_MATCH
+                    )
+                    connection.call(SYSTEMD_NAME, SYSTEMD_PATH, MANAGER_INTERFACE, "Subscribe")
+                except Exception:
+                    connection.close()
+                    raise
+                logging.debug(f"Connected to systemd over D-Bus at {self.address}")
+                self._connection = connection
+            return self._connection
+
+    def _signal(self, message: Message):
+        if message.fields.get(MEMBER) != "JobRemoved":
+            return
+        _, job, _, result = message.body
+        self._jobs[job] = result
+        while len(self._jobs) > MAX_FINISHED_JOBS:
+            # Jobs of other clients nobody waits for
+            self._jobs.pop(next(iter(self._jobs)))
+
+    def _manager(self, member: str, signature: str = "", *args) -> tuple:
+        return self.connection().call(
+            SYSTEMD_NAME, SYSTEMD_PATH, MANAGER_INTERFACE, member, signature, *args
+        )
+
+    def list_units(self, patterns: List[str]) -> Dict[str, str]:
+        """ActiveState of every loaded unit matching patterns, in one call.
+
+        Units that are not loaded (a stopped template instance, for one) are
+        not listed and are inactive.
+        """
+        units = self._manager("ListUnitsByPatterns", "asas", [], list(patterns))[0]
+        return {unit[0]: unit[3] for unit in units}
+
+    def list_services(self, patterns: List[str]) -> Dict[str, Tuple[str, int]]:
+        """ActiveState and MainPID of every loaded unit matching patterns.
+
+        The units come from one ListUnitsByPatterns call, and the MainPID
+        reads for the active ones are all sent before any reply is awaited,
+        so the bus is not waited on once per unit.
+        """
+        units = self._manager("ListUnitsByPatterns", "asas", [], list(patterns))[0]
+        connection = self.connection()
+        pending = {
+            unit[0]: connection.send(
+                SYSTEMD_NAME, unit[6], PROPERTIES_INTERFACE, "Get", "ss",
+                SERVICE_INTERFACE, "MainPID",
+            )
+            for unit in units
+            if unit[3] == "active"
+        }
+        services = {unit[0]: (unit[3], 0) for unit in units}
+        for name, serial in pending.items():
+            _, pid = connection.reply(serial)[0]
+            services[name] = (services[name][0], pid)
+        return services
+
+    def _property(self, path: str, interface: str, name: str) -> Any:
+        _, value = self.connection().call(
+            SYSTEMD_NAME, path, PROPERTIES_INTERFACE, "Get", "ss", interface, name
+        )[0]
+        return value
+
+    def unit_status(self, unit: str) -> Tuple[str, int]:
+        """ActiveState and MainPID of one service unit.
+
+        Only the unit itself is looked up (GetUnit), a unit that is not
+        loaded is inactive.
+        """
+        try:
+            path = self._manager("GetUnit", "s", unit)[0]
+        except DBusError as err:
+            if err.name == NO_SUCH_UNIT:
+                return ("inactive", 0)
+            raise
+        active_state = self._property(path, UNIT_INTERFACE, "ActiveState")
+        pid = 0
+        if active_state == "active":
+            pid = self._property(path, SERVICE_INTERFACE, "MainPID")
+        return (active_state, pid)
+
+    def _run_jobs(self, member: str, units: List[str]) -> bool:
+        jobs = [self._manager(member, "ss", unit, "replace")[0] for unit in units]
+        connection = self.connection()
+        deadline = time.monotonic() + self.job_timeout
+        failed = []
+        for unit, job in zip(units, jobs):
+            result = connection.wait_for(
+                lambda job=job: self._jobs.pop(job, None),
+                max(0.0, deadline - time.monotonic()),
+            )
+            if result != "done":
+                failed.append(f"{unit} ({result})")
+        if failed:
+            logging.error(f"systemd {member} failed: {', '.join(failed)}")
+        return not failed
+
+    def start_units(self, units: List[str]) -> bool:
+        """Start units and wait for their jobs to finish."""
+        return self._run_jobs("StartUnit", units)
+
+    def stop_units(self, units: List[str]) -> bool:
+        """Stop units and wait for their jobs to finish."""
+        return self._run_jobs("StopUnit", units)
+
+    def restart_units(self, units: List[str]) -> bool:
+        """Restart units and wait for their jobs to finish."""
+        return self._run_jobs("RestartUnit", units)
+
+    def reload(self) -> bool:
+        """Reload unit files (systemctl daemon-reload)."""
+        self._manager("Reload")
+        return True
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
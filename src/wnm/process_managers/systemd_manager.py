@@ -3,6 +3,18 @@ SystemdManager: Manage nodes via systemd services.
 
 Handles node lifecycle operations using systemd unit files and systemctl commands.
 Requires sudo privileges for systemctl and firewall operations.
+
+With systemd_template set, new nodes are instances of a single
+antnode@.service template unit (antnode@0001.service) whose per-node
+settings live in small environment files. Environment files are read when
+an instance starts, so creating or removing an instance needs no
+daemon-reload; only writing the template does. Nodes with their own unit
+file keep working side by side.
+
+With systemd_transport set to dbus, units are started, stopped, queried and
+reloaded over one D-Bus connection to systemd (see systemd_dbus.py) instead
+of a systemctl process per operation. If the bus cannot be used the manager
+falls back to systemctl for the rest of its lifetime.
 """
 
 import logging
@@ -10,12 +22,15 @@ import os
 import re
 import shutil
 import subprocess
+import threading
 import time
+from typing import Dict, List
 
 from wnm.common import DEAD, RESTARTING, RUNNING, STOPPED, UPGRADING
 from wnm.config import BOOTSTRAP_CACHE_DIR, IS_ROOT, LOG_DIR
 from wnm.models import Node
 from wnm.process_managers.base import NodeProcess, ProcessManager
+from wnm.process_managers.systemd_dbus import ACCESS_ERRORS, DBusError, SystemdBus
 from wnm.utils import (
     get_antnode_version,
     get_node_age,
@@ -23,11 +38,27 @@ from wnm.utils import (
     read_node_metrics,
 )
 
+# Template unit all instance nodes share
+TEMPLATE_UNIT = "antnode@.service"
+# Directory (under the service directory) holding instance environment files
+INSTANCE_DIR = "antnode.instances"
+
+
+def is_instance(service: str) -> bool:
+    """True if service is an instance of the antnode@.service template."""
+    return "@" in (service or "")
+
 
 class SystemdManager(ProcessManager):
     """Manage nodes as systemd services (system or user mode)"""
 
-    def __init__(self, session_factory=None, firewall_type: str = None, mode: str = None):
+    def __init__(
+        self,
+        session_factory=None,
+        firewall_type: str = None,
+        mode: str = None,
+        transport: str = None,
+    ):
         """
         Initialize SystemdManager.
 
@@ -35,6 +66,7 @@ class SystemdManager(ProcessManager):
             session_factory: SQLAlchemy session factory (optional, for status updates)
             firewall_type: Type of firewall to use (defaults to auto-detect, null for non-root)
             mode: Operation mode - "sudo" for system services with sudo, "user" for user services
+            transport: "dbus" to talk to systemd over D-Bus, "subprocess" (default) for systemctl
         """
         # Determine if we're using system or user services based on mode parameter
         # mode="sudo": Use system services in /etc/systemd/system/ with sudo (production)
@@ -68,6 +100,157 @@ class SystemdManager(ProcessManager):
             self.systemctl_cmd = ["systemctl", "--user"]
             # Create user service directory if it doesn't exist
             os.makedirs(self.service_dir, exist_ok=True)
+        self.instance_dir = os.path.join(self.service_dir, INSTANCE_DIR)
+        # Template unit content known to be installed and loaded
+        self._template = None
+        self._template_lock = threading.Lock()
+        # D-Bus transport (None uses systemctl)
+        self.bus = (
+            SystemdBus(user=not self.use_system_services) if transport == "dbus" else None
+        )
+
+    def _dbus(self, operation: str, *args):
+        """Run a SystemdBus operation.
+
+        Returns:
+            The operation result, or None if the bus is not in use or failed
+            (the caller then uses systemctl)
+        """
+        bus = self.bus
+        if bus is None:
+            return None
+        try:
+            return getattr(bus, operation)(*args)
+        except DBusError as err:
+            if err.name not in ACCESS_ERRORS:
+                # The unit operation itself failed, systemctl would fail too
+                logging.error(f"systemd {operation} failed: {err}")
+                return False
+            logging.warning(f"Not allowed to manage units over D-Bus ({err}), using systemctl")
+        except (OSError, ValueError) as err:
+            logging.warning(f"systemd D-Bus transport failed ({err}), using systemctl")
+        bus.close()
+        self.bus = None
+        return None
+
+    def _write_file(self, path: str, content: str) -> bool:
+        """Write a unit or environment file (through sudo for system services)."""
+        if self.use_system_services:
+            try:
+                subprocess.run(
+                    ["sudo", "tee", path],
+                    input=content,
+                    text=True,
+                    stdout=subprocess.PIPE,
+                    check=True,
+                )
+            except subprocess.CalledProcessError as err:
+                logging.error(f"Failed to write {path}: {err}")
+                return False
+        else:
+            try:
+                with open(path, "w") as f:
+                    f.write(content)
+            except OSError as err:
+                logging.error(f"Failed to write {path}: {err}")
+                return False
+        return True
+
+    def _remove_file(self, path: str) -> bool:
+        """Remove a unit or environment file (through sudo for system services)."""
+        if self.use_system_services:
+            try:
+                subprocess.run(["sudo", "rm", "-f", path], check=True)
+            except subprocess.CalledProcessError as err:
+                logging.error(f"Failed to remove {path}: {err}")
+                return False
+        else:
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+            except OSError as err:
+                logging.error(f"Failed to remove {path}: {err}")
+                return False
+        return True
+
+    def daemon_reload(self) -> bool:
+        """Reload systemd unit files.
+
+        Returns:
+            True if systemd was reloaded
+        """
+        reloaded = self._dbus("reload")
+        if reloaded is not None:
+            return reloaded
+        try:
+            subprocess.run(
+                self.systemctl_cmd + ["daemon-reload"],
+                stdout=subprocess.PIPE,
+                check=True,
+            )
+        except subprocess.CalledProcessError as err:
+            logging.error(f"Failed to reload systemd: {err}")
+            return False
+        return True
+
+    def instance_path(self, node_name: str) -> str:
+        """Path of the environment file of a template instance node."""
+        return os.path.join(self.instance_dir, f"antnode{node_name}.env")
+
+    def _template_content(self, user_line: str) -> str:
+        return f"""[Unit]
+Description=antnode%i
+[Service]
+EnvironmentFile={self.instance_dir}/antnode%i.env
+{user_line}
+ExecStart=/usr/bin/env ${{ANTNODE_BINARY}} $ANTNODE_ARGS
+Restart=always
+#RestartSec=300
+"""
+
+    def _ensure_template(self, user_line: str) -> bool:
+        """Install the antnode@.service template unit if it is missing or changed.
+
+        systemd is reloaded only when the template is written, so a batch of
+        instance creates shares at most one daemon-reload.
+
+        Returns:
+            True if the template is installed and loaded
+        """
+        content = self._template_content(user_line)
+        with self._template_lock:
+            if self._template == content:
+                return True
+            if self.use_system_services:
+                try:
+                    subprocess.run(
+                        ["sudo", "mkdir", "-p", self.instance_dir],
+                        stdout=subprocess.PIPE,
+                        check=True,
+                    )
+                except subprocess.CalledProcessError as err:
+                    logging.error(f"Failed to create {self.instance_dir}: {err}")
+                    return False
+            else:
+                try:
+                    os.makedirs(self.instance_dir, exist_ok=True)
+                except OSError as err:
+                    logging.error(f"Failed to create {self.instance_dir}: {err}")
+                    return False
+            template_path = os.path.join(self.service_dir, TEMPLATE_UNIT)
+            try:
+                with open(template_path) as f:
+                    installed = f.read()
+            except OSError:
+                installed = None
+            if installed != content:
+                logging.info(f"Installing systemd template unit {template_path}")
+                if not self._write_file(template_path, content):
+                    return False
+                if not self.daemon_reload():
+                    return False
+            self._template = content
+        return True
 
     def create_node(self, node: Node, binary_path: str) -> NodeProcess:
         """
@@ -83,19 +266,7 @@ class SystemdManager(ProcessManager):
         logging.info(f"Creating systemd node {node.id}")
 
         # Get machine config to check no_upnp setting
-        machine_config = None
-        if self.S:
-            from wnm.config import S
-            from wnm.models import Machine
-            from sqlalchemy import select
-
-            try:
-                with S() as session:
-                    result = session.execute(select(Machine)).first()
-                    if result:
-                        machine_config = result[0]
-            except Exception as e:
-                logging.warning(f"Failed to get machine config: {e}")
+        machine_config = self._get_machine_config()
 
         # Prepare service name
         service_name = f"antnode{node.node_name}.service"
@@ -122,27 +293,13 @@ class SystemdManager(ProcessManager):
                 logging.error(f"Failed to create directories: {err}")
                 return None
 
-        # Copy binary to node directory
-        if self.use_system_services:
-            # Root: use sudo to copy
-            try:
-                subprocess.run(
-                    ["sudo", "cp", binary_path, node.root_dir],
-                    stdout=subprocess.PIPE,
-                    check=True,
-                )
-            except subprocess.CalledProcessError as err:
-                logging.error(f"Failed to copy binary: {err}")
-                return None
-        else:
-            # Non-root: copy as current user
-            try:
-                shutil.copy2(binary_path, node.root_dir)
-                binary_dest = os.path.join(node.root_dir, "antnode")
-                os.chmod(binary_dest, 0o755)
-            except (OSError, shutil.Error) as err:
-                logging.error(f"Failed to copy binary: {err}")
-                return None
+        # Link binary into node directory (root: through sudo)
+        if not self.install_binary(
+            binary_path,
+            os.path.join(node.root_dir, "antnode"),
+            sudo=self.use_system_services,
+        ):
+            return None
 
         # Change ownership (only when running as root)
         # When running as non-root user, files remain owned by current user
@@ -189,6 +346,10 @@ class SystemdManager(ProcessManager):
             exec_args.append("--no-upnp")
 
         exec_args.extend(["--rewards-address", node.wallet, node.network])
+
+        if machine_config and getattr(machine_config, "systemd_template", 0):
+            return self._create_instance(node, exec_args, user_line)
+
         exec_start = " ".join(exec_args)
 
         service_content = f"""[Unit]
@@ -202,38 +363,11 @@ Restart=always
 """
 
         # Write service file
-        service_path = f"{self.service_dir}/{service_name}"
-        if self.use_system_services:
-            # System services: use sudo to write to /etc/systemd/system
-            try:
-                subprocess.run(
-                    ["sudo", "tee", service_path],
-                    input=service_content,
-                    text=True,
-                    stdout=subprocess.PIPE,
-                    check=True,
-                )
-            except subprocess.CalledProcessError as err:
-                logging.error(f"Failed to write service file: {err}")
-                return None
-        else:
-            # User services: write directly to ~/.config/systemd/user
-            try:
-                with open(service_path, "w") as f:
-                    f.write(service_content)
-            except OSError as err:
-                logging.error(f"Failed to write service file: {err}")
-                return None
+        if not self._write_file(f"{self.service_dir}/{service_name}", service_content):
+            return None
 
         # Reload systemd
-        try:
-            subprocess.run(
-                self.systemctl_cmd + ["daemon-reload"],
-                stdout=subprocess.PIPE,
-                check=True,
-            )
-        except subprocess.CalledProcessError as err:
-            logging.error(f"Failed to reload systemd: {err}")
+        if not self.daemon_reload():
             return None
 
         # Start the node
@@ -246,6 +380,39 @@ Restart=always
             status=RESTARTING,  # Node is starting up
         )
 
+    def _create_instance(self, node: Node, exec_args: List[str], user_line: str) -> NodeProcess:
+        """Create and start a node as an instance of the antnode@.service template.
+
+        Args:
+            node: Node database record with configuration
+            exec_args: antnode command line (binary first)
+            user_line: User= line of the template
+
+        Returns:
+            NodeProcess with the instance service name, None if creation failed
+        """
+        if not self._ensure_template(user_line):
+            return None
+
+        lines = [
+            f"ANTNODE_BINARY={exec_args[0]}",
+            f"ANTNODE_ARGS={' '.join(exec_args[1:])}",
+        ]
+        if node.environment:
+            lines.append(node.environment)
+        if not self._write_file(self.instance_path(node.node_name), "\n".join(lines) + "\n"):
+            return None
+
+        node.service = f"antnode@{node.node_name}.service"
+        if not self.start_node(node):
+            return None
+
+        return NodeProcess(
+            node_id=node.id,
+            status=RESTARTING,  # Node is starting up
+            external_node_id=node.service,
+        )
+
     def start_node(self, node: Node) -> bool:
         """
         Start a systemd node.
@@ -257,33 +424,54 @@ Restart=always
             True if node started successfully
         """
         logging.info(f"Starting systemd node {node.id}")
+        return self.start_nodes([node])
 
-        # Check if node is already responding on metadata port
-        metadata = read_node_metadata(node.host, node.metrics_port)
-        if isinstance(metadata, dict) and metadata.get("status") == RUNNING:
-            logging.warning(
-                f"Node {node.id} already responding on metadata port {node.metrics_port}, "
-                "skipping start to avoid duplicate process"
-            )
+    def start_nodes(self, nodes: List[Node]) -> bool:
+        """
+        Start several systemd nodes with a single systemctl call.
+
+        Args:
+            nodes: Node database records
+
+        Returns:
+            True if all nodes started successfully
+        """
+        to_start = []
+        for node in nodes:
+            # Check if node is already responding on metadata port
+            metadata = read_node_metadata(node.host, node.metrics_port)
+            if isinstance(metadata, dict) and metadata.get("status") == RUNNING:
+                logging.warning(
+                    f"Node {node.id} already responding on metadata port {node.metrics_port}, "
+                    "skipping start to avoid duplicate process"
+                )
+                continue
+            to_start.append(node)
+        if not to_start:
             return True
 
-        # Start service
-        try:
-            result = subprocess.run(
-                self.systemctl_cmd + ["start", node.service],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-            )
-            if "Failed to start" in result.stdout:
-                logging.error(f"Failed to start node: {result.stdout}")
-                return False
-        except subprocess.CalledProcessError as err:
-            logging.error(f"Failed to start node: {err}")
+        # Start services
+        started = self._dbus("start_units", [node.service for node in to_start])
+        if started is False:
             return False
+        if started is None:
+            try:
+                result = subprocess.run(
+                    self.systemctl_cmd + ["start"] + [node.service for node in to_start],
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    text=True,
+                )
+                if "Failed to start" in result.stdout:
+                    logging.error(f"Failed to start node: {result.stdout}")
+                    return False
+            except subprocess.CalledProcessError as err:
+                logging.error(f"Failed to start node: {err}")
+                return False
 
-        # Open firewall port
-        self.enable_firewall_port(node.port)
+        # Open firewall ports
+        for node in to_start:
+            self.enable_firewall_port(node.port)
 
         return True
 
@@ -298,20 +486,39 @@ Restart=always
             True if node stopped successfully
         """
         logging.info(f"Stopping systemd node {node.id}")
+        return self.stop_nodes([node])
 
-        # Stop service
-        try:
-            subprocess.run(
-                self.systemctl_cmd + ["stop", node.service],
-                stdout=subprocess.PIPE,
-                check=True,
-            )
-        except subprocess.CalledProcessError as err:
-            logging.error(f"Failed to stop node: {err}")
+    def stop_nodes(self, nodes: List[Node]) -> bool:
+        """
+        Stop several systemd nodes with a single systemctl call.
+
+        Args:
+            nodes: Node database records
+
+        Returns:
+            True if all nodes stopped successfully
+        """
+        if not nodes:
+            return True
+
+        # Stop services
+        stopped = self._dbus("stop_units", [node.service for node in nodes])
+        if stopped is False:
             return False
+        if stopped is None:
+            try:
+                subprocess.run(
+                    self.systemctl_cmd + ["stop"] + [node.service for node in nodes],
+                    stdout=subprocess.PIPE,
+                    check=True,
+                )
+            except subprocess.CalledProcessError as err:
+                logging.error(f"Failed to stop node: {err}")
+                return False
 
-        # Close firewall port
-        self.disable_firewall_port(node.port)
+        # Close firewall ports
+        for node in nodes:
+            self.disable_firewall_port(node.port)
 
         return True
 
@@ -327,6 +534,9 @@ Restart=always
         """
         logging.info(f"Restarting systemd node {node.id}")
 
+        restarted = self._dbus("restart_units", [node.service])
+        if restarted is not None:
+            return restarted
         try:
             subprocess.run(
                 self.systemctl_cmd + ["restart", node.service],
@@ -349,6 +559,13 @@ Restart=always
         Returns:
             NodeProcess with current status
         """
+        status = self._dbus("unit_status", node.service)
+        if isinstance(status, tuple):
+            active_state, pid = status
+            return self._node_process(node, pid, active_state)
+        if self.bus is not None:
+            # The bus answered with an error
+            return NodeProcess(node_id=node.id, pid=None, status="UNKNOWN")
         try:
             result = subprocess.run(
                 self.systemctl_cmd
@@ -364,27 +581,59 @@ Restart=always
 
             pid = int(state_info.get("MainPID", 0))
             active_state = state_info.get("ActiveState", "unknown")
-
-            # Map systemd state to our status
-            if active_state == "active":
-                status = RUNNING
-            elif active_state == "inactive" or active_state == "failed":
-                status = STOPPED
-            else:
-                status = "UNKNOWN"
-
-            # Check if root directory exists
-            if not os.path.isdir(node.root_dir):
-                status = DEAD
-
-            return NodeProcess(
-                node_id=node.id, pid=pid if pid > 0 else None, status=status
-            )
+            return self._node_process(node, pid, active_state)
 
         except (subprocess.CalledProcessError, ValueError, KeyError) as err:
             logging.error(f"Failed to get node status: {err}")
             return NodeProcess(node_id=node.id, pid=None, status="UNKNOWN")
 
+    def _node_process(self, node: Node, pid: int, active_state: str) -> NodeProcess:
+        # Map systemd state to our status
+        if active_state == "active":
+            status = RUNNING
+        elif active_state == "inactive" or active_state == "failed":
+            status = STOPPED
+        else:
+            status = "UNKNOWN"
+
+        # Check if root directory exists
+        if not os.path.isdir(node.root_dir):
+            status = DEAD
+
+        return NodeProcess(
+            node_id=node.id, pid=pid if pid > 0 else None, status=status
+        )
+
+    def get_statuses(self, nodes: List[Node]) -> Dict[int, NodeProcess]:
+        """
+        Get current status of several systemd nodes.
+
+        Over D-Bus the state of every antnode unit comes from one
+        ListUnitsByPatterns call, with the MainPID reads pipelined after it;
+        otherwise each node is queried in turn.
+
+        Args:
+            nodes: Node database records
+
+        Returns:
+            NodeProcess of each node by node id
+        """
+        services = self._dbus("list_services", ["antnode*.service"])
+        if not isinstance(services, dict):
+            if self.bus is not None:
+                # The bus answered with an error
+                return {
+                    node.id: NodeProcess(node_id=node.id, pid=None, status="UNKNOWN")
+                    for node in nodes
+                }
+            return {node.id: self.get_status(node) for node in nodes}
+        statuses = {}
+        for node in nodes:
+            # Units that are not loaded are not listed
+            active_state, pid = services.get(node.service, ("inactive", 0))
+            statuses[node.id] = self._node_process(node, pid, active_state)
+        return statuses
+
     def remove_node(self, node: Node) -> bool:
         """
         Stop and remove a systemd node.
@@ -396,61 +645,60 @@ Restart=always
             True if node was removed successfully
         """
         logging.info(f"Removing systemd node {node.id}")
+        return self.remove_nodes([node])
 
-        # Stop the node first
-        self.stop_node(node)
+    def remove_nodes(self, nodes: List[Node]) -> bool:
+        """
+        Stop and remove several systemd nodes.
 
-        nodename = f"antnode{node.node_name}"
-        log_path = f"{LOG_DIR}/{nodename}"
+        The nodes are stopped with a single systemctl call, and systemd is
+        reloaded once, only if unit files were removed (template instances
+        need no reload).
 
-        # Remove data and logs
-        if self.use_system_services:
-            # System services: use sudo to remove
-            try:
-                subprocess.run(
-                    ["sudo", "rm", "-rf", node.root_dir, log_path],
-                    check=True,
-                )
-            except subprocess.CalledProcessError as err:
-                logging.error(f"Failed to remove node data: {err}")
-        else:
-            # User services: remove as current user
-            try:
-                if os.path.exists(node.root_dir):
-                    shutil.rmtree(node.root_dir)
-                if os.path.exists(log_path):
-                    shutil.rmtree(log_path)
-            except (OSError, shutil.Error) as err:
-                logging.error(f"Failed to remove node data: {err}")
-
-        # Remove service file
-        service_path = f"{self.service_dir}/{node.service}"
-        if self.use_system_services:
-            # System services: use sudo to remove
-            try:
-                subprocess.run(
-                    ["sudo", "rm", "-f", service_path],
-                    check=True,
-                )
-            except subprocess.CalledProcessError as err:
-                logging.error(f"Failed to remove service file: {err}")
-        else:
-            # User services: remove as current user
-            try:
-                if os.path.exists(service_path):
-                    os.remove(service_path)
-            except OSError as err:
-                logging.error(f"Failed to remove service file: {err}")
+        Args:
+            nodes: Node database records
+
+        Returns:
+            True if the nodes were removed successfully
+        """
+        # Stop the nodes first
+        self.stop_nodes(nodes)
+
+        reload = False
+        for node in nodes:
+            nodename = f"antnode{node.node_name}"
+            log_path = f"{LOG_DIR}/{nodename}"
+
+            # Remove data and logs
+            if self.use_system_services:
+                # System services: use sudo to remove
+                try:
+                    subprocess.run(
+                        ["sudo", "rm", "-rf", node.root_dir, log_path],
+                        check=True,
+                    )
+                except subprocess.CalledProcessError as err:
+                    logging.error(f"Failed to remove node data: {err}")
+            else:
+                # User services: remove as current user
+                try:
+                    if os.path.exists(node.root_dir):
+                        shutil.rmtree(node.root_dir)
+                    if os.path.exists(log_path):
+                        shutil.rmtree(log_path)
+                except (OSError, shutil.Error) as err:
+                    logging.error(f"Failed to remove node data: {err}")
+
+            # Remove instance environment file or service file
+            if is_instance(node.service):
+                self._remove_file(self.instance_path(node.node_name))
+            else:
+                self._remove_file(f"{self.service_dir}/{node.service}")
+                reload = True
 
         # Reload systemd
-        try:
-            subprocess.run(
-                self.systemctl_cmd + ["daemon-reload"],
-                stdout=subprocess.PIPE,
-                check=True,
-            )
-        except subprocess.CalledProcessError as err:
-            logging.error(f"Failed to reload systemd: {err}")
+        if reload:
+            self.daemon_reload()
 
         return True
 
@@ -482,6 +730,16 @@ Restart=always
                 logging.error(f"Error listing systemd services: {e}")
                 return []
 
+        # Template instances are found by their environment files
+        if os.path.isdir(self.instance_dir):
+            try:
+                for file in os.listdir(self.instance_dir):
+                    match = re.match(r"antnode([\d]+)\.env$", file)
+                    if match:
+                        service_names.append(f"antnode@{match.group(1)}.service")
+            except OSError as e:
+                logging.error(f"Error listing systemd instances: {e}")
+
         if not service_names:
             logging.info("No systemd antnode services found")
             return []
@@ -492,7 +750,7 @@ Restart=always
         for service_name in service_names:
             logging.debug(f"{time.strftime('%Y-%m-%d %H:%M')} surveying {service_name}")
 
-            node_id_match = re.findall(r"antnode([\d]+)\.service", service_name)
+            node_id_match = re.findall(r"antnode@?([\d]+)\.service", service_name)
             if not node_id_match:
                 logging.info(f"Can't decode {service_name}")
                 continue
@@ -554,13 +812,22 @@ Restart=always
         """
         details = {}
         service_path = f"{self.service_dir}/{service_name}"
+        instance = is_instance(service_name)
 
         try:
-            with open(service_path, "r") as file:
-                data = file.read()
-
-            details["id"] = int(re.findall(r"antnode(\d+)", service_name)[0])
-            details["binary"] = re.findall(r"ExecStart=([^ ]+)", data)[0]
+            details["id"] = int(re.findall(r"antnode@?(\d+)", service_name)[0])
+            if instance:
+                # Instance settings are in its environment file, User= in the template
+                service_path = self.instance_path(f"{details['id']:04}")
+                with open(service_path, "r") as file:
+                    settings = file.read()
+                with open(f"{self.service_dir}/{TEMPLATE_UNIT}", "r") as file:
+                    data = settings + file.read()
+                details["binary"] = re.findall(r"ANTNODE_BINARY=(\S+)", data)[0]
+            else:
+                with open(service_path, "r") as file:
+                    data = file.read()
+                details["binary"] = re.findall(r"ExecStart=([^ ]+)", data)[0]
             # User field may be empty for user services
             user_matches = re.findall(r"User=(\w+)", data)
             details["user"] = user_matches[0] if user_matches else os.getenv("USER", "nobody")
@@ -584,8 +851,15 @@ Restart=always
                 details["host"] = machine_config.host
 
             # Check for environment variables
-            env_matches = re.findall(r'Environment="(.+)"', data)
-            details["environment"] = env_matches[0] if env_matches else ""
+            if instance:
+                details["environment"] = " ".join(
+                    line
+                    for line in settings.splitlines()
+                    if line and not line.startswith(("ANTNODE_BINARY=", "ANTNODE_ARGS="))
+                )
+            else:
+                env_matches = re.findall(r'Environment="(.+)"', data)
+                details["environment"] = env_matches[0] if env_matches else ""
 
         except Exception as e:
             logging.debug(f"Error reading service file {service_path}: {e}")
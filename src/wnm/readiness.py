@@ -0,0 +1,41 @@
+"""
+Readiness probing for nodes in RESTARTING or UPGRADING.
+
+A node that has been started or upgraded is promoted to RUNNING as soon as
+its metadata endpoint reports a version and its metrics show connected
+peers, instead of waiting out the whole delay_start/delay_upgrade timer.
+Nodes that are not ready yet are probed again with exponential backoff, and
+the timer is kept only as an upper bound after which the transition is
+recorded as failed.
+"""
+
+from typing import Dict, Optional
+
+# First probe this long after the transition starts, doubling up to the max
+READY_PROBE_BASE = 5
+READY_PROBE_MAX = 60
+
+# node_transition outcomes
+READY = "ready"
+FAILED = "failed"
+ABANDONED = "abandoned"
+
+
+def node_is_ready(metrics: Optional[Dict], metadata: Optional[Dict]) -> bool:
+    """Check a survey result shows a node ready to be marked RUNNING.
+
+    Args:
+        metrics: Node metrics as returned by survey_node
+        metadata: Node metadata as returned by survey_node
+
+    Returns:
+        True if the node reports a version and has connected peers
+    """
+    if not metrics or not metadata or not metadata.get("version"):
+        return False
+    return (metrics.get("connected_peers") or 0) > 0
+
+
+def next_probe_delay(probes: int) -> int:
+    """Seconds to wait before the next probe after probes attempts."""
+    return min(READY_PROBE_BASE * 2 ** max(0, probes), READY_PROBE_MAX)
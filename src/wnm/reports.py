@@ -11,7 +11,9 @@ from typing import List, Optional
 
 from sqlalchemy import select
 
+from wnm.history import node_rates
 from wnm.models import Node
+from wnm.rollout import load_rollout, nodes_per_hour, upgrade_downtime
 from wnm.common import RUNNING, STOPPED, UPGRADING, RESTARTING, REMOVING, DISABLED, DEAD
 from wnm.utils import parse_service_names
 
@@ -20,9 +22,11 @@ class NodeReporter:
     """
     Reporter class for generating node status reports.
 
-    Supports two report types:
+    Supports these report types:
     - node-status: Tabular summary of nodes
     - node-status-details: Detailed node information
+    - influx-resources: InfluxDB line protocol metrics
+    - node-rates: Per-node rates from the metrics history
     """
 
     def __init__(self, session_factory):
@@ -166,6 +170,66 @@ class NodeReporter:
         else:
             return self._format_details_text(nodes)
 
+    def node_rates_report(
+        self,
+        service_name: Optional[str] = None,
+        report_format: str = "text",
+        window: int = 3600,
+    ) -> str:
+        """
+        Generate per-node rates from the metrics history.
+
+        Format (text):
+            Service Name     Samples    Puts/h  Records/h   Reward Delta
+            antnode0001           60     12.00       4.00              0
+
+        Args:
+            service_name: Optional comma-separated list of service names
+            report_format: Output format ("text" or "json")
+            window: Look-back window in seconds (default: one hour)
+
+        Returns:
+            Formatted string report
+        """
+        service_names = parse_service_names(service_name)
+        nodes = self._get_nodes(service_names)
+
+        if not nodes:
+            if report_format == "json":
+                return json.dumps({"error": "No nodes found"}, indent=2)
+            return "No nodes found."
+
+        rates = node_rates(self.S, window=window, node_ids=[node.id for node in nodes])
+        empty = {
+            "samples": 0,
+            "span": 0,
+            "puts": 0,
+            "puts_per_hour": 0,
+            "records_delta": 0,
+            "records_per_hour": 0,
+            "reward_delta": "0",
+        }
+
+        if report_format == "json":
+            node_dicts = [
+                {"service_name": node.service, **rates.get(node.id, empty)}
+                for node in nodes
+            ]
+            if len(node_dicts) == 1:
+                return json.dumps(node_dicts[0], indent=2)
+            return json.dumps(node_dicts, indent=2)
+
+        lines = [
+            f"{'Service Name':<20}{'Samples':>8}{'Puts/h':>10}{'Records/h':>11}{'Reward Delta':>15}"
+        ]
+        for node in nodes:
+            rate = rates.get(node.id, empty)
+            lines.append(
+                f"{node.service:<20}{rate['samples']:>8}{rate['puts_per_hour']:>10.2f}"
+                + f"{rate['records_per_hour']:>11.2f}{rate['reward_delta']:>15}"
+            )
+        return "\n".join(lines)
+
     def _format_details_text(self, nodes: List[Node]) -> str:
         """
         Format node details as text (key: value format).
@@ -408,6 +472,103 @@ def generate_influx_resources_report(
     return reporter.influx_resources_report(service_name)
 
 
+def generate_node_rates_report(
+    session_factory,
+    service_name: Optional[str] = None,
+    report_format: str = "text"
+) -> str:
+    """
+    Convenience function to generate the node rates report.
+
+    Args:
+        session_factory: SQLAlchemy scoped_session factory
+        service_name: Optional comma-separated list of service names
+        report_format: Output format ("text" or "json")
+
+    Returns:
+        Formatted report string
+    """
+    reporter = NodeReporter(session_factory)
+    return reporter.node_rates_report(service_name, report_format)
+
+
+def generate_upgrade_status_report(
+    session_factory,
+    report_format: str = "text"
+) -> str:
+    """
+    Generate a report of the most recent rolling upgrade.
+
+    Format (text):
+        Version:       0.4.7
+        State:         rolling
+        Wave:          2 (4 nodes, 1 in progress)
+        Upgraded:      3
+        Rolled back:   0
+        Nodes/hour:    6.00
+        Downtime:      1.42s avg, 2.10s max (3 nodes)
+
+    Args:
+        session_factory: SQLAlchemy scoped_session factory
+        report_format: Output format ("text" or "json")
+
+    Returns:
+        Formatted report string
+    """
+    rollout = load_rollout(session_factory)
+    if rollout is None:
+        # Upgrades outside a rollout still report their downtime
+        downtime = upgrade_downtime(session_factory)
+        if report_format == "json":
+            return json.dumps(
+                {"error": "No upgrade rollout found", "downtime": downtime}, indent=2
+            )
+        lines = ["No upgrade rollout found."]
+        if downtime["count"]:
+            lines.append(f"{'Downtime:':<15}{_format_downtime(downtime)}")
+        return "\n".join(lines)
+
+    wave_nodes = sorted(int(node_id) for node_id in json.loads(rollout["wave_nodes"] or "{}"))
+    status = {
+        "version": rollout["version"],
+        "state": rollout["state"],
+        "started_at": rollout["started_at"],
+        "finished_at": rollout["finished_at"],
+        "wave": rollout["wave"],
+        "wave_size": rollout["wave_size"],
+        "wave_nodes": wave_nodes,
+        "upgraded": rollout["upgraded"],
+        "rolled_back": rollout["rolled_back"],
+        "nodes_per_hour": nodes_per_hour(rollout),
+        "reason": rollout["reason"],
+        "downtime": upgrade_downtime(session_factory, rollout["started_at"]),
+    }
+    if report_format == "json":
+        return json.dumps(status, indent=2)
+
+    lines = [
+        f"{'Version:':<15}{status['version']}",
+        f"{'State:':<15}{status['state']}",
+        f"{'Wave:':<15}{status['wave']} ({status['wave_size']} nodes, {len(wave_nodes)} in progress)",
+        f"{'Upgraded:':<15}{status['upgraded']}",
+        f"{'Rolled back:':<15}{status['rolled_back']}",
+        f"{'Nodes/hour:':<15}{status['nodes_per_hour']:.2f}",
+        f"{'Downtime:':<15}{_format_downtime(status['downtime'])}",
+    ]
+    if status["reason"]:
+        lines.append(f"{'Reason:':<15}{status['reason']}")
+    return "\n".join(lines)
+
+
+def _format_downtime(downtime) -> str:
+    if not downtime["count"]:
+        return "not measured"
+    return (
+        f"{downtime['average']:.2f}s avg, {downtime['max']:.2f}s max "
+        + f"({downtime['count']} nodes)"
+    )
+
+
 def generate_machine_config_report(
     session_factory,
     dbpath: str,
@@ -0,0 +1,425 @@
+"""
+Rolling upgrades for weave-node-manager (wnm).
+
+With upgrade_canary set, outdated nodes are upgraded in waves instead of as
+fast as max_concurrent_upgrades allows. The first wave is a canary cohort of
+upgrade_canary nodes. Once every node of a wave has finished its UPGRADING
+transition and the wave has soaked for ROLLOUT_SOAK seconds, its health
+(status, connected_peers, records and shunned) is compared with the
+baseline taken when the upgrade was planned. A healthy
+wave doubles the size of the next one; a wave that regressed pauses the
+rollout and, when the previous binaries were kept, rolls the wave back.
+Progress is kept in the upgrade_rollout table so cron runs carry on where
+the last one stopped.
+"""
+
+import json
+import logging
+import os
+import subprocess
+import time
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import func, select
+
+from wnm.actions import ActionType
+from wnm.binary_store import get_binary_store
+from wnm.common import RESTARTING, RUNNING, STOPPED, UPGRADING
+from wnm.models import Node, NodeTransition, UpgradeRollout
+
+# Rollout states
+ROLLING = "rolling"
+ROLLING_BACK = "rolling_back"
+PAUSED = "paused"
+DONE = "done"
+SUPERSEDED = "superseded"
+
+# Waves double in size after each healthy wave, up to this many nodes
+MAX_WAVE_SIZE = 32
+
+# A node regressed when it has fewer than these shares of its baseline
+# peers/records after the upgrade, or is shunned by more peers than allowed
+MIN_PEER_RATIO = 0.5
+MIN_RECORDS_RATIO = 0.5
+MAX_SHUNNED_INCREASE = 2
+# Share of a wave (after the canary) allowed to regress
+MAX_WAVE_REGRESSION = 0.25
+# Seconds a wave runs after its last node became ready before its health is
+# judged; a node is promoted on its first peer, long before it has its usual
+# peer count again
+ROLLOUT_SOAK = 300
+
+# Kept next to a node's binary while a rollout is in progress
+PREVIOUS_SUFFIX = ".previous"
+
+
+def previous_binary(path: str) -> str:
+    """Path the pre-upgrade binary of a node is kept at."""
+    return path + PREVIOUS_SUFFIX
+
+
+def health_baseline(node) -> Dict:
+    """Health figures of a node row (or mapping) before its upgrade."""
+    return {
+        "connected_peers": node["connected_peers"] or 0,
+        "records": node["records"] or 0,
+        "shunned": node["shunned"] or 0,
+    }
+
+
+def node_regressed(baseline: Dict, node, version: str) -> Optional[str]:
+    """Compare an upgraded node with its baseline.
+
+    Args:
+        baseline: Health baseline taken before the upgrade
+        node: Current node row (mapping)
+        version: Version being rolled out
+
+    Returns:
+        Description of the regression, or None if the node is healthy
+    """
+    if node["version"] != version:
+        return f"still on {node['version']}"
+    if node["status"] != RUNNING:
+        return f"status {node['status']}"
+    peers = node["connected_peers"] or 0
+    if peers < max(1, MIN_PEER_RATIO * baseline["connected_peers"]):
+        return f"connected_peers {baseline['connected_peers']} -> {peers}"
+    records = node["records"] or 0
+    if records < MIN_RECORDS_RATIO * baseline["records"]:
+        return f"records {baseline['records']} -> {records}"
+    shunned = node["shunned"] or 0
+    if shunned > baseline["shunned"] + MAX_SHUNNED_INCREASE:
+        return f"shunned {baseline['shunned']} -> {shunned}"
+    return None
+
+
+def nodes_per_hour(rollout: Dict, now: Optional[float] = None) -> float:
+    """Upgrade throughput of a rollout in healthy nodes per hour."""
+    end = rollout["finished_at"] or now or time.time()
+    elapsed = end - rollout["started_at"]
+    if elapsed <= 0:
+        return 0.0
+    return round(rollout["upgraded"] * 3600 / elapsed, 2)
+
+
+def upgrade_downtime(S, since: Optional[int] = None) -> Dict:
+    """Cutover downtime of node upgrades, in seconds.
+
+    Args:
+        S: SQLAlchemy session factory
+        since: Only count upgrades started at or after this timestamp
+
+    Returns:
+        Dict with the number of upgrades measured and their average and
+        maximum downtime
+    """
+    criteria = [
+        NodeTransition.transition == UPGRADING,
+        NodeTransition.downtime.is_not(None),
+    ]
+    if since is not None:
+        criteria.append(NodeTransition.started_at >= since)
+    with S() as session:
+        count, average, maximum = session.execute(
+            select(
+                func.count(NodeTransition.id),
+                func.avg(NodeTransition.downtime),
+                func.max(NodeTransition.downtime),
+            ).where(*criteria)
+        ).one()
+    return {
+        "count": count,
+        "average": round(average or 0.0, 3),
+        "max": round(maximum or 0.0, 3),
+    }
+
+
+def load_rollout(S) -> Optional[Dict]:
+    """Most recent rollout, as a dict, or None."""
+    with S() as session:
+        row = session.execute(
+            select(UpgradeRollout).order_by(UpgradeRollout.id.desc())
+        ).first()
+        return row[0].__json__() if row else None
+
+
+class RollingUpgrade:
+    """Wave-based rollout of one antnode version.
+
+    evaluate() is called once per cycle before planning, allowance() tells
+    the DecisionEngine how many more upgrades the open wave takes and
+    rollback_ids() which nodes to roll back, and record() adds the planned
+    upgrades to the wave.
+    """
+
+    def __init__(
+        self,
+        S,
+        version: str,
+        canary_size: int = 1,
+        clock: Callable[[], float] = time.time,
+        sudo: bool = False,
+    ):
+        """
+        Args:
+            S: SQLAlchemy session factory
+            version: antnode version being rolled out
+            canary_size: Number of nodes in the first wave
+            clock: Wall clock (overridable for tests)
+            sudo: Node binaries belong to system services (removed through sudo)
+        """
+        self.S = S
+        self.version = version
+        self.canary_size = max(1, int(canary_size or 1))
+        self.clock = clock
+        self.sudo = sudo
+        self.rollout = self._load()
+
+    def _load(self) -> Optional[Dict]:
+        rollout = load_rollout(self.S)
+        if rollout is None:
+            return None
+        if rollout["version"] == self.version:
+            return rollout
+        if rollout["state"] not in (DONE, SUPERSEDED):
+            logging.info(
+                f"Upgrade rollout of {rollout['version']} superseded by {self.version}"
+            )
+            rollout.update(
+                self._save(rollout, state=SUPERSEDED, finished_at=int(self.clock()))
+            )
+            self._discard_previous_binaries()
+        # A new rollout starts with the first planned upgrade
+        return None
+
+    @property
+    def state(self) -> Optional[str]:
+        return self.rollout["state"] if self.rollout else None
+
+    def _wave(self) -> Dict[int, Dict]:
+        if not self.rollout:
+            return {}
+        return {
+            int(node_id): baseline
+            for node_id, baseline in json.loads(self.rollout["wave_nodes"] or "{}").items()
+        }
+
+    def _nodes(self, *criteria) -> List:
+        with self.S() as session:
+            return (
+                session.execute(
+                    select(
+                        Node.id,
+                        Node.status,
+                        Node.version,
+                        Node.binary,
+                        Node.connected_peers,
+                        Node.records,
+                        Node.shunned,
+                    ).where(*criteria)
+                )
+                .mappings()
+                .all()
+            )
+
+    def _outdated_ids(self) -> List[int]:
+        return [
+            node["id"]
+            for node in self._nodes(
+                Node.status == RUNNING, Node.version != self.version
+            )
+        ]
+
+    def _save(self, rollout: Dict, **values) -> Dict:
+        try:
+            with self.S() as session:
+                session.query(UpgradeRollout).filter(
+                    UpgradeRollout.id == rollout["id"]
+                ).update(values)
+                session.commit()
+        except Exception as error:
+            template = "In RU - An exception of type {0} occurred. Arguments:\n{1!r}"
+            message = template.format(type(error).__name__, error.args)
+            logging.warning(message)
+        return values
+
+    def _update(self, **values):
+        self.rollout.update(self._save(self.rollout, **values))
+
+    def evaluate(self):
+        """Gate the open wave on node health and advance the rollout."""
+        if not self.rollout or self.state in (DONE, SUPERSEDED, PAUSED):
+            return
+        wave = self._wave()
+        if self.state == ROLLING_BACK:
+            if not self.rollback_ids():
+                rolled_back = sum(
+                    1
+                    for node in self._nodes(Node.id.in_(list(wave)))
+                    if node["version"] != self.version
+                )
+                logging.warning(
+                    f"Upgrade rollout of {self.version} paused after rolling back "
+                    + f"{rolled_back} node(s)"
+                )
+                self._update(
+                    state=PAUSED, rolled_back=self.rollout["rolled_back"] + rolled_back
+                )
+            return
+
+        if wave:
+            nodes = {node["id"]: node for node in self._nodes(Node.id.in_(list(wave)))}
+            if any(node["status"] in (UPGRADING, RESTARTING) for node in nodes.values()):
+                return
+            outdated = [node_id for node_id in self._outdated_ids() if node_id not in wave]
+            if len(wave) < self.rollout["wave_size"] and outdated:
+                # Wave still filling
+                return
+            if self.clock() - self._settled_at(wave) < ROLLOUT_SOAK:
+                # Let the wave's nodes find their peers again first
+                return
+            # Removed nodes are not held against the wave
+            regressions = {
+                node_id: reason
+                for node_id, reason in (
+                    (node_id, node_regressed(baseline, nodes[node_id], self.version))
+                    for node_id, baseline in wave.items()
+                    if node_id in nodes
+                )
+                if reason
+            }
+            allowed = 0 if self.rollout["wave"] == 0 else int(MAX_WAVE_REGRESSION * len(wave))
+            if len(regressions) > allowed:
+                self._regressed(nodes, regressions)
+                return
+            upgraded = self.rollout["upgraded"] + len(nodes)
+            wave_size = min(self.rollout["wave_size"] * 2, MAX_WAVE_SIZE)
+            logging.info(
+                f"Upgrade wave {self.rollout['wave']} of {self.version} healthy "
+                + f"({len(nodes)} node(s)), next wave {wave_size} node(s), "
+                + f"{nodes_per_hour({**self.rollout, 'upgraded': upgraded}, self.clock())} nodes/hour"
+            )
+            self._update(
+                wave=self.rollout["wave"] + 1,
+                wave_size=wave_size,
+                wave_started_at=0,
+                wave_nodes="{}",
+                upgraded=upgraded,
+            )
+
+        if not self._outdated_ids() and not self._nodes(Node.status == UPGRADING):
+            self._update(state=DONE, finished_at=int(self.clock()))
+            logging.info(
+                f"Upgrade rollout of {self.version} done: {self.rollout['upgraded']} "
+                + f"node(s), {nodes_per_hour(self.rollout)} nodes/hour"
+            )
+            self._discard_previous_binaries()
+
+    def _settled_at(self, wave: Dict[int, Dict]) -> int:
+        """When the wave's last upgrade or restart finished (or the wave started)."""
+        started = self.rollout["wave_started_at"] or 0
+        with self.S() as session:
+            finished = session.execute(
+                select(func.max(NodeTransition.finished_at)).where(
+                    NodeTransition.node_id.in_(list(wave)),
+                    NodeTransition.transition.in_((UPGRADING, RESTARTING)),
+                    NodeTransition.started_at >= started,
+                )
+            ).scalar()
+        return max(finished or 0, started)
+
+    def _regressed(self, nodes, regressions):
+        reason = "; ".join(
+            f"node {node_id} {text}" for node_id, text in sorted(regressions.items())
+        )
+        can_roll_back = any(
+            node["binary"] and os.path.exists(previous_binary(node["binary"]))
+            for node in nodes.values()
+        )
+        state = ROLLING_BACK if can_roll_back else PAUSED
+        logging.warning(
+            f"Upgrade wave {self.rollout['wave']} of {self.version} regressed "
+            + f"({reason}), {'rolling back' if can_roll_back else 'pausing rollout'}"
+        )
+        self._update(state=state, reason=reason)
+
+    def allowance(self) -> int:
+        """Number of upgrades the open wave still takes."""
+        if not self.rollout:
+            return self.canary_size
+        if self.state != ROLLING:
+            return 0
+        return max(0, self.rollout["wave_size"] - len(self._wave()))
+
+    def rollback_ids(self) -> List[int]:
+        """Wave nodes to roll back to their previous binary."""
+        if self.state != ROLLING_BACK:
+            return []
+        wave = self._wave()
+        return [
+            node["id"]
+            for node in self._nodes(Node.id.in_(list(wave)))
+            if node["version"] == self.version
+            and node["status"] in (RUNNING, STOPPED)
+            and node["binary"]
+            and os.path.exists(previous_binary(node["binary"]))
+        ]
+
+    def record(self, actions):
+        """Add the planned upgrades to the open wave with their baselines."""
+        node_ids = [
+            action.node_id
+            for action in actions
+            if action.type == ActionType.UPGRADE_NODE and action.node_id is not None
+        ]
+        if not node_ids:
+            return
+        now = int(self.clock())
+        if not self.rollout:
+            with self.S() as session:
+                row = UpgradeRollout(
+                    version=self.version, started_at=now, wave_size=self.canary_size
+                )
+                session.add(row)
+                session.commit()
+                self.rollout = row.__json__()
+            logging.info(
+                f"Starting upgrade rollout of {self.version} with "
+                + f"{self.canary_size} canary node(s)"
+            )
+        wave = self._wave()
+        for node in self._nodes(Node.id.in_(node_ids)):
+            wave[node["id"]] = health_baseline(node)
+        self._update(
+            wave_nodes=json.dumps({str(node_id): baseline for node_id, baseline in wave.items()}),
+            wave_started_at=self.rollout["wave_started_at"] or now,
+        )
+
+    def resume(self) -> bool:
+        """Resume a paused rollout with a fresh canary wave.
+
+        Returns:
+            True if the rollout was paused
+        """
+        if self.state != PAUSED:
+            return False
+        self._update(
+            state=ROLLING,
+            wave_size=self.canary_size,
+            wave_started_at=0,
+            wave_nodes="{}",
+            reason=None,
+        )
+        logging.info(f"Resumed upgrade rollout of {self.version}")
+        return True
+
+    def _discard_previous_binaries(self):
+        store = get_binary_store(self.sudo)
+        for node in self._nodes(Node.binary.is_not(None)):
+            path = previous_binary(node["binary"])
+            try:
+                if os.path.exists(path):
+                    store.remove(path)
+            except (OSError, subprocess.CalledProcessError) as err:
+                logging.debug(f"Unable to remove {path}: {err}")
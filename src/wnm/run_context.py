@@ -0,0 +1,117 @@
+"""
+Run-scoped state shared by the action executor and the process managers.
+
+A RunContext holds a read-only snapshot of the machine config, loaded at
+most once per cycle, and one process manager per manager type (each with
+its firewall manager). Managers read node options such as no_upnp or
+antnode_path from the snapshot instead of querying the Machine row on
+every create or start, and the executor reuses the same manager objects
+for every node instead of building new ones.
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import select
+
+from wnm.models import Machine
+
+# Every Machine column, in table order
+MACHINE_FIELDS = tuple(column.key for column in Machine.__table__.columns)
+
+
+class MachineSnapshot:
+    """Read-only copy of the Machine settings"""
+
+    __slots__ = MACHINE_FIELDS
+
+    def __init__(self, values: Dict[str, Any]):
+        """
+        Args:
+            values: Machine settings by column name (missing ones are None)
+        """
+        for field in MACHINE_FIELDS:
+            object.__setattr__(self, field, values.get(field))
+
+    @classmethod
+    def from_machine(cls, machine: Machine) -> "MachineSnapshot":
+        """Copy the settings of a Machine record."""
+        return cls({field: getattr(machine, field) for field in MACHINE_FIELDS})
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"MachineSnapshot is read-only, cannot set {name}")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"MachineSnapshot is read-only, cannot delete {name}")
+
+    def __repr__(self):
+        return f"MachineSnapshot(id={self.id}, host={self.host})"
+
+
+class RunContext:
+    """Machine snapshot and process manager registry for one wnm run"""
+
+    def __init__(self, session_factory):
+        """
+        Args:
+            session_factory: SQLAlchemy session factory the snapshot is loaded with
+        """
+        self.S = session_factory
+        # Process manager instances by manager type, kept for the run's lifetime
+        self.managers = {}
+        self._lock = threading.RLock()
+        self._machine = None
+        self._machine_loaded = False
+
+    @property
+    def machine(self) -> Optional[MachineSnapshot]:
+        """The machine config snapshot, loaded on first use in a cycle."""
+        with self._lock:
+            if not self._machine_loaded:
+                self._machine = self._load_machine()
+                self._machine_loaded = True
+            return self._machine
+
+    def _load_machine(self) -> Optional[MachineSnapshot]:
+        try:
+            with self.S() as session:
+                result = session.execute(select(Machine)).first()
+        except Exception as e:
+            logging.warning(f"Failed to get machine config: {e}")
+            return None
+        return MachineSnapshot.from_machine(result[0]) if result else None
+
+    def begin_cycle(self):
+        """Drop the snapshot and let every manager reset its per-cycle state."""
+        with self._lock:
+            self._machine = None
+            self._machine_loaded = False
+        for manager in self.all_managers():
+            begin_cycle = getattr(manager, "begin_cycle", None)
+            if callable(begin_cycle):
+                begin_cycle()
+
+    def manager(self, manager_type: str, create: Callable[[], Any]):
+        """
+        The process manager for a manager type, created on first use.
+
+        Args:
+            manager_type: Manager type including its mode (e.g. "systemd+user")
+            create: Builds the manager when the registry has none yet
+
+        Returns:
+            ProcessManager instance shared by every node of that type
+        """
+        with self._lock:
+            manager = self.managers.get(manager_type)
+            if manager is None:
+                manager = create()
+                manager.context = self
+                self.managers[manager_type] = manager
+        return manager
+
+    def all_managers(self) -> List[Any]:
+        """Every manager created so far."""
+        with self._lock:
+            return list(self.managers.values())
@@ -0,0 +1,310 @@
+"""
+Linux /proc sampler for weave-node-manager (wnm) machine metrics.
+
+CPU, disk and network figures are rates, so they need two samples. Rather
+than sampling twice around a one second sleep, each run reads /proc/stat,
+/proc/meminfo, /proc/diskstats and /proc/net/dev once and computes rates
+against the previous sample, kept in memory by --daemon mode and in the
+system_sample table between cron runs. Only when there is no usable
+previous sample (first run, after a reboot, or a long gap) is a second
+sample needed, and the caller can leave that window open while it does
+other work (the node survey) so the wait overlaps it.
+"""
+
+import logging
+import os
+import time
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import delete, insert
+
+from wnm.models import SystemSample
+
+PROC_ROOT = "/proc"
+SYS_BLOCK = "/sys/block"
+
+# /proc/diskstats counts 512 byte sectors regardless of the device block size
+SECTOR_SIZE = 512
+
+# Shortest window rates are computed over
+MIN_WINDOW = 1.0
+# Previous samples older than this are not used, a long average hides spikes
+MAX_SAMPLE_AGE = 600
+
+SAMPLE_COUNTERS = (
+    "cpu_total",
+    "cpu_idle",
+    "cpu_iowait",
+    "disk_read_bytes",
+    "disk_write_bytes",
+    "net_recv_bytes",
+    "net_sent_bytes",
+)
+
+
+def read_proc_stat(proc_root: str = PROC_ROOT) -> Dict:
+    """Read aggregate CPU time and boot time from /proc/stat.
+
+    Returns:
+        Dict with cpu_total, cpu_idle, cpu_iowait (clock ticks) and boot_time
+    """
+    sample = {}
+    with open(os.path.join(proc_root, "stat")) as f:
+        for line in f:
+            if line.startswith("cpu "):
+                fields = [int(value) for value in line.split()[1:]]
+                # guest and guest_nice are already included in user and nice
+                sample["cpu_total"] = sum(fields[:8])
+                sample["cpu_idle"] = fields[3]
+                sample["cpu_iowait"] = fields[4] if len(fields) > 4 else 0
+            elif line.startswith("btime "):
+                sample["boot_time"] = int(line.split()[1])
+    if "cpu_total" not in sample or "boot_time" not in sample:
+        raise ValueError("Unexpected /proc/stat format")
+    return sample
+
+
+def read_meminfo(proc_root: str = PROC_ROOT) -> Dict:
+    """Read total and available memory from /proc/meminfo.
+
+    Returns:
+        Dict with mem_total and mem_available in bytes
+    """
+    values = {}
+    with open(os.path.join(proc_root, "meminfo")) as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if name in ("MemTotal", "MemAvailable", "MemFree", "Buffers", "Cached"):
+                values[name] = int(rest.split()[0]) * 1024
+    if "MemAvailable" not in values:
+        # Kernels before 3.14 do not report MemAvailable
+        values["MemAvailable"] = (
+            values.get("MemFree", 0) + values.get("Buffers", 0) + values.get("Cached", 0)
+        )
+    return {"mem_total": values["MemTotal"], "mem_available": values["MemAvailable"]}
+
+
+def read_diskstats(proc_root: str = PROC_ROOT, sys_block: str = SYS_BLOCK) -> Dict:
+    """Sum bytes read and written by whole disks from /proc/diskstats.
+
+    Partitions are skipped (only devices listed in /sys/block are counted)
+    so I/O is not counted twice, matching psutil.disk_io_counters().
+
+    Returns:
+        Dict with disk_read_bytes and disk_write_bytes
+    """
+    read_bytes = write_bytes = 0
+    with open(os.path.join(proc_root, "diskstats")) as f:
+        for line in f:
+            fields = line.split()
+            if len(fields) < 10:
+                continue
+            if not os.path.exists(os.path.join(sys_block, fields[2].replace("/", "!"))):
+                continue
+            read_bytes += int(fields[5]) * SECTOR_SIZE
+            write_bytes += int(fields[9]) * SECTOR_SIZE
+    return {"disk_read_bytes": read_bytes, "disk_write_bytes": write_bytes}
+
+
+def read_net_dev(proc_root: str = PROC_ROOT) -> Dict:
+    """Sum bytes received and sent on all interfaces from /proc/net/dev.
+
+    Returns:
+        Dict with net_recv_bytes and net_sent_bytes
+    """
+    recv_bytes = sent_bytes = 0
+    with open(os.path.join(proc_root, "net", "dev")) as f:
+        for line in f:
+            name, sep, data = line.partition(":")
+            if not sep or "|" in line:
+                continue
+            fields = data.split()
+            recv_bytes += int(fields[0])
+            sent_bytes += int(fields[8])
+    return {"net_recv_bytes": recv_bytes, "net_sent_bytes": sent_bytes}
+
+
+def read_system_sample(
+    proc_root: str = PROC_ROOT,
+    sys_block: str = SYS_BLOCK,
+    clock: Callable[[], float] = time.time,
+) -> Optional[Dict]:
+    """Read one sample of the /proc counters.
+
+    Returns:
+        Dict of counters with a timestamp, or None if /proc is not readable
+        (not Linux)
+    """
+    try:
+        sample = {"timestamp": clock()}
+        sample.update(read_proc_stat(proc_root))
+        sample.update(read_meminfo(proc_root))
+        sample.update(read_diskstats(proc_root, sys_block))
+        sample.update(read_net_dev(proc_root))
+    except (OSError, ValueError, IndexError, KeyError) as err:
+        logging.debug(f"Unable to read /proc sample: {err}")
+        return None
+    return sample
+
+
+def usable_baseline(previous: Optional[Dict], current: Dict, min_window: float = MIN_WINDOW) -> bool:
+    """Check a previous sample can be used to compute rates for current."""
+    if not previous or previous.get("boot_time") != current["boot_time"]:
+        # Counters restart from zero on reboot
+        return False
+    elapsed = current["timestamp"] - previous["timestamp"]
+    return min_window <= elapsed <= MAX_SAMPLE_AGE
+
+
+def system_rates(previous: Dict, current: Dict) -> Dict:
+    """Compute machine metrics rates between two samples.
+
+    Returns:
+        Dict with idle_cpu_percent, io_wait, used_cpu_percent and the
+        hdio/netio read and write bytes per second
+    """
+    elapsed = max(current["timestamp"] - previous["timestamp"], 1e-6)
+    delta = {
+        key: max(0, current[key] - previous[key]) for key in SAMPLE_COUNTERS
+    }
+    rates = {}
+    if delta["cpu_total"]:
+        rates["idle_cpu_percent"] = round(100 * delta["cpu_idle"] / delta["cpu_total"], 1)
+        rates["io_wait"] = round(100 * delta["cpu_iowait"] / delta["cpu_total"], 1)
+    else:
+        rates["idle_cpu_percent"] = 100.0
+        rates["io_wait"] = 0.0
+    rates["used_cpu_percent"] = round(100 - rates["idle_cpu_percent"], 1)
+    rates["hdio_write_bytes"] = int(delta["disk_write_bytes"] / elapsed)
+    rates["hdio_read_bytes"] = int(delta["disk_read_bytes"] / elapsed)
+    rates["netio_write_bytes"] = int(delta["net_sent_bytes"] / elapsed)
+    rates["netio_read_bytes"] = int(delta["net_recv_bytes"] / elapsed)
+    return rates
+
+
+def memory_percent(sample: Dict) -> float:
+    """Used memory percent of a sample, as psutil.virtual_memory().percent"""
+    total = sample["mem_total"]
+    return round(100 * (total - sample["mem_available"]) / total, 1) if total else 0.0
+
+
+class SystemSampler:
+    """Compute machine rates against the previous /proc sample.
+
+    begin() reads /proc and returns rates straight away when a usable
+    previous sample exists (in memory from the last cycle, or from the
+    database). Otherwise the sampler is left pending and finish() takes the
+    closing sample, sleeping only for whatever part of MIN_WINDOW has not
+    already passed since begin().
+    """
+
+    def __init__(
+        self,
+        S=None,
+        proc_root: str = PROC_ROOT,
+        sys_block: str = SYS_BLOCK,
+        min_window: float = MIN_WINDOW,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Args:
+            S: SQLAlchemy session factory used to persist the last sample
+                (None keeps it in memory only)
+            proc_root: Path of the proc filesystem
+            sys_block: Path listing whole block devices
+            min_window: Shortest window rates are computed over
+            clock: Wall clock (overridable for tests)
+            sleep: Sleep function (overridable for tests)
+        """
+        self.S = S
+        self.proc_root = proc_root
+        self.sys_block = sys_block
+        self.min_window = min_window
+        self.clock = clock
+        self.sleep = sleep
+        self.previous = None
+        self.current = None
+        self.rates = None
+        self.waited = 0.0
+
+    @property
+    def available(self) -> bool:
+        """True if the last begin() could read /proc"""
+        return self.current is not None
+
+    @property
+    def pending(self) -> bool:
+        """True if begin() found no usable baseline and finish() must sample"""
+        return self.current is not None and self.rates is None
+
+    def sample(self) -> Optional[Dict]:
+        return read_system_sample(self.proc_root, self.sys_block, self.clock)
+
+    def begin(self) -> Optional[Dict]:
+        """Take a sample and compute rates against the previous one.
+
+        Returns:
+            Rates dict, or None if pending or /proc is not readable
+        """
+        self.rates = None
+        self.current = self.sample()
+        if self.current is None:
+            return None
+        previous = self.previous or self.load()
+        if usable_baseline(previous, self.current, self.min_window):
+            self.rates = system_rates(previous, self.current)
+            self._remember(self.current)
+        return self.rates
+
+    def finish(self) -> Optional[Dict]:
+        """Complete a pending window and return the rates.
+
+        Returns:
+            Rates dict, or None if /proc is not readable
+        """
+        if not self.pending:
+            return self.rates
+        start = self.current
+        remaining = self.min_window - (self.clock() - start["timestamp"])
+        if remaining > 0:
+            self.waited = remaining
+            self.sleep(remaining)
+        current = self.sample()
+        if current is None:
+            return None
+        self.current = current
+        self.rates = system_rates(start, current)
+        self._remember(current)
+        return self.rates
+
+    def load(self) -> Optional[Dict]:
+        """Load the sample saved by the previous run."""
+        if self.S is None:
+            return None
+        try:
+            with self.S() as session:
+                saved = session.get(SystemSample, 1)
+                return saved.__json__() if isinstance(saved, SystemSample) else None
+        except Exception as err:
+            logging.debug(f"Unable to load previous system sample: {err}")
+            return None
+
+    def _remember(self, sample: Dict):
+        self.previous = sample
+        if self.S is None:
+            return
+        row = {
+            key: sample[key]
+            for key in ("timestamp", "boot_time") + SAMPLE_COUNTERS
+        }
+        row["id"] = 1
+        try:
+            with self.S() as session:
+                session.execute(delete(SystemSample))
+                session.execute(insert(SystemSample), [row])
+                session.commit()
+        except Exception as error:
+            template = "In SS - An exception of type {0} occurred. Arguments:\n{1!r}"
+            message = template.format(type(error).__name__, error.args)
+            logging.warning(message)
@@ -1,11 +1,16 @@
+import http.client
+import ipaddress
 import logging
 import os
 import re
 import shutil
+import socket
 import subprocess
 import sys
+import threading
 import time
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional
 
 import psutil
@@ -28,8 +33,19 @@ from wnm.common import (
     STOPPED,
     UPGRADING,
 )
-from wnm.config import BOOTSTRAP_CACHE_DIR, LOG_DIR, PLATFORM
-from wnm.models import Base, Machine, Node
+from wnm.config import BASE_DIR, BOOTSTRAP_CACHE_DIR, LOG_DIR, PLATFORM
+from wnm.history import history_sample, maintain_history
+from wnm.models import Base, Machine, Node, NodeMetric, NodeTransition
+from wnm.readiness import (
+    ABANDONED,
+    FAILED,
+    READY,
+    READY_PROBE_BASE,
+    next_probe_delay,
+    node_is_ready,
+)
+from wnm.system_metrics import SystemSampler, memory_percent, read_proc_stat
+from wnm.version_cache import VersionCache
 
 
 def parse_service_names(service_name_str: Optional[str]) -> Optional[List[str]]:
@@ -50,13 +66,149 @@ def parse_service_names(service_name_str: Optional[str]) -> Optional[List[str]]:
     return [name for name in names if name]
 
 
+def _is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class ScrapeClient:
+    """Keep-alive HTTP client for node metrics ports.
+
+    A single instance is shared for the whole run (see get_scrape_client) so
+    /metadata and /metrics on the same port reuse one connection. Loopback
+    targets use a bare http.client HTTP/1.1 connection per port; other hosts
+    go through a pooled requests.Session. Errors are raised as the matching
+    requests exceptions so callers handle both paths the same way.
+    """
+
+    def __init__(self, timeout=5):
+        self.timeout = timeout
+        self.connections_opened = 0
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._session = None
+
+    def _checkout(self, key):
+        with self._lock:
+            return self._idle.pop(key, None)
+
+    def _checkin(self, key, conn):
+        with self._lock:
+            if key not in self._idle:
+                self._idle[key] = conn
+                return
+        # Another thread already parked a connection for this port
+        conn.close()
+
+    def _connect(self, host, port):
+        with self._lock:
+            self.connections_opened += 1
+        return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+    @staticmethod
+    def _request(conn, path):
+        conn.request("GET", path)
+        response = conn.getresponse()
+        return response.read().decode("utf-8", errors="replace"), response.will_close
+
+    @staticmethod
+    def _requests_error(error):
+        """The requests exception matching a socket error from http.client."""
+        if isinstance(error, (socket.timeout, TimeoutError)):
+            return requests.exceptions.Timeout(error)
+        return requests.exceptions.ConnectionError(error)
+
+    def _get_session(self):
+        with self._lock:
+            if self._session is None:
+                self._session = requests.Session()
+            return self._session
+
+    def get(self, host, port, path):
+        """Fetch a path from a node and return the response body.
+
+        Args:
+            host: Node host
+            port: Node metrics port
+            path: Request path (e.g. "/metrics")
+
+        Returns:
+            Response body as text
+        """
+        if not _is_loopback(host):
+            url = "http://{0}:{1}{2}".format(host, port, path)
+            return self._get_session().get(url, timeout=self.timeout).text
+
+        key = (host, int(port))
+        conn = self._checkout(key)
+        if conn is not None:
+            try:
+                body, will_close = self._request(conn, path)
+            except (ConnectionResetError, BrokenPipeError, http.client.BadStatusLine):
+                # Node restarted since the connection was parked, reconnect once
+                conn.close()
+                conn = None
+            except OSError as error:
+                conn.close()
+                raise self._requests_error(error) from error
+            except Exception:
+                conn.close()
+                raise
+        if conn is None:
+            conn = self._connect(*key)
+            try:
+                body, will_close = self._request(conn, path)
+            except OSError as error:
+                conn.close()
+                raise self._requests_error(error) from error
+            except Exception:
+                conn.close()
+                raise
+        if will_close:
+            conn.close()
+        else:
+            self._checkin(key, conn)
+        return body
+
+    def close(self):
+        """Close all parked connections and the requests session."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+            session, self._session = self._session, None
+        for conn in idle.values():
+            conn.close()
+        if session is not None:
+            session.close()
+
+
+_scrape_client = None
+
+
+def get_scrape_client():
+    """Return the run-scoped ScrapeClient, creating it on first use."""
+    global _scrape_client
+    if _scrape_client is None:
+        _scrape_client = ScrapeClient()
+    return _scrape_client
+
+
+def close_scrape_client():
+    """Close the run-scoped ScrapeClient and its connections."""
+    global _scrape_client
+    if _scrape_client is not None:
+        _scrape_client.close()
+        _scrape_client = None
+
+
 # Read config from systemd service file
 def read_node_metadata(host, port):
     # Only return version number when we have one, to stop clobbering the binary check
     try:
-        url = "http://{0}:{1}/metadata".format(host, port)
-        response = requests.get(url, timeout=5)
-        data = response.text
+        data = get_scrape_client().get(host, port, "/metadata")
     except requests.exceptions.ConnectionError:
         logging.debug("Connection Refused on port: {0}:{1}".format(host, str(port)))
         return {"status": STOPPED, "peer_id": ""}
@@ -80,121 +232,243 @@ def read_node_metadata(host, port):
     return card
 
 
-# Read data from metrics port
-def read_node_metrics(host, port):
-    metrics = {}
-    try:
-        url = "http://{0}:{1}/metrics".format(host, port)
-        response = requests.get(url, timeout=5)
-        metrics["status"] = RUNNING
+_LEADING_INT = re.compile(r"\d+")
+_LEADING_FLOAT = re.compile(r"[\d.]+")
 
-        # Original metrics (already collected)
-        metrics["uptime"] = int(
-            (re.findall(r"ant_node_uptime ([\d]+)", response.text) or [0])[0]
-        )
-        metrics["records"] = int(
-            (
-                re.findall(r"ant_networking_records_stored ([\d]+)", response.text)
-                or [0]
-            )[0]
-        )
-        metrics["shunned"] = int(
-            (
-                re.findall(
-                    r"ant_networking_shunned_by_close_group ([\d]+)", response.text
-                )
-                or [0]
-            )[0]
-        )
-        metrics["connected_peers"] = int(
-            (
-                re.findall(r"ant_networking_connected_peers ([\d]+)", response.text)
-                or [0]
-            )[0]
-        )
 
-        # New influx-specific metrics
-        # PUTs (counter, use _total suffix)
-        metrics["puts"] = int(
-            (re.findall(r"ant_node_put_record_ok_total(?:\{[^}]*\})? ([\d]+)", response.text) or [0])[0]
-        )
+def _metric_int(value):
+    match = _LEADING_INT.match(value)
+    return int(match.group()) if match else None
 
-        # GETs (not currently exposed, default to 0)
-        metrics["gets"] = 0
 
-        # Rewards (as string for high precision)
-        metrics["rewards"] = str(
-            (re.findall(r"ant_node_current_reward_wallet_balance ([\d.]+)", response.text) or ["0"])[0]
-        )
+def _metric_float(value):
+    match = _LEADING_FLOAT.match(value)
+    return float(match.group()) if match else None
 
-        # Memory in MB * 100 (e.g., 97.8125 -> 9781)
-        mem_mb = float((re.findall(r"ant_networking_process_memory_used_mb ([\d.]+)", response.text) or [0])[0])
-        metrics["mem"] = int(mem_mb * 100)
 
-        # CPU percentage * 100 (e.g., 0.0353 -> 4)
-        cpu_pct = float((re.findall(r"ant_networking_process_cpu_usage_percentage ([\d.]+)", response.text) or [0])[0])
-        metrics["cpu"] = int(cpu_pct * 100)
+def _metric_str(value):
+    match = _LEADING_FLOAT.match(value)
+    return match.group() if match else None
 
-        # Open connections
-        metrics["open_connections"] = int(
-            (re.findall(r"ant_networking_open_connections ([\d]+)", response.text) or [0])[0]
-        )
 
-        # Total peers in routing table
-        metrics["total_peers"] = int(
-            (re.findall(r"ant_networking_peers_in_routing_table ([\d]+)", response.text) or [0])[0]
-        )
+def _metric_hundredths(value):
+    # Stored as value * 100 (e.g., 97.8125 MB -> 9781, 0.0353% -> 3)
+    number = _metric_float(value)
+    return None if number is None else int(number * 100)
 
-        # Bad peers (counter, use _total suffix)
-        metrics["bad_peers"] = int(
-            (re.findall(r"ant_networking_bad_peers_count_total ([\d]+)", response.text) or [0])[0]
-        )
 
-        # Relevant records
-        metrics["rel_records"] = int(
-            (re.findall(r"ant_networking_relevant_records ([\d]+)", response.text) or [0])[0]
-        )
+# Prometheus series read from the node /metrics page.
+# name -> (card key, value parser, whether labelled series are accepted)
+NODE_METRIC_SERIES = {
+    "ant_node_uptime": ("uptime", _metric_int, False),
+    "ant_networking_records_stored": ("records", _metric_int, False),
+    "ant_networking_shunned_by_close_group": ("shunned", _metric_int, False),
+    "ant_networking_connected_peers": ("connected_peers", _metric_int, False),
+    # PUTs (counter, use _total suffix, first labelled series wins)
+    "ant_node_put_record_ok_total": ("puts", _metric_int, True),
+    # Rewards (as string for high precision)
+    "ant_node_current_reward_wallet_balance": ("rewards", _metric_str, False),
+    "ant_networking_process_memory_used_mb": ("mem", _metric_hundredths, False),
+    "ant_networking_process_cpu_usage_percentage": ("cpu", _metric_hundredths, False),
+    "ant_networking_open_connections": ("open_connections", _metric_int, False),
+    "ant_networking_peers_in_routing_table": ("total_peers", _metric_int, False),
+    "ant_networking_bad_peers_count_total": ("bad_peers", _metric_int, False),
+    "ant_networking_relevant_records": ("rel_records", _metric_int, False),
+    "ant_networking_max_records": ("max_records", _metric_int, False),
+    "ant_networking_received_payment_count": ("payment_count", _metric_int, False),
+    "ant_networking_live_time": ("live_time", _metric_int, False),
+    "ant_networking_estimated_network_size": ("network_size", _metric_int, False),
+}
 
-        # Maximum records
-        metrics["max_records"] = int(
-            (re.findall(r"ant_networking_max_records ([\d]+)", response.text) or [0])[0]
-        )
+# One compiled pass over the page, matching only sample lines of wanted series.
+# Anchoring on a literal newline (rather than ^ with MULTILINE) lets the regex
+# engine skip ahead between lines, which is several times faster.
+_NODE_METRIC_LINE = re.compile(
+    r"\n("
+    + "|".join(re.escape(name) for name in NODE_METRIC_SERIES)
+    + r")(\{[^}\n]*\})? ([^\n]*)"
+)
 
-        # Payment count
-        metrics["payment_count"] = int(
-            (re.findall(r"ant_networking_received_payment_count ([\d]+)", response.text) or [0])[0]
-        )
 
-        # Live time
-        metrics["live_time"] = int(
-            (re.findall(r"ant_networking_live_time ([\d]+)", response.text) or [0])[0]
-        )
+def parse_node_metrics(text):
+    """Parse the node /metrics exposition text in a single pass.
 
-        # Network size
-        metrics["network_size"] = int(
-            (re.findall(r"ant_networking_estimated_network_size ([\d]+)", response.text) or [0])[0]
-        )
+    Only series listed in NODE_METRIC_SERIES are decoded, and scanning stops
+    as soon as every one of them has been seen.
+
+    Args:
+        text: Prometheus exposition text from the node metrics port
+
+    Returns:
+        Metrics dict (status RUNNING), missing series default to 0
+    """
+    metrics = {
+        "status": RUNNING,
+        "uptime": 0,
+        "records": 0,
+        "shunned": 0,
+        "connected_peers": 0,
+        "puts": 0,
+        # GETs (not currently exposed, default to 0)
+        "gets": 0,
+        "rewards": "0",
+        "mem": 0,
+        "cpu": 0,
+        "open_connections": 0,
+        "total_peers": 0,
+        "bad_peers": 0,
+        "rel_records": 0,
+        "max_records": 0,
+        "payment_count": 0,
+        "live_time": 0,
+        "network_size": 0,
+    }
+    remaining = set(NODE_METRIC_SERIES)
+    for match in _NODE_METRIC_LINE.finditer("\n" + text):
+        name, labels, value = match.groups()
+        if name not in remaining:
+            continue
+        key, parse, labels_ok = NODE_METRIC_SERIES[name]
+        if labels and not labels_ok:
+            continue
+        parsed = parse(value)
+        if parsed is None:
+            continue
+        metrics[key] = parsed
+        remaining.discard(name)
+        if not remaining:
+            break
+    return metrics
+
+
+# Read data from metrics port
+def read_node_metrics(host, port):
+    metrics = {}
+    try:
+        metrics = parse_node_metrics(get_scrape_client().get(host, port, "/metrics"))
     except requests.exceptions.ConnectionError:
         logging.debug("Connection Refused on port: {0}:{1}".format(host, str(port)))
-        metrics["status"] = STOPPED
-        metrics["uptime"] = 0
-        metrics["records"] = 0
-        metrics["shunned"] = 0
-        metrics["connected_peers"] = 0
+        metrics = stopped_node_metrics()
     except Exception as error:
         template = "in:RNM - An exception of type {0} occurred. Arguments:\n{1!r}"
         message = template.format(type(error).__name__, error.args)
         logging.info(message)
-        metrics["status"] = STOPPED
-        metrics["uptime"] = 0
-        metrics["records"] = 0
-        metrics["shunned"] = 0
-        metrics["connected_peers"] = 0
+        metrics = stopped_node_metrics()
     return metrics
 
 
-# Read antnode binary version
+# Metrics card for a node whose metadata endpoint did not answer
+def stopped_node_metrics():
+    return {
+        "status": STOPPED,
+        "uptime": 0,
+        "records": 0,
+        "shunned": 0,
+        "connected_peers": 0,
+    }
+
+
+def survey_node(host, port):
+    """Read metadata and metrics for a single node.
+
+    Metadata is read first; when the node is not answering, the metrics
+    request is skipped and a zeroed STOPPED card is returned instead.
+
+    Args:
+        host: Node host
+        port: Node metrics port
+
+    Returns:
+        Tuple of (metrics, metadata) dicts
+    """
+    node_metadata = read_node_metadata(host, port)
+    if node_metadata["status"] == STOPPED:
+        return stopped_node_metrics(), node_metadata
+    return read_node_metrics(host, port), node_metadata
+
+
+class SurveyPacer:
+    """Enforce a minimum interval between the start of consecutive surveys.
+
+    Safe to share between worker threads. With an interval of 0 it never waits.
+    """
+
+    def __init__(self, interval_ms=0):
+        self.interval = max(0, interval_ms or 0) / 1000.0
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if self._next_start > now:
+                time.sleep(self._next_start - now)
+                now = self._next_start
+            self._next_start = now + self.interval
+
+
+def survey_nodes(targets, max_workers=1, survey_delay_ms=0):
+    """Survey a list of nodes, optionally with several requests in flight.
+
+    Args:
+        targets: List of (host, port) tuples
+        max_workers: Maximum number of nodes surveyed at the same time (default: 1)
+        survey_delay_ms: Minimum milliseconds between the start of two surveys (default: 0)
+
+    Returns:
+        List of (metrics, metadata) tuples in the same order as targets
+    """
+    pacer = SurveyPacer(survey_delay_ms)
+
+    def _survey(target):
+        pacer.wait()
+        return survey_node(*target)
+
+    max_workers = max(1, min(int(max_workers or 1), len(targets)))
+    if max_workers == 1:
+        return [_survey(target) for target in targets]
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="wnm-survey"
+    ) as pool:
+        return list(pool.map(_survey, targets))
+
+
+_version_cache = None
+
+
+def get_version_cache():
+    """Return the process-wide antnode VersionCache, creating it on first use."""
+    global _version_cache
+    if _version_cache is None:
+        # Test runs keep the cache in memory rather than under BASE_DIR
+        cache_file = (
+            None
+            if os.getenv("WNM_TEST_MODE")
+            else os.path.join(BASE_DIR, "antnode_versions.json")
+        )
+        _version_cache = VersionCache(cache_file)
+    return _version_cache
+
+
+def save_version_cache():
+    """Write the antnode version cache file if lookups changed it."""
+    if _version_cache is not None:
+        _version_cache.save()
+
+
+# Read antnode binary version (cached until the binary changes)
 def get_antnode_version(binary):
+    return get_version_cache().get(binary, _run_antnode_version)
+
+
+def forget_antnode_version(binary):
+    """Drop the cached version of a binary that has been replaced."""
+    get_version_cache().forget(binary)
+
+
+def _run_antnode_version(binary):
     try:
         data = subprocess.run(
             [binary, "--version"], stdout=subprocess.PIPE
@@ -239,7 +513,11 @@ def get_system_start_time():
             else:
                 raise ValueError("Could not parse kern.boottime")
         else:
-            # Linux: use uptime --since
+            # Linux: btime from /proc/stat, falling back to uptime --since
+            try:
+                return read_proc_stat()["boot_time"]
+            except (OSError, ValueError, KeyError) as err:
+                logging.debug(f"Unable to read btime from /proc/stat: {err}")
             p = subprocess.run(
                 ["uptime", "--since"],
                 stdout=subprocess.PIPE,
@@ -256,21 +534,87 @@ def get_system_start_time():
     return 0
 
 
+def psutil_rates():
+    """Measure CPU, disk and network rates across a one second psutil window.
+
+    Used where /proc is not available (macOS) or could not be read when a
+    SystemSampler window was closed.
+
+    Returns:
+        Dict with the same keys as wnm.system_metrics.system_rates()
+    """
+    rates = {}
+    start_time = time.time()
+    start_disk_counters = psutil.disk_io_counters()
+    start_net_counters = psutil.net_io_counters()
+    # Get CPU Metrics over 1 second
+    cpu_times = psutil.cpu_times_percent(1)
+    if PLATFORM == "Darwin":
+        # macOS: cpu_times has (user, nice, system, idle) - no iowait
+        rates["idle_cpu_percent"] = cpu_times.idle
+        rates["io_wait"] = 0  # Not available on macOS
+    else:
+        # Linux: cpu_times has (user, nice, system, idle, iowait, ...)
+        rates["idle_cpu_percent"], rates["io_wait"] = cpu_times[3:5]
+    # Really we returned Idle percent, subtract from 100 to get used.
+    rates["used_cpu_percent"] = 100 - rates["idle_cpu_percent"]
+    end_time = time.time()
+    end_disk_counters = psutil.disk_io_counters()
+    end_net_counters = psutil.net_io_counters()
+    elapsed = max(end_time - start_time, 1e-6)
+    rates["hdio_write_bytes"] = int(
+        (end_disk_counters.write_bytes - start_disk_counters.write_bytes) / elapsed
+    )
+    rates["hdio_read_bytes"] = int(
+        (end_disk_counters.read_bytes - start_disk_counters.read_bytes) / elapsed
+    )
+    rates["netio_write_bytes"] = int(
+        (end_net_counters.bytes_sent - start_net_counters.bytes_sent) / elapsed
+    )
+    rates["netio_read_bytes"] = int(
+        (end_net_counters.bytes_recv - start_net_counters.bytes_recv) / elapsed
+    )
+    return rates
+
+
 # Survey nodes by reading metadata from metrics ports or binary --version
-def get_machine_metrics(S, node_storage, remove_limit, crisis_bytes):
+def get_machine_metrics(
+    S, node_storage, remove_limit, crisis_bytes, sampler=None, defer_rates=False
+):
+    """Collect the machine metrics the decision engine plans against.
+
+    On Linux CPU, disk and network rates come from a SystemSampler, computed
+    against the previous /proc sample without sleeping. If there is no usable
+    previous sample and defer_rates is set, the rate keys are left out and
+    the caller must merge in sampler.finish() later (choose_action does, after
+    its survey); otherwise the window is closed here. Other platforms, or a
+    window /proc could not close, measure across a one second psutil window.
+
+    Args:
+        S: SQLAlchemy session factory
+        node_storage: Node storage path (disk usage is checked there)
+        remove_limit: Disk remove threshold percent
+        crisis_bytes: Bytes per node used for the disk crisis estimate
+        sampler: SystemSampler to reuse (--daemon mode keeps one warm)
+        defer_rates: Leave a pending sampling window open for the caller
+
+    Returns:
+        Dictionary of machine metrics
+    """
     metrics = {}
 
     with S() as session:
         db_nodes = session.execute(select(Node.status, Node.version)).all()
 
-    # Get system start time before we probe metrics
-    metrics["system_start"] = get_system_start_time()
-
-    # Get some initial stats for comparing after a few seconds
-    # We start these counters AFTER reading the database
-    start_time = time.time()
-    start_disk_counters = psutil.disk_io_counters()
-    start_net_counters = psutil.net_io_counters()
+    # Linux: one /proc read, rates against the previous sample
+    # We take the sample AFTER reading the database
+    sampler = sampler or SystemSampler(S)
+    rates = sampler.begin()
+    if sampler.available:
+        metrics["system_start"] = sampler.current["boot_time"]
+    else:
+        # Get system start time before we probe metrics
+        metrics["system_start"] = get_system_start_time()
 
     metrics["total_nodes"] = len(db_nodes)
     data = Counter(node[0] for node in db_nodes)
@@ -307,22 +651,17 @@ def get_machine_metrics(S, node_storage, remove_limit, crisis_bytes):
     metrics["load_average_1"], metrics["load_average_5"], metrics["load_average_15"] = (
         psutil.getloadavg()
     )
-    # Get CPU Metrics over 1 second
-    cpu_times = psutil.cpu_times_percent(1)
-    if PLATFORM == "Darwin":
-        # macOS: cpu_times has (user, nice, system, idle) - no iowait
-        metrics["idle_cpu_percent"] = cpu_times.idle
-        metrics["io_wait"] = 0  # Not available on macOS
+    if sampler.available:
+        if rates is None and not defer_rates:
+            # /proc may have gone unreadable since begin()
+            rates = sampler.finish() or psutil_rates()
+        metrics.update(rates or {})
+        metrics["used_mem_percent"] = memory_percent(sampler.current)
     else:
-        # Linux: cpu_times has (user, nice, system, idle, iowait, ...)
-        metrics["idle_cpu_percent"], metrics["io_wait"] = cpu_times[3:5]
-    # Really we returned Idle percent, subtract from 100 to get used.
-    metrics["used_cpu_percent"] = 100 - metrics["idle_cpu_percent"]
-    data = psutil.virtual_memory()
-    # print(data)
-    metrics["used_mem_percent"] = data.percent
+        metrics.update(psutil_rates())
+        data = psutil.virtual_memory()
+        metrics["used_mem_percent"] = data.percent
     metrics["free_mem_percent"] = 100 - metrics["used_mem_percent"]
-    data = psutil.disk_io_counters()
     # This only checks the drive mapped to the first node and will need to be updated
     # when we eventually support multiple drives
     # Ensure the node_storage directory exists before checking disk usage
@@ -332,25 +671,6 @@ def get_machine_metrics(S, node_storage, remove_limit, crisis_bytes):
     data = psutil.disk_usage(node_storage)
     metrics["used_hd_percent"] = data.percent
     metrics["total_hd_bytes"] = data.total
-    end_time = time.time()
-    end_disk_counters = psutil.disk_io_counters()
-    end_net_counters = psutil.net_io_counters()
-    metrics["hdio_write_bytes"] = int(
-        (end_disk_counters.write_bytes - start_disk_counters.write_bytes)
-        / (end_time - start_time)
-    )
-    metrics["hdio_read_bytes"] = int(
-        (end_disk_counters.read_bytes - start_disk_counters.read_bytes)
-        / (end_time - start_time)
-    )
-    metrics["netio_write_bytes"] = int(
-        (end_net_counters.bytes_sent - start_net_counters.bytes_sent)
-        / (end_time - start_time)
-    )
-    metrics["netio_read_bytes"] = int(
-        (end_net_counters.bytes_recv - start_net_counters.bytes_recv)
-        / (end_time - start_time)
-    )
     # print (json.dumps(metrics,indent=2))
     # How close (out of 100) to removal limit will we be with a max bytes per node (2GB default)
     # For running nodes with Porpoise(tm).
@@ -364,39 +684,187 @@ def get_machine_metrics(S, node_storage, remove_limit, crisis_bytes):
     return metrics
 
 
+# Node columns written from a survey card
+NODE_CARD_COLUMNS = (
+    "status",
+    "timestamp",
+    "uptime",
+    "records",
+    "shunned",
+    "connected_peers",
+    "peer_id",
+    "gets",
+    "puts",
+    "mem",
+    "cpu",
+    "open_connections",
+    "total_peers",
+    "bad_peers",
+    "rel_records",
+    "max_records",
+    "rewards",
+    "payment_count",
+    "live_time",
+    "network_size",
+    "version",
+)
+
+
+# Build the node row update for a survey result
+def node_card_from_metrics(metrics, metadata):
+    # We check the binary version in other code, so lets stop clobbering it when a node is stopped
+    card = {
+        "status": metrics["status"],
+        "timestamp": int(time.time()),
+        "uptime": metrics["uptime"],
+        "records": metrics["records"],
+        "shunned": metrics["shunned"],
+        "connected_peers": metrics["connected_peers"],
+        "peer_id": metadata["peer_id"],
+    }
+
+    # Add influx-specific metrics if available (only for RUNNING nodes)
+    if metrics["status"] == RUNNING:
+        card["gets"] = metrics.get("gets", 0)
+        card["puts"] = metrics.get("puts", 0)
+        card["mem"] = metrics.get("mem", 0)
+        card["cpu"] = metrics.get("cpu", 0)
+        card["open_connections"] = metrics.get("open_connections", 0)
+        card["total_peers"] = metrics.get("total_peers", 0)
+        card["bad_peers"] = metrics.get("bad_peers", 0)
+        card["rel_records"] = metrics.get("rel_records", 0)
+        card["max_records"] = metrics.get("max_records", 0)
+        card["rewards"] = metrics.get("rewards", "0")
+        card["payment_count"] = metrics.get("payment_count", 0)
+        card["live_time"] = metrics.get("live_time", 0)
+        card["network_size"] = metrics.get("network_size", 0)
+
+    if "version" in metadata:
+        card["version"] = metadata["version"]
+    return card
+
+
+class NodeWriteBatch:
+    """Collect node row writes and apply them in a single transaction.
+
+    Survey results, status transitions and deletes of expired REMOVING nodes
+    are queued with update(), set_status() and delete(), metrics history
+    samples with add_history(), and node_transition rows with
+    add_transition() and update_transition(). flush() writes them as bulk
+    UPDATE/INSERT (executemany) and DELETE statements with one commit.
+    """
+
+    def __init__(self, S):
+        self.S = S
+        self._updates = {}
+        self._deletes = set()
+        self._history = []
+        self._new_transitions = []
+        self._transition_updates = {}
+
+    def __len__(self):
+        return (
+            len(self._updates)
+            + len(self._deletes)
+            + len(self._history)
+            + len(self._new_transitions)
+            + len(self._transition_updates)
+        )
+
+    def update(self, node_id, values, current=None):
+        """Queue column updates for a node.
+
+        Args:
+            node_id: Node id
+            values: Dict of column name to new value
+            current: Optional mapping of the node's current column values,
+                columns whose value is unchanged are not rewritten
+
+        Returns:
+            True if anything was queued
+        """
+        if node_id in self._deletes:
+            return False
+        if current is not None:
+            values = {
+                key: value
+                for key, value in values.items()
+                if key not in current or current[key] != value
+            }
+        if not values:
+            return False
+        self._updates.setdefault(node_id, {}).update(values)
+        return True
+
+    def set_status(self, node_id, status, current=None):
+        """Queue a status transition, resetting the node timestamp."""
+        return self.update(
+            node_id, {"status": status, "timestamp": int(time.time())}, current
+        )
+
+    def delete(self, node_id):
+        """Queue a node row for deletion."""
+        self._updates.pop(node_id, None)
+        self._deletes.add(node_id)
+
+    def add_history(self, node_id, card):
+        """Queue a metrics history sample for a node."""
+        self._history.append(history_sample(node_id, card))
+
+    def add_transition(self, values):
+        """Queue a new node_transition row."""
+        self._new_transitions.append(values)
+
+    def update_transition(self, transition_id, values):
+        """Queue column updates for a node_transition row."""
+        self._transition_updates.setdefault(transition_id, {}).update(values)
+
+    def flush(self):
+        """Write all queued changes in one transaction.
+
+        Returns:
+            True on success (or nothing to write), False if the write failed
+        """
+        if not len(self):
+            return True
+        rows = [{"id": node_id, **values} for node_id, values in self._updates.items()]
+        deletes = sorted(self._deletes)
+        history = self._history
+        new_transitions = self._new_transitions
+        transition_rows = [
+            {"id": transition_id, **values}
+            for transition_id, values in self._transition_updates.items()
+        ]
+        self._updates = {}
+        self._deletes = set()
+        self._history = []
+        self._new_transitions = []
+        self._transition_updates = {}
+        try:
+            with self.S() as session:
+                if rows:
+                    session.execute(update(Node), rows)
+                if history:
+                    session.execute(insert(NodeMetric), history)
+                if new_transitions:
+                    session.execute(insert(NodeTransition), new_transitions)
+                if transition_rows:
+                    session.execute(update(NodeTransition), transition_rows)
+                if deletes:
+                    session.execute(delete(Node).where(Node.id.in_(deletes)))
+                session.commit()
+        except Exception as error:
+            template = "In NWB - An exception of type {0} occurred. Arguments:\n{1!r}"
+            message = template.format(type(error).__name__, error.args)
+            logging.warning(message)
+            return False
+        return True
+
+
 # Update node with metrics result
 def update_node_from_metrics(S, id, metrics, metadata):
     try:
-        # We check the binary version in other code, so lets stop clobbering it when a node is stopped
-        card = {
-            "status": metrics["status"],
-            "timestamp": int(time.time()),
-            "uptime": metrics["uptime"],
-            "records": metrics["records"],
-            "shunned": metrics["shunned"],
-            "connected_peers": metrics["connected_peers"],
-            "peer_id": metadata["peer_id"],
-        }
-
-        # Add influx-specific metrics if available (only for RUNNING nodes)
-        if metrics["status"] == RUNNING:
-            card["gets"] = metrics.get("gets", 0)
-            card["puts"] = metrics.get("puts", 0)
-            card["mem"] = metrics.get("mem", 0)
-            card["cpu"] = metrics.get("cpu", 0)
-            card["open_connections"] = metrics.get("open_connections", 0)
-            card["total_peers"] = metrics.get("total_peers", 0)
-            card["bad_peers"] = metrics.get("bad_peers", 0)
-            card["rel_records"] = metrics.get("rel_records", 0)
-            card["max_records"] = metrics.get("max_records", 0)
-            card["rewards"] = metrics.get("rewards", "0")
-            card["payment_count"] = metrics.get("payment_count", 0)
-            card["live_time"] = metrics.get("live_time", 0)
-            card["network_size"] = metrics.get("network_size", 0)
-
-        if "version" in metadata:
-            card["version"] = metadata["version"]
-
+        card = node_card_from_metrics(metrics, metadata)
         with S() as session:
             session.query(Node).filter(Node.id == id).update(card)
             session.commit()
@@ -409,8 +877,141 @@ def update_node_from_metrics(S, id, metrics, metadata):
         return True
 
 
+# Load the nodes to survey along with their current card values
+def _select_survey_nodes(S, *criteria):
+    with S() as session:
+        return (
+            session.execute(
+                select(
+                    Node.id,
+                    Node.host,
+                    Node.metrics_port,
+                    *(getattr(Node, column) for column in NODE_CARD_COLUMNS),
+                )
+                .where(*criteria)
+                .order_by(Node.timestamp.asc())
+            )
+            .mappings()
+            .all()
+        )
+
+
+# Probe nodes in a RESTARTING/UPGRADING transition and queue the ones that finished
+def _settle_transitions(S, batch, status, delay, config):
+    """Promote ready nodes out of a transitional status.
+
+    Nodes are probed with exponential backoff (see wnm.readiness) and marked
+    RUNNING as soon as they report a version and connected peers. A node
+    still not ready when its delay timer expires gets its survey result
+    applied as before and the transition is recorded as failed.
+
+    Args:
+        S: SQLAlchemy session factory
+        batch: NodeWriteBatch the node and node_transition writes are queued on
+        status: RESTARTING or UPGRADING
+        delay: delay_start or delay_upgrade seconds
+        config: Machine config
+
+    Returns:
+        Number of nodes still in the transition
+    """
+    now = int(time.time())
+    nodes = _select_survey_nodes(S, Node.status == status)
+    with S() as session:
+        open_transitions = (
+            session.execute(
+                select(NodeTransition).where(
+                    NodeTransition.transition == status,
+                    NodeTransition.finished_at.is_(None),
+                )
+            )
+            .scalars()
+            .all()
+        )
+        open_transitions = {
+            (row.node_id, row.started_at): row.__json__() for row in open_transitions
+        }
+    due = []
+    for node in nodes:
+        if not isinstance(node["timestamp"], int):
+            continue
+        transition = open_transitions.pop((node["id"], node["timestamp"]), None)
+        if transition is None:
+            transition = {
+                "id": None,
+                "node_id": node["id"],
+                "transition": status,
+                "started_at": node["timestamp"],
+                "probes": 0,
+                "next_probe_at": node["timestamp"] + READY_PROBE_BASE,
+            }
+        expired = node["timestamp"] < now - delay
+        if expired or transition["next_probe_at"] <= now:
+            due.append((node, transition, expired))
+        elif transition["id"] is None:
+            batch.add_transition(_transition_row(transition))
+    # Open transitions whose node has since left the status (or restarted again)
+    for transition in open_transitions.values():
+        batch.update_transition(
+            transition["id"], {"finished_at": now, "outcome": ABANDONED}
+        )
+
+    results = survey_nodes(
+        [(node["host"], node["metrics_port"]) for node, _, _ in due],
+        max_workers=config.get("max_concurrent_surveys") or 1,
+    )
+    finished = 0
+    for (node, transition, expired), (node_metrics, node_metadata) in zip(due, results):
+        transition["probes"] += 1
+        ready = node_is_ready(node_metrics, node_metadata)
+        if ready or expired:
+            finished += 1
+            transition["finished_at"] = now
+            if ready:
+                card = node_card_from_metrics(node_metrics, node_metadata)
+                card["status"] = RUNNING
+                batch.update(node["id"], card, node)
+                transition["outcome"] = READY
+                transition["seconds"] = now - transition["started_at"]
+                logging.info(
+                    f"Node {node['id']} ready {transition['seconds']}s after "
+                    + f"{status} ({transition['probes']} probes)"
+                )
+            else:
+                if node_metrics and node_metadata:
+                    batch.update(
+                        node["id"],
+                        node_card_from_metrics(node_metrics, node_metadata),
+                        node,
+                    )
+                transition["outcome"] = FAILED
+                logging.warning(
+                    f"Node {node['id']} not ready {delay}s after {status}, "
+                    + f"marking transition failed"
+                )
+        else:
+            transition["next_probe_at"] = now + next_probe_delay(transition["probes"])
+        if transition["id"] is None:
+            batch.add_transition(_transition_row(transition))
+        else:
+            batch.update_transition(
+                transition["id"],
+                {
+                    key: transition[key]
+                    for key in ("probes", "next_probe_at", "finished_at", "outcome", "seconds")
+                    if key in transition
+                },
+            )
+    return len(nodes) - finished
+
+
+def _transition_row(transition):
+    return {key: value for key, value in transition.items() if key != "id"}
+
+
 # Set Node status
 def update_counters(S, old, config):
+    batch = NodeWriteBatch(S)
     # Are we already removing a node
     if old["removing_nodes"]:
         with S() as session:
@@ -427,85 +1028,57 @@ def update_counters(S, old, config):
                 int(time.time()) - config["delay_remove"]
             ):
                 logging.info("Deleting removed node " + str(check[1]))
-                with S() as session:
-                    session.execute(delete(Node).where(Node.id == check[1]))
-                    session.commit()
+                batch.delete(check[1])
                 records_to_remove -= 1
         old["removing_nodes"] = records_to_remove
     # Are we already upgrading a node
     if old["upgrading_nodes"]:
-        with S() as session:
-            upgrades = session.execute(
-                select(Node.timestamp, Node.id, Node.host, Node.metrics_port)
-                .where(Node.status == UPGRADING)
-                .order_by(Node.timestamp.asc())
-            ).all()
-        # Iterate through active upgrades
-        records_to_upgrade = len(upgrades)
-        for check in upgrades:
-            # If the delay_upgrade timer has expired, check on status
-            if isinstance(check[0], int) and check[0] < (
-                int(time.time()) - config["delay_upgrade"]
-            ):
-                logging.info("Updating upgraded node " + str(check[1]))
-                node_metrics = read_node_metrics(check[2], check[3])
-                node_metadata = read_node_metadata(check[2], check[3])
-                if node_metrics and node_metadata:
-                    update_node_from_metrics(S, check[1], node_metrics, node_metadata)
-                records_to_upgrade -= 1
-        old["upgrading_nodes"] = records_to_upgrade
+        old["upgrading_nodes"] = _settle_transitions(
+            S, batch, UPGRADING, config["delay_upgrade"], config
+        )
     # Are we already restarting a node
     if old["restarting_nodes"]:
-        with S() as session:
-            restarts = session.execute(
-                select(Node.timestamp, Node.id, Node.host, Node.metrics_port)
-                .where(Node.status == RESTARTING)
-                .order_by(Node.timestamp.asc())
-            ).all()
-        # Iterate through active upgrades
-        records_to_restart = len(restarts)
-        for check in restarts:
-            # If the delay_start timer has expired, check on status
-            if isinstance(check[0], int) and check[0] < (
-                int(time.time()) - config["delay_start"]
-            ):
-                logging.info("Updating restarted node " + str(check[1]))
-                node_metrics = read_node_metrics(check[2], check[3])
-                node_metadata = read_node_metadata(check[2], check[3])
-                if node_metrics and node_metadata:
-                    update_node_from_metrics(S, check[1], node_metrics, node_metadata)
-                records_to_restart -= 1
-        old["restarting_nodes"] = records_to_restart
+        old["restarting_nodes"] = _settle_transitions(
+            S, batch, RESTARTING, config["delay_start"], config
+        )
+    batch.flush()
     return old
 
 
-# Enable firewall for port
-def update_nodes(S, survey_delay_ms=0):
+# Survey every active node and store the results
+def update_nodes(S, survey_delay_ms=0, max_concurrent_surveys=1, history_retention=0):
     """Update all nodes with current metrics.
 
+    Results are written with a single NodeWriteBatch, only changed columns
+    are rewritten.
+
     Args:
         S: SQLAlchemy session factory
-        survey_delay_ms: Delay in milliseconds between surveying each node (default: 0)
+        survey_delay_ms: Minimum milliseconds between starting each node survey (default: 0)
+        max_concurrent_surveys: Maximum number of nodes surveyed at the same time (default: 1)
+        history_retention: Days of metrics history to keep, 0 disables history (default: 0)
     """
-    with S() as session:
-        nodes = session.execute(
-            select(Node.timestamp, Node.id, Node.host, Node.metrics_port, Node.status)
-            .where(Node.status != DISABLED)
-            .order_by(Node.timestamp.asc())
-        ).all()
+    nodes = [
+        check
+        for check in _select_survey_nodes(S, Node.status != DISABLED)
+        if isinstance(check["timestamp"], int)
+    ]
+    results = survey_nodes(
+        [(check["host"], check["metrics_port"]) for check in nodes],
+        max_workers=max_concurrent_surveys,
+        survey_delay_ms=survey_delay_ms,
+    )
+    batch = NodeWriteBatch(S)
     # Iterate through all records
-    for idx, check in enumerate(nodes):
-        # Check on status
-        if isinstance(check[0], int):
-            logging.debug("Updating info on node " + str(check[1]))
-            node_metrics = read_node_metrics(check[2], check[3])
-            node_metadata = read_node_metadata(check[2], check[3])
-            if node_metrics and node_metadata:
-                # Don't write updates for stopped nodes that are already marked as stopped
-                if node_metadata["status"] == STOPPED and check[4] == STOPPED:
-                    continue
-                update_node_from_metrics(S, check[1], node_metrics, node_metadata)
-
-            # Insert delay between nodes (but not after the last node)
-            if survey_delay_ms > 0 and idx < len(nodes) - 1:
-                time.sleep(survey_delay_ms / 1000.0)
+    for check, (node_metrics, node_metadata) in zip(nodes, results):
+        logging.debug("Updating info on node " + str(check["id"]))
+        if node_metrics and node_metadata:
+            # Don't write updates for stopped nodes that are already marked as stopped
+            if node_metadata["status"] == STOPPED and check["status"] == STOPPED:
+                continue
+            card = node_card_from_metrics(node_metrics, node_metadata)
+            batch.update(check["id"], card, check)
+            if history_retention and card["status"] == RUNNING:
+                batch.add_history(check["id"], card)
+    if batch.flush() and history_retention:
+        maintain_history(S, history_retention)
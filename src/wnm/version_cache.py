@@ -0,0 +1,129 @@
+"""
+antnode binary version cache for weave-node-manager (wnm).
+
+Every node runs its own copy of the antnode binary, and asking a binary for
+its version means a fork/exec of `antnode --version`. Versions are cached by
+path and keyed on the file identity (device, inode, size, mtime and ctime),
+so a replaced binary is detected without running it again. The cache is
+shared by every caller in the process and saved to a small JSON file so
+cron runs start warm. Lookups only mark the cache dirty; it is written once
+per cycle by save(), not on every miss.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+
+def binary_key(path: str) -> Optional[Tuple[int, int, int, int, int]]:
+    """Identity of a binary file, or None if it does not exist.
+
+    ctime is included because shutil.copy2 preserves mtime when replacing a
+    binary in place, but the kernel always updates ctime on write. It is
+    left out (0) for hardlinked binaries: linking or unlinking another node
+    to a store entry also updates ctime, and store links are only ever
+    replaced by renaming a new file over them, which changes the inode.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    ctime = st.st_ctime_ns if st.st_nlink == 1 else 0
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, ctime)
+
+
+class VersionCache:
+    """Thread-safe map of binary path to version, keyed on file identity."""
+
+    def __init__(self, cache_file: Optional[str] = None):
+        """
+        Args:
+            cache_file: JSON file the cache is loaded from and saved to
+                (None keeps it in memory only)
+        """
+        self.cache_file = cache_file
+        self.lookups = 0
+        self.misses = 0
+        self._entries: Dict[str, Tuple[list, str]] = {}
+        # Entries changed since the cache file was last written
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def get(self, path: str, probe: Callable[[str], str]):
+        """Return the cached version of path, running probe(path) on a miss.
+
+        Args:
+            path: Path to the antnode binary
+            probe: Function returning the version of a binary (0 on failure)
+
+        Returns:
+            Version string, or whatever probe returned on failure
+        """
+        key = binary_key(path)
+        with self._lock:
+            self.lookups += 1
+            entry = self._entries.get(path)
+            if key is not None and entry and tuple(entry[0]) == key:
+                return entry[1]
+            self.misses += 1
+        version = probe(path)
+        if key is not None and version:
+            with self._lock:
+                self._entries[path] = (list(key), version)
+                self._dirty = True
+        return version
+
+    def forget(self, path: str):
+        """Drop the cached version of path (e.g. after replacing the binary)."""
+        with self._lock:
+            if self._entries.pop(path, None):
+                self._dirty = True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _load(self):
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file) as f:
+                data = json.load(f)
+            self._entries = {
+                path: (list(entry["key"]), entry["version"])
+                for path, entry in data.items()
+            }
+        except (OSError, ValueError, KeyError, TypeError) as err:
+            logging.debug(f"Ignoring unreadable version cache {self.cache_file}: {err}")
+            self._entries = {}
+
+    def save(self):
+        """Write the cache file if any entry changed since the last save."""
+        if not self.cache_file:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            # Drop binaries that have since been removed with their node
+            data = {
+                path: {"key": key, "version": version}
+                for path, (key, version) in self._entries.items()
+                if os.path.exists(path)
+            }
+        tmp = f"{self.cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.cache_file)
+        except OSError as err:
+            logging.debug(f"Unable to save version cache {self.cache_file}: {err}")
+            with self._lock:
+                self._dirty = True
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
@@ -4,6 +4,7 @@ import os
 import platform
 import tempfile
 from pathlib import Path
+from unittest.mock import Mock
 
 import pytest
 from sqlalchemy import create_engine
@@ -177,6 +178,40 @@ def multiple_nodes(db_session, sample_node_config):
     return nodes
 
 
+@pytest.fixture
+def thread_sessions(db_engine):
+    """Thread-local session factory, for executor tests running actions in parallel"""
+    S = scoped_session(sessionmaker(bind=db_engine))
+    yield S
+    S.remove()
+
+
+@pytest.fixture
+def make_node_mock(tmp_path):
+    """Build detached Node stand-ins for process manager tests
+
+    Call with a node id and any attributes to override.
+    """
+
+    def make(node_id, **fields):
+        node = Mock(spec=Node)
+        node.id = node_id
+        node.node_name = f"{node_id:04}"
+        node.service = f"antnode{node_id:04}.service"
+        node.root_dir = str(tmp_path)
+        node.port = 55000 + node_id
+        node.metrics_port = 13000 + node_id
+        node.host = "127.0.0.1"
+        node.wallet = "0x1234567890123456789012345678901234567890"
+        node.network = "evm-arbitrum-one"
+        node.environment = ""
+        for name, value in fields.items():
+            setattr(node, name, value)
+        return node
+
+    return make
+
+
 @pytest.fixture
 def process_manager_type():
     """Return appropriate process manager for current platform"""
@@ -0,0 +1,245 @@
+"""Tests for the content-addressed antnode binary store."""
+
+import os
+import time
+from unittest.mock import MagicMock, patch
+
+from wnm.binary_store import BinaryStore, file_digest, staged_binary
+from wnm.common import UPGRADING
+from wnm.executor import ActionExecutor
+from wnm.models import Node, NodeTransition
+from wnm.rollout import upgrade_downtime
+from wnm.version_cache import VersionCache
+
+
+def _binary(path, content):
+    path.write_bytes(content)
+    return str(path)
+
+
+class TestBinaryStore:
+    """Test node binaries are shared through the store"""
+
+    def test_nodes_share_one_inode(self, tmp_path):
+        store = BinaryStore(str(tmp_path / "store"))
+        source = _binary(tmp_path / "antnode", b"v1")
+        first = str(tmp_path / "node1")
+        second = str(tmp_path / "node2")
+
+        assert store.install(source, first) == "link"
+        assert store.install(source, second) == "link"
+
+        entry = store.entry_path(file_digest(source))
+        assert os.stat(first).st_ino == os.stat(second).st_ino == os.stat(entry).st_ino
+        assert os.stat(entry).st_nlink == 3
+        assert os.stat(first).st_mode & 0o777 == 0o755
+        assert store.links == 2
+
+    def test_source_hashed_once(self, tmp_path):
+        store = BinaryStore(str(tmp_path / "store"))
+        source = _binary(tmp_path / "antnode", b"v1")
+
+        with patch("wnm.binary_store.file_digest", wraps=file_digest) as digest:
+            for i in range(3):
+                store.install(source, str(tmp_path / f"node{i}"))
+
+        assert digest.call_count == 1
+
+    def test_upgrade_replaces_link_not_content(self, tmp_path):
+        """Test installing a new version never writes through a shared inode"""
+        store = BinaryStore(str(tmp_path / "store"))
+        old = _binary(tmp_path / "antnode-old", b"v1")
+        new = _binary(tmp_path / "antnode-new", b"v2")
+        first = tmp_path / "node1"
+        second = tmp_path / "node2"
+        store.install(old, str(first))
+        store.install(old, str(second))
+
+        store.install(new, str(first))
+
+        assert first.read_bytes() == b"v2"
+        assert second.read_bytes() == b"v1"
+        assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+    def test_falls_back_to_copy_across_filesystems(self, tmp_path):
+        store = BinaryStore(str(tmp_path / "store"))
+        source = _binary(tmp_path / "antnode", b"v1")
+        dest = tmp_path / "node1"
+
+        with patch("os.link", side_effect=OSError(18, "Invalid cross-device link")), patch(
+            "wnm.binary_store._reflink", return_value=False
+        ):
+            assert store.install(source, str(dest)) == "copy"
+
+        assert dest.read_bytes() == b"v1"
+        assert os.stat(dest).st_nlink == 1
+        assert store.copies == 1
+
+    def test_missing_store_copies_source(self, tmp_path):
+        store = BinaryStore(str(tmp_path / "store"))
+        source = _binary(tmp_path / "antnode", b"v1")
+        dest = tmp_path / "node1"
+
+        with patch.object(store, "add", side_effect=PermissionError("read-only")):
+            assert store.install(source, str(dest)) == "copy"
+
+        assert dest.read_bytes() == b"v1"
+
+    def test_gc_removes_unused_versions(self, tmp_path):
+        store = BinaryStore(str(tmp_path / "store"))
+        old = _binary(tmp_path / "antnode-old", b"v1")
+        new = _binary(tmp_path / "antnode-new", b"v2")
+        node = tmp_path / "node1"
+        store.install(old, str(node))
+        store.install(new, str(node))
+
+        assert store.gc() == 1
+
+        assert os.listdir(store.root) == [file_digest(new)]
+        # An entry in use by a node (or kept for rollback) is never removed
+        assert store.gc() == 0
+        # Re-adding a collected version works
+        assert store.install(old, str(node)) == "link"
+        assert node.read_bytes() == b"v1"
+
+    def test_linking_another_node_keeps_cached_version(self, tmp_path):
+        """Test links to a shared inode (which bump its ctime) cause no re-probe"""
+        store = BinaryStore(str(tmp_path / "store"))
+        source = _binary(tmp_path / "antnode", b"v1")
+        first = str(tmp_path / "node1")
+        store.install(source, first)
+        cache = VersionCache()
+        probe = MagicMock(return_value="0.4.7")
+        cache.get(first, probe)
+        ctime = os.stat(first).st_ctime_ns
+
+        time.sleep(0.05)
+        second = str(tmp_path / "node2")
+        store.install(source, second)
+        os.remove(second)
+
+        assert os.stat(first).st_ctime_ns != ctime
+        assert cache.get(first, probe) == "0.4.7"
+        probe.assert_called_once_with(first)
+
+    def test_gc_keep(self, tmp_path):
+        store = BinaryStore(str(tmp_path / "store"))
+        source = _binary(tmp_path / "antnode", b"v1")
+        store.add(source)
+
+        assert store.gc(keep=[file_digest(source)]) == 0
+        assert store.gc() == 1
+
+
+class TestStagedUpgrade:
+    """Test upgrades stage the new binary before the stop/rename/start cutover"""
+
+    def test_verify_and_swap(self, tmp_path):
+        store = BinaryStore(str(tmp_path / "store"))
+        source = _binary(tmp_path / "antnode", b"v2")
+        node = _binary(tmp_path / "node1", b"v1")
+        staged = staged_binary(node)
+
+        store.install(source, staged)
+        assert store.verify(source, staged)
+        # A copy is verified by digest
+        copied = _binary(tmp_path / "copy", b"v2")
+        assert store.verify(source, copied)
+        assert not store.verify(source, node)
+
+        store.swap(staged, node)
+
+        assert not os.path.exists(staged)
+        assert (tmp_path / "node1").read_bytes() == b"v2"
+
+    def _executor(self, db_session, tmp_path):
+        node = db_session.get(Node, 1)
+        node.binary = _binary(tmp_path / "node1", b"v1")
+        db_session.commit()
+        executor = ActionExecutor(lambda: db_session)
+        executor.machine_config = {"antnode_path": _binary(tmp_path / "antnode", b"v2")}
+        return executor, node
+
+    @patch("wnm.executor.get_antnode_version", return_value="0.2.0")
+    def test_cutover_records_downtime(self, mock_version, db_session, multiple_nodes, tmp_path):
+        store = BinaryStore(str(tmp_path / "store"))
+        executor, node = self._executor(db_session, tmp_path)
+        manager = MagicMock()
+        manager.install_binary.side_effect = lambda source, dest, sudo: bool(
+            store.install(source, dest)
+        )
+
+        with patch("wnm.executor.get_process_manager", return_value=manager), patch(
+            "wnm.executor.get_binary_store", return_value=store
+        ):
+            assert executor._upgrade_node_binary(node, "0.2.0")
+
+        assert (tmp_path / "node1").read_bytes() == b"v2"
+        assert not os.path.exists(staged_binary(str(tmp_path / "node1")))
+        manager.stop_node.assert_called_once()
+        manager.start_node.assert_called_once()
+        db_session.expire_all()
+        assert db_session.get(Node, 1).status == UPGRADING
+        transition = db_session.query(NodeTransition).one()
+        assert transition.transition == UPGRADING
+        assert transition.downtime >= 0
+        assert upgrade_downtime(lambda: db_session)["count"] == 1
+
+    @patch("wnm.executor.get_antnode_version", return_value="0.2.0")
+    def test_cutover_keeps_previous_binary(
+        self, mock_version, db_session, multiple_nodes, tmp_path
+    ):
+        store = BinaryStore(str(tmp_path / "store"))
+        executor, node = self._executor(db_session, tmp_path)
+        executor.machine_config["upgrade_canary"] = 1
+        manager = MagicMock()
+        manager.install_binary.side_effect = lambda source, dest, sudo: bool(
+            store.install(source, dest)
+        )
+
+        with patch("wnm.executor.get_process_manager", return_value=manager), patch(
+            "wnm.executor.get_binary_store", return_value=store
+        ):
+            assert executor._upgrade_node_binary(node, "0.2.0")
+
+        assert (tmp_path / "node1").read_bytes() == b"v2"
+        assert (tmp_path / "node1.previous").read_bytes() == b"v1"
+
+    @patch("wnm.executor.get_antnode_version", return_value="0.2.0")
+    def test_system_service_cutover_keeps_previous_through_sudo(
+        self, mock_version, db_session, multiple_nodes, tmp_path
+    ):
+        store = BinaryStore(str(tmp_path / "store"), sudo=True)
+        executor, node = self._executor(db_session, tmp_path)
+        executor.machine_config["upgrade_canary"] = 1
+        binary = node.binary
+        staged = staged_binary(binary)
+        manager = MagicMock(use_system_services=True)
+
+        with patch("wnm.executor.get_process_manager", return_value=manager), patch(
+            "wnm.executor.get_binary_store", return_value=store
+        ), patch.object(executor, "_stage_binary", return_value=staged), patch(
+            "wnm.binary_store.subprocess.run"
+        ) as mock_run:
+            assert executor._upgrade_node_binary(node, "0.2.0")
+
+        commands = [call.args[0] for call in mock_run.call_args_list]
+        assert commands == [
+            ["sudo", "ln", "-f", binary, binary + ".previous"],
+            ["sudo", "mv", "-f", staged, binary],
+        ]
+
+    def test_failed_staging_keeps_node_running(self, db_session, multiple_nodes, tmp_path):
+        store = BinaryStore(str(tmp_path / "store"))
+        executor, node = self._executor(db_session, tmp_path)
+        manager = MagicMock()
+        manager.install_binary.return_value = False
+
+        with patch("wnm.executor.get_process_manager", return_value=manager), patch(
+            "wnm.executor.get_binary_store", return_value=store
+        ):
+            assert not executor._upgrade_node_binary(node, "0.2.0")
+
+        manager.stop_node.assert_not_called()
+        assert (tmp_path / "node1").read_bytes() == b"v1"
+        assert db_session.query(NodeTransition).count() == 0
@@ -0,0 +1,117 @@
+"""Tests for --daemon mode scheduling."""
+
+import signal
+
+from wnm.daemon import DaemonLoop
+
+
+class FakeClock:
+    """Monotonic clock advanced by the test"""
+
+    def __init__(self, start=1000.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+
+class FakeStopEvent:
+    """Stand-in for threading.Event that advances the fake clock on wait"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.waits = []
+        self._set = False
+
+    def is_set(self):
+        return self._set
+
+    def set(self):
+        self._set = True
+
+    def wait(self, timeout):
+        self.waits.append(round(timeout, 3))
+        if not self._set:
+            self.clock.now += max(0, timeout)
+        return self._set
+
+
+def _loop(cycle_durations, interval=60):
+    clock = FakeClock()
+    starts = []
+    durations = list(cycle_durations)
+
+    def cycle():
+        starts.append(clock.now)
+        clock.now += durations.pop(0)
+        if not durations:
+            loop.stop()
+
+    loop = DaemonLoop(cycle, interval, clock=clock)
+    loop._stop = FakeStopEvent(clock)
+    return loop, starts
+
+
+class TestDaemonLoop:
+    """Test the fixed-interval cycle scheduler"""
+
+    def test_no_drift(self):
+        """Test cycle starts stay on the interval grid despite cycle duration"""
+        loop, starts = _loop([5, 12.5, 0.5, 30])
+
+        assert loop.run() == 4
+        assert starts == [1000, 1060, 1120, 1180]
+
+    def test_overrun_skips_missed_slots(self):
+        """Test a cycle longer than the interval skips to the next grid slot"""
+        loop, starts = _loop([10, 130, 1])
+
+        loop.run()
+
+        assert starts == [1000, 1060, 1240]
+        assert loop.skipped == 2
+
+    def test_cycle_exception_does_not_stop_daemon(self):
+        clock = FakeClock()
+        calls = []
+
+        def cycle():
+            calls.append(clock.now)
+            if len(calls) == 1:
+                raise RuntimeError("boom")
+            loop.stop()
+
+        loop = DaemonLoop(cycle, 30, clock=clock)
+        loop._stop = FakeStopEvent(clock)
+
+        assert loop.run() == 2
+        assert calls == [1000, 1030]
+
+    def test_minimum_interval(self):
+        assert DaemonLoop(lambda: None, 0).interval == 60
+        assert DaemonLoop(lambda: None, -5).interval == 1
+
+    def test_sigterm_finishes_current_cycle(self):
+        """Test SIGTERM sets the stop flag instead of exiting"""
+        previous = {sig: signal.getsignal(sig) for sig in (signal.SIGTERM, signal.SIGINT)}
+        second = []
+        try:
+            loop = DaemonLoop(lambda: None, 60)
+            loop.install_signal_handlers(on_second_signal=lambda s, f: second.append(s))
+            handler = signal.getsignal(signal.SIGTERM)
+
+            handler(signal.SIGTERM, None)
+            assert loop.stopping
+            assert second == []
+
+            handler(signal.SIGTERM, None)
+            assert second == [signal.SIGTERM]
+        finally:
+            for sig, prev in previous.items():
+                signal.signal(sig, prev)
+
+    def test_stopped_before_start_runs_nothing(self):
+        loop = DaemonLoop(lambda: None, 60)
+        loop.stop()
+
+        assert loop.run() == 0
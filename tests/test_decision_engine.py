@@ -874,3 +874,229 @@ class TestActionExecutor:
 
         assert result["status"] == "no-actions"
         assert result["results"] == []
+
+
+def _binding_config(**overrides):
+    config = {
+        "last_stopped_at": 1000,
+        "cpu_less_than": 70,
+        "cpu_remove": 85,
+        "mem_less_than": 70,
+        "mem_remove": 85,
+        "hd_less_than": 80,
+        "hd_remove": 90,
+        "node_cap": 10,
+        "netio_read_less_than": 0,
+        "netio_read_remove": 0,
+        "netio_write_less_than": 0,
+        "netio_write_remove": 0,
+        "hdio_read_less_than": 0,
+        "hdio_read_remove": 0,
+        "hdio_write_less_than": 0,
+        "hdio_write_remove": 0,
+        "desired_load_average": 5.0,
+        "max_load_average_allowed": 10.0,
+        "max_concurrent_upgrades": 3,
+        "max_concurrent_starts": 3,
+        "max_concurrent_removals": 3,
+        "max_concurrent_operations": 3,
+    }
+    config.update(overrides)
+    return config
+
+
+def _binding_metrics(**overrides):
+    metrics = {
+        "system_start": 500,
+        "dead_nodes": 0,
+        "restarting_nodes": 0,
+        "upgrading_nodes": 0,
+        "removing_nodes": 0,
+        "stopped_nodes": 0,
+        "used_cpu_percent": 60,
+        "used_mem_percent": 60,
+        "used_hd_percent": 70,
+        "running_nodes": 5,
+        "total_nodes": 5,
+        "load_average_1": 3.0,
+        "load_average_5": 3.5,
+        "load_average_15": 4.0,
+        "nodes_to_upgrade": 0,
+        "antnode_version": "0.1.0",
+        "queen_node_version": "0.1.0",
+    }
+    metrics.update(overrides)
+    return metrics
+
+
+class TestNodeBinding:
+    """Test the planner binds concrete node ids to actions"""
+
+    def _candidates(self, db_session, version="0.1.0", strategy="youngest"):
+        from wnm.node_candidates import NodeCandidates
+
+        return NodeCandidates(lambda: db_session, version, strategy)
+
+    def test_stops_bound_youngest_first(self, db_session, multiple_nodes):
+        engine = DecisionEngine(
+            _binding_config(),
+            _binding_metrics(used_cpu_percent=90),
+            candidates=self._candidates(db_session),
+        )
+        actions = engine.plan_actions()
+
+        assert [a.type for a in actions] == [ActionType.STOP_NODE] * 3
+        assert [a.node_id for a in actions] == [5, 4, 3]
+
+    def test_removal_strategy(self, db_session, multiple_nodes):
+        engine = DecisionEngine(
+            _binding_config(),
+            _binding_metrics(used_cpu_percent=90),
+            candidates=self._candidates(db_session, strategy="oldest"),
+        )
+
+        assert [a.node_id for a in engine.plan_actions()] == [1, 2, 3]
+
+    def test_starts_bound_oldest_stopped_first(self, db_session, multiple_nodes):
+        from wnm.common import STOPPED
+
+        for node in multiple_nodes[1:4]:
+            node.status = STOPPED
+        db_session.commit()
+
+        engine = DecisionEngine(
+            _binding_config(),
+            _binding_metrics(running_nodes=2, stopped_nodes=3),
+            candidates=self._candidates(db_session),
+        )
+        actions = engine.plan_actions()
+
+        assert [a.type for a in actions] == [ActionType.START_NODE] * 3
+        assert [a.node_id for a in actions] == [2, 3, 4]
+
+    def test_upgrades_bound_to_outdated_nodes(self, db_session, multiple_nodes):
+        multiple_nodes[0].version = "0.2.0"
+        db_session.commit()
+
+        engine = DecisionEngine(
+            _binding_config(),
+            _binding_metrics(
+                nodes_to_upgrade=4,
+                antnode_version="0.2.0",
+                queen_node_version="0.2.0",
+            ),
+            candidates=self._candidates(db_session, version="0.2.0"),
+        )
+        actions = engine.plan_actions()
+
+        assert [a.node_id for a in actions] == [2, 3, 4]
+
+    def test_fewer_candidates_than_metrics(self, db_session, multiple_nodes):
+        """Test stale counts never produce unbound or duplicate actions"""
+        from wnm.common import STOPPED
+
+        multiple_nodes[0].status = STOPPED
+        db_session.commit()
+
+        engine = DecisionEngine(
+            _binding_config(),
+            _binding_metrics(running_nodes=2, stopped_nodes=3),
+            candidates=self._candidates(db_session),
+        )
+        actions = engine.plan_actions()
+
+        starts = [a for a in actions if a.type == ActionType.START_NODE]
+        assert [a.node_id for a in starts] == [1]
+
+    def test_candidates_loaded_once(self, db_session, multiple_nodes):
+        from wnm.node_candidates import REMOVE_RUNNING
+
+        candidates = self._candidates(db_session)
+        with patch.object(candidates, "_load", wraps=candidates._load) as load:
+            assert candidates.take(REMOVE_RUNNING, 2) == [5, 4]
+            assert candidates.take(REMOVE_RUNNING, 2) == [3, 2]
+        assert load.call_count == 1
+
+    def test_idle_cycle_does_not_query(self):
+        from wnm.node_candidates import NodeCandidates
+
+        S = MagicMock()
+        engine = DecisionEngine(
+            _binding_config(node_cap=5),
+            _binding_metrics(),
+            candidates=NodeCandidates(S, "0.1.0"),
+        )
+
+        assert engine.plan_actions()[0].type == ActionType.SURVEY_NODES
+        S.assert_not_called()
+
+    def test_executor_uses_bound_node(self, db_session, multiple_nodes):
+        """Test the executor stops the bound node, not the youngest"""
+        from wnm.common import STOPPED
+        from wnm.executor import ActionExecutor
+
+        manager = MagicMock()
+        executor = ActionExecutor(lambda: db_session)
+        action = Action(type=ActionType.STOP_NODE, node_id=2, priority=70, reason="test")
+
+        with patch("wnm.executor.get_process_manager", return_value=manager):
+            result = executor.execute([action], {"process_manager": "systemd+user"}, {})
+
+        assert result["status"] == "stopped-node"
+        assert manager.stop_node.call_args[0][0].id == 2
+        db_session.expire_all()
+        assert db_session.get(type(multiple_nodes[0]), 2).status == STOPPED
+
+    def test_executor_skips_bound_node_in_wrong_state(self, db_session, multiple_nodes):
+        from wnm.executor import ActionExecutor
+
+        manager = MagicMock()
+        executor = ActionExecutor(lambda: db_session)
+        action = Action(type=ActionType.START_NODE, node_id=2, priority=50, reason="test")
+
+        with patch("wnm.executor.get_process_manager", return_value=manager):
+            result = executor.execute([action], {}, {"antnode_version": "0.1.0"})
+
+        assert result["status"] == "no-stopped-nodes"
+        manager.start_node.assert_not_called()
+
+
+class FakeRollout:
+    def __init__(self, allowance=0, rollback_ids=()):
+        self._allowance = allowance
+        self._rollback_ids = list(rollback_ids)
+
+    def allowance(self):
+        return self._allowance
+
+    def rollback_ids(self):
+        return self._rollback_ids
+
+
+class TestRolloutPlanning:
+    """Test the planner follows a rolling upgrade"""
+
+    def _engine(self, rollout):
+        return DecisionEngine(
+            _binding_config(),
+            _binding_metrics(nodes_to_upgrade=5, antnode_version="0.2.0"),
+            rollout=rollout,
+        )
+
+    def test_upgrades_limited_to_wave(self):
+        actions = self._engine(FakeRollout(allowance=1)).plan_actions()
+
+        assert [a.type for a in actions] == [ActionType.UPGRADE_NODE]
+
+    def test_paused_rollout_plans_no_upgrades(self):
+        actions = self._engine(FakeRollout(allowance=0)).plan_actions()
+
+        assert ActionType.UPGRADE_NODE not in [a.type for a in actions]
+
+    def test_rollbacks_planned_first(self):
+        actions = self._engine(FakeRollout(rollback_ids=[2, 4])).plan_actions()
+
+        assert [(a.type, a.node_id) for a in actions] == [
+            (ActionType.ROLLBACK_NODE, 2),
+            (ActionType.ROLLBACK_NODE, 4),
+        ]
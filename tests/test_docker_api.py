@@ -0,0 +1,341 @@
+"""Tests for the Docker Engine API transport against a stand-in daemon."""
+
+import json
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler
+from unittest.mock import Mock, patch
+from urllib.parse import parse_qs, unquote, urlparse
+
+import pytest
+
+from wnm.common import RUNNING, STOPPED
+from wnm.models import Container
+from wnm.process_managers import DockerManager, S6OverlayManager
+from wnm.process_managers.docker_api import (
+    NODE_LABEL,
+    DockerAPI,
+    DockerAPIError,
+    demux_stream,
+)
+
+
+class FakeDocker(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Stand-in Docker daemon serving the Engine API calls wnm makes"""
+
+    daemon_threads = True
+
+    def __init__(self, path, images=(), containers=None):
+        self.images = set(images)
+        # name -> {"Id", "State", "Labels"}
+        self.containers = dict(containers or {})
+        self.requests = []
+        self.connections = 0
+        # Commands run by exec, and the (exit code, stdout, stderr) they give
+        self.execs = []
+        self.exec_result = (0, "", "")
+        super().__init__(str(path), FakeDockerHandler)
+        self.path = str(path)
+        threading.Thread(
+            target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        ).start()
+
+    def get_request(self):
+        self.connections += 1
+        return super().get_request()
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
+
+
+class FakeDockerHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def address_string(self):
+        return "docker.sock"
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body=None):
+        data = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self, method):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        docker = self.server
+        parts = url.path.split("/")[2:]
+        docker.requests.append((method, "/" + "/".join(parts), query, body))
+
+        if parts == ["_ping"]:
+            return self._reply(200, "OK")
+        if parts[0] == "images":
+            image = unquote(parts[1])
+            if parts[-1] == "create":
+                docker.images.add(f"{query['fromImage'][0]}:{query['tag'][0]}")
+                return self._reply(200)
+            if image in docker.images:
+                return self._reply(200, {"Id": "sha256:image"})
+            return self._reply(404, {"message": f"No such image: {image}"})
+
+        if parts == ["containers", "json"]:
+            label = json.loads(query["filters"][0])["label"][0]
+            return self._reply(
+                200,
+                [
+                    {"Id": c["Id"], "Names": [f"/{name}"], "State": c["State"], "Labels": c["Labels"]}
+                    for name, c in docker.containers.items()
+                    if label in c["Labels"]
+                ],
+            )
+        if parts == ["containers", "create"]:
+            name = query["name"][0]
+            docker.containers[name] = {
+                "Id": f"id-{name}",
+                "State": "created",
+                "Labels": body["Labels"],
+            }
+            return self._reply(201, {"Id": f"id-{name}"})
+        if parts[0] == "exec":
+            if parts[2] == "json":
+                return self._reply(200, {"ExitCode": docker.exec_result[0]})
+            _, stdout, stderr = docker.exec_result
+            data = b""
+            for kind, text in ((1, stdout), (2, stderr)):
+                if text:
+                    data += bytes([kind, 0, 0, 0]) + len(text).to_bytes(4, "big") + text.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/vnd.docker.multiplexed-stream")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return None
+
+        name = parts[1].replace("id-", "")
+        container = docker.containers.get(name)
+        if container is None:
+            return self._reply(404, {"message": f"No such container: {name}"})
+        action = parts[2] if len(parts) > 2 else None
+        if method == "DELETE":
+            del docker.containers[name]
+            return self._reply(204)
+        if action == "exec":
+            if container["State"] != "running":
+                return self._reply(409, {"message": f"Container {name} is not running"})
+            docker.execs.append((name, body["Cmd"]))
+            return self._reply(201, {"Id": str(len(docker.execs))})
+        if action == "json":
+            return self._reply(
+                200,
+                {"Id": container["Id"], "State": {"Status": container["State"], "Pid": 4242}},
+            )
+        if action in ("start", "restart"):
+            container["State"] = "running"
+        elif action == "stop":
+            container["State"] = "exited"
+        return self._reply(204)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+
+@pytest.fixture
+def fake_docker(tmp_path):
+    docker = FakeDocker(
+        tmp_path / "docker.sock",
+        images={"autonomi/node:latest"},
+        containers={
+            "antnode0001": {"Id": "id-antnode0001", "State": "running", "Labels": {NODE_LABEL: "1"}},
+            "antnode0002": {"Id": "id-antnode0002", "State": "exited", "Labels": {NODE_LABEL: "2"}},
+            "other": {"Id": "id-other", "State": "running", "Labels": {}},
+        },
+    )
+    yield docker
+    docker.close()
+
+
+class TestDockerAPI:
+    """Test Engine API requests over the stand-in daemon socket"""
+
+    def test_requests_share_connection(self, fake_docker):
+        api = DockerAPI(fake_docker.path)
+
+        assert api.ping()
+        containers = api.list_containers()
+        assert api.inspect_container("antnode0001")["State"]["Pid"] == 4242
+        assert api.inspect_container("missing") is None
+
+        assert sorted(c["Names"][0] for c in containers) == ["/antnode0001", "/antnode0002"]
+        assert fake_docker.connections == 1
+        api.close()
+
+    def test_image_check_cached(self, fake_docker):
+        api = DockerAPI(fake_docker.path)
+
+        assert api.ensure_image("autonomi/node:latest")
+        assert api.ensure_image("autonomi/node:latest")
+        assert api.ensure_image("autonomi/node:next")
+
+        paths = [path for _, path, _, _ in fake_docker.requests]
+        assert paths.count("/images/autonomi%2Fnode%3Alatest/json") == 1
+        assert "/images/create" in paths
+        api.close()
+
+    def test_batched_stops_close_worker_connections(self, fake_docker):
+        api = DockerAPI(fake_docker.path)
+        assert api.ping()
+
+        for _ in range(5):
+            assert api.stop_containers(["antnode0001", "antnode0002"])
+
+        # Only the caller's own connection stays open between batches
+        assert len(api._connections) == 1
+        api.close()
+
+    def test_error_status(self, fake_docker):
+        api = DockerAPI(fake_docker.path)
+
+        with pytest.raises(DockerAPIError) as err:
+            api.start_container("missing")
+
+        assert err.value.status == 404
+        assert "No such container" in err.value.message
+        api.close()
+
+    def test_exec_run(self, fake_docker):
+        api = DockerAPI(fake_docker.path)
+        fake_docker.exec_result = (3, "out\n", "err\n")
+
+        assert api.exec_run("antnode0001", ["sh", "-c", "true"]) == (3, "out\n", "err\n")
+        assert fake_docker.execs == [("antnode0001", ["sh", "-c", "true"])]
+        with pytest.raises(DockerAPIError) as err:
+            api.exec_run("antnode0002", ["true"])
+        assert err.value.status == 409
+        api.close()
+
+    def test_demux_stream(self):
+        framed = b"\x01\x00\x00\x00\x00\x00\x00\x02ab\x02\x00\x00\x00\x00\x00\x00\x01c"
+
+        assert demux_stream(framed) == ("ab", "c")
+        # A TTY stream has no frame headers
+        assert demux_stream(b"plain output") == ("plain output", "")
+
+
+class TestDockerManagerAPI:
+    """Test DockerManager uses the Engine API and falls back to the CLI"""
+
+    @patch("subprocess.run")
+    @patch("wnm.process_managers.docker_manager.time.sleep")
+    def test_create_with_label(self, mock_sleep, mock_run, fake_docker, make_node_mock):
+        manager = DockerManager(transport="api")
+        manager.api = DockerAPI(fake_docker.path)
+
+        created = manager.create_node(
+            make_node_mock(3, environment="A=1 B=2"), "/usr/local/bin/antnode"
+        )
+        manager.create_node(make_node_mock(4), "/usr/local/bin/antnode")
+
+        mock_run.assert_not_called()
+        assert created.container_id == "id-antnode0003"
+        container = fake_docker.containers["antnode0003"]
+        assert container["State"] == "running"
+        assert container["Labels"] == {NODE_LABEL: "3"}
+        config = next(body for _, path, _, body in fake_docker.requests if path == "/containers/create")
+        assert config["Env"] == ["A=1", "B=2"]
+        assert config["HostConfig"]["PortBindings"]["55003/udp"] == [{"HostPort": "55003"}]
+        # The image was looked up once for both nodes
+        paths = [path for _, path, _, _ in fake_docker.requests]
+        assert sum(path.startswith("/images/") for path in paths) == 1
+
+    @patch("subprocess.run")
+    def test_statuses_from_one_listing(self, mock_run, fake_docker, make_node_mock):
+        manager = DockerManager(transport="api")
+        manager.api = DockerAPI(fake_docker.path)
+        nodes = [make_node_mock(1), make_node_mock(2)]
+
+        statuses = manager.get_statuses(nodes)
+
+        assert statuses[1].status == RUNNING
+        assert statuses[1].container_id == "id-antnode0001"
+        assert statuses[2].status == STOPPED
+        assert [path for _, path, _, _ in fake_docker.requests] == ["/containers/json"]
+        mock_run.assert_not_called()
+
+    @patch("subprocess.run")
+    def test_batched_stop_and_remove(self, mock_run, fake_docker, tmp_path, make_node_mock):
+        manager = DockerManager(transport="api")
+        manager.api = DockerAPI(fake_docker.path)
+        nodes = [
+            make_node_mock(1, root_dir=str(tmp_path / "a")),
+            make_node_mock(2, root_dir=str(tmp_path / "b")),
+        ]
+
+        assert manager.stop_nodes(nodes)
+        assert fake_docker.containers["antnode0001"]["State"] == "exited"
+        assert manager.remove_nodes(nodes)
+
+        mock_run.assert_not_called()
+        assert sorted(fake_docker.containers) == ["other"]
+        stops = [query for _, path, query, _ in fake_docker.requests if path.endswith("/stop")]
+        assert stops[0] == {"t": ["30"]}
+
+    @patch("subprocess.run")
+    def test_falls_back_without_daemon(self, mock_run, tmp_path, make_node_mock):
+        mock_run.return_value = Mock(returncode=0, stdout="", stderr="")
+        manager = DockerManager(transport="api")
+        manager.api = DockerAPI(str(tmp_path / "missing.sock"))
+
+        assert manager.stop_node(make_node_mock(1))
+
+        assert manager.api is None
+        assert mock_run.call_args.args[0] == ["docker", "stop", "-t", "30", "antnode0001"]
+
+    @patch("subprocess.run")
+    def test_s6overlay_exec_through_api(self, mock_run, fake_docker, db_session, make_node_mock):
+        fake_docker.containers["antcontainer01"] = {
+            "Id": "id-antcontainer01",
+            "State": "running",
+            "Labels": {},
+        }
+        db_session.add(
+            Container(
+                container_id="id-antcontainer01",
+                name="antcontainer01",
+                image="test/s6:latest",
+                status="running",
+                created_at=0,
+            )
+        )
+        db_session.commit()
+        manager = S6OverlayManager(session_factory=lambda: db_session, transport="api")
+        manager.api = DockerAPI(fake_docker.path)
+        nodes = [make_node_mock(1), make_node_mock(2)]
+        for node in nodes:
+            node.container_id = 1
+
+        assert manager.stop_nodes(nodes)
+        fake_docker.exec_result = (0, "antnode0001 true 321\nantnode0002 false -1\n", "")
+        statuses = manager.get_statuses(nodes)
+        fake_docker.exec_result = (1, "", "s6-svc: fatal\n")
+        assert not manager.start_nodes(nodes)
+
+        mock_run.assert_not_called()
+        assert [name for name, _ in fake_docker.execs] == ["antcontainer01"] * 3
+        assert "touch /run/service/antnode0001/down" in fake_docker.execs[0][1][-1]
+        assert statuses[1].status == RUNNING
+        assert statuses[1].pid == 321
+        assert statuses[2].status == STOPPED
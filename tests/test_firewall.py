@@ -4,13 +4,21 @@ Tests for firewall managers.
 Tests the firewall abstraction layer, including UFW and null implementations.
 """
 
+import json
 import os
-from unittest.mock import MagicMock, patch
+import subprocess
+from unittest.mock import MagicMock, call, patch
 
 import pytest
 
-from wnm.firewall import NullFirewall, UFWManager, get_firewall_manager
+from wnm.firewall import (
+    NftablesManager,
+    NullFirewall,
+    UFWManager,
+    get_firewall_manager,
+)
 from wnm.firewall.factory import get_default_firewall_type
+from wnm.firewall.port_range import PortRangeFirewall
 
 
 class TestNullFirewall:
@@ -217,6 +225,381 @@ class TestUFWManager:
         assert firewall.disable_port(55001) is False
 
 
+    @patch("subprocess.run")
+    @patch("shutil.which")
+    def test_enable_port_range(self, mock_which, mock_run):
+        """Test a port range is opened with one rule"""
+        mock_which.return_value = "/usr/sbin/ufw"
+        mock_run.return_value = MagicMock(returncode=0)
+
+        firewall = UFWManager()
+        assert firewall.enable_port_range(55001, 55100, comment="antnodes") is True
+
+        mock_run.assert_called_once_with(
+            ["sudo", "ufw", "allow", "55001:55100/udp", "comment", "antnodes"],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+
+    @patch("subprocess.run")
+    @patch("shutil.which")
+    def test_open_port_ranges(self, mock_which, mock_run):
+        """Test range rules are read back from ufw status"""
+        mock_which.return_value = "/usr/sbin/ufw"
+        mock_run.return_value = MagicMock(
+            returncode=0,
+            stdout=(
+                "Status: active\n\n"
+                "To                         Action      From\n"
+                "--                         ------      ----\n"
+                "22/tcp                     ALLOW       Anywhere\n"
+                "55001/udp                  ALLOW       Anywhere\n"
+                "55101:55200/udp            ALLOW       Anywhere                   # antnode ports 55101-55200\n"
+                "55001:55100/udp            ALLOW       Anywhere\n"
+                "56001:56100/tcp            ALLOW       Anywhere\n"
+                "55001:55100/udp (v6)       ALLOW       Anywhere (v6)\n"
+            ),
+        )
+
+        firewall = UFWManager()
+        assert firewall.open_port_ranges() == [(55001, 55100), (55101, 55200)]
+        assert firewall.open_port_ranges("tcp") == [(56001, 56100)]
+
+    @patch("subprocess.run")
+    @patch("shutil.which")
+    def test_open_port_ranges_failure(self, mock_which, mock_run):
+        """Test unreadable rules are reported as unknown"""
+        mock_which.return_value = "/usr/sbin/ufw"
+        mock_run.side_effect = Exception("Permission denied")
+
+        firewall = UFWManager()
+        assert firewall.open_port_ranges() is None
+
+
+class TestPortRangeFirewall:
+    """Tests for opening node ports in port-range blocks"""
+
+    def _firewall(self, open_ranges=None):
+        backend = MagicMock()
+        backend.open_port_ranges.return_value = open_ranges
+        backend.enable_port_range.return_value = True
+        return backend, PortRangeFirewall(backend, port_start=55, block_size=100)
+
+    def test_block_range(self):
+        """Test blocks follow node ids from port_start * 1000 + 1"""
+        _, firewall = self._firewall()
+
+        assert firewall.block_range(55001) == (55001, 55100)
+        assert firewall.block_range(55100) == (55001, 55100)
+        assert firewall.block_range(55101) == (55101, 55200)
+        assert firewall.block_range(55000) is None
+        assert PortRangeFirewall(MagicMock(), 65, 1000).block_range(65535) == (
+            65001,
+            65535,
+        )
+
+    def test_block_opened_once(self):
+        """Test a block gets one range rule however many of its ports open"""
+        backend, firewall = self._firewall([])
+
+        for port in (55001, 55002, 55050, 55100, 55101):
+            assert firewall.enable_port(port) is True
+
+        assert backend.enable_port_range.call_args_list == [
+            call(55001, 55100, "udp", "antnode ports 55001-55100"),
+            call(55101, 55200, "udp", "antnode ports 55101-55200"),
+        ]
+        backend.open_port_ranges.assert_called_once_with("udp")
+        backend.enable_port.assert_not_called()
+
+    def test_existing_rules_reused(self):
+        """Test blocks inside a range rule that already exists are not reopened"""
+        backend, firewall = self._firewall([(55001, 55200)])
+
+        assert firewall.enable_port(55150) is True
+
+        backend.enable_port_range.assert_not_called()
+
+    def test_failed_block_retried(self):
+        """Test a block that failed to open is tried again"""
+        backend, firewall = self._firewall(None)
+        backend.enable_port_range.return_value = False
+
+        assert firewall.enable_port(55001) is False
+        backend.enable_port_range.return_value = True
+        assert firewall.enable_port(55002) is True
+
+        assert backend.enable_port_range.call_count == 2
+
+    def test_disable_port_keeps_range(self):
+        """Test closing a node port leaves its range rule alone"""
+        backend, firewall = self._firewall([])
+
+        assert firewall.disable_port(55001) is True
+
+        backend.disable_port.assert_not_called()
+
+    def test_ports_below_range(self):
+        """Test ports outside the node port range get their own rules"""
+        backend, firewall = self._firewall([])
+
+        firewall.enable_port(22, "tcp")
+        firewall.disable_port(22, "tcp")
+
+        backend.enable_port.assert_called_once_with(22, "tcp", None)
+        backend.disable_port.assert_called_once_with(22, "tcp")
+        backend.enable_port_range.assert_not_called()
+
+
+def _nft_set(*elements):
+    """`nft -j list set` output for the udp node port set"""
+    return json.dumps(
+        {
+            "nftables": [
+                {"metainfo": {"version": "1.0.6", "json_schema_version": 1}},
+                {
+                    "set": {
+                        "family": "inet",
+                        "name": "antnode_udp",
+                        "table": "wnm",
+                        "type": "inet_service",
+                        "handle": 1,
+                        "elem": list(elements),
+                    }
+                },
+            ]
+        }
+    )
+
+
+def _counted(port, packets=0, bytes=0):
+    return {"elem": {"val": port, "counter": {"packets": packets, "bytes": bytes}}}
+
+
+class TestNftablesManager:
+    """Tests for the nftables set backend"""
+
+    @pytest.fixture
+    def nft(self):
+        with patch("shutil.which", return_value="/usr/sbin/nft"), patch(
+            "subprocess.run"
+        ) as mock_run:
+            yield mock_run
+
+    def test_reconcile_one_transaction(self, nft):
+        """Test the set difference is applied with a single nft -f"""
+        nft.side_effect = [
+            MagicMock(returncode=0, stdout=_nft_set(_counted(55001), _counted(55003))),
+            MagicMock(returncode=0),
+        ]
+
+        firewall = NftablesManager()
+        assert firewall.reconcile([55001, 55002, 55004]) is True
+
+        assert nft.call_count == 2
+        assert nft.call_args_list[0].args[0] == [
+            "sudo",
+            "nft",
+            "-j",
+            "list",
+            "set",
+            "inet",
+            "wnm",
+            "antnode_udp",
+        ]
+        assert nft.call_args.args[0] == ["sudo", "nft", "-f", "-"]
+        script = nft.call_args.kwargs["input"]
+        assert "add element inet wnm antnode_udp { 55002, 55004 }" in script
+        assert "delete element inet wnm antnode_udp { 55003 }" in script
+        assert "flush chain inet wnm input" in script
+        assert "add rule inet wnm input udp dport @antnode_udp accept" in script
+        assert script.count("counter") == 2
+
+    def test_reconcile_drops_closed_ports(self, nft):
+        """Test node ports missing from the set are dropped by the chain"""
+        nft.side_effect = [
+            MagicMock(returncode=0, stdout=_nft_set(55001, 55002)),
+            MagicMock(returncode=0),
+        ]
+
+        firewall = NftablesManager()
+        assert firewall.reconcile([55001], port_range=(55001, 55999)) is True
+
+        script = nft.call_args.kwargs["input"]
+        lines = script.splitlines()
+        drop = "add rule inet wnm input udp dport 55001-55999 udp dport != @antnode_udp drop"
+        assert drop in lines
+        # The drop rule comes after the accept rules of the rebuilt chain
+        assert lines.index(drop) > lines.index("flush chain inet wnm input")
+        assert "delete element inet wnm antnode_udp { 55002 }" in script
+
+    def test_reconcile_up_to_date(self, nft):
+        """Test nothing is written when the set and chain already match"""
+        nft.side_effect = [
+            MagicMock(returncode=0, stdout=_nft_set(55001)),
+            MagicMock(returncode=0),
+        ]
+
+        firewall = NftablesManager()
+        # First run builds the chain even though the set is unchanged
+        assert firewall.reconcile([55001], port_range=(55001, 55999)) is True
+        assert nft.call_count == 2
+        assert "drop" in nft.call_args.kwargs["input"]
+        # Unchanged set and range: only the set is read
+        nft.side_effect = None
+        nft.return_value = MagicMock(returncode=0, stdout=_nft_set(55001))
+        assert firewall.reconcile([55001], port_range=(55001, 55999)) is True
+        assert nft.call_count == 3
+
+    def test_reconcile_creates_table(self, nft):
+        """Test a missing set is created along with its elements"""
+        nft.side_effect = [
+            subprocess.CalledProcessError(
+                1, "nft", stderr="Error: No such file or directory"
+            ),
+            MagicMock(returncode=0),
+        ]
+
+        firewall = NftablesManager()
+        assert firewall.reconcile([55001]) is True
+
+        script = nft.call_args.kwargs["input"]
+        assert script.startswith("table inet wnm {")
+        assert "delete element" not in script
+
+    def test_reconcile_unreadable_set(self, nft):
+        """Test nothing is changed when the set cannot be read"""
+        nft.side_effect = subprocess.CalledProcessError(
+            1, "nft", stderr="Operation not permitted"
+        )
+
+        firewall = NftablesManager()
+        assert firewall.reconcile([55001]) is False
+        nft.assert_called_once()
+
+    def test_enable_disable_are_queued(self, nft):
+        """Test single port changes wait for one flush"""
+        nft.side_effect = [
+            MagicMock(returncode=0, stdout=_nft_set(55003)),
+            MagicMock(returncode=0),
+        ]
+
+        firewall = NftablesManager()
+        assert firewall.enable_port(55001) is True
+        assert firewall.enable_port(55002) is True
+        assert firewall.disable_port(55003) is True
+        nft.assert_not_called()
+
+        assert firewall.flush() is True
+        script = nft.call_args.kwargs["input"]
+        assert "add element inet wnm antnode_udp { 55001, 55002 }" in script
+        assert "delete element inet wnm antnode_udp { 55003 }" in script
+        assert nft.call_count == 2
+
+    def test_port_counters(self, nft):
+        """Test per-element counters are read from the set"""
+        nft.return_value = MagicMock(
+            returncode=0, stdout=_nft_set(_counted(55001, 12, 3400), 55002)
+        )
+
+        firewall = NftablesManager()
+        assert firewall.port_counters() == {
+            55001: {"packets": 12, "bytes": 3400},
+            55002: {"packets": 0, "bytes": 0},
+        }
+
+    def test_not_available(self):
+        """Test nothing runs without nft"""
+        with patch("shutil.which", return_value=None), patch(
+            "subprocess.run"
+        ) as mock_run:
+            firewall = NftablesManager()
+            assert firewall.enable_port(55001) is False
+            assert firewall.reconcile([55001]) is False
+            mock_run.assert_not_called()
+
+    def test_range_mode_not_applied(self):
+        """Test firewall_range_block leaves the nftables set alone"""
+        from wnm.process_managers import SetsidManager
+
+        manager = SetsidManager(firewall_type="nftables")
+        config = MagicMock(port_start=55, firewall_range_block=100)
+        with patch.object(manager, "_get_machine_config", return_value=config):
+            assert manager._port_firewall() is manager.firewall
+
+
+class TestFirewallReconcile:
+    """Tests for the executor's once-per-cycle firewall reconciliation"""
+
+    def _executor(self, db_session, firewall):
+        from wnm.executor import ActionExecutor
+
+        executor = ActionExecutor(lambda: db_session)
+        manager = MagicMock()
+        manager.firewall = firewall
+        executor.context.managers["setsid+user"] = manager
+        return executor
+
+    def test_desired_ports_from_nodes(self, db_session, multiple_nodes):
+        """Test running nodes' ports are kept open, stopped ones closed"""
+        from wnm.common import DISABLED, STOPPED
+        from wnm.models import Node
+
+        db_session.query(Node).filter(Node.id == 2).update({"status": STOPPED})
+        db_session.query(Node).filter(Node.id == 4).update({"status": DISABLED})
+        db_session.commit()
+        firewall = MagicMock(reconciles=True)
+        executor = self._executor(db_session, firewall)
+
+        executor.execute([], {"process_manager": "setsid+user"}, {})
+
+        firewall.reconcile.assert_called_once()
+        assert sorted(firewall.reconcile.call_args.args[0]) == [55001, 55003, 55005]
+        assert firewall.reconcile.call_args.kwargs["port_range"] is None
+
+    def test_node_port_range(self, db_session, multiple_nodes):
+        """Test the dropped range runs from port_start * 1000 + 1"""
+        firewall = MagicMock(reconciles=True)
+        executor = self._executor(db_session, firewall)
+
+        executor.execute([], {"process_manager": "setsid+user", "port_start": 55}, {})
+
+        assert firewall.reconcile.call_args.kwargs["port_range"] == (55001, 55999)
+        assert executor._node_port_range(56203) == (55001, 56203)
+        assert executor._node_port_range(None) == (55001, 55999)
+
+    def test_per_port_backends_skipped(self, db_session, multiple_nodes):
+        """Test backends that apply changes immediately are not reconciled"""
+        firewall = MagicMock(reconciles=False)
+        executor = self._executor(db_session, firewall)
+
+        executor.execute([], {"process_manager": "setsid+user"}, {})
+
+        firewall.reconcile.assert_not_called()
+
+    def test_dry_run(self, db_session, multiple_nodes):
+        """Test a dry run changes no firewall state"""
+        firewall = MagicMock(reconciles=True)
+        executor = self._executor(db_session, firewall)
+
+        executor.execute([], {"process_manager": "setsid+user"}, {}, dry_run=True)
+
+        firewall.reconcile.assert_not_called()
+
+    def test_manager_gets_machine_firewall(self, db_session):
+        """Test firewall_type is passed to new process managers"""
+        from wnm.executor import ActionExecutor
+
+        executor = ActionExecutor(lambda: db_session)
+        executor.machine_config = {
+            "process_manager": "setsid+user",
+            "firewall_type": "nftables",
+        }
+
+        assert executor._manager_options("setsid+user") == {"firewall_type": "nftables"}
+
+
 class TestFirewallFactory:
     """Tests for firewall factory functions"""
 
@@ -231,6 +614,11 @@ class TestFirewallFactory:
         assert result == mock_ufw
         mock_ufw_class.assert_called_once()
 
+    def test_get_firewall_manager_nftables(self):
+        """Test creating an nftables manager, by name or alias"""
+        assert isinstance(get_firewall_manager("nftables"), NftablesManager)
+        assert isinstance(get_firewall_manager("nft"), NftablesManager)
+
     def test_get_firewall_manager_null(self):
         """Test creating null firewall explicitly"""
         result = get_firewall_manager("null")
@@ -354,3 +742,53 @@ class TestProcessManagerFirewallIntegration:
 
         manager = SetsidManager(firewall_type="ufw")
         assert isinstance(manager.firewall, UFWManager)
+
+    @patch("subprocess.run")
+    @patch("shutil.which")
+    def test_range_mode(self, mock_which, mock_run):
+        """Test firewall_range_block opens node ports as ufw range rules"""
+        from wnm.process_managers import SetsidManager
+
+        mock_which.return_value = "/usr/sbin/ufw"
+        mock_run.return_value = MagicMock(returncode=0, stdout="Status: active\n")
+
+        manager = SetsidManager(firewall_type="ufw")
+        config = MagicMock(port_start=55, firewall_range_block=100)
+        with patch.object(manager, "_get_machine_config", return_value=config):
+            for port in (55001, 55002, 55003):
+                assert manager.enable_firewall_port(port) is True
+            assert manager.disable_firewall_port(55002) is True
+
+        commands = [c.args[0] for c in mock_run.call_args_list]
+        assert commands == [
+            ["sudo", "ufw", "status"],
+            [
+                "sudo",
+                "ufw",
+                "allow",
+                "55001:55100/udp",
+                "comment",
+                "antnode ports 55001-55100",
+            ],
+        ]
+
+    @patch("subprocess.run")
+    @patch("shutil.which")
+    def test_per_node_mode(self, mock_which, mock_run):
+        """Test firewall_range_block 0 keeps one rule per node"""
+        from wnm.process_managers import SetsidManager
+
+        mock_which.return_value = "/usr/sbin/ufw"
+        mock_run.return_value = MagicMock(returncode=0)
+
+        manager = SetsidManager(firewall_type="ufw")
+        config = MagicMock(port_start=55, firewall_range_block=0)
+        with patch.object(manager, "_get_machine_config", return_value=config):
+            assert manager.enable_firewall_port(55001) is True
+
+        mock_run.assert_called_once_with(
+            ["sudo", "ufw", "allow", "55001/udp"],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
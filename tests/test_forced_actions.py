@@ -1069,3 +1069,103 @@ class TestForcedActionRouter:
 
         assert result["status"] == "error"
         assert "unknown" in result["message"].lower()
+
+
+class TestBatchedForcedActions:
+    """Test forced multi-node actions use the batched manager calls"""
+
+    @patch("wnm.executor.ActionExecutor._get_process_manager")
+    def test_force_stop_batched(self, mock_get_manager, db_session, multiple_nodes):
+        """Test stopping several nodes calls stop_nodes once"""
+        mock_manager = MagicMock()
+        mock_manager.stop_nodes.return_value = True
+        mock_get_manager.return_value = mock_manager
+
+        executor = ActionExecutor(lambda: db_session)
+
+        result = executor._force_stop_node("antnode0001,antnode0002,antnode9999", dry_run=False)
+
+        assert result["stopped_nodes"] == ["antnode0001", "antnode0002"]
+        assert result["failed_nodes"] == [{"service": "antnode9999", "error": "not found"}]
+        mock_manager.stop_nodes.assert_called_once()
+        assert [node.id for node in mock_manager.stop_nodes.call_args.args[0]] == [1, 2]
+        mock_manager.stop_node.assert_not_called()
+        assert db_session.get(Node, 1).status == STOPPED
+
+    @patch("wnm.executor.ActionExecutor._get_process_manager")
+    def test_force_remove_batched(self, mock_get_manager, db_session, multiple_nodes):
+        """Test removing several youngest nodes calls remove_nodes once"""
+        mock_manager = MagicMock()
+        mock_get_manager.return_value = mock_manager
+
+        executor = ActionExecutor(lambda: db_session)
+
+        result = executor._force_remove_node(None, dry_run=False, count=2)
+
+        assert result["removed_nodes"] == ["antnode0005", "antnode0004"]
+        mock_manager.remove_nodes.assert_called_once()
+        mock_manager.remove_node.assert_not_called()
+        assert db_session.query(Node).count() == 3
+
+    @patch("wnm.executor.ActionExecutor._get_process_manager")
+    def test_failed_batch_start(self, mock_get_manager, db_session, multiple_nodes):
+        """Test a failed batched start reports every node in it"""
+        for node in multiple_nodes[:2]:
+            node.status = STOPPED
+            node.version = "0.4.6"
+        db_session.commit()
+        mock_manager = MagicMock()
+        mock_manager.start_nodes.return_value = False
+        mock_get_manager.return_value = mock_manager
+
+        executor = ActionExecutor(lambda: db_session)
+        metrics = {"antnode_version": "0.4.6"}
+
+        result = executor._force_start_node(None, metrics, dry_run=False, count=2)
+
+        assert result["started_count"] == 0
+        assert result["failed_count"] == 2
+        assert db_session.get(Node, 1).status == STOPPED
+
+    @patch("wnm.executor.time.sleep")
+    @patch("wnm.executor.ActionExecutor._get_process_manager")
+    def test_action_delay_keeps_per_node_calls(
+        self, mock_get_manager, mock_sleep, db_session, multiple_nodes
+    ):
+        """Test an action delay still staggers the nodes one at a time"""
+        mock_manager = MagicMock()
+        mock_get_manager.return_value = mock_manager
+
+        executor = ActionExecutor(lambda: db_session)
+        executor.machine_config = {"action_delay": 100}
+
+        executor._force_stop_node("antnode0001,antnode0002", dry_run=False)
+
+        assert mock_manager.stop_node.call_count == 2
+        mock_manager.stop_nodes.assert_not_called()
+        mock_sleep.assert_called_once()
+
+
+class TestAntctlForkReport:
+    """Test the cycle's antctl invocation count is reported"""
+
+    @patch("subprocess.run")
+    def test_forced_stop_reports_forks(self, mock_run, db_session, multiple_nodes):
+        """Test a forced action result carries the antctl fork count"""
+        from wnm.process_managers.antctl_manager import AntctlManager
+
+        mock_run.return_value = MagicMock(returncode=0, stdout="", stderr="")
+        manager = AntctlManager(mode="user")
+        manager.forks = 7  # left over from an earlier cycle
+        executor = ActionExecutor(lambda: db_session)
+        executor.context.managers["antctl+user"] = manager
+        for node in multiple_nodes:
+            node.manager_type = "antctl+user"
+        db_session.commit()
+
+        result = executor.execute_forced_action(
+            "stop", {}, {}, service_name="antnode0001,antnode0002"
+        )
+
+        assert result["stopped_nodes"] == ["antnode0001", "antnode0002"]
+        assert result["antctl_forks"] == 1
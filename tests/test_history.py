@@ -0,0 +1,229 @@
+"""Tests for node metrics history.
+
+These tests verify that surveys append history samples, that samples are
+rolled up into 5 minute and hourly buckets and pruned by retention, and that
+per-node rates are computed from the history.
+"""
+
+import json
+import time
+from unittest.mock import patch
+
+from sqlalchemy import func, select, text
+
+from wnm.common import RUNNING
+from wnm.history import (
+    FIVE_MINUTE_HISTORY_SECONDS,
+    FIVE_MINUTES,
+    ONE_HOUR,
+    RAW,
+    RAW_HISTORY_SECONDS,
+    history_sample,
+    maintain_history,
+    node_rates,
+)
+from wnm.models import NodeMetric
+from wnm.reports import NodeReporter
+from wnm.utils import update_nodes
+
+NOW = 1_800_000_000  # aligned to the hour
+
+
+def _add_samples(db_session, node_id, start, count, step, puts=None, rewards=0):
+    for i in range(count):
+        db_session.add(
+            NodeMetric(
+                node_id=node_id,
+                timestamp=start + i * step,
+                records=100 + i,
+                puts=puts[i] if puts else i,
+                rewards=str(rewards + i),
+                connected_peers=10,
+                mem=1000 + i * 10,
+                cpu=i,
+            )
+        )
+    db_session.commit()
+
+
+def _count(db_session, resolution):
+    return db_session.execute(
+        select(func.count(NodeMetric.id)).where(NodeMetric.resolution == resolution)
+    ).scalar()
+
+
+class TestHistorySample:
+    """Test building history rows from survey cards"""
+
+    def test_sample_from_card(self):
+        card = {
+            "status": RUNNING,
+            "timestamp": NOW,
+            "records": 5,
+            "puts": 7,
+            "rewards": "1.5",
+            "connected_peers": 3,
+            "shunned": 0,
+            "mem": 9781,
+            "cpu": 3,
+        }
+        sample = history_sample(2, card)
+
+        assert sample["node_id"] == 2
+        assert sample["timestamp"] == NOW
+        assert sample["resolution"] == RAW
+        assert sample["rewards"] == "1.5"
+        assert sample["mem"] == 9781
+
+
+class TestMaintainHistory:
+    """Test downsampling and retention"""
+
+    def test_raw_rolled_into_five_minute_buckets(self, db_session):
+        # 20 one-minute samples, 10 hours old
+        start = NOW - 10 * ONE_HOUR
+        _add_samples(db_session, 1, start, 20, 60)
+
+        assert maintain_history(lambda: db_session, 30, now=NOW)
+
+        assert _count(db_session, RAW) == 0
+        buckets = db_session.execute(
+            select(NodeMetric)
+            .where(NodeMetric.resolution == FIVE_MINUTES)
+            .order_by(NodeMetric.timestamp)
+        ).scalars().all()
+        assert len(buckets) == 4
+        assert [b.timestamp for b in buckets] == [start + i * 300 for i in range(4)]
+        # Last value kept for counters, average for mem
+        assert buckets[0].puts == 4
+        assert buckets[0].mem == 1020
+
+    def test_recent_raw_kept(self, db_session):
+        _add_samples(db_session, 1, NOW - ONE_HOUR, 10, 60)
+
+        maintain_history(lambda: db_session, 30, now=NOW)
+
+        assert _count(db_session, RAW) == 10
+        assert _count(db_session, FIVE_MINUTES) == 0
+
+    def test_five_minute_rolled_into_hourly(self, db_session):
+        start = NOW - FIVE_MINUTE_HISTORY_SECONDS - 2 * ONE_HOUR
+        for i in range(24):
+            db_session.add(
+                NodeMetric(node_id=1, timestamp=start + i * 300, resolution=FIVE_MINUTES, puts=i)
+            )
+        db_session.commit()
+
+        maintain_history(lambda: db_session, 30, now=NOW)
+
+        hourly = db_session.execute(
+            select(NodeMetric).where(NodeMetric.resolution == ONE_HOUR)
+        ).scalars().all()
+        assert len(hourly) == 2
+        assert _count(db_session, FIVE_MINUTES) == 0
+
+    def test_retention_prunes_old_rows(self, db_session):
+        db_session.add(NodeMetric(node_id=1, timestamp=NOW - 40 * 24 * ONE_HOUR, resolution=ONE_HOUR))
+        db_session.add(NodeMetric(node_id=1, timestamp=NOW - 20 * 24 * ONE_HOUR, resolution=ONE_HOUR))
+        db_session.commit()
+
+        maintain_history(lambda: db_session, 30, now=NOW)
+
+        assert _count(db_session, ONE_HOUR) == 1
+
+    def test_maintenance_queries_use_indexes(self, db_session):
+        """Test the rollup select and retention delete do not scan the table"""
+        plans = [
+            "SELECT * FROM node_metric WHERE resolution = 0 AND timestamp < 1"
+            " ORDER BY node_id, timestamp",
+            "DELETE FROM node_metric WHERE timestamp < 1",
+            "SELECT * FROM node_metric WHERE timestamp >= 1",
+        ]
+        for query in plans:
+            details = " ".join(
+                row[-1]
+                for row in db_session.execute(text(f"EXPLAIN QUERY PLAN {query}"))
+            )
+            assert "USING INDEX" in details or "USING COVERING INDEX" in details, query
+
+    def test_disabled_does_nothing(self, db_session):
+        _add_samples(db_session, 1, NOW - RAW_HISTORY_SECONDS - ONE_HOUR, 5, 60)
+
+        maintain_history(lambda: db_session, 0, now=NOW)
+
+        assert _count(db_session, RAW) == 5
+
+
+class TestNodeRates:
+    """Test rate queries over the history"""
+
+    def test_puts_per_hour(self, db_session):
+        # 61 samples one minute apart, one put per minute
+        _add_samples(db_session, 1, NOW - ONE_HOUR, 61, 60)
+
+        rates = node_rates(lambda: db_session, window=ONE_HOUR, now=NOW)
+
+        assert rates[1]["samples"] == 61
+        assert rates[1]["puts"] == 60
+        assert rates[1]["puts_per_hour"] == 60
+        assert rates[1]["records_per_hour"] == 60
+        assert rates[1]["reward_delta"] == "60"
+
+    def test_reward_delta_keeps_precision(self, db_session):
+        for offset, rewards in ((600, "1.000000000000000001"), (0, "1.000000000000000003")):
+            db_session.add(NodeMetric(node_id=1, timestamp=NOW - offset, rewards=rewards))
+        db_session.commit()
+
+        rates = node_rates(lambda: db_session, now=NOW)
+
+        assert rates[1]["reward_delta"] == "2E-18"
+
+    def test_counter_reset(self, db_session):
+        # Node restarted between the 3rd and 4th sample
+        _add_samples(db_session, 1, NOW - 300, 5, 60, puts=[10, 12, 15, 2, 4])
+
+        rates = node_rates(lambda: db_session, window=ONE_HOUR, now=NOW)
+
+        assert rates[1]["puts"] == 5 + 2 + 2
+
+    def test_node_filter(self, db_session):
+        _add_samples(db_session, 1, NOW - 300, 3, 60)
+        _add_samples(db_session, 2, NOW - 300, 3, 60)
+
+        rates = node_rates(lambda: db_session, node_ids=[2], now=NOW)
+
+        assert list(rates) == [2]
+
+
+class TestHistoryRecording:
+    """Test surveys write history"""
+
+    @patch("wnm.utils.read_node_metrics")
+    @patch("wnm.utils.read_node_metadata")
+    def test_update_nodes_appends_samples(
+        self, mock_metadata, mock_metrics, db_session, multiple_nodes
+    ):
+        mock_metadata.return_value = {"status": RUNNING, "peer_id": "p", "version": "0.4.6"}
+        mock_metrics.return_value = {
+            "status": RUNNING,
+            "uptime": 1,
+            "records": 1,
+            "shunned": 0,
+            "connected_peers": 4,
+            "puts": 3,
+        }
+
+        update_nodes(lambda: db_session, history_retention=30)
+        update_nodes(lambda: db_session, history_retention=0)
+
+        assert _count(db_session, RAW) == len(multiple_nodes)
+
+    def test_node_rates_report(self, db_session, multiple_nodes):
+        _add_samples(db_session, 1, int(time.time()) - 600, 11, 60)
+        reporter = NodeReporter(lambda: db_session)
+
+        report = json.loads(reporter.node_rates_report("antnode0001.service", "json"))
+
+        assert report["service_name"] == "antnode0001.service"
+        assert report["samples"] == 11
+        assert report["puts"] == 10
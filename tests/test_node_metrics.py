@@ -0,0 +1,228 @@
+"""Tests for node /metrics parsing.
+
+Uses the metrics.out and metadata.out fixtures at the repository root
+(real antnode pages).
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from wnm.common import RUNNING, STOPPED
+from wnm.utils import (
+    ScrapeClient,
+    parse_node_metrics,
+    read_node_metadata,
+    read_node_metrics,
+)
+
+METRICS_FIXTURE = Path(__file__).parent.parent / "metrics.out"
+METADATA_FIXTURE = Path(__file__).parent.parent / "metadata.out"
+
+
+class TestParseNodeMetrics:
+    """Test the single-pass Prometheus parser"""
+
+    def test_fixture_values(self):
+        """Test all wanted series are read from the fixture"""
+        metrics = parse_node_metrics(METRICS_FIXTURE.read_text())
+
+        assert metrics == {
+            "status": RUNNING,
+            "uptime": 1260,
+            "records": 1,
+            "shunned": 0,
+            "connected_peers": 4,
+            "puts": 1,
+            "gets": 0,
+            "rewards": "0",
+            "mem": 9781,
+            "cpu": 3,
+            "open_connections": 4,
+            "total_peers": 362,
+            "bad_peers": 0,
+            "rel_records": 0,
+            "max_records": 0,
+            "payment_count": 0,
+            "live_time": 0,
+            "network_size": 2064384,
+        }
+
+    def test_missing_series_default(self):
+        """Test an empty page yields zero defaults"""
+        metrics = parse_node_metrics("")
+
+        assert metrics["status"] == RUNNING
+        assert metrics["uptime"] == 0
+        assert metrics["rewards"] == "0"
+
+    def test_first_labelled_put_wins(self):
+        """Test labelled PUT counters use the first series"""
+        text = (
+            "# TYPE ant_node_put_record_ok counter\n"
+            'ant_node_put_record_ok_total{record_type="Chunk"} 7\n'
+            'ant_node_put_record_ok_total{record_type="Scratchpad"} 9\n'
+        )
+        assert parse_node_metrics(text)["puts"] == 7
+
+    def test_labels_ignored_for_plain_series(self):
+        """Test labelled samples of unlabelled series are skipped"""
+        text = 'ant_node_uptime{foo="bar"} 5\nant_node_uptime 42\n'
+        assert parse_node_metrics(text)["uptime"] == 42
+
+    def test_similar_names_not_matched(self):
+        """Test series sharing a prefix do not clobber wanted values"""
+        text = (
+            "ant_networking_records_stored_total 99\n"
+            "ant_networking_records_stored 3\n"
+        )
+        assert parse_node_metrics(text)["records"] == 3
+
+    def test_float_values(self):
+        """Test float and scaled values"""
+        text = (
+            "ant_node_current_reward_wallet_balance 12.500\n"
+            "ant_networking_process_memory_used_mb 1.5\n"
+            "ant_networking_process_cpu_usage_percentage 2.25\n"
+            "ant_node_uptime 10.0\n"
+        )
+        metrics = parse_node_metrics(text)
+
+        assert metrics["rewards"] == "12.500"
+        assert metrics["mem"] == 150
+        assert metrics["cpu"] == 225
+        assert metrics["uptime"] == 10
+
+
+class TestReadNodeMetrics:
+    """Test read_node_metrics error handling"""
+
+    @patch("wnm.utils.ScrapeClient.get")
+    def test_reads_fixture(self, mock_get):
+        mock_get.return_value = METRICS_FIXTURE.read_text()
+
+        metrics = read_node_metrics("127.0.0.1", 13001)
+
+        mock_get.assert_called_once_with("127.0.0.1", 13001, "/metrics")
+        assert metrics["status"] == RUNNING
+        assert metrics["total_peers"] == 362
+
+    @patch("wnm.utils.ScrapeClient.get", side_effect=requests.exceptions.ConnectionError)
+    def test_connection_refused(self, mock_get):
+        metrics = read_node_metrics("127.0.0.1", 13001)
+
+        assert metrics == {
+            "status": STOPPED,
+            "uptime": 0,
+            "records": 0,
+            "shunned": 0,
+            "connected_peers": 0,
+        }
+
+
+class _NodeHandler(BaseHTTPRequestHandler):
+    """Minimal stand-in for the antnode metrics server"""
+
+    protocol_version = "HTTP/1.1"
+    # Send headers and body without waiting on delayed ACKs, like antnode
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            body = METRICS_FIXTURE.read_bytes()
+        elif self.path == "/metadata":
+            body = METADATA_FIXTURE.read_bytes()
+        elif self.path == "/slow":
+            # A node too busy to answer within the scrape timeout
+            time.sleep(1)
+            body = b""
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def node_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _NodeHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def scrape_client():
+    client = ScrapeClient(timeout=2)
+    with patch("wnm.utils.get_scrape_client", return_value=client):
+        yield client
+    client.close()
+
+
+class TestScrapeClient:
+    """Test the keep-alive scrape client against a local stand-in server"""
+
+    def test_one_connection_for_both_endpoints(self, node_server, scrape_client):
+        port = node_server.server_address[1]
+
+        metadata = read_node_metadata("127.0.0.1", port)
+        metrics = read_node_metrics("127.0.0.1", port)
+
+        assert metadata["status"] == RUNNING
+        assert metadata["version"] == "0.4.7"
+        assert metrics["uptime"] == 1260
+        assert scrape_client.connections_opened == 1
+
+    def test_reconnects_after_server_drops_connection(self, node_server, scrape_client):
+        port = node_server.server_address[1]
+        scrape_client.get("127.0.0.1", port, "/metadata")
+
+        # Simulate a node restart closing the parked connection
+        conn = scrape_client._idle[("127.0.0.1", port)]
+        conn.sock.shutdown(2)
+
+        body = scrape_client.get("127.0.0.1", port, "/metadata")
+
+        assert "antnode_version" in body
+        assert scrape_client.connections_opened == 2
+
+    def test_connection_refused(self, scrape_client):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _NodeHandler)
+        port = server.server_address[1]
+        server.server_close()
+
+        with pytest.raises(requests.exceptions.ConnectionError):
+            scrape_client.get("127.0.0.1", port, "/metrics")
+        assert read_node_metadata("127.0.0.1", port) == {"status": STOPPED, "peer_id": ""}
+
+    def test_timeout_on_reused_connection(self, node_server):
+        port = node_server.server_address[1]
+        client = ScrapeClient(timeout=0.2)
+        client.get("127.0.0.1", port, "/metadata")
+
+        with pytest.raises(requests.exceptions.Timeout):
+            client.get("127.0.0.1", port, "/slow")
+        assert client.connections_opened == 1
+        assert client._idle == {}
+        client.close()
+
+    def test_close_drops_idle_connections(self, node_server, scrape_client):
+        port = node_server.server_address[1]
+        scrape_client.get("127.0.0.1", port, "/metrics")
+
+        scrape_client.close()
+
+        assert scrape_client._idle == {}
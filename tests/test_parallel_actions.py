@@ -0,0 +1,399 @@
+"""Tests for parallel and batched action execution in ActionExecutor.
+
+Parallel mode runs actions on worker threads, so these tests use a real
+thread-local scoped_session over the test database instead of the shared
+db_session.
+"""
+
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import select
+
+from wnm.actions import Action, ActionType
+from wnm.common import REMOVING, RESTARTING, RUNNING, STOPPED, UPGRADING
+from wnm.executor import ActionExecutor
+from wnm.models import Machine, Node
+from wnm.process_managers import DockerManager
+from wnm.process_managers.base import NodeProcess
+
+
+class SlowManager:
+    """Process manager stand-in whose operations take a fixed time"""
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.calls = []
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def _record(self, op, node):
+        with self._lock:
+            self.calls.append((op, node.id))
+            self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+
+    def start_node(self, node):
+        self._record("start", node)
+        return True
+
+    def stop_node(self, node):
+        self._record("stop", node)
+        return True
+
+    def remove_node(self, node):
+        self._record("remove", node)
+        return True
+
+    def create_node(self, node, binary_path):
+        self._record("create", node)
+        return NodeProcess(node_id=node.id, status=RUNNING)
+
+
+class BatchAntctlManager:
+    """antctl manager stand-in recording its batched calls"""
+
+    def __init__(self):
+        self.calls = []
+
+    def create_node(self, node, binary_path):
+        self.calls.append(("create", [node.id]))
+        return NodeProcess(node_id=node.id, external_node_id=f"antnode{node.id}")
+
+    def create_nodes(self, nodes, binary_path):
+        self.calls.append(("create", [node.id for node in nodes]))
+        return [
+            NodeProcess(node_id=node.id, external_node_id=f"antnode{node.id}")
+            for node in nodes
+        ]
+
+    def upgrade_nodes(self, nodes, new_version=None):
+        self.calls.append(("upgrade", [node.id for node in nodes]))
+        return True
+
+
+@pytest.fixture
+def slow_manager():
+    manager = SlowManager()
+    with patch("wnm.executor.get_process_manager", return_value=manager):
+        yield manager
+
+
+def _config(sample_machine_config, parallel=1, operations=4):
+    config = dict(sample_machine_config)
+    config["parallel_actions"] = parallel
+    config["max_concurrent_operations"] = operations
+    return config
+
+
+def _set_status(db_session, nodes, status, version="0.4.7"):
+    for node in nodes:
+        node.status = status
+        node.version = version
+    db_session.commit()
+
+
+def _statuses(S):
+    with S() as session:
+        return dict(session.execute(select(Node.id, Node.status)).all())
+
+
+class TestParallelActions:
+    """Test actions run concurrently when parallel_actions is enabled"""
+
+    def test_starts_run_concurrently(
+        self, db_session, multiple_nodes, thread_sessions, slow_manager, sample_machine_config
+    ):
+        _set_status(db_session, multiple_nodes, STOPPED)
+        actions = [Action(type=ActionType.START_NODE, priority=50, reason="test")] * 4
+        executor = ActionExecutor(thread_sessions)
+
+        start = time.monotonic()
+        result = executor.execute(
+            actions, _config(sample_machine_config), {"antnode_version": "0.4.7"}
+        )
+        elapsed = time.monotonic() - start
+
+        # The slowest action, not the sum of all four
+        assert elapsed < 0.6
+        assert len(slow_manager.threads) > 1
+        # Each action claimed a different node
+        started = sorted(node_id for op, node_id in slow_manager.calls)
+        assert started == [1, 2, 3, 4]
+        assert result["status"] == "started-node"
+        assert [r["status"] for r in result["results"]] == ["started-node"] * 4
+        statuses = _statuses(thread_sessions)
+        assert [statuses[i] for i in range(1, 5)] == [RESTARTING] * 4
+        assert statuses[5] == STOPPED
+
+    def test_more_actions_than_nodes(
+        self, db_session, multiple_nodes, thread_sessions, slow_manager, sample_machine_config
+    ):
+        _set_status(db_session, multiple_nodes[:2], STOPPED)
+        _set_status(db_session, multiple_nodes[2:], RUNNING)
+        actions = [Action(type=ActionType.START_NODE, priority=50, reason="test")] * 3
+
+        result = ActionExecutor(thread_sessions).execute(
+            actions, _config(sample_machine_config), {"antnode_version": "0.4.7"}
+        )
+
+        statuses = sorted(r["status"] for r in result["results"])
+        assert statuses == ["no-stopped-nodes", "started-node", "started-node"]
+
+    def test_removals_claim_distinct_nodes(
+        self, db_session, multiple_nodes, thread_sessions, slow_manager, sample_machine_config
+    ):
+        _set_status(db_session, multiple_nodes, RUNNING)
+        actions = [Action(type=ActionType.REMOVE_NODE, priority=80, reason="cpu")] * 3
+
+        ActionExecutor(thread_sessions).execute(
+            actions, _config(sample_machine_config), {"antnode_version": "0.4.7"}
+        )
+
+        # Youngest first
+        stopped = sorted(node_id for op, node_id in slow_manager.calls)
+        assert stopped == [3, 4, 5]
+        statuses = _statuses(thread_sessions)
+        assert [statuses[i] for i in (3, 4, 5)] == [REMOVING] * 3
+
+    @patch("wnm.executor.select_wallet_for_node", return_value="0x1234")
+    def test_adds_allocate_distinct_ids(
+        self, mock_wallet, thread_sessions, slow_manager, sample_machine_config
+    ):
+        actions = [Action(type=ActionType.ADD_NODE, priority=40, reason="test")] * 3
+
+        start = time.monotonic()
+        result = ActionExecutor(thread_sessions).execute(
+            actions, _config(sample_machine_config), {"antnode_version": "0.4.7"}
+        )
+
+        assert time.monotonic() - start < 0.5
+        assert [r["status"] for r in result["results"]] == ["added-node"] * 3
+        assert sorted(_statuses(thread_sessions)) == [1, 2, 3]
+
+    def test_failed_action_reported(
+        self, db_session, multiple_nodes, thread_sessions, slow_manager, sample_machine_config
+    ):
+        _set_status(db_session, multiple_nodes, STOPPED)
+        slow_manager.start_node = MagicMock(side_effect=[True, RuntimeError("boom")])
+        actions = [Action(type=ActionType.START_NODE, priority=50, reason="test")] * 2
+
+        result = ActionExecutor(thread_sessions).execute(
+            actions, _config(sample_machine_config), {"antnode_version": "0.4.7"}
+        )
+
+        errors = [r for r in result["results"] if r.get("success") is False]
+        assert len(errors) == 1
+        assert errors[0]["error"] == "boom"
+
+
+class TestSequentialDefault:
+    """Test actions still run one at a time unless parallel_actions is set"""
+
+    def test_default_is_sequential(
+        self, db_session, multiple_nodes, slow_manager, sample_machine_config
+    ):
+        _set_status(db_session, multiple_nodes, STOPPED)
+        slow_manager.delay = 0
+        actions = [Action(type=ActionType.START_NODE, priority=50, reason="test")] * 2
+
+        result = ActionExecutor(lambda: db_session).execute(
+            actions, _config(sample_machine_config, parallel=0), {"antnode_version": "0.4.7"}
+        )
+
+        assert slow_manager.threads == {threading.get_ident()}
+        assert [node_id for op, node_id in slow_manager.calls] == [1, 2]
+        assert len(result["results"]) == 2
+
+    def test_survey_actions_not_parallelized(self, sample_machine_config):
+        executor = ActionExecutor(MagicMock())
+        actions = [
+            Action(type=ActionType.START_NODE, priority=50, reason="test"),
+            Action(type=ActionType.SURVEY_NODES, priority=0, reason="idle"),
+        ]
+
+        with patch("wnm.executor.ThreadPoolExecutor") as pool, patch.object(
+            executor, "_execute_action", return_value={"status": "ok"}
+        ):
+            executor.execute(actions, _config(sample_machine_config), {})
+
+        pool.assert_not_called()
+
+
+class TestBatchedActions:
+    """Test same-kind actions go to managers with native batch calls at once"""
+
+    @patch("subprocess.run")
+    def test_stops_batched(
+        self, mock_run, db_session, multiple_nodes, thread_sessions, sample_machine_config
+    ):
+        mock_run.return_value = MagicMock(returncode=0)
+        actions = [
+            Action(type=ActionType.STOP_NODE, priority=70, reason="mem", node_id=node_id)
+            for node_id in (5, 4)
+        ] + [Action(type=ActionType.STOP_NODE, priority=70, reason="mem", node_id=9)]
+
+        with patch("wnm.executor.get_process_manager", return_value=DockerManager(transport="cli")):
+            result = ActionExecutor(thread_sessions).execute(
+                actions, _config(sample_machine_config), {"antnode_version": "0.4.7"}
+            )
+
+        mock_run.assert_called_once()
+        assert mock_run.call_args.args[0] == [
+            "docker", "stop", "-t", "30", "antnode0005", "antnode0004"
+        ]
+        assert [r["status"] for r in result["results"]] == [
+            "stopped-node",
+            "stopped-node",
+            "no-nodes-to-stop",
+        ]
+        statuses = _statuses(thread_sessions)
+        assert [statuses[i] for i in (4, 5)] == [STOPPED] * 2
+
+    @patch("subprocess.run")
+    def test_batching_follows_node_managers(
+        self, mock_run, db_session, multiple_nodes, thread_sessions, sample_machine_config
+    ):
+        """Test nodes are batched by their own manager, not the machine default"""
+        mock_run.return_value = MagicMock(returncode=0)
+        for node in multiple_nodes[3:]:
+            node.manager_type = "docker"
+        db_session.commit()
+        docker, slow = DockerManager(transport="cli"), SlowManager(delay=0)
+        actions = [
+            Action(type=ActionType.STOP_NODE, priority=70, reason="mem", node_id=node_id)
+            for node_id in (5, 4, 3, 2)
+        ]
+
+        with patch(
+            "wnm.executor.get_process_manager",
+            side_effect=lambda manager_type, **kwargs: (
+                docker if manager_type == "docker" else slow
+            ),
+        ):
+            result = ActionExecutor(thread_sessions).execute(
+                actions, _config(sample_machine_config), {"antnode_version": "0.4.7"}
+            )
+
+        # One docker stop for the docker nodes, the others one by one
+        mock_run.assert_called_once()
+        assert mock_run.call_args.args[0] == [
+            "docker", "stop", "-t", "30", "antnode0005", "antnode0004"
+        ]
+        assert sorted(slow.calls) == [("stop", 2), ("stop", 3)]
+        assert [r["status"] for r in result["results"]] == ["stopped-node"] * 4
+        statuses = _statuses(thread_sessions)
+        assert [statuses[i] for i in (2, 3, 4, 5)] == [STOPPED] * 4
+
+    @patch("wnm.utils.read_node_metadata", return_value={})
+    def test_partially_failed_start_batch(
+        self, mock_metadata, db_session, multiple_nodes, thread_sessions, sample_machine_config
+    ):
+        _set_status(db_session, multiple_nodes[:3], STOPPED)
+        manager = DockerManager(transport="cli")
+        # docker start starts the others when one container fails
+        manager.start_nodes = MagicMock(return_value=False)
+        manager.get_statuses = MagicMock(
+            side_effect=lambda nodes: {
+                node.id: NodeProcess(node.id, status=STOPPED if node.id == 2 else RUNNING)
+                for node in nodes
+            }
+        )
+        actions = [
+            Action(type=ActionType.START_NODE, priority=50, reason="test", node_id=node_id)
+            for node_id in (1, 2, 3)
+        ]
+
+        with patch("wnm.executor.get_process_manager", return_value=manager):
+            result = ActionExecutor(thread_sessions).execute(
+                actions, _config(sample_machine_config), {"antnode_version": "0.4.7"}
+            )
+
+        manager.start_nodes.assert_called_once()
+        assert [r["status"] for r in result["results"]] == [
+            "started-node",
+            "failed-start-node",
+            "started-node",
+        ]
+        statuses = _statuses(thread_sessions)
+        assert [statuses[i] for i in (1, 2, 3)] == [RESTARTING, STOPPED, RESTARTING]
+
+    @patch("wnm.executor.get_antnode_version", return_value="0.4.6")
+    @patch("wnm.executor.ActionExecutor._upgrade_node_binary", return_value=True)
+    @patch("wnm.utils.read_node_metadata", return_value={})
+    @patch("subprocess.run")
+    def test_outdated_start_upgraded(
+        self,
+        mock_run,
+        mock_metadata,
+        mock_upgrade,
+        mock_version,
+        db_session,
+        multiple_nodes,
+        thread_sessions,
+        sample_machine_config,
+    ):
+        _set_status(db_session, multiple_nodes[:2], STOPPED)
+        _set_status(db_session, multiple_nodes[2:3], STOPPED, version="0.4.6")
+        mock_run.return_value = MagicMock(returncode=0)
+        actions = [Action(type=ActionType.START_NODE, priority=50, reason="test")] * 3
+
+        with patch("wnm.executor.get_process_manager", return_value=DockerManager(transport="cli")):
+            result = ActionExecutor(thread_sessions).execute(
+                actions, _config(sample_machine_config), {"antnode_version": "0.4.7"}
+            )
+
+        assert mock_run.call_args.args[0] == ["docker", "start", "antnode0001", "antnode0002"]
+        assert [r["status"] for r in result["results"]] == [
+            "started-node",
+            "started-node",
+            "upgrading-stopped-node",
+        ]
+        mock_upgrade.assert_called_once()
+
+    def test_antctl_adds_batched(
+        self, db_session, machine, thread_sessions, sample_machine_config
+    ):
+        machine.highest_node_id_used = 7
+        db_session.commit()
+        config = _config(sample_machine_config)
+        config["process_manager"] = "antctl+user"
+        manager = BatchAntctlManager()
+        actions = [Action(type=ActionType.ADD_NODE, priority=40, reason="test")] * 3
+
+        with patch("wnm.executor.get_process_manager", return_value=manager):
+            result = ActionExecutor(thread_sessions).execute(
+                actions, config, {"antnode_version": "0.4.7"}
+            )
+
+        assert manager.calls == [("create", [8, 9, 10])]
+        assert [r["status"] for r in result["results"]] == ["added-node"] * 3
+        with thread_sessions() as session:
+            nodes = session.execute(select(Node).order_by(Node.id)).scalars().all()
+            assert [(n.id, n.port, n.service, n.status) for n in nodes] == [
+                (8, 55008, "antnode8", RESTARTING),
+                (9, 55009, "antnode9", RESTARTING),
+                (10, 55010, "antnode10", RESTARTING),
+            ]
+            assert session.get(Machine, 1).highest_node_id_used == 10
+
+    def test_antctl_upgrades_batched(
+        self, db_session, multiple_nodes, thread_sessions, sample_machine_config
+    ):
+        _set_status(db_session, multiple_nodes, RUNNING, version="0.4.6")
+        config = _config(sample_machine_config)
+        config["process_manager"] = "antctl+user"
+        manager = BatchAntctlManager()
+        actions = [Action(type=ActionType.UPGRADE_NODE, priority=60, reason="test")] * 2
+
+        with patch("wnm.executor.get_process_manager", return_value=manager):
+            result = ActionExecutor(thread_sessions).execute(
+                actions, config, {"antnode_version": "0.4.7"}
+            )
+
+        assert manager.calls == [("upgrade", [1, 2])]
+        assert [r["status"] for r in result["results"]] == ["upgrading-node"] * 2
+        statuses = _statuses(thread_sessions)
+        assert [statuses[i] for i in (1, 2, 3)] == [UPGRADING, UPGRADING, RUNNING]
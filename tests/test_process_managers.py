@@ -1,6 +1,7 @@
 """Tests for process managers (systemd, docker, setsid, etc.)"""
 
 import json
+import subprocess
 import tempfile
 from pathlib import Path
 from unittest.mock import MagicMock, Mock, patch
@@ -165,6 +166,119 @@ class TestSystemdManager:
         assert result is True
 
 
+class TestSystemdTemplate:
+    """Tests for SystemdManager antnode@.service template instances"""
+
+    def _manager(self, tmp_path):
+        manager = SystemdManager(mode="user", firewall_type="null")
+        manager.service_dir = str(tmp_path)
+        manager.instance_dir = str(tmp_path / "antnode.instances")
+        return manager
+
+    def _node(self, node_id):
+        node = Mock(spec=Node)
+        node.id = node_id
+        node.node_name = f"{node_id:04}"
+        node.service = f"antnode{node_id:04}.service"
+        node.root_dir = f"/tmp/test_node/antnode{node_id:04}"
+        node.port = 55000 + node_id
+        node.metrics_port = 13000 + node_id
+        node.host = "127.0.0.1"
+        node.environment = "ANTNODE_LOG=info"
+        return node
+
+    def _args(self, node):
+        return [
+            f"{node.root_dir}/antnode",
+            "--root-dir", node.root_dir,
+            "--port", str(node.port),
+            "--metrics-server-port", str(node.metrics_port),
+            "--rewards-address", "0x1234567890abcdef", "evm-arbitrum-one",
+        ]
+
+    @patch("wnm.process_managers.systemd_manager.read_node_metadata", return_value={})
+    @patch("subprocess.run")
+    def test_instances_share_one_reload(self, mock_run, mock_metadata, tmp_path):
+        """Test creating instances writes the template and reloads systemd once"""
+        mock_run.return_value = Mock(returncode=0, stdout="")
+        manager = self._manager(tmp_path)
+        nodes = [self._node(1), self._node(2)]
+
+        for node in nodes:
+            process = manager._create_instance(node, self._args(node), "")
+            assert process.external_node_id == f"antnode@{node.node_name}.service"
+
+        commands = [call.args[0] for call in mock_run.call_args_list]
+        assert commands.count(["systemctl", "--user", "daemon-reload"]) == 1
+        assert ["systemctl", "--user", "start", "antnode@0002.service"] in commands
+        assert "EnvironmentFile=" in (tmp_path / "antnode@.service").read_text()
+        settings = (tmp_path / "antnode.instances" / "antnode0002.env").read_text()
+        assert "ANTNODE_BINARY=/tmp/test_node/antnode0002/antnode" in settings
+        assert "ANTNODE_LOG=info" in settings
+
+        # A new manager (next run) finds the template already installed
+        mock_run.reset_mock()
+        node = self._node(3)
+        self._manager(tmp_path)._create_instance(node, self._args(node), "")
+        commands = [call.args[0] for call in mock_run.call_args_list]
+        assert ["systemctl", "--user", "daemon-reload"] not in commands
+
+    @patch("wnm.process_managers.systemd_manager.read_node_metadata", return_value={})
+    @patch("subprocess.run")
+    def test_read_instance(self, mock_run, mock_metadata, tmp_path):
+        """Test surveying an instance reads its environment file"""
+        mock_run.return_value = Mock(returncode=0, stdout="")
+        manager = self._manager(tmp_path)
+        node = self._node(7)
+        manager._create_instance(node, self._args(node), "User=ant")
+
+        details = manager._read_service_file("antnode@0007.service", Mock(host="127.0.0.1"))
+
+        assert details["id"] == 7
+        assert details["binary"] == "/tmp/test_node/antnode0007/antnode"
+        assert details["port"] == 55007
+        assert details["metrics_port"] == 13007
+        assert details["user"] == "ant"
+        assert details["environment"] == "ANTNODE_LOG=info"
+
+    @patch("wnm.process_managers.systemd_manager.read_node_metadata", return_value={})
+    @patch("subprocess.run")
+    def test_batched_start_stop(self, mock_run, mock_metadata, tmp_path):
+        """Test several nodes are started and stopped with one systemctl call"""
+        mock_run.return_value = Mock(returncode=0, stdout="")
+        manager = self._manager(tmp_path)
+        nodes = [self._node(1), self._node(2)]
+
+        assert manager.start_nodes(nodes)
+        assert manager.stop_nodes(nodes)
+
+        commands = [call.args[0] for call in mock_run.call_args_list]
+        assert commands == [
+            ["systemctl", "--user", "start", "antnode0001.service", "antnode0002.service"],
+            ["systemctl", "--user", "stop", "antnode0001.service", "antnode0002.service"],
+        ]
+
+    @patch("wnm.process_managers.systemd_manager.read_node_metadata", return_value={})
+    @patch("subprocess.run")
+    def test_remove_instances_without_reload(self, mock_run, mock_metadata, tmp_path):
+        """Test removing instances deletes their settings and skips daemon-reload"""
+        mock_run.return_value = Mock(returncode=0, stdout="")
+        manager = self._manager(tmp_path)
+        nodes = [self._node(1), self._node(2)]
+        for node in nodes:
+            manager._create_instance(node, self._args(node), "")
+        mock_run.reset_mock()
+
+        assert manager.remove_nodes(nodes)
+
+        commands = [call.args[0] for call in mock_run.call_args_list]
+        assert commands == [
+            ["systemctl", "--user", "stop", "antnode@0001.service", "antnode@0002.service"]
+        ]
+        assert not list((tmp_path / "antnode.instances").iterdir())
+        assert (tmp_path / "antnode@.service").exists()
+
+
 class TestDockerManager:
     """Tests for DockerManager"""
 
@@ -172,7 +286,7 @@ class TestDockerManager:
     def test_start_container(self, mock_run, mock_node):
         """Test starting a Docker container"""
         mock_run.return_value = Mock(returncode=0, stdout="", stderr="")
-        manager = DockerManager()
+        manager = DockerManager(transport="cli")
         result = manager.start_node(mock_node)
         assert result is True
         # Verify docker start was called
@@ -182,7 +296,7 @@ class TestDockerManager:
     def test_stop_container(self, mock_run, mock_node):
         """Test stopping a Docker container"""
         mock_run.return_value = Mock(returncode=0, stdout="", stderr="")
-        manager = DockerManager()
+        manager = DockerManager(transport="cli")
         result = manager.stop_node(mock_node)
         assert result is True
         # Verify docker stop was called
@@ -196,7 +310,7 @@ class TestDockerManager:
         mock_run.return_value = Mock(
             returncode=0, stdout="running|1234|abc123def456\n", stderr=""
         )
-        manager = DockerManager()
+        manager = DockerManager(transport="cli")
         status = manager.get_status(mock_node)
         assert status.status == RUNNING
         assert status.pid == 1234
@@ -211,7 +325,7 @@ class TestDockerManager:
         import subprocess
 
         mock_run.side_effect = subprocess.CalledProcessError(1, "docker")
-        manager = DockerManager()
+        manager = DockerManager(transport="cli")
         status = manager.get_status(mock_node)
         assert status.status == STOPPED
 
@@ -219,14 +333,14 @@ class TestDockerManager:
     def test_remove_container(self, mock_run, mock_node):
         """Test removing a Docker container"""
         mock_run.return_value = Mock(returncode=0, stdout="", stderr="")
-        manager = DockerManager()
+        manager = DockerManager(transport="cli")
         with patch("shutil.rmtree"):  # Mock directory removal
             result = manager.remove_node(mock_node)
         assert result is True
 
     def test_firewall_operations_noop(self):
         """Test that firewall operations are no-op for Docker"""
-        manager = DockerManager()
+        manager = DockerManager(transport="cli")
         assert manager.enable_firewall_port(55001) is True
         assert manager.disable_firewall_port(55001) is True
 
@@ -343,6 +457,51 @@ class TestSetsidManager:
             status = manager.get_status(mock_node)
             assert status.status == STOPPED
 
+    def _script_node(self, mock_node, tmpdir, body):
+        """Point mock_node at an antnode stand-in script"""
+        mock_node.root_dir = tmpdir
+        mock_node.host = "127.0.0.1"
+        binary = Path(tmpdir) / "antnode"
+        binary.write_text(f"#!/bin/sh\n{body}\n")
+        binary.chmod(0o755)
+        return mock_node
+
+    @patch("wnm.process_managers.setsid_manager.psutil.process_iter")
+    @patch("wnm.utils.read_node_metadata")
+    def test_start_tracks_pid_directly(self, mock_metadata, mock_process_iter, mock_node):
+        """Test the node binary is launched directly and its own PID recorded"""
+        # Not answering before the start, then ready on the first poll
+        mock_metadata.side_effect = [{"status": STOPPED}, {"status": RUNNING}]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            node = self._script_node(mock_node, tmpdir, "exec sleep 30")
+            manager = SetsidManager(firewall_type="null")
+
+            assert manager.start_node(node) is True
+
+            pid = manager._read_pid_file(node)
+            process = manager._children[pid]
+            assert process.args[0] == f"{tmpdir}/antnode"
+            mock_process_iter.assert_not_called()
+
+            # PID file survives for the next run; stop reaps the child
+            assert (Path(tmpdir) / "node.pid").read_text() == str(pid)
+            assert manager.stop_node(node) is True
+            assert process.poll() is not None
+            assert pid not in manager._children
+            assert not (Path(tmpdir) / "node.pid").exists()
+
+    @patch("wnm.utils.read_node_metadata", return_value={"status": STOPPED})
+    def test_start_fails_when_process_exits(self, mock_metadata, mock_node):
+        """Test a node that exits during startup fails and leaves no PID file"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            node = self._script_node(mock_node, tmpdir, "exit 3")
+            manager = SetsidManager(firewall_type="null")
+
+            assert manager.start_node(node) is False
+
+            assert not (Path(tmpdir) / "node.pid").exists()
+            assert manager._read_pid_file(node) is None
+
     def test_firewall_operations_best_effort(self):
         """Test that firewall operations are best-effort for setsid"""
         manager = SetsidManager()
@@ -354,6 +513,7 @@ class TestSetsidManager:
 class TestLaunchdManager:
     """Tests for LaunchdManager (macOS launchd)"""
 
+    @patch("os.replace")
     @patch("subprocess.run")
     @patch("os.path.exists")
     @patch("os.makedirs")
@@ -368,6 +528,7 @@ class TestLaunchdManager:
         mock_makedirs,
         mock_exists,
         mock_run,
+        mock_replace,
         mock_node,
     ):
         """Test creating a launchd node"""
@@ -597,18 +758,86 @@ class TestAntctlManager:
     @patch("subprocess.run")
     @patch("os.path.isdir")
     def test_get_status(self, mock_isdir, mock_run, mock_node):
-        """Test getting antctl node status"""
+        """Test getting antctl node status from antctl status"""
         from wnm.process_managers.antctl_manager import AntctlManager
-        from wnm.utils import read_node_metadata
 
         mock_isdir.return_value = True
+        mock_run.return_value = Mock(
+            returncode=0,
+            stdout=json.dumps(
+                {"nodes": [{"service_name": mock_node.service, "status": "Stopped"}]}
+            ),
+            stderr="",
+        )
         manager = AntctlManager(mode="user")
 
         with patch("wnm.process_managers.antctl_manager.read_node_metadata") as mock_read:
             # Node is stopped
-            mock_read.return_value = {"status": STOPPED}
             status = manager.get_status(mock_node)
             assert status.status == STOPPED
+            mock_read.assert_not_called()
+
+    @patch("subprocess.run")
+    @patch("os.path.isdir")
+    def test_get_status_without_antctl_status(self, mock_isdir, mock_run, mock_node):
+        """Test status falls back to the metadata port when antctl status fails"""
+        from wnm.process_managers.antctl_manager import AntctlManager
+
+        mock_isdir.return_value = True
+        mock_run.side_effect = FileNotFoundError("antctl")
+        manager = AntctlManager(mode="user")
+
+        with patch("wnm.process_managers.antctl_manager.read_node_metadata") as mock_read:
+            mock_read.return_value = {"status": RUNNING}
+            assert manager.get_status(mock_node).status == RUNNING
+            assert manager.get_status(mock_node).status == RUNNING
+
+        # The failed status call is not retried within the cycle
+        assert mock_run.call_count == 1
+
+    @patch("subprocess.run")
+    def test_status_snapshot_shared_until_mutation(self, mock_run, mock_node):
+        """Test antctl status is fetched once per cycle and refetched after a change"""
+        from wnm.process_managers.antctl_manager import AntctlManager
+
+        status = {"nodes": [{"service_name": mock_node.service, "status": "Running", "pid": 42}]}
+        mock_run.return_value = Mock(returncode=0, stdout=json.dumps(status), stderr="")
+        manager = AntctlManager(mode="user")
+
+        assert manager.get_status(mock_node).pid == 42
+        assert manager.get_statuses([mock_node, mock_node])[1].status == RUNNING
+        # Already running: the start guard skips it without another status call
+        assert manager.start_node(mock_node) is True
+        assert manager.forks == 1
+
+        assert manager.stop_node(mock_node) is True
+        manager.get_status(mock_node)
+        assert manager.forks == 3
+        assert [call.args[0][1] for call in mock_run.call_args_list] == [
+            "status",
+            "stop",
+            "status",
+        ]
+
+        manager.begin_cycle()
+        assert manager.forks == 0
+        manager.get_status(mock_node)
+        assert mock_run.call_args.args[0][1] == "status"
+
+    @patch("subprocess.run")
+    def test_status_with_debug_output(self, mock_run, mock_node):
+        """Test the status JSON is found in --debug output"""
+        from wnm.process_managers.antctl_zen_manager import AntctlZenManager
+
+        document = json.dumps(
+            {"nodes": [{"service_name": mock_node.service, "status": "Running"}]}, indent=2
+        )
+        mock_run.return_value = Mock(
+            returncode=0, stdout=f"DEBUG loading registry\n{document}\nDEBUG done\n", stderr=""
+        )
+        manager = AntctlZenManager(mode="user")
+
+        assert manager.get_status(mock_node).status == RUNNING
 
     @patch("subprocess.run")
     def test_remove_node(self, mock_run, mock_node):
@@ -718,3 +947,215 @@ class TestAntctlManager:
         # Default (user mode)
         manager = AntctlManager()
         assert manager.use_sudo is False
+
+
+class TestBatchLifecycle:
+    """Tests for the batched create/start/stop/remove/upgrade node API"""
+
+    def _nodes(self, tmpdir, count=3):
+        nodes = []
+        for node_id in range(1, count + 1):
+            node = Mock(spec=Node)
+            node.id = node_id
+            node.node_name = f"{node_id:04}"
+            node.service = f"antnode{node_id:04}.service"
+            node.root_dir = f"{tmpdir}/antnode{node_id:04}"
+            node.port = 55000 + node_id
+            node.metrics_port = 13000 + node_id
+            node.host = "127.0.0.1"
+            nodes.append(node)
+        return nodes
+
+    def test_default_loops_over_nodes(self, tmp_path):
+        """Test the base class batch falls back to the per-node method"""
+        from wnm.process_managers.base import has_native_batch
+
+        manager = LaunchdManager()
+        nodes = self._nodes(tmp_path)
+        with patch.object(LaunchdManager, "stop_node", side_effect=[True, False, True]) as stop:
+            assert manager.stop_nodes(nodes) is False
+        assert [call.args[0] for call in stop.call_args_list] == nodes
+        assert not has_native_batch(manager, "stop_nodes")
+        assert has_native_batch(SetsidManager(), "stop_nodes")
+
+    @patch("wnm.process_managers.setsid_manager.psutil.wait_procs")
+    @patch("wnm.process_managers.setsid_manager.psutil.Process")
+    @patch("wnm.process_managers.setsid_manager.psutil.pid_exists", return_value=True)
+    def test_setsid_waits_once(self, mock_pid_exists, mock_process_class, mock_wait, tmp_path):
+        """Test setsid terminates every process and waits on them together"""
+        manager = SetsidManager(firewall_type="null")
+        nodes = self._nodes(tmp_path)
+        processes = {}
+        for node in nodes:
+            Path(node.root_dir).mkdir()
+            manager._write_pid_file(node, 1000 + node.id)
+            processes[1000 + node.id] = Mock(pid=1000 + node.id)
+        mock_process_class.side_effect = lambda pid: processes[pid]
+        stubborn = processes[1002]
+        mock_wait.side_effect = [
+            ([processes[1001], processes[1003]], [stubborn]),
+            ([stubborn], []),
+        ]
+
+        assert manager.stop_nodes(nodes) is True
+
+        for process in processes.values():
+            process.terminate.assert_called_once()
+        stubborn.kill.assert_called_once()
+        assert mock_wait.call_count == 2
+        assert len(mock_wait.call_args_list[0].args[0]) == 3
+        assert not any(Path(node.root_dir, "node.pid").exists() for node in nodes)
+
+    @patch("wnm.process_managers.antctl_manager.read_node_metadata", return_value={})
+    @patch("subprocess.run")
+    def test_antctl_single_invocation(self, mock_run, mock_metadata, tmp_path):
+        """Test antctl gets one --service-name flag per node in one call"""
+        from wnm.process_managers.antctl_manager import AntctlManager
+
+        mock_run.return_value = Mock(returncode=0, stdout='{"nodes": []}', stderr="")
+        manager = AntctlManager(mode="user")
+        nodes = self._nodes(tmp_path, count=2)
+
+        assert manager.start_nodes(nodes) is True
+        assert manager.stop_nodes(nodes) is True
+
+        # One status call for the start guard, then one call per batch
+        assert mock_run.call_count == 3
+        mock_metadata.assert_not_called()
+        assert mock_run.call_args.args[0][-5:] == [
+            "stop",
+            "--service-name",
+            "antnode0001.service",
+            "--service-name",
+            "antnode0002.service",
+        ]
+
+    def _new_nodes(self, tmpdir, count=3):
+        nodes = self._nodes(tmpdir, count)
+        for node in nodes:
+            node.rpc_port = 30000 + node.id
+            node.wallet = "0x1234567890123456789012345678901234567890"
+            node.network = "evm-arbitrum-one"
+            node.log_dir = None
+        return nodes
+
+    def _add_output(self, tmpdir, count=3):
+        lines = ["Services Added:"]
+        for index in range(1, count + 1):
+            lines += [
+                f" ✓ antnode{index}",
+                f"    - Antnode path: {tmpdir}/antnode{index}/antnode",
+                f"    - Data path: {tmpdir}/antnode{index}",
+                f"    - Log path: {tmpdir}/logs/antnode{index}",
+                f"    - RPC port: 127.0.0.1:{30000 + index}",
+            ]
+        return "\n".join(lines) + "\n"
+
+    @patch("subprocess.run")
+    def test_antctl_batch_add(self, mock_run, tmp_path):
+        """Test nodes are added with one antctl add and started with one antctl start"""
+        from wnm.process_managers.antctl_manager import AntctlManager
+
+        mock_run.side_effect = [
+            Mock(returncode=0, stdout=self._add_output(tmp_path), stderr=""),
+            Mock(returncode=0, stdout="", stderr=""),
+        ]
+        manager = AntctlManager(mode="user")
+        nodes = self._new_nodes(tmp_path)
+
+        processes = manager.create_nodes(nodes, "/usr/local/bin/antnode")
+
+        assert [p.external_node_id for p in processes] == ["antnode1", "antnode2", "antnode3"]
+        add, start = [call.args[0] for call in mock_run.call_args_list]
+        assert add[1:7] == ["add", "--count", "3", "--data-dir-path", str(tmp_path), "--node-port"]
+        assert "55001-55003" in add
+        assert "13001-13003" in add
+        assert "30001-30003" in add
+        assert start[1:] == [
+            "start",
+            "--service-name",
+            "antnode1",
+            "--service-name",
+            "antnode2",
+            "--service-name",
+            "antnode3",
+        ]
+        assert nodes[1].root_dir == f"{tmp_path}/antnode2"
+        assert nodes[2].log_dir == f"{tmp_path}/logs/antnode3"
+
+    def test_antctl_add_batches(self, tmp_path):
+        """Test nodes split into runs sharing a wallet and consecutive ports"""
+        from wnm.process_managers.antctl_manager import add_batches
+
+        nodes = self._new_nodes(tmp_path, count=5)
+        nodes[3].wallet = "0x0987654321098765432109876543210987654321"
+        nodes[2].port = 55013
+
+        batches = add_batches(nodes)
+
+        assert [[node.id for node in batch] for batch in batches] == [[1, 2], [3], [4], [5]]
+
+    @patch("subprocess.run")
+    def test_antctl_batch_add_failure(self, mock_run, tmp_path):
+        """Test a failed antctl add fails its nodes without starting anything"""
+        from wnm.process_managers.antctl_manager import AntctlManager
+
+        mock_run.side_effect = subprocess.CalledProcessError(1, "antctl", "", "boom")
+        manager = AntctlManager(mode="user")
+
+        assert manager.create_nodes(self._new_nodes(tmp_path), None) == [None] * 3
+        mock_run.assert_called_once()
+
+    @patch("subprocess.run")
+    def test_antctl_zen_batch_add(self, mock_run, tmp_path):
+        """Test the zen manager reads every new service's paths from one add"""
+        from wnm.process_managers.antctl_zen_manager import AntctlZenManager
+
+        mock_run.side_effect = [
+            Mock(returncode=0, stdout=self._add_output(tmp_path, 2), stderr=""),
+            Mock(returncode=0, stdout="", stderr=""),
+        ]
+        manager = AntctlZenManager(mode="user")
+        nodes = self._new_nodes(tmp_path, count=2)
+
+        processes = manager.create_nodes(nodes, None)
+
+        assert [p.external_node_id for p in processes] == ["antnode1", "antnode2"]
+        add = mock_run.call_args_list[0].args[0]
+        assert "--data-dir-path" not in add
+        assert add[add.index("--node-port") + 1] == "55001-55002"
+        assert nodes[1].binary == f"{tmp_path}/antnode2/antnode"
+        assert mock_run.call_count == 2
+
+    @patch("subprocess.run")
+    def test_antctl_batch_upgrade(self, mock_run, tmp_path):
+        """Test several nodes are upgraded with one antctl upgrade"""
+        from wnm.process_managers.antctl_manager import AntctlManager
+
+        mock_run.return_value = Mock(returncode=0, stdout="", stderr="")
+        manager = AntctlManager(mode="user")
+
+        assert manager.upgrade_nodes(self._nodes(tmp_path, count=2)) is True
+
+        mock_run.assert_called_once()
+        assert mock_run.call_args.args[0][1:6] == [
+            "upgrade",
+            "--service-name",
+            "antnode0001.service",
+            "--service-name",
+            "antnode0002.service",
+        ]
+
+    @patch("subprocess.run")
+    def test_docker_single_invocation(self, mock_run, tmp_path):
+        """Test docker stops and removes every container with one call each"""
+        mock_run.return_value = Mock(returncode=0, stdout="", stderr="")
+        manager = DockerManager(transport="cli")
+        nodes = self._nodes(tmp_path)
+
+        assert manager.remove_nodes(nodes) is True
+
+        assert [call.args[0] for call in mock_run.call_args_list] == [
+            ["docker", "stop", "-t", "30", "antnode0001", "antnode0002", "antnode0003"],
+            ["docker", "rm", "-f", "antnode0001", "antnode0002", "antnode0003"],
+        ]
@@ -0,0 +1,162 @@
+"""Tests for readiness-driven RESTARTING/UPGRADING transitions."""
+
+import time
+from unittest.mock import patch
+
+from sqlalchemy import select
+
+from wnm.common import RESTARTING, RUNNING, STOPPED, UPGRADING
+from wnm.models import Node, NodeTransition
+from wnm.readiness import (
+    READY_PROBE_BASE,
+    READY_PROBE_MAX,
+    next_probe_delay,
+    node_is_ready,
+)
+from wnm.utils import update_counters
+
+CONFIG = {"delay_remove": 300, "delay_upgrade": 300, "delay_start": 300}
+
+
+def _metadata(host, port):
+    return {"status": RUNNING, "peer_id": f"peer{port}", "version": "0.4.6"}
+
+
+def _metrics(peers):
+    def metrics(host, port):
+        return {
+            "status": RUNNING,
+            "uptime": 10,
+            "records": 0,
+            "shunned": 0,
+            "connected_peers": peers,
+        }
+
+    return metrics
+
+
+def _transitions(db_session):
+    db_session.expire_all()
+    return db_session.execute(select(NodeTransition)).scalars().all()
+
+
+class TestReadinessHelpers:
+    """Test the readiness check and probe backoff"""
+
+    def test_ready_needs_version_and_peers(self):
+        assert node_is_ready({"connected_peers": 3}, {"version": "0.4.6"})
+        assert not node_is_ready({"connected_peers": 0}, {"version": "0.4.6"})
+        assert not node_is_ready({"connected_peers": 3}, {"status": STOPPED})
+        assert not node_is_ready(None, None)
+
+    def test_backoff_doubles_to_max(self):
+        assert next_probe_delay(0) == READY_PROBE_BASE
+        assert next_probe_delay(1) == READY_PROBE_BASE * 2
+        assert next_probe_delay(2) == READY_PROBE_BASE * 4
+        assert next_probe_delay(10) == READY_PROBE_MAX
+
+
+class TestReadinessTransitions:
+    """Test update_counters promotes nodes as soon as they are ready"""
+
+    def _restarting(self, db_session, node, age):
+        node.status = RESTARTING
+        node.timestamp = int(time.time()) - age
+        db_session.commit()
+
+    @patch("wnm.utils.read_node_metrics", side_effect=_metrics(5))
+    @patch("wnm.utils.read_node_metadata", side_effect=_metadata)
+    def test_ready_node_promoted_before_timer(
+        self, mock_metadata, mock_metrics, db_session, multiple_nodes
+    ):
+        """Test a node reporting version and peers leaves RESTARTING early"""
+        self._restarting(db_session, multiple_nodes[0], 20)
+
+        old = {"removing_nodes": 0, "upgrading_nodes": 0, "restarting_nodes": 1}
+        result = update_counters(lambda: db_session, old, CONFIG)
+
+        assert result["restarting_nodes"] == 0
+        db_session.expire_all()
+        assert db_session.get(Node, 1).status == RUNNING
+        (transition,) = _transitions(db_session)
+        assert transition.outcome == "ready"
+        assert transition.transition == RESTARTING
+        assert transition.probes == 1
+        assert 20 <= transition.seconds <= 22
+
+    @patch("wnm.utils.read_node_metrics", side_effect=_metrics(0))
+    @patch("wnm.utils.read_node_metadata", side_effect=_metadata)
+    def test_unready_node_backs_off(
+        self, mock_metadata, mock_metrics, db_session, multiple_nodes
+    ):
+        """Test a node without peers stays RESTARTING and is probed later"""
+        self._restarting(db_session, multiple_nodes[0], 20)
+        old = {"removing_nodes": 0, "upgrading_nodes": 0, "restarting_nodes": 1}
+
+        result = update_counters(lambda: db_session, old, CONFIG)
+
+        assert result["restarting_nodes"] == 1
+        assert db_session.get(Node, 1).status == RESTARTING
+        (transition,) = _transitions(db_session)
+        assert transition.finished_at is None
+        assert transition.probes == 1
+        assert transition.next_probe_at >= int(time.time()) + READY_PROBE_BASE
+
+        # Not due yet: no second probe
+        mock_metadata.reset_mock()
+        update_counters(lambda: db_session, dict(old), CONFIG)
+        mock_metadata.assert_not_called()
+        assert _transitions(db_session)[0].probes == 1
+
+    @patch("wnm.utils.read_node_metadata")
+    def test_fresh_transition_not_probed(self, mock_metadata, db_session, multiple_nodes):
+        """Test the first probe waits READY_PROBE_BASE seconds"""
+        self._restarting(db_session, multiple_nodes[0], 0)
+        old = {"removing_nodes": 0, "upgrading_nodes": 0, "restarting_nodes": 1}
+
+        assert update_counters(lambda: db_session, old, CONFIG)["restarting_nodes"] == 1
+
+        mock_metadata.assert_not_called()
+        (transition,) = _transitions(db_session)
+        assert transition.probes == 0
+        assert transition.next_probe_at == transition.started_at + READY_PROBE_BASE
+
+    @patch("wnm.utils.read_node_metrics", side_effect=_metrics(0))
+    @patch("wnm.utils.read_node_metadata", side_effect=_metadata)
+    def test_expired_timer_marks_transition_failed(
+        self, mock_metadata, mock_metrics, db_session, multiple_nodes
+    ):
+        """Test delay_upgrade is an upper bound recorded as a failure"""
+        node = multiple_nodes[0]
+        node.status = UPGRADING
+        node.timestamp = int(time.time()) - 1000
+        db_session.commit()
+        old = {"removing_nodes": 0, "upgrading_nodes": 1, "restarting_nodes": 0}
+
+        result = update_counters(lambda: db_session, old, CONFIG)
+
+        assert result["upgrading_nodes"] == 0
+        db_session.expire_all()
+        # Survey result still applied, as before readiness probing
+        assert db_session.get(Node, 1).status == RUNNING
+        (transition,) = _transitions(db_session)
+        assert transition.outcome == "failed"
+        assert transition.seconds is None
+
+    @patch("wnm.utils.read_node_metrics", side_effect=_metrics(5))
+    @patch("wnm.utils.read_node_metadata", side_effect=_metadata)
+    def test_stale_transition_abandoned(
+        self, mock_metadata, mock_metrics, db_session, multiple_nodes
+    ):
+        """Test an open transition for a node that restarted again is closed"""
+        self._restarting(db_session, multiple_nodes[0], 20)
+        db_session.add(
+            NodeTransition(1, RESTARTING, int(time.time()) - 500, next_probe_at=0)
+        )
+        db_session.commit()
+        old = {"removing_nodes": 0, "upgrading_nodes": 0, "restarting_nodes": 1}
+
+        update_counters(lambda: db_session, old, CONFIG)
+
+        outcomes = sorted(t.outcome for t in _transitions(db_session))
+        assert outcomes == ["abandoned", "ready"]
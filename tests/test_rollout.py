@@ -0,0 +1,397 @@
+"""Tests for wave-based rolling upgrades."""
+
+import json
+from unittest.mock import MagicMock, patch
+
+from wnm.actions import Action, ActionType
+from wnm.common import RESTARTING, RUNNING, STOPPED, UPGRADING
+from wnm.executor import ActionExecutor
+from wnm.models import Node, NodeTransition, UpgradeRollout
+from wnm.reports import generate_upgrade_status_report
+from wnm.rollout import (
+    DONE,
+    PAUSED,
+    ROLLING,
+    ROLLING_BACK,
+    ROLLOUT_SOAK,
+    SUPERSEDED,
+    RollingUpgrade,
+    node_regressed,
+    nodes_per_hour,
+)
+
+NEW = "0.2.0"
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _healthy(db_session, peers=10):
+    for node in db_session.query(Node).all():
+        node.connected_peers = peers
+    db_session.commit()
+
+
+def _upgrade(db_session, node_ids, **values):
+    for node_id in node_ids:
+        node = db_session.get(Node, node_id)
+        node.version = NEW
+        node.status = RUNNING
+        for key, value in values.items():
+            setattr(node, key, value)
+    db_session.commit()
+
+
+def _upgrades(*node_ids):
+    return [Action(type=ActionType.UPGRADE_NODE, node_id=node_id) for node_id in node_ids]
+
+
+def _rollout(db_session, canary=1, clock=None):
+    return RollingUpgrade(lambda: db_session, NEW, canary, clock=clock or FakeClock())
+
+
+class TestNodeHealth:
+    """Test the per-node regression check"""
+
+    baseline = {"connected_peers": 10, "records": 100, "shunned": 0}
+
+    def _node(self, **values):
+        node = {
+            "status": RUNNING,
+            "version": NEW,
+            "connected_peers": 10,
+            "records": 100,
+            "shunned": 0,
+        }
+        node.update(values)
+        return node
+
+    def test_healthy(self):
+        assert node_regressed(self.baseline, self._node(), NEW) is None
+        assert node_regressed(self.baseline, self._node(connected_peers=5), NEW) is None
+
+    def test_regressions(self):
+        assert "connected_peers" in node_regressed(
+            self.baseline, self._node(connected_peers=4), NEW
+        )
+        assert "records" in node_regressed(self.baseline, self._node(records=10), NEW)
+        assert "shunned" in node_regressed(self.baseline, self._node(shunned=3), NEW)
+        assert "status" in node_regressed(self.baseline, self._node(status=STOPPED), NEW)
+        assert "0.1.0" in node_regressed(self.baseline, self._node(version="0.1.0"), NEW)
+
+    def test_nodes_per_hour(self):
+        rollout = {"started_at": 0, "finished_at": 1800, "upgraded": 5}
+        assert nodes_per_hour(rollout) == 10.0
+
+
+class TestRollingUpgrade:
+    """Test wave gating, growth, pause and rollback"""
+
+    def test_canary_wave(self, db_session, multiple_nodes):
+        rollout = _rollout(db_session, canary=2)
+        assert rollout.allowance() == 2
+
+        rollout.record(_upgrades(1, 2))
+
+        assert rollout.state == ROLLING
+        assert rollout.allowance() == 0
+        row = db_session.query(UpgradeRollout).one()
+        assert row.version == NEW
+        assert json.loads(row.wave_nodes) == {
+            "1": {"connected_peers": 0, "records": 100, "shunned": 0},
+            "2": {"connected_peers": 0, "records": 200, "shunned": 0},
+        }
+
+    def test_wave_in_progress_not_gated(self, db_session, multiple_nodes):
+        _healthy(db_session)
+        rollout = _rollout(db_session)
+        rollout.record(_upgrades(1))
+        _upgrade(db_session, [1], status=UPGRADING)
+
+        rollout.evaluate()
+
+        assert rollout.rollout["wave"] == 0
+        assert rollout.allowance() == 0
+
+    def test_healthy_wave_grows_next_wave(self, db_session, multiple_nodes):
+        _healthy(db_session)
+        clock = FakeClock()
+        rollout = _rollout(db_session, clock=clock)
+        rollout.record(_upgrades(1))
+        _upgrade(db_session, [1])
+        clock.now += 360
+
+        rollout.evaluate()
+
+        assert rollout.rollout["wave"] == 1
+        assert rollout.rollout["upgraded"] == 1
+        assert rollout.allowance() == 2
+        # Progress survives into the next run
+        assert _rollout(db_session).allowance() == 2
+
+    def test_just_promoted_node_soaks(self, db_session, multiple_nodes):
+        _healthy(db_session)
+        clock = FakeClock()
+        rollout = _rollout(db_session, clock=clock)
+        rollout.record(_upgrades(1))
+        # Readiness promoted the node on its first peer a while after the upgrade
+        clock.now += 600
+        db_session.add(
+            NodeTransition(
+                node_id=1,
+                transition=UPGRADING,
+                started_at=clock.now - 600,
+                finished_at=clock.now - 10,
+                outcome="ready",
+            )
+        )
+        _upgrade(db_session, [1], connected_peers=1)
+
+        rollout.evaluate()
+
+        assert rollout.state == ROLLING
+        assert rollout.rollout["wave"] == 0
+
+        # Peers recovered during the soak
+        _upgrade(db_session, [1], connected_peers=9)
+        clock.now += ROLLOUT_SOAK
+        rollout.evaluate()
+
+        assert rollout.state == ROLLING
+        assert rollout.rollout["wave"] == 1
+
+    def test_regressed_canary_pauses(self, db_session, multiple_nodes):
+        _healthy(db_session)
+        clock = FakeClock()
+        rollout = _rollout(db_session, clock=clock)
+        rollout.record(_upgrades(1))
+        _upgrade(db_session, [1], connected_peers=1)
+        clock.now += ROLLOUT_SOAK
+
+        rollout.evaluate()
+
+        assert rollout.state == PAUSED
+        assert "connected_peers" in rollout.rollout["reason"]
+        assert rollout.allowance() == 0
+        assert rollout.resume()
+        assert rollout.allowance() == 1
+
+    def test_regressed_wave_rolls_back(self, db_session, multiple_nodes, tmp_path):
+        _healthy(db_session)
+        binary = tmp_path / "antnode"
+        binary.write_text("new")
+        (tmp_path / "antnode.previous").write_text("old")
+        db_session.get(Node, 1).binary = str(binary)
+        db_session.commit()
+        clock = FakeClock()
+        rollout = _rollout(db_session, clock=clock)
+        rollout.record(_upgrades(1))
+        _upgrade(db_session, [1], shunned=5)
+        clock.now += ROLLOUT_SOAK
+
+        rollout.evaluate()
+
+        assert rollout.state == ROLLING_BACK
+        assert rollout.rollback_ids() == [1]
+
+        # Executor restored the binary
+        (tmp_path / "antnode.previous").replace(binary)
+        db_session.get(Node, 1).version = "0.1.0"
+        db_session.commit()
+
+        rollout.evaluate()
+
+        assert rollout.state == PAUSED
+        assert rollout.rollout["rolled_back"] == 1
+
+    def test_done_when_nothing_outdated(self, db_session, multiple_nodes):
+        _healthy(db_session)
+        clock = FakeClock()
+        rollout = _rollout(db_session, canary=5, clock=clock)
+        rollout.record(_upgrades(1, 2, 3, 4, 5))
+        _upgrade(db_session, [1, 2, 3, 4, 5])
+        clock.now += ROLLOUT_SOAK
+
+        rollout.evaluate()
+
+        assert rollout.state == DONE
+        assert rollout.rollout["upgraded"] == 5
+
+    def test_new_version_supersedes(self, db_session, multiple_nodes):
+        _rollout(db_session).record(_upgrades(1))
+
+        rollout = RollingUpgrade(lambda: db_session, "0.3.0", 1, clock=FakeClock())
+
+        assert rollout.rollout is None
+        assert db_session.query(UpgradeRollout).one().state == SUPERSEDED
+
+    def test_superseded_discards_previous_binaries(
+        self, db_session, multiple_nodes, tmp_path
+    ):
+        binary = tmp_path / "antnode"
+        binary.write_text("new")
+        (tmp_path / "antnode.previous").write_text("old")
+        db_session.get(Node, 1).binary = str(binary)
+        db_session.commit()
+        _rollout(db_session).record(_upgrades(1))
+
+        RollingUpgrade(lambda: db_session, "0.3.0", 1, clock=FakeClock())
+
+        assert not (tmp_path / "antnode.previous").exists()
+        assert binary.read_text() == "new"
+
+    @patch("wnm.binary_store.subprocess.run")
+    def test_superseded_discards_through_sudo(
+        self, mock_run, db_session, multiple_nodes, tmp_path
+    ):
+        binary = tmp_path / "antnode"
+        binary.write_text("new")
+        (tmp_path / "antnode.previous").write_text("old")
+        db_session.get(Node, 1).binary = str(binary)
+        db_session.commit()
+        _rollout(db_session).record(_upgrades(1))
+
+        RollingUpgrade(lambda: db_session, "0.3.0", 1, clock=FakeClock(), sudo=True)
+
+        mock_run.assert_called_once()
+        assert mock_run.call_args.args[0] == [
+            "sudo", "rm", "-f", str(tmp_path / "antnode.previous")
+        ]
+
+    def test_status_report(self, db_session, multiple_nodes):
+        _rollout(db_session).record(_upgrades(1))
+
+        report = json.loads(generate_upgrade_status_report(lambda: db_session, "json"))
+
+        assert report["version"] == NEW
+        assert report["wave_nodes"] == [1]
+        assert "Nodes/hour:" in generate_upgrade_status_report(lambda: db_session)
+
+
+
+class TestRollbackExecution:
+    """Test the executor restores the previous binary"""
+
+    @patch("wnm.executor.get_antnode_version", return_value="0.1.0")
+    def test_rollback_restores_previous_binary(
+        self, mock_version, db_session, multiple_nodes, tmp_path
+    ):
+        binary = tmp_path / "antnode"
+        binary.write_text("new")
+        (tmp_path / "antnode.previous").write_text("old")
+        _upgrade(db_session, [1], binary=str(binary))
+        manager = MagicMock(use_system_services=False)
+        executor = ActionExecutor(lambda: db_session)
+        action = Action(type=ActionType.ROLLBACK_NODE, node_id=1)
+
+        with patch("wnm.executor.get_process_manager", return_value=manager):
+            result = executor.execute([action], {}, {"antnode_version": NEW})
+
+        assert result["status"] == "rolled-back-node"
+        assert binary.read_text() == "old"
+        assert not (tmp_path / "antnode.previous").exists()
+        manager.stop_node.assert_called_once()
+        manager.start_node.assert_called_once()
+        db_session.expire_all()
+        node = db_session.get(Node, 1)
+        assert node.status == RESTARTING
+        assert node.version == "0.1.0"
+
+
+    @patch("wnm.binary_store.subprocess.run")
+    @patch("wnm.executor.get_antnode_version", return_value="0.1.0")
+    def test_system_service_rollback_uses_sudo(
+        self, mock_version, mock_run, db_session, multiple_nodes, tmp_path
+    ):
+        binary = tmp_path / "antnode"
+        binary.write_text("new")
+        (tmp_path / "antnode.previous").write_text("old")
+        _upgrade(db_session, [1], binary=str(binary))
+        manager = MagicMock(use_system_services=True)
+        executor = ActionExecutor(lambda: db_session)
+        action = Action(type=ActionType.ROLLBACK_NODE, node_id=1)
+
+        with patch("wnm.executor.get_process_manager", return_value=manager):
+            result = executor.execute([action], {}, {"antnode_version": NEW})
+
+        assert result["status"] == "rolled-back-node"
+        assert mock_run.call_args.args[0] == [
+            "sudo", "mv", "-f", str(tmp_path / "antnode.previous"), str(binary)
+        ]
+        manager.start_node.assert_called_once()
+
+
+class BatchStartManager:
+    """Process manager stand-in with a native start_nodes"""
+
+    def __init__(self):
+        self.started = []
+
+    def start_node(self, node):
+        self.started.append([node.id])
+        return True
+
+    def start_nodes(self, nodes):
+        self.started.append([node.id for node in nodes])
+        return True
+
+
+class TestStartDuringRollout:
+    """Test outdated stopped nodes only join an open rollout wave"""
+
+    def _start(self, db_session, config, node_ids=(1,)):
+        manager = BatchStartManager()
+        executor = ActionExecutor(lambda: db_session)
+        executor.machine_config = config
+        actions = [Action(type=ActionType.START_NODE, node_id=i) for i in node_ids]
+        metrics = {"antnode_version": NEW}
+        with patch("wnm.executor.get_process_manager", return_value=manager), patch.object(
+            executor, "_upgrade_node_binary", return_value=True
+        ) as upgrade:
+            if len(actions) == 1:
+                results = [executor._execute_start_node(actions[0], metrics, False)]
+            else:
+                results = executor._execute_batch("start", actions, metrics)
+        return results, manager, upgrade
+
+    def _stop(self, db_session, *node_ids):
+        for node_id in node_ids:
+            db_session.get(Node, node_id).status = STOPPED
+        db_session.commit()
+
+    def test_paused_rollout_starts_current_binary(self, db_session, multiple_nodes):
+        _healthy(db_session)
+        rollout = _rollout(db_session)
+        rollout.record(_upgrades(1))
+        rollout._update(state=PAUSED)
+        self._stop(db_session, 2)
+        config = {"process_manager": "setsid+user", "upgrade_canary": 1}
+
+        results, manager, upgrade = self._start(db_session, config, (2,))
+
+        assert results[0]["status"] == "started-node"
+        upgrade.assert_not_called()
+        assert manager.started == [[2]]
+
+    def test_open_wave_takes_stopped_node(self, db_session, multiple_nodes):
+        _healthy(db_session)
+        self._stop(db_session, 2, 3, 4)
+        config = {"process_manager": "setsid+user", "upgrade_canary": 1}
+
+        results, manager, upgrade = self._start(db_session, config, (2, 3, 4))
+
+        # The canary wave has room for one node; the others start as they are
+        assert sorted(result["status"] for result in results) == [
+            "started-node",
+            "started-node",
+            "upgrading-stopped-node",
+        ]
+        assert len(manager.started) == 1 and len(manager.started[0]) == 2
+        upgrade.assert_called_once()
+        wave = json.loads(db_session.query(UpgradeRollout).one().wave_nodes)
+        assert list(wave) == [str(upgrade.call_args.args[0].id)]
@@ -0,0 +1,139 @@
+"""Tests for the run context: machine snapshot and process manager registry."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from wnm.executor import ActionExecutor
+from wnm.models import Machine
+from wnm.process_managers import SetsidManager
+from wnm.run_context import MACHINE_FIELDS, MachineSnapshot, RunContext
+
+
+class TestMachineSnapshot:
+    """Test the read-only machine config snapshot"""
+
+    def test_copies_machine(self, machine):
+        snapshot = MachineSnapshot.from_machine(machine)
+
+        assert snapshot.host == "test-host"
+        assert snapshot.port_start == 55
+        assert snapshot.antnode_path == "~/.local/bin/antnode"
+        assert set(MACHINE_FIELDS) >= {"no_upnp", "antctl_version", "process_manager"}
+
+    def test_read_only(self, machine):
+        snapshot = MachineSnapshot.from_machine(machine)
+
+        with pytest.raises(AttributeError):
+            snapshot.host = "other-host"
+        with pytest.raises(AttributeError):
+            snapshot.extra = 1
+        with pytest.raises(AttributeError):
+            del snapshot.host
+        assert not hasattr(snapshot, "__dict__")
+
+    def test_missing_values(self):
+        snapshot = MachineSnapshot({"host": "test-host", "unknown": 1})
+
+        assert snapshot.host == "test-host"
+        assert snapshot.no_upnp is None
+        assert not hasattr(snapshot, "unknown")
+
+
+class TestRunContext:
+    """Test the snapshot is loaded once per cycle and managers once per type"""
+
+    def test_machine_loaded_once_per_cycle(self, db_session, machine):
+        queries = []
+        context = RunContext(lambda: (queries.append(1), db_session)[1])
+
+        assert context.machine.host == "test-host"
+        assert context.machine.port_start == 55
+        assert len(queries) == 1
+
+        db_session.query(Machine).filter(Machine.id == 1).update({"host": "new-host"})
+        db_session.commit()
+        assert context.machine.host == "test-host"
+
+        context.begin_cycle()
+        assert context.machine.host == "new-host"
+        assert len(queries) == 2
+
+    def test_no_machine(self, db_session):
+        context = RunContext(lambda: db_session)
+
+        assert context.machine is None
+
+    def test_manager_registry(self, db_session):
+        context = RunContext(lambda: db_session)
+        create = MagicMock(side_effect=lambda: SetsidManager(firewall_type="null"))
+
+        first = context.manager("setsid+user", create)
+        second = context.manager("setsid+user", create)
+
+        assert first is second
+        create.assert_called_once()
+        assert first.context is context
+        assert context.all_managers() == [first]
+
+    def test_begin_cycle_resets_managers(self, db_session):
+        context = RunContext(lambda: db_session)
+        manager = context.manager("antctl+user", MagicMock)
+
+        context.begin_cycle()
+
+        manager.begin_cycle.assert_called_once()
+
+    def test_manager_reads_snapshot(self, db_session, machine):
+        context = RunContext(lambda: db_session)
+        manager = context.manager(
+            "setsid+user",
+            lambda: SetsidManager(session_factory=lambda: db_session, firewall_type="null"),
+        )
+
+        with patch("wnm.config.S") as global_session:
+            config = manager._get_machine_config()
+            assert manager._get_machine_config() is config
+
+        assert isinstance(config, MachineSnapshot)
+        assert config.host == "test-host"
+        global_session.assert_not_called()
+
+    def test_standalone_manager_uses_own_session(self, db_session, machine):
+        queries = []
+        manager = SetsidManager(
+            session_factory=lambda: (queries.append(1), db_session)[1],
+            firewall_type="null",
+        )
+
+        with patch("wnm.config.S") as global_session:
+            config = manager._get_machine_config()
+            assert manager._get_machine_config() is config
+
+        assert isinstance(config, MachineSnapshot)
+        assert config.host == "test-host"
+        assert len(queries) == 1
+        global_session.assert_not_called()
+
+
+class TestExecutorContext:
+    """Test the executor shares one manager per type through its context"""
+
+    def test_one_manager_per_type(self, db_session, multiple_nodes):
+        executor = ActionExecutor(lambda: db_session)
+        executor.machine_config = {"process_manager": "setsid+user"}
+
+        with patch(
+            "wnm.executor.get_process_manager",
+            side_effect=lambda *args, **kwargs: MagicMock(),
+        ) as factory:
+            managers = {executor._get_process_manager(node) for node in multiple_nodes}
+
+        assert len(managers) == 1
+        factory.assert_called_once()
+        assert executor.context.managers == {multiple_nodes[0].manager_type: managers.pop()}
+
+    def test_shared_context(self, db_session):
+        context = RunContext(lambda: db_session)
+
+        assert ActionExecutor(lambda: db_session, context).context is context
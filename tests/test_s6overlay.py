@@ -0,0 +1,245 @@
+"""Tests for the s6overlay process manager and its container allocation."""
+
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+from sqlalchemy import select
+
+from wnm.actions import Action, ActionType
+from wnm.common import DEAD, RUNNING, STOPPED
+from wnm.executor import ActionExecutor
+from wnm.models import Container, Node
+from wnm.process_managers import S6OverlayManager, get_process_manager
+from wnm.process_managers.base import NodeProcess
+
+
+class FakeS6Manager:
+    """S6OverlayManager stand-in recording containers and node creation"""
+
+    image = "test/s6:latest"
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.containers = []
+        self.created = []
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def create_container(self, name, node_storage, port_range, metrics_port_range):
+        self.containers.append((name, port_range, metrics_port_range))
+        return f"docker-{name}"
+
+    def create_node(self, node, binary_path):
+        with self._lock:
+            self.created.append(node.id)
+            self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+        return NodeProcess(node_id=node.id, status=RUNNING)
+
+
+@pytest.fixture
+def s6_config(sample_machine_config):
+    config = dict(sample_machine_config)
+    config.update(
+        {
+            "process_manager": "s6overlay+user",
+            "port_start": 55,
+            "metrics_port_start": 13,
+            "max_node_per_container": 200,
+            "min_container_count": 5,
+            "docker_image": "test/s6:latest",
+        }
+    )
+    return config
+
+
+def _adds(count):
+    return [Action(type=ActionType.ADD_NODE, priority=40) for _ in range(count)]
+
+
+def _execute(S, manager, actions, config):
+    executor = ActionExecutor(S)
+    with patch("wnm.executor.get_process_manager", return_value=manager):
+        return executor.execute(actions, config, {"antnode_version": "0.1.0"})
+
+
+class TestContainerAllocation:
+    """Test port block allocation and load balancing across containers"""
+
+    def test_port_blocks(self, thread_sessions, s6_config):
+        manager = FakeS6Manager(delay=0)
+
+        _execute(thread_sessions, manager, _adds(5), s6_config)
+
+        # One block of node and metrics ports per container
+        assert manager.containers == [
+            ("antcontainer01", (55001, 55200), (13001, 13200)),
+            ("antcontainer02", (55201, 55400), (13201, 13400)),
+            ("antcontainer03", (55401, 55600), (13401, 13600)),
+            ("antcontainer04", (55601, 55800), (13601, 13800)),
+            ("antcontainer05", (55801, 56000), (13801, 14000)),
+        ]
+        with thread_sessions() as session:
+            nodes = session.execute(select(Node).order_by(Node.id)).scalars().all()
+            assert [(n.id, n.port, n.metrics_port) for n in nodes] == [
+                (1, 55001, 13001),
+                (201, 55201, 13201),
+                (401, 55401, 13401),
+                (601, 55601, 13601),
+                (801, 55801, 13801),
+            ]
+            assert len({n.container_id for n in nodes}) == 5
+            containers = session.execute(select(Container)).scalars().all()
+            assert {c.container_id for c in containers} == {
+                f"docker-antcontainer0{i}" for i in range(1, 6)
+            }
+
+    def test_adds_run_one_per_container(self, thread_sessions, s6_config):
+        manager = FakeS6Manager(delay=0.2)
+
+        start = time.monotonic()
+        result = _execute(thread_sessions, manager, _adds(5), s6_config)
+        elapsed = time.monotonic() - start
+
+        assert [r["status"] for r in result["results"]] == ["added-node"] * 5
+        assert len(manager.threads) == 5
+        assert elapsed < 0.8
+
+    def test_new_container_when_full(self, thread_sessions, s6_config):
+        s6_config.update({"max_node_per_container": 2, "min_container_count": 1})
+        manager = FakeS6Manager(delay=0)
+
+        for _ in range(3):
+            _execute(thread_sessions, manager, _adds(1), s6_config)
+
+        assert [name for name, _, _ in manager.containers] == [
+            "antcontainer01",
+            "antcontainer02",
+        ]
+        with thread_sessions() as session:
+            ports = session.execute(select(Node.port).order_by(Node.id)).scalars().all()
+        assert ports == [55001, 55002, 55003]
+
+    def test_least_loaded_container(self, thread_sessions, s6_config):
+        s6_config["min_container_count"] = 2
+        manager = FakeS6Manager(delay=0)
+        _execute(thread_sessions, manager, _adds(3), s6_config)
+
+        with thread_sessions() as session:
+            session.delete(session.get(Node, 201))
+            session.commit()
+
+        _execute(thread_sessions, manager, _adds(1), s6_config)
+
+        with thread_sessions() as session:
+            ids = session.execute(select(Node.id).order_by(Node.id)).scalars().all()
+        # The emptier second container gets the node, on its lowest free port
+        assert ids == [1, 2, 201]
+
+    def test_failed_container(self, thread_sessions, s6_config):
+        manager = FakeS6Manager(delay=0)
+        manager.create_container = Mock(return_value=None)
+
+        result = _execute(thread_sessions, manager, _adds(1), s6_config)
+
+        assert result["status"] == "failed-create-container"
+        with thread_sessions() as session:
+            assert session.execute(select(Node)).first() is None
+
+
+def _node(node_id, tmp_path, container_id=1):
+    node = Mock(spec=Node)
+    node.id = node_id
+    node.node_name = f"{node_id:04}"
+    node.root_dir = str(tmp_path / f"antnode{node_id:04}")
+    node.port = 55000 + node_id
+    node.metrics_port = 13000 + node_id
+    node.wallet = "0x1234567890123456789012345678901234567890"
+    node.network = "evm-arbitrum-one"
+    node.environment = ""
+    node.container_id = container_id
+    return node
+
+
+class TestS6OverlayManager:
+    """Test node operations run through docker exec in the node's container"""
+
+    def _manager(self, db_session):
+        for index in (1, 2):
+            db_session.add(
+                Container(
+                    container_id=f"docker-{index}",
+                    name=f"antcontainer0{index}",
+                    image="test/s6:latest",
+                    status="running",
+                    created_at=0,
+                )
+            )
+        db_session.commit()
+        return S6OverlayManager(
+            session_factory=lambda: db_session, transport="cli", firewall_type="null"
+        )
+
+    def test_factory(self):
+        manager = get_process_manager("s6overlay+user", transport="cli")
+        assert isinstance(manager, S6OverlayManager)
+        assert manager.mode == "user"
+
+    @patch("subprocess.run")
+    def test_start_writes_run_file(self, mock_run, db_session, tmp_path):
+        mock_run.return_value = Mock(returncode=0, stderr="")
+        manager = self._manager(db_session)
+        nodes = [_node(1, tmp_path), _node(2, tmp_path), _node(201, tmp_path, 2)]
+
+        assert manager.start_nodes(nodes)
+
+        # One docker exec per container
+        assert mock_run.call_count == 2
+        cmd = mock_run.call_args_list[0].args[0]
+        assert cmd[:3] == ["docker", "exec", "antcontainer01"]
+        script = cmd[-1]
+        assert "/run/service/antnode0001/run" in script
+        assert "rm -f /run/service/antnode0002/down" in script
+        assert "--metrics-server-port 13002" in script
+        assert "/var/antctl/services/antnode0002/antnode" in script
+        assert "antnode0201" not in script
+
+    @patch("subprocess.run")
+    def test_stop_creates_down_file(self, mock_run, db_session, tmp_path):
+        mock_run.return_value = Mock(returncode=0, stderr="")
+        manager = self._manager(db_session)
+
+        assert manager.stop_nodes([_node(1, tmp_path), _node(2, tmp_path)])
+
+        mock_run.assert_called_once()
+        script = mock_run.call_args.args[0][-1]
+        assert "touch /run/service/antnode0001/down" in script
+        assert "s6-svwait -D" in script
+
+    @patch("subprocess.run")
+    def test_statuses(self, mock_run, db_session, tmp_path):
+        mock_run.return_value = Mock(
+            returncode=0, stdout="antnode0001 true 321\nantnode0002 false -1\n"
+        )
+        manager = self._manager(db_session)
+        nodes = [_node(1, tmp_path), _node(2, tmp_path), _node(3, tmp_path)]
+        (tmp_path / "antnode0001").mkdir()
+        (tmp_path / "antnode0002").mkdir()
+
+        statuses = manager.get_statuses(nodes)
+
+        mock_run.assert_called_once()
+        assert statuses[1].status == RUNNING
+        assert statuses[1].pid == 321
+        assert statuses[1].container_id == "docker-1"
+        assert statuses[2].status == STOPPED
+        assert statuses[3].status == DEAD
+
+    @patch("subprocess.run")
+    def test_unplaced_node_fails(self, mock_run, db_session, tmp_path):
+        manager = self._manager(db_session)
+
+        assert not manager.start_nodes([_node(1, tmp_path, container_id=9)])
+        mock_run.assert_not_called()
@@ -0,0 +1,261 @@
+"""Tests for the node survey engine.
+
+These tests verify that surveys return per-node cards in target order,
+respect the max_concurrent_surveys cap, pace starts by survey_delay, and
+write their results through a single NodeWriteBatch transaction.
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from sqlalchemy import event
+
+from wnm.common import REMOVING, RESTARTING, RUNNING, STOPPED
+from wnm.executor import ActionExecutor
+from wnm.models import Node
+from wnm.utils import (
+    NodeWriteBatch,
+    SurveyPacer,
+    survey_node,
+    survey_nodes,
+    update_counters,
+    update_nodes,
+)
+
+
+def _metadata(host, port):
+    return {"status": RUNNING, "peer_id": f"peer{port}", "version": "0.4.6"}
+
+
+def _metrics(host, port):
+    return {
+        "status": RUNNING,
+        "uptime": port,
+        "records": 0,
+        "shunned": 0,
+        "connected_peers": 5,
+    }
+
+
+class TestSurveyNode:
+    """Test single node survey"""
+
+    @patch("wnm.utils.read_node_metrics")
+    @patch("wnm.utils.read_node_metadata")
+    def test_stopped_node_skips_metrics(self, mock_metadata, mock_metrics):
+        """Test metrics are not requested when metadata shows node is down"""
+        mock_metadata.return_value = {"status": STOPPED, "peer_id": ""}
+
+        metrics, metadata = survey_node("127.0.0.1", 13001)
+
+        mock_metrics.assert_not_called()
+        assert metrics["status"] == STOPPED
+        assert metrics["connected_peers"] == 0
+        assert metadata["status"] == STOPPED
+
+    @patch("wnm.utils.read_node_metrics", side_effect=_metrics)
+    @patch("wnm.utils.read_node_metadata", side_effect=_metadata)
+    def test_running_node_reads_metrics(self, mock_metadata, mock_metrics):
+        """Test metrics are read for a responding node"""
+        metrics, metadata = survey_node("127.0.0.1", 13001)
+
+        assert metrics["uptime"] == 13001
+        assert metadata["peer_id"] == "peer13001"
+
+
+class TestSurveyNodes:
+    """Test concurrent survey of multiple nodes"""
+
+    @pytest.mark.parametrize("workers", [1, 4])
+    @patch("wnm.utils.read_node_metrics", side_effect=_metrics)
+    @patch("wnm.utils.read_node_metadata", side_effect=_metadata)
+    def test_results_in_target_order(self, mock_metadata, mock_metrics, workers):
+        """Test cards come back in the same order as targets"""
+        targets = [("127.0.0.1", 13000 + i) for i in range(10)]
+
+        results = survey_nodes(targets, max_workers=workers)
+
+        assert [m["uptime"] for m, _ in results] == [p for _, p in targets]
+
+    def test_empty_targets(self):
+        """Test surveying nothing returns an empty list"""
+        assert survey_nodes([], max_workers=8) == []
+
+    def test_in_flight_cap(self):
+        """Test no more than max_workers surveys run at once"""
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        def slow_survey(host, port):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.02)
+            with lock:
+                state["active"] -= 1
+            return _metrics(host, port), _metadata(host, port)
+
+        targets = [("127.0.0.1", 13000 + i) for i in range(12)]
+        with patch("wnm.utils.survey_node", side_effect=slow_survey):
+            results = survey_nodes(targets, max_workers=3)
+
+        assert len(results) == 12
+        assert 1 < state["peak"] <= 3
+
+    def test_pacer_spaces_starts(self):
+        """Test survey_delay is a minimum interval between survey starts"""
+        pacer = SurveyPacer(20)
+        starts = []
+        for _ in range(3):
+            pacer.wait()
+            starts.append(time.monotonic())
+
+        assert starts[1] - starts[0] >= 0.019
+        assert starts[2] - starts[1] >= 0.019
+
+    def test_pacer_disabled(self):
+        """Test zero delay never sleeps"""
+        with patch("wnm.utils.time.sleep") as mock_sleep:
+            pacer = SurveyPacer(0)
+            for _ in range(5):
+                pacer.wait()
+        mock_sleep.assert_not_called()
+
+
+class TestUpdateNodes:
+    """Test update_nodes uses the survey engine"""
+
+    @patch("wnm.utils.read_node_metrics", side_effect=_metrics)
+    @patch("wnm.utils.read_node_metadata", side_effect=_metadata)
+    def test_update_nodes_concurrent(
+        self, mock_metadata, mock_metrics, db_session, multiple_nodes
+    ):
+        """Test every node is updated with its own card"""
+        update_nodes(lambda: db_session, max_concurrent_surveys=4)
+
+        for node in db_session.query(Node).all():
+            assert node.uptime == node.metrics_port
+            assert node.peer_id == f"peer{node.metrics_port}"
+
+
+class TestExecutorSurveyConcurrency:
+    """Test executor reads max_concurrent_surveys"""
+
+    def test_default_concurrency(self, db_session):
+        executor = ActionExecutor(lambda: db_session)
+        assert executor._get_survey_concurrency(None) == 1
+        assert executor._get_survey_concurrency({}) == 1
+
+    def test_configured_concurrency(self, db_session):
+        executor = ActionExecutor(lambda: db_session)
+        assert executor._get_survey_concurrency({"max_concurrent_surveys": 8}) == 8
+
+    @patch("wnm.utils.read_node_metrics", side_effect=_metrics)
+    @patch("wnm.utils.read_node_metadata", side_effect=_metadata)
+    def test_survey_specific_nodes(
+        self, mock_metadata, mock_metrics, db_session, multiple_nodes
+    ):
+        """Test forced survey of named nodes keeps order and updates rows"""
+        executor = ActionExecutor(lambda: db_session)
+        executor.machine_config = {"max_concurrent_surveys": 4}
+        names = ["antnode0003", "antnode0001", "antnode0002"]
+
+        result = executor._survey_specific_nodes(names + ["antnode0099"], dry_run=False)
+
+        assert result["surveyed_nodes"] == names
+        assert result["failed_count"] == 1
+        node = db_session.query(Node).filter(Node.id == 3).one()
+        assert node.uptime == 13003
+
+
+@pytest.fixture
+def commit_counter(db_session):
+    """Count commits issued on the test session"""
+    counter = {"commits": 0}
+
+    def _on_commit(session):
+        counter["commits"] += 1
+
+    event.listen(db_session, "after_commit", _on_commit)
+    yield counter
+    event.remove(db_session, "after_commit", _on_commit)
+
+
+class TestNodeWriteBatch:
+    """Test the bulk node writer"""
+
+    def test_unchanged_columns_skipped(self, db_session):
+        batch = NodeWriteBatch(lambda: db_session)
+        current = {"status": RUNNING, "records": 10}
+
+        assert batch.update(1, {"status": RUNNING, "records": 10}, current) is False
+        assert len(batch) == 0
+        assert batch.update(1, {"status": RUNNING, "records": 11}, current) is True
+        assert batch._updates == {1: {"records": 11}}
+
+    def test_flush_single_commit(self, db_session, multiple_nodes, commit_counter):
+        batch = NodeWriteBatch(lambda: db_session)
+        batch.update(1, {"records": 999})
+        batch.set_status(2, STOPPED)
+        batch.update(3, {"connected_peers": 42, "shunned": 1})
+        batch.delete(4)
+
+        assert batch.flush() is True
+        assert commit_counter["commits"] == 1
+        assert len(batch) == 0
+
+        db_session.expire_all()
+        assert db_session.get(Node, 1).records == 999
+        assert db_session.get(Node, 2).status == STOPPED
+        assert db_session.get(Node, 3).connected_peers == 42
+        assert db_session.get(Node, 4) is None
+
+    def test_delete_overrides_update(self, db_session, multiple_nodes):
+        batch = NodeWriteBatch(lambda: db_session)
+        batch.update(5, {"records": 1})
+        batch.delete(5)
+        batch.update(5, {"records": 2})
+
+        assert batch._updates == {}
+        batch.flush()
+        assert db_session.get(Node, 5) is None
+
+    def test_empty_flush(self, db_session, commit_counter):
+        assert NodeWriteBatch(lambda: db_session).flush() is True
+        assert commit_counter["commits"] == 0
+
+
+class TestUpdateCountersBatched:
+    """Test update_counters writes through one transaction"""
+
+    @patch("wnm.utils.read_node_metrics", side_effect=_metrics)
+    @patch("wnm.utils.read_node_metadata", side_effect=_metadata)
+    def test_expired_removals_and_restarts(
+        self, mock_metadata, mock_metrics, db_session, multiple_nodes, commit_counter
+    ):
+        expired = int(time.time()) - 1000
+        for node in multiple_nodes[:2]:
+            node.status = REMOVING
+            node.timestamp = expired
+        multiple_nodes[2].status = RESTARTING
+        multiple_nodes[2].timestamp = expired
+        multiple_nodes[3].status = RESTARTING
+        multiple_nodes[3].timestamp = int(time.time())
+        db_session.commit()
+        commit_counter["commits"] = 0
+
+        old = {"removing_nodes": 2, "upgrading_nodes": 0, "restarting_nodes": 2}
+        config = {"delay_remove": 300, "delay_upgrade": 300, "delay_start": 300}
+        result = update_counters(lambda: db_session, old, config)
+
+        assert result["removing_nodes"] == 0
+        assert result["restarting_nodes"] == 1
+        assert commit_counter["commits"] == 1
+        db_session.expire_all()
+        assert db_session.get(Node, 1) is None
+        assert db_session.get(Node, 2) is None
+        assert db_session.get(Node, 3).status == RUNNING
+        assert db_session.get(Node, 4).status == RESTARTING
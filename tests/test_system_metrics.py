@@ -2,6 +2,7 @@
 
 import platform
 import re
+from collections import namedtuple
 from unittest.mock import Mock, patch
 
 import pytest
@@ -62,48 +63,27 @@ class TestSystemStartTime:
     @pytest.mark.skipif(platform.system() != "Linux", reason="Linux only")
     @patch("subprocess.run")
     def test_linux_system_start_time(self, mock_run):
-        """Test system start time detection on Linux using uptime --since"""
-        # Mock uptime --since output
+        """Test system start time on Linux comes from btime in /proc/stat"""
+        from wnm.system_metrics import read_proc_stat
+        from wnm.utils import get_system_start_time
+
+        assert get_system_start_time() == read_proc_stat()["boot_time"]
+        assert not mock_run.called
+
+    @pytest.mark.skipif(platform.system() != "Linux", reason="Linux only")
+    @patch("wnm.utils.read_proc_stat", side_effect=FileNotFoundError)
+    @patch("subprocess.run")
+    def test_linux_system_start_time_fallback(self, mock_run, mock_stat):
+        """Test uptime --since is used when /proc/stat is unreadable"""
         mock_run.return_value = Mock(
             returncode=0,
             stdout="2024-01-15 10:30:45\n".encode("utf-8")
         )
 
-        from wnm.utils import get_machine_metrics
-
-        # Create a minimal mock for S() session
-        mock_s = Mock()
-        mock_session = Mock()
-        mock_session.execute.return_value.all.return_value = []
-        mock_s.return_value.__enter__ = Mock(return_value=mock_session)
-        mock_s.return_value.__exit__ = Mock(return_value=None)
-
-        # Mock psutil functions
-        with patch("wnm.utils.psutil.cpu_percent") as mock_cpu:
-            with patch("wnm.utils.psutil.virtual_memory") as mock_mem:
-                with patch("wnm.utils.psutil.disk_usage") as mock_disk:
-                    with patch("wnm.utils.psutil.disk_io_counters") as mock_io:
-                        with patch("wnm.utils.os.getloadavg") as mock_load:
-                            with patch("wnm.utils.shutil.which") as mock_which:
-                                with patch("wnm.utils.psutil.net_io_counters") as mock_net_io:
-                                    # Setup mocks
-                                    mock_cpu.return_value = 25.0
-                                    mock_mem.return_value = Mock(percent=50.0)
-                                    mock_disk.return_value = Mock(percent=60.0, total=1000000000000)
-                                    mock_io.return_value = Mock(read_bytes=1000, write_bytes=2000)
-                                    mock_net_io.return_value = Mock(bytes_sent=1000, bytes_recv=2000)
-                                    mock_load.return_value = (1.0, 1.5, 2.0)
-                                    mock_which.return_value = "/usr/local/bin/antnode"
-
-                                    # Call the function with S as parameter
-                                    metrics = get_machine_metrics(mock_s, "/tmp/test", 90, 1000000000)
+        from wnm.utils import get_system_start_time
 
-                                    # Verify system_start was parsed correctly
-                                    assert metrics["system_start"] > 0
-                                    assert mock_run.called
-                                    # Verify it called uptime, not sysctl (check first call)
-                                    first_call_args = mock_run.call_args_list[0][0][0]
-                                    assert "uptime" in first_call_args
+        assert get_system_start_time() > 0
+        assert "uptime" in mock_run.call_args_list[0][0][0]
 
 
 class TestCPUCount:
@@ -302,3 +282,248 @@ class TestSystemMetricsIntegration:
             assert anm_config["cpu_count"] > 0
             # Should work on any platform
             assert isinstance(anm_config["cpu_count"], int)
+
+
+PROC_STAT = """cpu  {user} 0 100 {idle} {iowait} 0 0 0 0 0
+cpu0 1 0 1 1 1 0 0 0 0 0
+intr 12345
+btime {btime}
+processes 42
+"""
+
+MEMINFO = """MemTotal:        8000000 kB
+MemFree:         1000000 kB
+MemAvailable:    6000000 kB
+Buffers:          100000 kB
+Cached:          2000000 kB
+"""
+
+DISKSTATS = """   8       0 sda 100 0 {read} 10 50 0 {write} 20 0 30 30
+   8       1 sda1 100 0 {read} 10 50 0 {write} 20 0 30 30
+"""
+
+NET_DEV = """Inter-|   Receive                                                |  Transmit
+ face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed
+    lo: {lo} 10 0 0 0 0 0 0 {lo} 10 0 0 0 0 0 0
+  eth0: {recv} 10 0 0 0 0 0 0 {sent} 10 0 0 0 0 0 0
+"""
+
+
+class FakeProc:
+    """Writes /proc and /sys/block files for the sampler under tmp_path"""
+
+    def __init__(self, tmp_path):
+        self.proc = tmp_path / "proc"
+        self.sys_block = tmp_path / "block"
+        (self.proc / "net").mkdir(parents=True)
+        (self.sys_block / "sda").mkdir(parents=True)
+        (self.proc / "meminfo").write_text(MEMINFO)
+
+    def write(self, user=0, idle=0, iowait=0, read=0, write=0, recv=0, sent=0, btime=1700000000):
+        (self.proc / "stat").write_text(
+            PROC_STAT.format(user=user, idle=idle, iowait=iowait, btime=btime)
+        )
+        (self.proc / "diskstats").write_text(DISKSTATS.format(read=read, write=write))
+        (self.proc / "net" / "dev").write_text(NET_DEV.format(lo=5, recv=recv, sent=sent))
+
+
+class FakeClock:
+    def __init__(self, now=1700001000.0):
+        self.now = now
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def fake_proc(tmp_path):
+    proc = FakeProc(tmp_path)
+    proc.write()
+    return proc
+
+
+def _sampler(fake_proc, clock, S=None):
+    from wnm.system_metrics import SystemSampler
+
+    return SystemSampler(
+        S,
+        proc_root=str(fake_proc.proc),
+        sys_block=str(fake_proc.sys_block),
+        clock=clock,
+        sleep=clock.sleep,
+    )
+
+
+class TestProcReaders:
+    """Test parsing of the /proc files"""
+
+    def test_read_system_sample(self, fake_proc):
+        from wnm.system_metrics import memory_percent, read_system_sample
+
+        fake_proc.write(user=300, idle=600, iowait=50, read=4, write=8, recv=1000, sent=2000)
+        sample = read_system_sample(str(fake_proc.proc), str(fake_proc.sys_block))
+
+        assert sample["boot_time"] == 1700000000
+        assert sample["cpu_total"] == 300 + 100 + 600 + 50
+        assert sample["cpu_idle"] == 600
+        assert sample["cpu_iowait"] == 50
+        # Partitions are not counted twice
+        assert sample["disk_read_bytes"] == 4 * 512
+        assert sample["disk_write_bytes"] == 8 * 512
+        assert sample["net_recv_bytes"] == 1005
+        assert sample["net_sent_bytes"] == 2005
+        assert memory_percent(sample) == 25.0
+
+    def test_missing_proc(self, tmp_path):
+        from wnm.system_metrics import read_system_sample
+
+        assert read_system_sample(str(tmp_path / "missing")) is None
+
+
+class TestSystemSampler:
+    """Test rates computed against the previous sample"""
+
+    def test_first_sample_is_pending_and_waits_remainder(self, fake_proc):
+        clock = FakeClock()
+        sampler = _sampler(fake_proc, clock)
+
+        assert sampler.begin() is None
+        assert sampler.pending
+
+        # Survey work takes 0.4 seconds of the window
+        clock.now += 0.4
+        fake_proc.write(user=50, idle=50, read=2, write=4, recv=100, sent=200)
+        rates = sampler.finish()
+
+        assert clock.slept == [pytest.approx(0.6)]
+        assert rates["used_cpu_percent"] == 50.0
+        assert rates["hdio_read_bytes"] == 1024
+        assert rates["netio_write_bytes"] == 200
+        assert not sampler.pending
+
+    def test_no_wait_when_survey_covers_window(self, fake_proc):
+        clock = FakeClock()
+        sampler = _sampler(fake_proc, clock)
+        sampler.begin()
+
+        clock.now += 3
+        sampler.finish()
+
+        assert clock.slept == []
+
+    def test_previous_sample_in_memory(self, fake_proc):
+        """Test the daemon's second cycle needs no second sample"""
+        clock = FakeClock()
+        sampler = _sampler(fake_proc, clock)
+        sampler.begin()
+        sampler.finish()
+
+        clock.now += 60
+        fake_proc.write(user=90, idle=10, iowait=20, write=60 * 1000)
+        rates = sampler.begin()
+
+        assert rates is not None
+        assert clock.slept == [1.0]
+        assert rates["idle_cpu_percent"] == pytest.approx(100 * 10 / 120, abs=0.1)
+        assert rates["io_wait"] == pytest.approx(100 * 20 / 120, abs=0.1)
+        assert rates["hdio_write_bytes"] == 512 * 1000
+
+    def test_previous_sample_from_database(self, fake_proc, db_session):
+        """Test a cron run uses the sample saved by the previous run"""
+        clock = FakeClock()
+        first = _sampler(fake_proc, clock, S=lambda: db_session)
+        first.begin()
+        first.finish()
+
+        clock.now += 60
+        fake_proc.write(recv=6000)
+        second = _sampler(fake_proc, clock, S=lambda: db_session)
+
+        rates = second.begin()
+
+        assert rates["netio_read_bytes"] == 100
+        assert clock.slept == [1.0]
+
+    def test_reboot_discards_previous_sample(self, fake_proc):
+        clock = FakeClock()
+        sampler = _sampler(fake_proc, clock)
+        sampler.begin()
+        sampler.finish()
+
+        clock.now += 60
+        fake_proc.write(btime=1700000500)
+
+        assert sampler.begin() is None
+        assert sampler.pending
+
+    def test_stale_previous_sample_discarded(self, fake_proc):
+        clock = FakeClock()
+        sampler = _sampler(fake_proc, clock)
+        sampler.begin()
+        sampler.finish()
+
+        clock.now += 3600
+
+        assert sampler.begin() is None
+
+    @patch("wnm.utils.shutil.which", return_value="/usr/local/bin/antnode")
+    @patch("wnm.utils.get_antnode_version", return_value="0.4.7")
+    def test_machine_metrics_deferred(self, mock_version, mock_which, fake_proc, db_session, tmp_path):
+        """Test get_machine_metrics leaves a pending window to the caller"""
+        from wnm.utils import get_machine_metrics
+
+        clock = FakeClock()
+        sampler = _sampler(fake_proc, clock)
+
+        metrics = get_machine_metrics(
+            lambda: db_session, str(tmp_path), 90, 2000000000,
+            sampler=sampler, defer_rates=True,
+        )
+
+        assert metrics["system_start"] == 1700000000
+        assert metrics["used_mem_percent"] == 25.0
+        assert "used_cpu_percent" not in metrics
+        assert sampler.pending
+        assert clock.slept == []
+
+        metrics = get_machine_metrics(
+            lambda: db_session, str(tmp_path), 90, 2000000000, sampler=sampler
+        )
+        assert "used_cpu_percent" in metrics
+        assert "hdio_read_bytes" in metrics
+
+    @patch("wnm.utils.shutil.which", return_value="/usr/local/bin/antnode")
+    @patch("wnm.utils.get_antnode_version", return_value="0.4.7")
+    @patch("wnm.utils.psutil.cpu_times_percent")
+    def test_machine_metrics_proc_lost(
+        self, mock_cpu, mock_version, mock_which, fake_proc, db_session, tmp_path
+    ):
+        """Test rates fall back to psutil when /proc cannot close the window"""
+        from wnm.utils import get_machine_metrics
+
+        cpu_times = namedtuple("scputimes", "user nice system idle iowait")
+        mock_cpu.return_value = cpu_times(10.0, 0.0, 5.0, 80.0, 5.0)
+        clock = FakeClock()
+        sampler = _sampler(fake_proc, clock)
+        finish = sampler.finish
+
+        def unreadable_finish():
+            (fake_proc.proc / "stat").unlink()
+            return finish()
+
+        with patch.object(sampler, "finish", side_effect=unreadable_finish):
+            metrics = get_machine_metrics(
+                lambda: db_session, str(tmp_path), 90, 2000000000, sampler=sampler
+            )
+
+        mock_cpu.assert_called_once_with(1)
+        assert metrics["idle_cpu_percent"] == 80.0
+        assert metrics["used_cpu_percent"] == 20.0
+        assert metrics["io_wait"] == (0 if platform.system() == "Darwin" else 5.0)
+        for key in ("hdio_read_bytes", "hdio_write_bytes", "netio_read_bytes"):
+            assert key in metrics
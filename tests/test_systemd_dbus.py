@@ -0,0 +1,313 @@
+"""Tests for the systemd D-Bus transport against a stand-in systemd bus."""
+
+import fnmatch
+import socket
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+
+from wnm.common import RUNNING, STOPPED
+from wnm.process_managers import SystemdManager
+from wnm.process_managers.systemd_dbus import (
+    DESTINATION,
+    ERROR,
+    ERROR_NAME,
+    INTERFACE,
+    MEMBER,
+    METHOD_CALL,
+    METHOD_RETURN,
+    PATH,
+    REPLY_SERIAL,
+    SIGNAL,
+    SystemdBus,
+    encode_message,
+    parse_message,
+)
+
+
+class FakeSystemd:
+    """Stand-in message bus serving the systemd Manager calls wnm makes"""
+
+    def __init__(self, path, units=None, failing=(), deny=False):
+        self.units = dict(units or {})
+        self.failing = set(failing)
+        self.deny = deny
+        self.calls = []
+        self.connections = 0
+        self._serial = 0
+        self._jobs = 0
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(str(path))
+        self.server.listen(4)
+        self.address = f"unix:path={path}"
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def close(self):
+        self.server.close()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        buffer = b""
+        while b"BEGIN\r\n" not in buffer:
+            chunk = conn.recv(4096)
+            if not chunk:
+                return
+            if b"AUTH EXTERNAL" in chunk:
+                conn.sendall(b"OK 0123456789abcdef0123456789abcdef\r\n")
+            buffer += chunk
+        buffer = buffer.split(b"BEGIN\r\n", 1)[1]
+        while True:
+            message, used = parse_message(buffer)
+            if message is None:
+                chunk = conn.recv(65536)
+                if not chunk:
+                    return
+                buffer += chunk
+                continue
+            buffer = buffer[used:]
+            if message.type == METHOD_CALL:
+                self._handle(conn, message)
+
+    def _send(self, conn, message_type, fields, signature="", body=()):
+        self._serial += 1
+        conn.sendall(encode_message(message_type, self._serial, fields, signature, body))
+
+    def _reply(self, conn, call, signature="", *body):
+        fields = {REPLY_SERIAL: ("u", call.serial), DESTINATION: ("s", ":1.42")}
+        self._send(conn, METHOD_RETURN, fields, signature, body)
+
+    def _error(self, conn, call, name, text):
+        fields = {
+            REPLY_SERIAL: ("u", call.serial),
+            DESTINATION: ("s", ":1.42"),
+            ERROR_NAME: ("s", name),
+        }
+        self._send(conn, ERROR, fields, "s", (text,))
+
+    def _handle(self, conn, call):
+        member = call.fields[MEMBER]
+        self.calls.append((member, call.body))
+        if member == "Hello":
+            self._reply(conn, call, "s", ":1.42")
+        elif member in ("AddMatch", "Subscribe", "Reload"):
+            self._reply(conn, call)
+        elif member == "ListUnitsByPatterns":
+            units = [
+                (name, name, "loaded", state, "running", "", f"/unit/{i}", 0, "", "/")
+                for i, (name, state) in enumerate(sorted(self.units.items()))
+                if any(fnmatch.fnmatch(name, pattern) for pattern in call.body[1])
+            ]
+            self._reply(conn, call, "a(ssssssouso)", units)
+        elif member == "GetUnit":
+            unit = call.body[0]
+            if unit not in self.units:
+                self._error(
+                    conn, call, "org.freedesktop.systemd1.NoSuchUnit", f"Unit {unit} not loaded."
+                )
+                return
+            self._reply(conn, call, "o", f"/org/freedesktop/systemd1/unit/{unit[:-8]}")
+        elif member == "Get":
+            if call.body[1] == "ActiveState":
+                unit = call.fields[PATH].rsplit("/", 1)[1] + ".service"
+                self._reply(conn, call, "v", ("s", self.units[unit]))
+            else:
+                self._reply(conn, call, "v", ("u", 4242))
+        elif member in ("StartUnit", "StopUnit", "RestartUnit"):
+            if self.deny:
+                self._error(
+                    conn,
+                    call,
+                    "org.freedesktop.DBus.Error.InteractiveAuthorizationRequired",
+                    "Interactive authentication required.",
+                )
+                return
+            unit = call.body[0]
+            self._jobs += 1
+            job = f"/org/freedesktop/systemd1/job/{self._jobs}"
+            self._reply(conn, call, "o", job)
+            result = "failed" if unit in self.failing else "done"
+            if result == "done":
+                self.units[unit] = "inactive" if member == "StopUnit" else "active"
+            self._send(
+                conn,
+                SIGNAL,
+                {
+                    PATH: ("o", "/org/freedesktop/systemd1"),
+                    INTERFACE: ("s", "org.freedesktop.systemd1.Manager"),
+                    MEMBER: ("s", "JobRemoved"),
+                },
+                "uoss",
+                (self._jobs, job, unit, result),
+            )
+        else:
+            self._error(conn, call, "org.freedesktop.DBus.Error.UnknownMethod", member)
+
+
+@pytest.fixture
+def fake_systemd(tmp_path):
+    bus = FakeSystemd(tmp_path / "bus", units={"antnode0001.service": "active"})
+    yield bus
+    bus.close()
+
+
+class TestDBusCodec:
+    """Test D-Bus message marshalling"""
+
+    def test_round_trip(self):
+        body = (
+            [("antnode0001.service", "active", 7)],
+            {"MainPID": ("u", 42)},
+            True,
+            "/org/freedesktop/systemd1",
+        )
+        data = encode_message(
+            METHOD_CALL,
+            9,
+            {PATH: ("o", "/"), MEMBER: ("s", "Test")},
+            "a(ssu)a{sv}bo",
+            body,
+        )
+
+        message, used = parse_message(data + b"extra")
+
+        assert used == len(data)
+        assert message.serial == 9
+        assert message.fields[MEMBER] == "Test"
+        assert message.body == body
+
+    def test_partial_message(self):
+        data = encode_message(METHOD_CALL, 1, {PATH: ("o", "/"), MEMBER: ("s", "Ping")})
+        assert parse_message(data[:-1]) == (None, 0)
+
+
+class TestSystemdBus:
+    """Test systemd unit management over the stand-in bus"""
+
+    def test_jobs_wait_for_signals(self, fake_systemd):
+        bus = SystemdBus(address=fake_systemd.address, timeout=5)
+
+        assert bus.start_units(["antnode0002.service", "antnode0003.service"])
+        assert bus.list_units(["antnode*"]) == {
+            "antnode0001.service": "active",
+            "antnode0002.service": "active",
+            "antnode0003.service": "active",
+        }
+        assert bus.stop_units(["antnode0001.service"])
+        bus.reload()
+
+        # One connection, subscribed once, for every operation
+        assert fake_systemd.connections == 1
+        members = [member for member, _ in fake_systemd.calls]
+        assert members.count("Subscribe") == 1
+        assert members.count("ListUnitsByPatterns") == 1
+        bus.close()
+
+    def test_failed_job(self, fake_systemd):
+        fake_systemd.failing.add("antnode0002.service")
+        bus = SystemdBus(address=fake_systemd.address, timeout=5)
+
+        assert not bus.start_units(["antnode0002.service"])
+        bus.close()
+
+
+class TestSystemdManagerDBus:
+    """Test SystemdManager uses the D-Bus transport and falls back to systemctl"""
+
+    def _manager(self, address):
+        manager = SystemdManager(mode="user", firewall_type="null", transport="dbus")
+        manager.bus = SystemdBus(address=address, timeout=5)
+        return manager
+
+    @patch("wnm.process_managers.systemd_manager.read_node_metadata", return_value={})
+    @patch("subprocess.run")
+    def test_no_systemctl_processes(self, mock_run, mock_metadata, fake_systemd, make_node_mock):
+        manager = self._manager(fake_systemd.address)
+        nodes = [make_node_mock(1), make_node_mock(2)]
+
+        assert manager.stop_nodes(nodes[:1])
+        assert manager.start_nodes(nodes)
+        assert manager.restart_node(nodes[1])
+        assert manager.daemon_reload()
+        statuses = manager.get_statuses(nodes)
+
+        mock_run.assert_not_called()
+        assert statuses[1].status == RUNNING
+        assert statuses[1].pid == 4242
+        assert manager.get_status(make_node_mock(3)).status == STOPPED
+
+    @patch("subprocess.run")
+    def test_bulk_statuses_pipeline_pids(self, mock_run, fake_systemd, make_node_mock):
+        for node_id in range(2, 41):
+            fake_systemd.units[f"antnode{node_id:04}.service"] = (
+                "active" if node_id % 2 else "inactive"
+            )
+        manager = self._manager(fake_systemd.address)
+        nodes = [make_node_mock(node_id) for node_id in range(1, 42)]
+
+        statuses = manager.get_statuses(nodes)
+
+        assert statuses[1].pid == 4242 and statuses[1].status == RUNNING
+        assert statuses[2].pid is None and statuses[2].status == STOPPED
+        # Not loaded
+        assert statuses[41].status == STOPPED
+        members = [member for member, _ in fake_systemd.calls]
+        assert members.count("ListUnitsByPatterns") == 1
+        assert members.count("GetUnit") == 0
+        # One MainPID read per active unit, no per-node round trip first
+        assert members.count("Get") == 20
+        mock_run.assert_not_called()
+
+    @patch("subprocess.run")
+    def test_single_status_looks_up_own_unit(self, mock_run, fake_systemd, make_node_mock):
+        fake_systemd.units["antnode0002.service"] = "failed"
+        manager = self._manager(fake_systemd.address)
+
+        running = manager.get_status(make_node_mock(1))
+        failed = manager.get_status(make_node_mock(2))
+        unloaded = manager.get_status(make_node_mock(3))
+
+        assert (running.status, running.pid) == (RUNNING, 4242)
+        assert (failed.status, failed.pid) == (STOPPED, None)
+        assert (unloaded.status, unloaded.pid) == (STOPPED, None)
+        members = [member for member, _ in fake_systemd.calls]
+        assert "ListUnitsByPatterns" not in members
+        assert members.count("GetUnit") == 3
+        mock_run.assert_not_called()
+
+    @patch("wnm.process_managers.systemd_manager.read_node_metadata", return_value={})
+    @patch("subprocess.run")
+    def test_falls_back_when_denied(self, mock_run, mock_metadata, tmp_path, make_node_mock):
+        fake = FakeSystemd(tmp_path / "bus", deny=True)
+        mock_run.return_value = Mock(returncode=0, stdout="")
+        manager = self._manager(fake.address)
+
+        assert manager.start_node(make_node_mock(1))
+
+        assert manager.bus is None
+        mock_run.assert_called_once()
+        assert mock_run.call_args.args[0] == [
+            "systemctl",
+            "--user",
+            "start",
+            "antnode0001.service",
+        ]
+        fake.close()
+
+    @patch("subprocess.run")
+    def test_falls_back_without_bus(self, mock_run, tmp_path, make_node_mock):
+        mock_run.return_value = Mock(returncode=0)
+        manager = self._manager(f"unix:path={tmp_path}/missing")
+
+        assert manager.stop_node(make_node_mock(1))
+
+        assert manager.bus is None
+        mock_run.assert_called_once()
@@ -0,0 +1,187 @@
+"""Tests for the antnode binary version cache."""
+
+import os
+import shutil
+import stat
+from unittest.mock import patch
+
+import pytest
+
+from wnm.version_cache import VersionCache, binary_key
+
+
+def _write_binary(path, version):
+    path.write_text(f"#!/bin/sh\necho 'Autonomi Node v{version}'\n")
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+
+
+class CountingProbe:
+    """Stand-in for running antnode --version"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, path):
+        self.calls.append(path)
+        with open(path) as f:
+            return f.read().split(" v")[1].split("'")[0]
+
+
+class TestVersionCache:
+    """Test version lookups are cached until the binary changes"""
+
+    def test_hit_does_not_probe(self, tmp_path):
+        binary = tmp_path / "antnode"
+        _write_binary(binary, "0.4.7")
+        cache = VersionCache()
+        probe = CountingProbe()
+
+        assert cache.get(str(binary), probe) == "0.4.7"
+        assert cache.get(str(binary), probe) == "0.4.7"
+
+        assert len(probe.calls) == 1
+        assert cache.lookups == 2
+        assert cache.misses == 1
+
+    def test_replaced_binary_is_reprobed(self, tmp_path):
+        """Test copying a new binary over the old one invalidates the entry"""
+        binary = tmp_path / "antnode"
+        new_binary = tmp_path / "antnode.new"
+        _write_binary(binary, "0.4.6")
+        _write_binary(new_binary, "0.4.7")
+        cache = VersionCache()
+        probe = CountingProbe()
+        cache.get(str(binary), probe)
+
+        # Upgrades copy with copy2, which keeps the source mtime
+        shutil.copy2(new_binary, binary)
+
+        assert cache.get(str(binary), probe) == "0.4.7"
+        assert len(probe.calls) == 2
+
+    def test_failed_probe_not_cached(self, tmp_path):
+        binary = tmp_path / "antnode"
+        _write_binary(binary, "0.4.7")
+        cache = VersionCache()
+        calls = []
+
+        def failing(path):
+            calls.append(path)
+            return 0
+
+        assert cache.get(str(binary), failing) == 0
+        assert cache.get(str(binary), failing) == 0
+        assert len(calls) == 2
+
+    def test_missing_binary(self, tmp_path):
+        cache = VersionCache()
+
+        assert binary_key(str(tmp_path / "missing")) is None
+        assert cache.get(str(tmp_path / "missing"), lambda path: 0) == 0
+
+    def test_forget(self, tmp_path):
+        binary = tmp_path / "antnode"
+        _write_binary(binary, "0.4.7")
+        cache = VersionCache()
+        probe = CountingProbe()
+        cache.get(str(binary), probe)
+
+        cache.forget(str(binary))
+        cache.get(str(binary), probe)
+
+        assert len(probe.calls) == 2
+
+    def test_persisted_between_runs(self, tmp_path):
+        binary = tmp_path / "antnode"
+        _write_binary(binary, "0.4.7")
+        cache_file = str(tmp_path / "antnode_versions.json")
+        cache = VersionCache(cache_file)
+        cache.get(str(binary), CountingProbe())
+        cache.save()
+
+        probe = CountingProbe()
+        assert VersionCache(cache_file).get(str(binary), probe) == "0.4.7"
+        assert probe.calls == []
+
+    def test_unreadable_cache_file_ignored(self, tmp_path):
+        cache_file = tmp_path / "antnode_versions.json"
+        cache_file.write_text("not json")
+        binary = tmp_path / "antnode"
+        _write_binary(binary, "0.4.7")
+
+        assert VersionCache(str(cache_file)).get(str(binary), CountingProbe()) == "0.4.7"
+
+    def test_removed_binaries_pruned_on_save(self, tmp_path):
+        cache_file = str(tmp_path / "antnode_versions.json")
+        cache = VersionCache(cache_file)
+        old = tmp_path / "old"
+        _write_binary(old, "0.4.6")
+        cache.get(str(old), CountingProbe())
+        os.remove(old)
+
+        new = tmp_path / "new"
+        _write_binary(new, "0.4.7")
+        cache.get(str(new), CountingProbe())
+        cache.save()
+
+        assert list(VersionCache(cache_file)._entries) == [str(new)]
+
+    def test_misses_saved_once(self, tmp_path):
+        cache_file = tmp_path / "antnode_versions.json"
+        cache = VersionCache(str(cache_file))
+        for index in range(5):
+            binary = tmp_path / f"antnode{index}"
+            _write_binary(binary, "0.4.7")
+            cache.get(str(binary), CountingProbe())
+
+        # Misses only mark the cache dirty
+        assert not cache_file.exists()
+
+        with patch("wnm.version_cache.os.replace", wraps=os.replace) as mock_replace:
+            cache.save()
+            cache.save()
+
+        mock_replace.assert_called_once()
+        assert len(VersionCache(str(cache_file))._entries) == 5
+
+
+class TestGetAntnodeVersion:
+    """Test get_antnode_version uses the shared cache"""
+
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self):
+        with patch("wnm.utils._version_cache", VersionCache()):
+            yield
+
+    def test_runs_binary_once(self, tmp_path):
+        from wnm.utils import get_antnode_version
+
+        binary = tmp_path / "antnode"
+        _write_binary(binary, "0.4.7")
+
+        with patch("wnm.utils._run_antnode_version", wraps=lambda path: "0.4.7") as run:
+            assert get_antnode_version(str(binary)) == "0.4.7"
+            assert get_antnode_version(str(binary)) == "0.4.7"
+
+        assert run.call_count == 1
+
+    def test_parses_binary_output(self, tmp_path):
+        from wnm.utils import get_antnode_version
+
+        binary = tmp_path / "antnode"
+        _write_binary(binary, "0.4.7")
+
+        assert get_antnode_version(str(binary)) == "0.4.7"
+
+    def test_forget_after_upgrade(self, tmp_path):
+        from wnm.utils import forget_antnode_version, get_antnode_version
+
+        binary = tmp_path / "antnode"
+        _write_binary(binary, "0.4.6")
+        get_antnode_version(str(binary))
+
+        forget_antnode_version(str(binary))
+
+        with patch("wnm.utils._run_antnode_version", return_value="0.4.7") as run:
+            assert get_antnode_version(str(binary)) == "0.4.7"
+        assert run.call_count == 1